@@ -0,0 +1,94 @@
+"""Benchmark of torchvision.io.decode_and_preprocess against the unfused
+decode_image -> Resize -> ToDtype -> Normalize chain it replaces.
+
+Usage: python benchmarks/decode_and_preprocess.py [--image-dir DIR]
+
+Without --image-dir, synthetic JPEG images are used.
+"""
+
+import argparse
+import os
+import platform
+
+import torch
+import torch.utils.benchmark as benchmark
+import torchvision
+from torchvision.transforms import v2
+
+
+MEAN = [0.485, 0.456, 0.406]
+STD = [0.229, 0.224, 0.225]
+
+
+def print_machine_specs():
+    print("Processor:", platform.processor())
+    print("Platform:", platform.platform())
+    print("Logical CPUs:", os.cpu_count())
+
+
+def get_synthetic_data(num_images=16, height=480, width=640):
+    # Smooth gradients with some noise compress like natural images, unlike
+    # pure noise.
+    torch.manual_seed(0)
+    y = torch.linspace(0, 1, height)[:, None]
+    x = torch.linspace(0, 1, width)[None, :]
+    encoded_images = []
+    for _ in range(num_images):
+        coeffs = torch.rand(3, 2)
+        img = coeffs[:, :1, None] * y + coeffs[:, 1:, None] * x
+        img = (img / img.amax() * 200 + torch.rand(3, height, width) * 55).to(torch.uint8)
+        encoded_images.append(torchvision.io.encode_jpeg(img, quality=90))
+    return encoded_images
+
+
+def get_data(image_dir):
+    paths = sorted(
+        os.path.join(image_dir, name) for name in os.listdir(image_dir) if name.lower().endswith((".jpg", ".jpeg"))
+    )
+    return [torchvision.io.read_file(path) for path in paths]
+
+
+def run_benchmark(encoded_images):
+    results = []
+    for size in (224, [224, 224], 800):
+        unfused = v2.Compose(
+            [v2.Resize(size, antialias=True), v2.ToDtype(torch.float32, scale=True), v2.Normalize(MEAN, STD)]
+        )
+        for num_threads in (1, 4):
+            for stmt, strat in zip(
+                [
+                    "[unfused(decode_image(img, mode=ImageReadMode.RGB)) for img in encoded_images]",
+                    "[decode_and_preprocess(img, size=size, mean=MEAN, std=STD, mode=ImageReadMode.RGB) "
+                    "for img in encoded_images]",
+                ],
+                ["unfused", "fused"],
+            ):
+                t = benchmark.Timer(
+                    stmt=stmt,
+                    setup="from torchvision.io import decode_and_preprocess, decode_image, ImageReadMode",
+                    globals={
+                        "encoded_images": encoded_images,
+                        "unfused": unfused,
+                        "size": size,
+                        "MEAN": MEAN,
+                        "STD": STD,
+                    },
+                    label="Decode and preprocess",
+                    sub_label=f"size={size} ({strat})",
+                    description=f"{len(encoded_images)} images",
+                    num_threads=num_threads,
+                )
+                results.append(t.blocked_autorange(min_run_time=1))
+    compare = benchmark.Compare(results)
+    compare.print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image-dir", help="Directory of JPEG images to benchmark on")
+    args = parser.parse_args()
+
+    print_machine_specs()
+    encoded_images = get_data(args.image_dir) if args.image_dir else get_synthetic_data()
+    print(f"\nBenchmarking on {len(encoded_images)} images\n")
+    run_benchmark(encoded_images)
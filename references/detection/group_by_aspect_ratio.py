@@ -8,7 +8,6 @@ import numpy as np
 import torch
 import torch.utils.data
 import torchvision
-from PIL import Image
 from torch.utils.data.sampler import BatchSampler, Sampler
 from torch.utils.model_zoo import tqdm
 
@@ -143,13 +142,9 @@ def _compute_aspect_ratios_coco_dataset(dataset, indices=None):
 def _compute_aspect_ratios_voc_dataset(dataset, indices=None):
     if indices is None:
         indices = range(len(dataset))
-    aspect_ratios = []
-    for i in indices:
-        # this doesn't load the data into memory, because PIL loads it lazily
-        width, height = Image.open(dataset.images[i]).size
-        aspect_ratio = float(width) / float(height)
-        aspect_ratios.append(aspect_ratio)
-    return aspect_ratios
+    # this only parses the image headers, the images aren't decoded
+    infos = torchvision.io.read_image_info([dataset.images[i] for i in indices])
+    return [float(info.width) / float(info.height) for info in infos]
 
 
 def _compute_aspect_ratios_subset_dataset(dataset, indices=None):
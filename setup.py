@@ -305,6 +305,22 @@ def make_image_extension():
         else:
             warnings.warn("Building torchvision without PNG support")
 
+    # zlib is only needed to decode Deflate-compressed TIFF images, the rest
+    # of the TIFF decoder doesn't depend on any library.
+    zlib_found, zlib_include_dir, zlib_library_dir = find_library(header="zlib.h")
+    if zlib_found:
+        print("Building torchvision with TIFF Deflate support")
+        print(f"{zlib_include_dir = }")
+        print(f"{zlib_library_dir = }")
+        if zlib_include_dir is not None and zlib_library_dir is not None:
+            # if those are None it means they come from standard paths that are already in the search paths, which we don't need to re-add.
+            include_dirs.append(zlib_include_dir)
+            library_dirs.append(zlib_library_dir)
+        libraries.append("zlib" if sys.platform == "win32" else "z")
+        define_macros += [("ZLIB_FOUND", 1)]
+    else:
+        warnings.warn("Building torchvision without TIFF Deflate support")
+
     if USE_JPEG:
         jpeg_found, jpeg_include_dir, jpeg_library_dir = find_library(header="jpeglib.h")
         if jpeg_found:
@@ -1,5 +1,4 @@
 import bz2
-import contextlib
 import csv
 import io
 import itertools
@@ -22,9 +21,11 @@ import PIL
 import pytest
 import torch
 import torch.nn.functional as F
-from common_utils import combinations_grid
+from common_utils import assert_equal, combinations_grid, get_tmp_dir
 from torchvision import datasets
+from torchvision.io import decode_image
 from torchvision.transforms import v2
+from torchvision.transforms.functional import pil_to_tensor
 
 
 class STL10TestCase(datasets_utils.ImageDatasetTestCase):
@@ -629,6 +630,33 @@ class CelebATestCase(datasets_utils.ImageDatasetTestCase):
 
         assert merged_imgs_names == all_imgs_names
 
+    def test_annotations_cache(self):
+        with self.create_dataset(split="all") as (dataset, _):
+            base_folder = os.path.join(dataset.root, dataset.base_folder)
+            for name in ["list_eval_partition.txt", "identity_CelebA.txt", "list_attr_celeba.txt"]:
+                assert os.path.isfile(os.path.join(base_folder, f".{name}.torchvision_cache.npz"))
+
+            with self._maybe_apply_patches(self._patch_checks()):
+                cached = datasets.CelebA(
+                    dataset.root, split="all", target_type=["attr", "identity", "bbox", "landmarks"]
+                )
+            assert cached.filename == dataset.filename
+            assert cached.attr_names == dataset.attr_names
+            for name in ["attr", "identity", "bbox", "landmarks_align"]:
+                assert_equal(getattr(cached, name), getattr(dataset, name))
+
+            # The annotations are parsed again when they change
+            attr_path = os.path.join(base_folder, "list_attr_celeba.txt")
+            with open(attr_path) as f:
+                lines = f.read().splitlines()
+            lines[2] = " ".join([lines[2].split()[0]] + ["1"] * len(dataset.attr_names))
+            with open(attr_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            with self._maybe_apply_patches(self._patch_checks()):
+                changed = datasets.CelebA(dataset.root, split="all")
+            assert changed.attr[0].tolist() == [1] * len(dataset.attr_names)
+            assert_equal(changed.attr[1:], dataset.attr[1:])
+
     def test_transforms_v2_wrapper_spawn(self):
         expected_size = (123, 321)
         for target_type in ["identity", "bbox", ["identity", "bbox"]]:
@@ -972,23 +1000,6 @@ class LSUNTestCase(datasets_utils.ImageDatasetTestCase):
 
         return num_images
 
-    @contextlib.contextmanager
-    def create_dataset(self, *args, **kwargs):
-        with super().create_dataset(*args, **kwargs) as output:
-            yield output
-            # Currently datasets.LSUN caches the keys in the current directory rather than in the root directory. Thus,
-            # this creates a number of _cache_* files in the current directory that will not be removed together
-            # with the temporary directory
-            for file in os.listdir(os.getcwd()):
-                if file.startswith("_cache_"):
-                    try:
-                        os.remove(file)
-                    except FileNotFoundError:
-                        # When the same test is run in parallel (in fb internal tests), a thread may remove another
-                        # thread's file. We should be able to remove the try/except when
-                        # https://github.com/pytorch/vision/issues/825 is fixed.
-                        pass
-
     def _parse_classes(self, classes):
         if not isinstance(classes, str):
             return classes
@@ -1024,6 +1035,43 @@ class LSUNTestCase(datasets_utils.ImageDatasetTestCase):
 
         return num_images
 
+    def test_keys_index(self):
+        with self.create_dataset(classes=["bedroom_train"]) as (dataset, _):
+            db = dataset.dbs[0]
+            keys_path = os.path.join(db.root, datasets.lsun.KEYS_FILENAME)
+            assert os.path.isfile(keys_path)
+            assert not any(file.startswith("_cache_") for file in os.listdir(os.getcwd()))
+            with db.env.begin() as txn:
+                expected_keys = list(txn.cursor().iternext(keys=True, values=False))
+            assert db.keys == expected_keys
+            assert db.keys is db.keys
+
+            keys_mtime_ns = os.stat(keys_path).st_mtime_ns
+            assert datasets.lsun.LSUNClass(db.root).keys == expected_keys
+            assert os.stat(keys_path).st_mtime_ns == keys_mtime_ns
+
+            # The keys are listed again when the database changes
+            datasets.lsun._environments.pop(os.path.abspath(db.root)).close()
+            with datasets_utils.lazy_importer.lmdb.open(db.root) as env, env.begin(write=True) as txn:
+                txn.delete(expected_keys[0])
+            assert datasets.lsun.LSUNClass(db.root).keys == expected_keys[1:]
+
+    def test_loader(self):
+        with self.create_dataset(classes=["bedroom_train", "tower_train"]) as (dataset, info):
+            tensor_dataset = datasets.LSUN(dataset.root, classes=dataset.classes, loader=decode_image)
+            loader = torch.utils.data.DataLoader(tensor_dataset, batch_size=None, num_workers=2)
+            for (image, target), (expected_image, expected_target) in zip(loader, dataset):
+                assert_equal(image, pil_to_tensor(expected_image))
+                assert target == expected_target
+
+    def test_loader_keeping_data(self):
+        with self.create_dataset(classes=["bedroom_train"]) as (dataset, _):
+            db = datasets.lsun.LSUNClass(dataset.dbs[0].root, loader=lambda data: data)
+            data = [db[i][0] for i in range(len(db))]
+            with db.env.begin() as txn:
+                expected = [txn.get(key) for key in db.keys]
+            assert [bytes(d.numpy()) for d in data] == expected
+
     def test_not_found_or_corrupted(self):
         # LSUN does not raise built-in exception, but a custom one. It is expressive enough to not 'cast' it to
         # RuntimeError or FileNotFoundError that are normally checked by this test.
@@ -1700,6 +1748,72 @@ class DatasetFolderTestCase(datasets_utils.ImageDatasetTestCase):
             with self.create_dataset(config) as (dataset, info):
                 pass
 
+    def test_compact_samples(self):
+        with self.create_dataset(compact_samples=True) as (dataset, info):
+            expected = datasets.DatasetFolder(dataset.root, dataset.loader, self._EXTENSIONS)
+            assert len(dataset.samples) == len(expected.samples) == info["num_examples"]
+            assert list(dataset.samples) == expected.samples
+            assert dataset.samples[-1] == expected.samples[-1]
+            assert dataset.samples[1:] == expected.samples[1:]
+            with pytest.raises(IndexError):
+                dataset.samples[len(dataset)]
+            assert isinstance(dataset.targets, np.ndarray)
+            assert dataset.targets.tolist() == expected.targets
+
+            sample, target = dataset[0]
+            assert isinstance(target, int)
+            assert list(pickle.loads(pickle.dumps(dataset)).samples) == expected.samples
+
+    def test_manifest(self):
+        with get_tmp_dir() as tmpdir, self.create_dataset(manifest_dir=tmpdir) as (dataset, info):
+            manifest_dir = pathlib.Path(tmpdir)
+            assert len(dataset) == info["num_examples"]
+            assert len(list(manifest_dir.iterdir())) == 1
+
+            def make_dataset():
+                return datasets.DatasetFolder(
+                    dataset.root, dataset.loader, extensions=self._EXTENSIONS, manifest_dir=manifest_dir
+                )
+
+            assert make_dataset().samples == dataset.samples
+
+            # Recently modified directories are always listed again, as their
+            # modification time may not change if they are modified again.
+            root = pathlib.Path(dataset.root)
+            for path in [root, *root.iterdir()]:
+                os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns - 10**10))
+            assert make_dataset().samples == dataset.samples
+            (manifest_path,) = manifest_dir.iterdir()
+            manifest_mtime_ns = manifest_path.stat().st_mtime_ns
+            # The manifest is up to date, and isn't rewritten
+            assert make_dataset().samples == dataset.samples
+            assert manifest_path.stat().st_mtime_ns == manifest_mtime_ns
+
+            # Modified directories are listed again
+            nested_dir = root / dataset.classes[0] / "nested"
+            nested_dir.mkdir()
+            datasets_utils.create_image_file(nested_dir, "new.png")
+            os.remove(dataset.samples[0][0])
+            samples = make_dataset().samples
+            assert samples == datasets.DatasetFolder(dataset.root, dataset.loader, self._EXTENSIONS).samples
+            assert (str(nested_dir / "new.png"), 0) in samples
+            assert dataset.samples[0] not in samples
+
+            with pytest.raises(ValueError, match="only be used with extensions"):
+                datasets.DatasetFolder(
+                    dataset.root, dataset.loader, is_valid_file=lambda path: True, manifest_dir=manifest_dir
+                )
+
+            class CustomDatasetFolder(datasets.DatasetFolder):
+                @staticmethod
+                def make_dataset(*args, **kwargs):
+                    return datasets.DatasetFolder.make_dataset(*args, **kwargs)
+
+            with pytest.raises(ValueError, match="make_dataset is overridden"):
+                CustomDatasetFolder(
+                    dataset.root, dataset.loader, extensions=self._EXTENSIONS, manifest_dir=manifest_dir
+                )
+
 
 class ImageFolderTestCase(datasets_utils.ImageDatasetTestCase):
     DATASET_CLASS = datasets.ImageFolder
@@ -1722,6 +1836,72 @@ class ImageFolderTestCase(datasets_utils.ImageDatasetTestCase):
             assert all([a == b for a, b in zip(dataset.classes, info["classes"])])
 
 
+class TestShardedImageDataset:
+    def _create_image_folder(self, root):
+        for cls in ("a", "b", "c"):
+            datasets_utils.create_image_folder(root, cls, lambda idx: f"{cls}_{idx}.png", num_examples=7)
+        return datasets.ImageFolder(root, loader=decode_image)
+
+    @pytest.mark.parametrize("shard_size", (1, 500, 2**30))
+    def test_map_style(self, tmp_path, shard_size):
+        folder = self._create_image_folder(tmp_path / "images")
+        datasets.write_image_shards(folder, tmp_path / "shards", shard_size=shard_size, shuffle=False)
+        num_shards = len(list((tmp_path / "shards").glob("shard-*.bin")))
+        if shard_size == 1:
+            assert num_shards == len(folder)
+        elif shard_size == 500:
+            assert 1 < num_shards < len(folder)
+        else:
+            assert num_shards == 1
+
+        dataset = datasets.ShardedImageDataset(tmp_path / "shards")
+        assert len(dataset) == len(folder)
+        assert dataset.classes == folder.classes
+        assert dataset.targets.tolist() == folder.targets
+        for (image, target), (expected_image, expected_target) in zip(dataset, folder):
+            assert_equal(image, expected_image)
+            assert target == expected_target
+
+        dataset = datasets.ShardedImageDataset(tmp_path / "shards", mode="GRAY", target_transform=lambda t: -t)
+        image, target = dataset[-1]
+        assert image.shape[0] == 1
+        assert target == -folder.targets[-1]
+
+    @pytest.mark.parametrize("num_workers", (0, 2))
+    def test_shard_shuffled(self, tmp_path, num_workers):
+        folder = self._create_image_folder(tmp_path / "images")
+        datasets.write_image_shards(folder, tmp_path / "shards", shard_size=300)
+        dataset = datasets.ShardedImageDataset(tmp_path / "shards")
+        # The images are shuffled when written
+        assert dataset.targets.tolist() != folder.targets
+
+        expected = sorted((image.flatten().tolist(), target) for image, target in folder)
+        iterable = dataset.shard_shuffled(seed=1, buffer_size=4, read_size=1000)
+        loader = torch.utils.data.DataLoader(iterable, batch_size=None, num_workers=num_workers)
+        samples = [(image.flatten().tolist(), target) for image, target in loader]
+        assert sorted(samples) == expected
+        assert samples != sorted(samples)
+
+        iterable.set_epoch(1)
+        loader = torch.utils.data.DataLoader(iterable, batch_size=None, num_workers=num_workers)
+        assert [target for _, target in loader] != [target for _, target in samples]
+
+    def test_encode_dataset(self, tmp_path):
+        fake_data = datasets.FakeData(size=5, image_size=(3, 10, 12), num_classes=3)
+        datasets.write_image_shards(fake_data, tmp_path, shuffle=False)
+        dataset = datasets.ShardedImageDataset(tmp_path)
+        assert dataset.classes is None
+        for (image, target), (expected_image, expected_target) in zip(dataset, fake_data):
+            assert_equal(image, pil_to_tensor(expected_image))
+            assert target == expected_target
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="write_image_shards"):
+            datasets.ShardedImageDataset(tmp_path)
+        with pytest.raises(ValueError, match="shard_size"):
+            datasets.write_image_shards(datasets.FakeData(size=1), tmp_path, shard_size=0)
+
+
 class KittiTestCase(datasets_utils.ImageDatasetTestCase):
     DATASET_CLASS = datasets.Kitti
     FEATURE_TYPES = (PIL.Image.Image, (list, type(None)))  # test split returns None as target
@@ -2,7 +2,9 @@ import contextlib
 import gzip
 import os
 import pathlib
+import pickle
 import re
+import struct
 import tarfile
 import zipfile
 
@@ -11,8 +13,10 @@ import torch
 import torchvision.datasets.utils as utils
 from common_utils import assert_equal
 from torch._utils_internal import get_file_path_2
+from torchvision.datasets import DecodedImageCache, ImageFolder
 from torchvision.datasets.folder import make_dataset
 from torchvision.datasets.utils import _COMPRESSED_FILE_OPENERS
+from torchvision.io import decode_image, ImageReadMode, write_png
 
 TEST_FILE = get_file_path_2(
     os.path.dirname(os.path.abspath(__file__)), "assets", "encode_jpeg", "grace_hopper_517x606.jpg"
@@ -283,5 +287,150 @@ def test_make_dataset_no_valid_files(tmpdir, kwargs, expected_error_msg):
         make_dataset(str(tmpdir), **kwargs)
 
 
+class TestDecodedImageCache:
+    def _make_images(self, root, num_images=4, size=(40, 60)):
+        paths = []
+        for i in range(num_images):
+            path = os.path.join(root, f"{i}.png")
+            write_png(torch.randint(0, 256, (3, *size), dtype=torch.uint8), path)
+            paths.append(path)
+        return paths
+
+    def test_hit_and_miss(self, tmpdir, mocker):
+        paths = self._make_images(tmpdir)
+        cache = DecodedImageCache(max_bytes=2**20)
+        spy = mocker.spy(cache, "_load")
+        for _ in range(3):
+            for path in paths:
+                assert_equal(cache(path), decode_image(path, mode=ImageReadMode.RGB))
+        assert spy.call_count == len(paths)
+
+        # Modified images are decoded again
+        write_png(torch.zeros((3, 10, 20), dtype=torch.uint8), paths[0])
+        os.utime(paths[0], ns=(0, 0))
+        assert cache(paths[0]).shape == (3, 10, 20)
+        assert spy.call_count == len(paths) + 1
+
+    def test_shared_between_instances(self, tmpdir, mocker):
+        paths = self._make_images(tmpdir)
+        cache = DecodedImageCache(max_bytes=2**20)
+        for path in paths:
+            cache(path)
+
+        # A pickled copy, like in DataLoader workers, uses the same entries
+        other = pickle.loads(pickle.dumps(cache))
+        spy = mocker.spy(other, "_load")
+        for path in paths:
+            assert_equal(other(path), cache(path))
+        assert spy.call_count == 0
+
+        # Copies don't own the cache directory
+        cache_dir = cache.cache_dir
+        del other
+        assert os.path.isdir(cache_dir)
+        del cache
+        assert not os.path.exists(cache_dir)
+
+    def test_eviction(self, tmpdir):
+        paths = self._make_images(tmpdir, num_images=10)
+        image_bytes = 3 * 40 * 60
+        cache = DecodedImageCache(max_bytes=4 * image_bytes + 500)
+        for path in paths:
+            cache(path)
+        entries = os.listdir(cache.cache_dir)
+        assert 0 < len(entries) <= 4
+        # The most recently used entries are kept
+        assert cache._get_key(paths[-1]) in entries
+
+    def test_write_failure(self, tmpdir, mocker):
+        (path,) = self._make_images(tmpdir, num_images=1)
+        cache = DecodedImageCache(max_bytes=2**20)
+        mocker.patch("torchvision._utils.os.replace", side_effect=OSError(28, "No space left on device"))
+        assert_equal(cache(path), decode_image(path, mode=ImageReadMode.RGB))
+        assert os.listdir(cache.cache_dir) == []
+
+    def test_uncacheable_images(self, tmpdir):
+        paths = self._make_images(tmpdir, num_images=2)
+        cache = DecodedImageCache(max_bytes=2**20, loader=lambda path: decode_image(path).double())
+        with pytest.warns(UserWarning, match="are not cached"):
+            assert cache(paths[0]).dtype == torch.float64
+        assert cache(paths[1]).dtype == torch.float64
+        assert os.listdir(cache.cache_dir) == []
+
+    def test_malformed_entries(self, tmpdir):
+        (path,) = self._make_images(tmpdir, num_images=1)
+        cache = DecodedImageCache(max_bytes=2**20)
+        expected = cache(path)
+        entry = os.path.join(cache.cache_dir, cache._get_key(path))
+        with open(entry, "r+b") as f:
+            # Invalid dtype index
+            f.seek(8)
+            f.write(struct.pack("<q", 100))
+        assert_equal(cache(path), expected)
+        with open(entry, "r+b") as f:
+            f.truncate(100)
+        assert_equal(cache(path), expected)
+        assert_equal(cache(path), expected)
+
+    def test_stale_temporary_files(self, tmpdir):
+        paths = self._make_images(tmpdir, num_images=2)
+        image_bytes = 3 * 40 * 60
+        cache = DecodedImageCache(max_bytes=2 * image_bytes + 2000)
+        stale, recent = (os.path.join(cache.cache_dir, f"{name}.123.tmp") for name in ("stale", "recent"))
+        for tmp in (stale, recent):
+            with open(tmp, "wb") as f:
+                f.write(bytes(image_bytes))
+        os.utime(stale, ns=(0, 0))
+        for path in paths:
+            cache(path)
+        cache._evict()
+        entries = os.listdir(cache.cache_dir)
+        assert os.path.basename(stale) not in entries
+        # The recent temporary file counts in the size of the cache
+        assert sorted(entries) == sorted([os.path.basename(recent), cache._get_key(paths[1])])
+
+    @pytest.mark.parametrize("size", (20, 100))
+    def test_size(self, tmpdir, size):
+        (path,) = self._make_images(tmpdir, num_images=1, size=(40, 60))
+        cache = DecodedImageCache(max_bytes=2**20, size=size, mode="GRAY")
+        expected_size = (20, 30) if size == 20 else (40, 60)
+        assert cache(path).shape == (1, *expected_size)
+        assert cache(path).shape == (1, *expected_size)
+
+    def test_loader_and_cache_dir(self, tmpdir):
+        (path,) = self._make_images(os.path.join(tmpdir), num_images=1)
+        cache_dir = os.path.join(tmpdir, "cache")
+        cache = DecodedImageCache(
+            max_bytes=2**20, loader=lambda path: decode_image(path).float() / 255, cache_dir=cache_dir
+        )
+        expected = decode_image(path).float() / 255
+        assert_equal(cache(path), expected)
+        assert_equal(cache(pathlib.Path(path)), expected)
+        del cache
+        assert len(os.listdir(cache_dir)) == 1
+
+        cache = DecodedImageCache(max_bytes=2**20, cache_dir=cache_dir)
+        cache.clear()
+        assert os.listdir(cache_dir) == []
+
+    def test_image_folder(self, tmpdir):
+        for cls in ("a", "b"):
+            os.makedirs(os.path.join(tmpdir, cls))
+            self._make_images(os.path.join(tmpdir, cls), num_images=2)
+        cache = DecodedImageCache(max_bytes=2**20)
+        dataset = ImageFolder(str(tmpdir), loader=cache)
+        for i in range(2):
+            for (path, target), (sample, sample_target) in zip(dataset.samples, dataset):
+                assert_equal(sample, decode_image(path, mode=ImageReadMode.RGB))
+                assert sample_target == target
+        assert len(os.listdir(cache.cache_dir)) == len(dataset)
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match="max_bytes must be a positive integer"):
+            DecodedImageCache(max_bytes=0)
+        with pytest.raises(ValueError, match="size must be a positive integer"):
+            DecodedImageCache(max_bytes=10, size=0)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,8 +1,12 @@
+import pickle
+import threading
+import warnings
+
 import pytest
 import torch
 from common_utils import assert_equal, get_list_of_videos
 from torchvision import io
-from torchvision.datasets.video_utils import unfold, VideoClips
+from torchvision.datasets.video_utils import ClipBatchReader, unfold, VideoClips
 
 
 class TestVideo:
@@ -67,6 +71,153 @@ class TestVideo:
                 assert info["video_fps"] == fps
                 # TODO add tests checking that the content is right
 
+    @pytest.mark.skipif(not io.video._av_available(), reason="this test requires av")
+    def test_video_clips_use_video_index(self, tmpdir):
+        video_list = get_list_of_videos(tmpdir, num_videos=3)
+        video_clips = VideoClips(video_list, 5, 5, use_video_index=True)
+        assert all(io.read_video_index(path) is not None for path in video_list)
+
+        expected = VideoClips(video_list, 5, 5)
+        assert video_clips.num_clips() == expected.num_clips() == 1 + 2 + 3
+        for pts, expected_pts in zip(video_clips.video_pts, expected.video_pts):
+            assert_equal(pts, expected_pts)
+        assert video_clips.video_fps == expected.video_fps
+        assert_equal(video_clips.get_clip(3)[0], expected.get_clip(3)[0])
+
+    @pytest.mark.skipif(not io.video._av_available(), reason="this test requires av")
+    def test_video_clips_video_size(self, tmpdir):
+        video_list = get_list_of_videos(tmpdir, num_videos=2, sizes=[10, 10])
+        video_clips = VideoClips(video_list, 5, 5, _video_width=40, _video_height=30)
+        assert video_clips.get_clip(0)[0].shape == (5, 30, 40, 3)
+        video_clips = VideoClips(video_list, 5, 5, _video_min_dimension=20, output_format="TCHW")
+        assert video_clips.get_clip(0)[0].shape[:3] == (5, 3, 20)
+
+    @pytest.mark.skipif(not io.video._av_available(), reason="this test requires av")
+    @pytest.mark.parametrize("frame_rate, output_format", ((None, "THWC"), (3, "TCHW"), (8, "THWC")))
+    def test_clip_batch_reader(self, tmpdir, frame_rate, output_format):
+        video_list = get_list_of_videos(tmpdir, num_videos=3, sizes=[12, 10, 15])
+        video_clips = VideoClips(video_list, 4, 2, frame_rate=frame_rate, output_format=output_format)
+        idxs = list(range(video_clips.num_clips()))[::-1]
+        locations = [video_clips.get_clip_location(idx) for idx in idxs]
+        expected = torch.stack([video_clips.get_clip(idx)[0] for idx in idxs])
+
+        reader = ClipBatchReader(video_clips, num_threads=3)
+        batch = reader.read(locations)
+        assert_equal(batch, expected)
+
+        # The memory of the output can be reused
+        assert reader.read(locations[:2], out=batch[:2]).data_ptr() == batch.data_ptr()
+        with pytest.raises(ValueError, match="out should be"):
+            reader.read(locations, out=batch[1:])
+        with pytest.raises(IndexError, match="There is no clip"):
+            reader.read([(0, video_clips.num_clips_per_video()[0].item())])
+
+        batch = ClipBatchReader(video_clips, size=(30, 40), crop=[5, 10, 20, 16]).read(locations[:3])
+        assert batch.shape == ((3, 4, 20, 16, 3) if output_format == "THWC" else (3, 4, 3, 20, 16))
+
+    @pytest.mark.skipif(not io.video._av_available(), reason="this test requires av")
+    def test_clip_batch_reader_close(self, tmpdir):
+        video_clips = VideoClips(get_list_of_videos(tmpdir, num_videos=2, sizes=[10, 10]), 4, 4)
+        num_threads = threading.active_count()
+        with ClipBatchReader(video_clips, num_threads=2) as reader:
+            reader.read([(0, 0), (1, 1)])
+            assert threading.active_count() > num_threads
+        assert threading.active_count() == num_threads
+        with pytest.raises(RuntimeError, match="closed"):
+            reader.read([(0, 0)])
+
+        # The threads are also stopped when the reader is garbage collected
+        reader = ClipBatchReader(video_clips, num_threads=2)
+        reader.read([(0, 0), (1, 1)])
+        del reader
+        assert threading.active_count() == num_threads
+
+    @pytest.mark.skipif(not io.video._av_available(), reason="this test requires av")
+    def test_clip_batch_reader_different_sizes(self, tmpdir):
+        video_list = []
+        for i, (height, width) in enumerate(((30, 40), (20, 24))):
+            path = str(tmpdir / f"{i}.mp4")
+            io.write_video(path, torch.randint(0, 256, (8, height, width, 3), dtype=torch.uint8), fps=5)
+            video_list.append(path)
+        video_clips = VideoClips(video_list, 4, 4)
+        with pytest.raises(ValueError, match=r"have different sizes .*\(30, 40\).*\(20, 24\).*Pass size or crop"):
+            ClipBatchReader(video_clips).read([(0, 0), (1, 0)])
+        batch = ClipBatchReader(video_clips, size=(24, 32)).read([(0, 1), (1, 0)])
+        assert batch.shape == (2, 4, 24, 32, 3)
+
+    @pytest.mark.parametrize("frame_rate", (None, 1, 3, 4, 7.5, 10))
+    @pytest.mark.parametrize("num_frames, step", ((4, 4), (5, 2), (30, 1)))
+    def test_video_clips_flat_metadata(self, frame_rate, num_frames, step):
+        # Compare against the clips computed video per video by compute_clips_for_video
+        lengths = [0, 3, 12, 25, 50, 7, 100]
+        fps = [None, 3, 4, 6, 29.97, 30, 25]
+        video_pts = [torch.arange(n) * 1000 + i for i, n in enumerate(lengths)]
+        metadata = {"video_paths": [f"{i}.mp4" for i in range(len(lengths))], "video_pts": video_pts, "video_fps": fps}
+        with pytest.warns(UserWarning, match="There aren't enough frames"):
+            video_clips = VideoClips(metadata["video_paths"], num_frames, step, frame_rate, metadata)
+
+        expected_clips = []
+        for pts, video_fps in zip(video_pts, fps):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                clips, _ = VideoClips.compute_clips_for_video(pts, num_frames, step, video_fps, frame_rate)
+            expected_clips.append(clips)
+        assert video_clips.num_clips_per_video().tolist() == [len(c) for c in expected_clips]
+        assert video_clips.num_clips() == sum(len(c) for c in expected_clips)
+        for clips, expected in zip(video_clips.clips, expected_clips):
+            assert_equal(clips, expected)
+
+        expected_locations = [(v, c) for v, clips in enumerate(expected_clips) for c in range(len(clips))]
+        for idx, (video_idx, clip_idx) in enumerate(expected_locations):
+            assert video_clips.get_clip_location(idx) == (video_idx, clip_idx)
+            frame_idxs = video_clips._get_clip_frame_idxs(video_idx, clip_idx)
+            assert_equal(video_pts[video_idx][frame_idxs], expected_clips[video_idx][clip_idx])
+
+        for pts, expected_pts in zip(video_clips.video_pts, video_pts):
+            assert_equal(pts, expected_pts)
+        assert video_clips.video_fps == fps
+        assert video_clips.clips is video_clips.clips
+        assert video_clips.resampling_idxs is video_clips.resampling_idxs
+        assert video_clips.video_pts is video_clips.video_pts
+
+    @pytest.mark.parametrize("fps, frame_rate", ((23.976, 29.97), (29.97, 23.976), (25, 29.97), (30, 7.5), (59.94, 24)))
+    def test_video_clips_num_clips_non_integer_steps(self, fps, frame_rate):
+        lengths = list(range(1, 400))
+        video_pts = [torch.arange(n) for n in lengths]
+        metadata = {
+            "video_paths": [f"{n}.mp4" for n in lengths],
+            "video_pts": video_pts,
+            "video_fps": [fps] * len(lengths),
+        }
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            video_clips = VideoClips(metadata["video_paths"], 4, 3, frame_rate, metadata)
+            expected = [len(VideoClips.compute_clips_for_video(pts, 4, 3, fps, frame_rate)[0]) for pts in video_pts]
+        assert video_clips.num_clips_per_video().tolist() == expected
+
+    def test_video_clips_pickle(self):
+        video_pts = [torch.arange(n) for n in (10, 0, 20)]
+        metadata = {"video_paths": ["a.mp4", "b.mp4", "c.mp4"], "video_pts": video_pts, "video_fps": [5, None, 5]}
+        with pytest.warns(UserWarning, match="There aren't enough frames"):
+            video_clips = VideoClips(metadata["video_paths"], 5, 5, _precomputed_metadata=metadata)
+            video_clips.share_memory_()
+
+            clips = pickle.loads(pickle.dumps(video_clips))
+            # States pickled by older versions of torchvision
+            old_state = dict(video_clips.__getstate__(), _version=2, video_pts_sizes=[10, 0, 20])
+            old_state["video_pts"] = torch.cat(video_pts).numpy()
+            old_state["video_fps"] = [5, None, 5]
+            old_clips = VideoClips.__new__(VideoClips)
+            old_clips.__setstate__({k: v for k, v in old_state.items() if not k.startswith("_video_")})
+
+        for c in (clips, old_clips):
+            assert c.num_clips() == 6
+            assert c.num_clips_per_video().tolist() == [2, 0, 4]
+            assert c.get_clip_location(3) == (2, 1)
+            for pts, expected_pts in zip(c.video_pts, video_pts):
+                assert_equal(pts, expected_pts)
+            assert c.video_fps == [5, None, 5]
+
     def test_compute_clips_for_video(self):
         video_pts = torch.arange(30)
         # case 1: single clip
@@ -3,7 +3,9 @@ import glob
 import io
 import os
 import re
+import struct
 import sys
+import zlib
 from contextlib import nullcontext
 from pathlib import Path
 
@@ -18,16 +20,24 @@ from torchvision._internally_replaced_utils import IN_FBCODE
 from torchvision.io.image import (
     _decode_avif,
     _decode_heic,
+    decode_and_preprocess,
     decode_gif,
     decode_image,
+    decode_image_async,
     decode_jpeg,
     decode_png,
+    decode_png_bands,
+    decode_tiff,
     decode_webp,
     encode_jpeg,
     encode_png,
+    get_io_num_threads,
     ImageReadMode,
     read_file,
     read_image,
+    read_image_async,
+    read_image_info,
+    set_io_num_threads,
     write_file,
     write_jpeg,
     write_png,
@@ -125,6 +135,143 @@ def test_decode_jpeg(img_path, pil_mode, mode, scripted, decode_fun):
     assert abs_mean_diff < 2
 
 
+@pytest.mark.parametrize("mode", [ImageReadMode.UNCHANGED, ImageReadMode.GRAY, ImageReadMode.RGB])
+@pytest.mark.parametrize("num_threads", (0, 1, 3))
+@pytest.mark.parametrize("scripted", (False, True))
+def test_decode_jpegs_cpu(mode, num_threads, scripted):
+    encoded_images = [read_file(img_path) for img_path in get_images(IMAGE_ROOT, ".jpg")]
+    expected = [decode_jpeg(data, mode=mode) for data in encoded_images]
+
+    decode_fn = torch.jit.script(decode_jpeg) if scripted else decode_jpeg
+    decoded_images = decode_fn(encoded_images, mode=mode, num_threads=num_threads)
+
+    assert len(decoded_images) == len(expected)
+    for decoded, ref in zip(decoded_images, expected):
+        assert_equal(decoded, ref)
+
+
+def test_decode_jpegs_cpu_errors():
+    good = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    bad = read_file(os.path.join(DAMAGED_JPEG, "corrupt34_2.jpg"))
+    with pytest.raises(RuntimeError, match="Image is incomplete or truncated"):
+        decode_jpeg([good, bad, good], num_threads=2)
+    with pytest.raises(RuntimeError, match="num_threads must be a non-negative integer"):
+        decode_jpeg([good], num_threads=-1)
+
+
+@pytest.mark.parametrize(
+    "target_size, expected_size",
+    [
+        ([606, 517], (606, 517)),
+        ([303, 259], (303, 259)),
+        ([304, 259], (606, 517)),
+        ([100], (152, 130)),
+        ([1], (76, 65)),
+        ([10000], (606, 517)),
+    ],
+)
+@pytest.mark.parametrize("scripted", (False, True))
+@pytest.mark.parametrize("decode_fun", (decode_jpeg, decode_image))
+def test_decode_jpeg_target_size(target_size, expected_size, scripted, decode_fun):
+    img_path = os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg")
+    data = read_file(img_path)
+    if scripted:
+        decode_fun = torch.jit.script(decode_fun)
+    img = decode_fun(data, target_size=target_size)
+    assert img.shape == (3, *expected_size)
+
+    # PIL's draft mode relies on the same libjpeg DCT scaling
+    with Image.open(img_path) as img_pil:
+        scale = round(img_pil.height / expected_size[0])
+        img_pil.draft("RGB", (img_pil.width // scale, img_pil.height // scale))
+        img_pil = normalize_dimensions(torch.from_numpy(np.array(img_pil)))
+    assert img_pil.shape == img.shape
+    abs_mean_diff = (img.float() - img_pil.float()).abs().mean().item()
+    assert abs_mean_diff < 2
+
+
+@pytest.mark.parametrize("orientation", [1, 6])
+def test_decode_jpeg_target_size_exif_orientation(tmpdir, orientation):
+    fp = os.path.join(tmpdir, f"exif_oriented_{orientation}.jpg")
+    t = torch.randint(0, 256, size=(3, 256, 128), dtype=torch.uint8)
+    im = F.to_pil_image(t)
+    exif = im.getexif()
+    exif[0x0112] = orientation
+    im.save(fp, "JPEG", exif=exif.tobytes())
+
+    data = read_file(fp)
+    # target_size refers to the oriented output, so the same target leads to
+    # different scales depending on the orientation
+    output = decode_jpeg(data, apply_exif_orientation=True, target_size=[64, 64])
+    expected_size = (128, 64) if orientation == 1 else (64, 128)
+    assert output.shape == (3, *expected_size)
+
+    outputs = decode_jpeg([data, data], apply_exif_orientation=True, target_size=[64, 64])
+    assert all(output.shape == (3, *expected_size) for output in outputs)
+
+
+def test_decode_jpeg_target_size_errors():
+    data = read_file(os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg"))
+    with pytest.raises(ValueError, match="target_size must be a list of 1 or 2 integers"):
+        decode_jpeg(data, target_size=[1, 2, 3])
+    with pytest.raises(RuntimeError, match="target_size values must be positive"):
+        decode_jpeg(data, target_size=[0])
+
+
+@pytest.mark.parametrize(
+    "img_path",
+    [pytest.param(jpeg_path, id=_get_safe_image_name(jpeg_path)) for jpeg_path in get_images(IMAGE_ROOT, ".jpg")],
+)
+@pytest.mark.parametrize("mode", [ImageReadMode.UNCHANGED, ImageReadMode.GRAY, ImageReadMode.RGB])
+@pytest.mark.parametrize("scripted", (False, True))
+def test_decode_jpeg_crop(img_path, mode, scripted):
+    data = read_file(img_path)
+    full = decode_jpeg(data, mode=mode)
+    height, width = full.shape[-2:]
+
+    decode_fn = torch.jit.script(decode_jpeg) if scripted else decode_jpeg
+    for top, left, crop_height, crop_width in [
+        (0, 0, height, width),
+        (1, 3, height - 5, width - 7),
+        (17, 33, 20, 30),
+        (height // 2, width // 3, height // 2, width // 2),
+    ]:
+        img = decode_fn(data, mode=mode, crop=[top, left, crop_height, crop_width])
+        expected = full[:, top : top + crop_height, left : left + crop_width]
+        assert img.shape == expected.shape
+        # Chroma upsampling can slightly differ on the edges of the crop
+        abs_mean_diff = (img.float() - expected.float()).abs().mean().item()
+        assert abs_mean_diff < 0.1
+
+
+@pytest.mark.parametrize(
+    "crop, target_size, expected_size",
+    [
+        ([303, 172, 303, 258], [64], (77, 65)),
+        ([303, 172, 150, 258], [20, 20], (39, 65)),
+        ([303, 172, 303, 258], [303, 258], (303, 258)),
+    ],
+)
+def test_decode_jpeg_crop_target_size(crop, target_size, expected_size):
+    data = read_file(os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg"))
+    img = decode_jpeg(data, crop=crop, target_size=target_size)
+    assert img.shape == (3, *expected_size)
+
+
+def test_decode_jpeg_crop_errors():
+    data = read_file(os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg"))
+    with pytest.raises(RuntimeError, match="must be within the image of size 606x517"):
+        decode_jpeg(data, crop=[600, 0, 10, 10])
+    with pytest.raises(RuntimeError, match="must be within the image"):
+        decode_jpeg(data, crop=[0, 0, 0, 10])
+    with pytest.raises(RuntimeError, match="crop must be empty or have 4 elements"):
+        decode_jpeg(data, crop=[0, 0, 10])
+    with pytest.raises(RuntimeError, match="crop is not supported together with apply_exif_orientation"):
+        decode_jpeg(data, crop=[0, 0, 10, 10], apply_exif_orientation=True)
+    with pytest.raises(ValueError, match="crop is only supported when decoding a single image"):
+        decode_jpeg([data], crop=[0, 0, 10, 10])
+
+
 @pytest.mark.parametrize("codec", ["png", "jpeg"])
 @pytest.mark.parametrize("orientation", [1, 2, 3, 4, 5, 6, 7, 8, 0])
 def test_decode_with_exif_orientation(tmpdir, codec, orientation):
@@ -245,6 +392,61 @@ def test_decode_png_errors():
         decode_png(read_file(os.path.join(TOOSMALL_PNG, "heapbof.png")))
 
 
+@pytest.mark.parametrize(
+    "img_path",
+    [
+        pytest.param(png_path, id=_get_safe_image_name(png_path))
+        for png_path in list(get_images(FAKEDATA_DIR, ".png")) + list(get_images(INTERLACED_PNG, ".png"))
+    ],
+)
+@pytest.mark.parametrize("mode", (ImageReadMode.UNCHANGED, ImageReadMode.GRAY, ImageReadMode.RGB_ALPHA))
+@pytest.mark.parametrize("band_height", (1, 7, 100_000))
+def test_decode_png_bands(img_path, mode, band_height):
+    expected = decode_png(read_file(img_path), mode=mode)
+    bands = list(decode_png_bands(img_path, band_height=band_height, mode=mode))
+    assert len(bands) == -(-expected.shape[1] // band_height)
+    assert all(band.shape[1] == band_height for band in bands[:-1])
+    assert_equal(torch.cat(bands, dim=1), expected)
+
+
+@pytest.mark.parametrize("channels_last", (True, False))
+@pytest.mark.parametrize("filename", ("rgbalpha_pytorch16.png", "palette_pytorch.png"))
+def test_decode_png_bands_out(channels_last, filename):
+    data = read_file(os.path.join(FAKEDATA_DIR, "logos", filename))
+    expected = decode_png(data)
+    num_channels, _, width = expected.shape
+    out = torch.empty((num_channels, 16, width), dtype=expected.dtype)
+    if channels_last:
+        out = out[None].contiguous(memory_format=torch.channels_last)[0]
+
+    bands = []
+    for band in decode_png_bands(data, band_height=16, out=out):
+        assert band.data_ptr() == out.data_ptr()
+        bands.append(band.clone())
+    assert_equal(torch.cat(bands, dim=1), expected)
+
+
+def test_decode_png_bands_errors():
+    data = read_file(os.path.join(FAKEDATA_DIR, "logos", "rgb_pytorch.png"))
+    with pytest.raises(ValueError, match="band_height must be a positive integer"):
+        decode_png_bands(data, band_height=0)
+    with pytest.raises(ValueError, match="out must be a torch.uint8 tensor of shape"):
+        decode_png_bands(data, band_height=10, out=torch.empty((3, 11, 100), dtype=torch.uint8))
+    with pytest.raises(ValueError, match="out must be a torch.uint8 tensor of shape"):
+        decode_png_bands(data, band_height=10, out=torch.empty((3, 10, 100), dtype=torch.uint16))
+    with pytest.raises(RuntimeError, match="Content is not png"):
+        decode_png_bands(read_file(next(get_images(IMAGE_ROOT, ".jpg"))))
+    with pytest.raises(RuntimeError, match="Content is too small for png"):
+        decode_png_bands(os.path.join(TOOSMALL_PNG, "heapbof.png"))
+
+    # Truncated image data is only detected when reaching the missing rows
+    data = encode_png(torch.randint(0, 256, (3, 512, 512), dtype=torch.uint8))
+    bands = decode_png_bands(data[: data.numel() // 2], band_height=10)
+    next(bands)
+    with pytest.raises(RuntimeError, match="Out of bound read in decode_png"):
+        list(bands)
+
+
 @pytest.mark.parametrize(
     "img_path",
     [pytest.param(png_path, id=_get_safe_image_name(png_path)) for png_path in get_images(IMAGE_DIR, ".png")],
@@ -298,6 +500,38 @@ def test_write_png(img_path, tmpdir, scripted):
     assert_equal(img_pil, saved_image)
 
 
+@pytest.mark.parametrize("num_threads", (0, 1, 3))
+@pytest.mark.parametrize("scripted", (True, False))
+def test_encode_png_batch(num_threads, scripted):
+    images = [decode_image(img_path) for img_path in get_images(IMAGE_DIR, ".png")]
+    encode = torch.jit.script(encode_png) if scripted else encode_png
+    encoded_images = encode(images, compression_level=6, num_threads=num_threads)
+    assert len(encoded_images) == len(images)
+    for image, encoded_image in zip(images, encoded_images):
+        assert_equal(encoded_image, encode_png(image, compression_level=6))
+    assert encode_png(images[:0]) == []
+
+    with pytest.raises(RuntimeError, match="Input tensor dtype should be uint8"):
+        encode_png([images[0], images[0].float()])
+
+
+@pytest.mark.parametrize("scripted", (True, False))
+def test_write_png_batch(tmpdir, scripted):
+    images = [decode_image(img_path) for img_path in get_images(IMAGE_DIR, ".png")]
+    filenames = [os.path.join(tmpdir, f"{i}.png") for i in range(len(images))]
+    write = torch.jit.script(write_png) if scripted else write_png
+    write(images, filenames, compression_level=6, num_threads=2)
+    for image, filename in zip(images, filenames):
+        assert_equal(decode_image(filename), image)
+
+    with pytest.raises(ValueError, match="filename must be a list of"):
+        write_png(images, filenames[:-1])
+    with pytest.raises(ValueError, match="filename must be a list of"):
+        write_png(images, filenames[0])
+    with pytest.raises(ValueError, match="filename must be a single path"):
+        write_png(images[0], filenames)
+
+
 def test_read_image():
     # Just testing torchcsript, the functionality is somewhat tested already in other tests.
     path = next(get_images(IMAGE_ROOT, ".jpg"))
@@ -323,6 +557,31 @@ def test_read_file(tmpdir, scripted):
         read_file("tst")
 
 
+@pytest.mark.parametrize("mmap", (True, False))
+@pytest.mark.parametrize("scripted", (True, False))
+def test_read_file_offset_length(tmpdir, mmap, scripted):
+    fpath = os.path.join(tmpdir, "shard.bin")
+    images = [read_file(img_path) for img_path in get_images(IMAGE_ROOT, ".jpg")]
+    offsets = [0]
+    with open(fpath, "wb") as f:
+        for data in images:
+            f.write(data.numpy().tobytes())
+            offsets.append(offsets[-1] + data.numel())
+
+    fun = torch.jit.script(read_file) if scripted else read_file
+    for data, offset in zip(images, offsets):
+        record = fun(fpath, offset=offset, length=data.numel(), mmap=mmap)
+        assert_equal(record, data)
+        assert_equal(decode_jpeg(record), decode_jpeg(data))
+
+    assert_equal(fun(fpath, offset=offsets[-2], mmap=mmap), images[-1])
+
+    with pytest.raises(RuntimeError, match="offset must be in"):
+        read_file(fpath, offset=offsets[-1], mmap=mmap)
+    with pytest.raises(RuntimeError, match="Cannot read 2 bytes at offset"):
+        read_file(fpath, offset=offsets[-1] - 1, length=2, mmap=mmap)
+
+
 def test_read_file_non_ascii(tmpdir):
     fname, content = "日本語(Japanese).bin", b"TorchVision\211\n"
     fpath = os.path.join(tmpdir, fname)
@@ -684,6 +943,21 @@ def test_encode_jpegs_batch(scripted, contiguous, device):
             assert (decoded_cuda_encoded_image.cpu().float() - decoded_image_tv.cpu().float()).abs().mean() < 3
 
 
+@pytest.mark.skipif(IS_MACOS, reason="https://github.com/pytorch/vision/issues/8031")
+@pytest.mark.parametrize("num_threads", (0, 1, 3))
+def test_encode_jpegs_cpu_num_threads(num_threads):
+    images = [decode_jpeg(read_file(jpeg_path)) for jpeg_path in get_images(ENCODE_JPEG, ".jpg")]
+    encoded_images = encode_jpeg(images, quality=75, num_threads=num_threads)
+    assert len(encoded_images) == len(images)
+    for image, encoded_image in zip(images, encoded_images):
+        assert_equal(encoded_image, encode_jpeg(image, quality=75))
+
+    with pytest.raises(RuntimeError, match="Input tensor dtype should be uint8"):
+        encode_jpeg([images[0], images[0].float()])
+    with pytest.raises(RuntimeError, match="num_threads must be a non-negative integer"):
+        encode_jpeg(images, num_threads=-1)
+
+
 @needs_cuda
 def test_single_encode_jpeg_cuda_errors():
     with pytest.raises(RuntimeError, match="Input tensor dtype should be uint8"):
@@ -804,6 +1078,22 @@ def test_write_jpeg(img_path, tmpdir, scripted):
     assert_equal(torch_bytes, pil_bytes)
 
 
+@pytest.mark.skipif(IS_MACOS, reason="https://github.com/pytorch/vision/issues/8031")
+@pytest.mark.parametrize("scripted", (True, False))
+def test_write_jpeg_batch(tmpdir, scripted):
+    images = [read_image(jpeg_path) for jpeg_path in get_images(ENCODE_JPEG, ".jpg")]
+    filenames = [os.path.join(tmpdir, f"{i}.jpg") for i in range(len(images))]
+    write = torch.jit.script(write_jpeg) if scripted else write_jpeg
+    write(images, filenames, quality=75, num_threads=2)
+    for image, filename in zip(images, filenames):
+        assert_equal(read_file(filename), encode_jpeg(image, quality=75))
+
+    with pytest.raises(ValueError, match="filename must be a list of"):
+        write_jpeg(images, filenames[:-1])
+    with pytest.raises(ValueError, match="Image quality should be a positive number between 1 and 100"):
+        write_jpeg(images, filenames, quality=0)
+
+
 def test_pathlib_support(tmpdir):
     # Just make sure pathlib.Path is supported where relevant
 
@@ -1067,6 +1357,572 @@ def test_decode_image_path(input_type, scripted):
     decode_fun(input)
 
 
+@pytest.mark.parametrize(
+    "img_path",
+    [
+        pytest.param(img_path, id=_get_safe_image_name(img_path))
+        for img_path in list(get_images(IMAGE_ROOT, ".jpg")) + list(get_images(FAKEDATA_DIR, ".png"))
+    ],
+)
+@pytest.mark.parametrize("scripted", (False, True))
+def test_read_image_info(img_path, scripted):
+    read_image_info_fun = torch.jit.script(read_image_info) if scripted else read_image_info
+    info = read_image_info_fun(read_file(img_path))
+    img = decode_image(img_path)
+    assert (info.num_channels, info.height, info.width) == img.shape
+    assert info.format == ("jpeg" if img_path.endswith(".jpg") else "png")
+    assert info.exif_orientation == 1
+
+    assert read_image_info_fun(img_path) == info
+
+
+@pytest.mark.parametrize("ext, format", ((".webp", "webp"), (".avif", "avif"), (".heic", "heic")))
+def test_read_image_info_webp_avif_heic(ext, format):
+    # These don't need torchvision to be compiled with the corresponding decoders
+    info = read_image_info(next(get_images(FAKEDATA_DIR, ext)))
+    assert info == (100, 100, 3, format, 1)
+
+
+@pytest.mark.parametrize("mode", ("RGB", "RGBA"))
+@pytest.mark.parametrize("lossless", (False, True))
+def test_read_image_info_webp_alpha(tmpdir, mode, lossless):
+    fp = os.path.join(tmpdir, "image.webp")
+    Image.new(mode, (40, 30)).save(fp, "WEBP", lossless=lossless)
+    assert read_image_info(fp) == (30, 40, len(mode), "webp", 1)
+
+
+def test_read_image_info_gif(tmpdir):
+    fp = os.path.join(tmpdir, "image.gif")
+    frames = [Image.new("P", (40, 30), color=i) for i in range(3)]
+    frames[0].save(fp, save_all=True, append_images=frames[1:])
+    assert read_image_info(fp) == (30, 40, 3, "gif", 1)
+    assert decode_gif(read_file(fp)).shape[-3:] == (3, 30, 40)
+
+
+@pytest.mark.parametrize("codec", ["png", "jpeg"])
+@pytest.mark.parametrize("orientation", [1, 2, 3, 4, 5, 6, 7, 8, 0, 9])
+def test_read_image_info_exif_orientation(tmpdir, codec, orientation):
+    fp = os.path.join(tmpdir, f"exif_oriented_{orientation}.{codec}")
+    im = Image.new("RGB", (40, 30))
+    exif = im.getexif()
+    exif[0x0112] = orientation
+    im.save(fp, codec.upper(), exif=exif.tobytes())
+
+    info = read_image_info(fp)
+    assert info == (30, 40, 3, codec, orientation if 1 <= orientation <= 8 else 1)
+    oriented_size = decode_image(fp, apply_exif_orientation=True).shape[-2:]
+    assert oriented_size == ((40, 30) if info.exif_orientation >= 5 else (30, 40))
+
+
+@pytest.mark.parametrize("input_type", ("Path", "str", "tensor"))
+@pytest.mark.parametrize("num_threads", (0, 1, 2))
+@pytest.mark.parametrize("scripted", (False, True))
+def test_read_image_info_batched(input_type, num_threads, scripted):
+    paths = list(get_images(IMAGE_ROOT, ".jpg")) + list(get_images(FAKEDATA_DIR, ".png"))
+    if input_type == "Path":
+        inputs = [Path(path) for path in paths]
+    elif input_type == "str":
+        inputs = paths
+    else:
+        inputs = [read_file(path) for path in paths]
+
+    if scripted and input_type == "Path":
+        pytest.xfail(reason="Can't pass a Path when scripting")
+
+    read_image_info_fun = torch.jit.script(read_image_info) if scripted else read_image_info
+    infos = read_image_info_fun(inputs, num_threads=num_threads)
+    assert infos == [read_image_info(path) for path in paths]
+    assert read_image_info(inputs[:0]) == []
+
+
+def test_read_image_info_errors():
+    with pytest.raises(RuntimeError, match="Unsupported image file"):
+        read_image_info(torch.arange(100, dtype=torch.uint8))
+    with pytest.raises(RuntimeError, match="Input tensor must be 1-dimensional and non-empty"):
+        read_image_info(torch.empty(0, dtype=torch.uint8))
+
+    data = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    with pytest.raises(RuntimeError, match="Invalid or truncated JPEG header"):
+        read_image_info(data[:100])
+    with pytest.raises(RuntimeError, match="Invalid or truncated JPEG header"):
+        read_image_info([data, data[:100]])
+    with pytest.raises(RuntimeError, match="Invalid or truncated PNG header"):
+        read_image_info(os.path.join(TOOSMALL_PNG, "heapbof.png"))
+
+
+def _channels_last(img):
+    return img[None].contiguous(memory_format=torch.channels_last)[0]
+
+
+@pytest.mark.parametrize(
+    "img_path",
+    [
+        pytest.param(img_path, id=_get_safe_image_name(img_path))
+        for img_path in list(get_images(IMAGE_ROOT, ".jpg")) + list(get_images(FAKEDATA_DIR, ".png"))
+    ],
+)
+@pytest.mark.parametrize("channels_last", (True, False))
+@pytest.mark.parametrize("scripted", (False, True))
+def test_decode_image_out(img_path, channels_last, scripted):
+    data = read_file(img_path)
+    expected = decode_image(data)
+    out = torch.empty_like(expected)
+    if channels_last:
+        out = _channels_last(out)
+
+    decode_image_fun = torch.jit.script(decode_image) if scripted else decode_image
+    output = decode_image_fun(data, out=out)
+    assert output.data_ptr() == out.data_ptr()
+    assert_equal(out, expected)
+
+    decode_fun = decode_jpeg if img_path.endswith(".jpg") else decode_png
+    out.zero_()
+    assert decode_fun(data, out=out).data_ptr() == out.data_ptr()
+    assert_equal(out, expected)
+
+
+@pytest.mark.parametrize("codec", ["png", "jpeg"])
+@pytest.mark.parametrize("orientation", [1, 3, 6])
+def test_decode_image_out_exif_orientation(tmpdir, codec, orientation):
+    fp = os.path.join(tmpdir, f"exif_oriented_{orientation}.{codec}")
+    im = Image.new("RGB", (40, 30), color=(10, 20, 30))
+    im.paste((200, 100, 0), (0, 0, 10, 5))
+    exif = im.getexif()
+    exif[0x0112] = orientation
+    im.save(fp, codec.upper(), exif=exif.tobytes())
+
+    expected = decode_image(fp, apply_exif_orientation=True)
+    out = _channels_last(torch.empty_like(expected))
+    decode_image(fp, apply_exif_orientation=True, out=out)
+    assert_equal(out, expected)
+
+
+@pytest.mark.parametrize("channels_last", (True, False))
+@pytest.mark.parametrize("num_threads", (1, 2))
+def test_decode_jpegs_out(channels_last, num_threads):
+    img = torch.randint(0, 256, (3, 32, 48), dtype=torch.uint8)
+    encoded_images = [encode_jpeg(img, quality=quality) for quality in (50, 75, 90)]
+    expected = decode_jpeg(encoded_images)
+
+    out = torch.empty((len(encoded_images), 3, 32, 48), dtype=torch.uint8)
+    if channels_last:
+        out = out.contiguous(memory_format=torch.channels_last)
+    if torch.cuda.is_available():
+        out = out.pin_memory()
+    outputs = decode_jpeg(encoded_images, num_threads=num_threads, out=out)
+    for i, (output, expected_image) in enumerate(zip(outputs, expected)):
+        assert output.data_ptr() == out[i].data_ptr()
+        assert_equal(output, expected_image)
+
+
+def test_decode_image_out_errors():
+    data = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    c, h, w = decode_image(data).shape
+    with pytest.raises(RuntimeError, match="out must have shape"):
+        decode_image(data, out=torch.empty((c, h, w + 1), dtype=torch.uint8))
+    with pytest.raises(RuntimeError, match="out must have shape"):
+        decode_image(data, mode=ImageReadMode.GRAY, out=torch.empty((c, h, w), dtype=torch.uint8))
+    with pytest.raises(RuntimeError, match="out must have dtype"):
+        decode_image(data, out=torch.empty((c, h, w), dtype=torch.float32))
+    with pytest.raises(RuntimeError, match="out must be a 4 dimensional tensor"):
+        decode_jpeg([data, data], out=torch.empty((c, h, w), dtype=torch.uint8))
+    with pytest.raises(RuntimeError, match="out must be a 4 dimensional tensor"):
+        decode_jpeg([data, data], out=torch.empty((3, c, h, w), dtype=torch.uint8))
+    with pytest.raises(ValueError, match="out is not supported on CUDA"):
+        decode_jpeg(data, device="cuda", out=torch.empty((c, h, w), dtype=torch.uint8))
+
+
+@pytest.mark.parametrize(
+    "img_path",
+    [
+        pytest.param(img_path, id=_get_safe_image_name(img_path))
+        for img_path in list(get_images(IMAGE_ROOT, ".jpg"))[:2]
+        + [os.path.join(FAKEDATA_DIR, "logos", name) for name in ("gray_pytorch.png", "rgbalpha_pytorch16.png")]
+    ],
+)
+@pytest.mark.parametrize("size", (None, 100, [50, 300], [700, 30], [7, 9]))
+@pytest.mark.parametrize("antialias", (True, False))
+@pytest.mark.parametrize("dtype", (torch.float32, torch.float64, torch.bfloat16))
+def test_decode_and_preprocess(img_path, size, antialias, dtype):
+    img = decode_image(img_path)
+    num_channels = img.shape[0]
+    mean = [0.485, 0.456, 0.406, 0.5][:num_channels]
+    std = [0.229, 0.224, 0.225, 0.25][:num_channels]
+
+    output = decode_and_preprocess(img_path, size=size, mean=mean, std=std, dtype=dtype, antialias=antialias)
+
+    # The fused op resizes in float, while resizing a uint8 image rounds the
+    # result, so we compare with the chain applied on a float image.
+    expected = F.to_dtype(img, torch.float64, scale=True)
+    if size is not None:
+        expected = F.resize(expected, size, antialias=antialias)
+    expected = F.normalize(expected, mean, std)
+    assert output.dtype == dtype
+    torch.testing.assert_close(output, expected.to(dtype), atol=1e-4, rtol=0)
+
+
+@pytest.mark.parametrize("scripted", (False, True))
+def test_decode_and_preprocess_defaults(scripted):
+    data = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    decode_and_preprocess_fun = torch.jit.script(decode_and_preprocess) if scripted else decode_and_preprocess
+    output = decode_and_preprocess_fun(data, mode=ImageReadMode.GRAY)
+    assert_equal(output, F.to_dtype(decode_image(data, mode=ImageReadMode.GRAY), torch.float32, scale=True))
+    output = decode_and_preprocess_fun(data, size=[32, 24], mean=[0.5], std=[0.5])
+    assert output.shape == (3, 32, 24)
+    assert output.min() >= -1 and output.max() <= 1
+
+
+def test_decode_and_preprocess_errors():
+    data = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    with pytest.raises(RuntimeError, match="mean must have 1 or num_channels=3 values"):
+        decode_and_preprocess(data, mean=[0.5, 0.5])
+    with pytest.raises(RuntimeError, match="std evaluated to zero"):
+        decode_and_preprocess(data, std=[1.0, 0.0, 1.0])
+    with pytest.raises(RuntimeError, match="size must only contain positive values"):
+        decode_and_preprocess(data, size=[0, 10])
+    with pytest.raises(RuntimeError, match="size must be empty or have 1 or 2 elements"):
+        decode_and_preprocess(data, size=[1, 2, 3])
+    with pytest.raises(RuntimeError, match="dtype must be a floating point dtype"):
+        decode_and_preprocess(data, dtype=torch.uint8)
+
+
+@pytest.mark.parametrize("input_type", ("Path", "str", "tensor"))
+@pytest.mark.parametrize("scripted", (False, True))
+def test_decode_image_async(input_type, scripted):
+    paths = list(get_images(IMAGE_ROOT, ".jpg")) + list(get_images(FAKEDATA_DIR, ".png"))
+    if input_type == "Path":
+        inputs = [Path(path) for path in paths]
+    elif input_type == "str":
+        inputs = paths
+    else:
+        inputs = [read_file(path) for path in paths]
+
+    if scripted and input_type == "Path":
+        pytest.xfail(reason="Can't pass a Path when scripting")
+
+    decode_image_async_fun = torch.jit.script(decode_image_async) if scripted else decode_image_async
+    futures = [decode_image_async_fun(input, mode=ImageReadMode.RGB) for input in inputs]
+    if not scripted:
+        assert all(isinstance(future, torch.futures.Future) for future in futures)
+    for future, path in zip(futures, paths):
+        assert_equal(future.wait(), decode_image(path, mode=ImageReadMode.RGB))
+
+    future = read_image_async(paths[0], apply_exif_orientation=True)
+    assert_equal(future.wait(), decode_image(paths[0], apply_exif_orientation=True))
+    assert get_io_num_threads() >= 1
+
+
+def test_decode_image_async_errors():
+    future = read_image_async("this/file/does/not/exist.jpg")
+    with pytest.raises(RuntimeError, match="No such file or directory"):
+        future.wait()
+    future = decode_image_async(torch.arange(100, dtype=torch.uint8))
+    with pytest.raises(RuntimeError, match="Unsupported image file"):
+        future.wait()
+    # The pool has been created by the calls above
+    with pytest.raises(RuntimeError, match="can't be changed after the first asynchronous operation"):
+        set_io_num_threads(2)
+
+
+def _decode_image_async_in_child(path, queue):
+    queue.put(decode_image_async(path).wait().shape)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork is not available on Windows")
+def test_decode_image_async_fork():
+    import multiprocessing
+
+    path = next(get_images(IMAGE_ROOT, ".jpg"))
+    expected_shape = decode_image_async(path).wait().shape
+    # The forked process doesn't inherit the threads of the pool created above
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_decode_image_async_in_child, args=(path, queue))
+    process.start()
+    try:
+        assert queue.get(timeout=60) == expected_shape
+    finally:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.kill()
+    assert process.exitcode == 0
+
+
+def _write_tiff(
+    img,
+    tile=None,
+    rows_per_strip=None,
+    planar=False,
+    byteorder="<",
+    bigtiff=False,
+    compression=1,
+    predictor=1,
+    photometric=1,
+):
+    # Minimal TIFF writer producing the layouts that PIL can't write: tiles,
+    # planar images, BigTIFF, N bands, predictors...
+    # img is a (C, H, W) numpy array.
+    num_channels, height, width = img.shape
+    chunk_height, chunk_width = tile if tile is not None else (rows_per_strip or height, width)
+    chunks = []
+    for plane in [img[c : c + 1] for c in range(num_channels)] if planar else [img]:
+        for y in range(0, height, chunk_height):
+            for x in range(0, width, chunk_width):
+                part = plane[:, y : y + chunk_height, x : x + chunk_width].transpose(1, 2, 0)
+                rows = chunk_height if tile is not None else part.shape[0]
+                chunk = np.zeros((rows, chunk_width, plane.shape[0]), dtype=img.dtype)
+                chunk[: part.shape[0], : part.shape[1]] = part
+                chunk = chunk.reshape(rows, -1)
+                spp = plane.shape[0]
+                if predictor == 2:
+                    diff = chunk.copy()
+                    diff[:, spp:] -= chunk[:, :-spp]
+                    raw = diff.astype(img.dtype.newbyteorder(byteorder)).tobytes()
+                elif predictor == 3:
+                    # Bytes grouped by significance, most significant first, then differenced
+                    row_bytes = chunk.astype(img.dtype.newbyteorder(">")).view(np.uint8)
+                    row_bytes = row_bytes.reshape(rows, -1, img.itemsize).transpose(0, 2, 1).reshape(rows, -1)
+                    diff = row_bytes.copy()
+                    diff[:, spp:] -= row_bytes[:, :-spp]
+                    raw = diff.tobytes()
+                else:
+                    raw = chunk.astype(img.dtype.newbyteorder(byteorder)).tobytes()
+                chunks.append(zlib.compress(raw) if compression == 8 else raw)
+
+    header_size = 16 if bigtiff else 8
+    offsets = np.cumsum([header_size] + [len(c) for c in chunks[:-1]]).tolist()
+    offset_type = 16 if bigtiff else 4
+    sample_format = {"u": 1, "i": 2, "f": 3}[img.dtype.kind]
+    entries = {
+        256: (4, [width]),
+        257: (4, [height]),
+        258: (3, [img.itemsize * 8] * num_channels),
+        259: (3, [compression]),
+        262: (3, [photometric]),
+        277: (3, [num_channels]),
+        284: (3, [2 if planar else 1]),
+        317: (3, [predictor]),
+        339: (3, [sample_format] * num_channels),
+    }
+    if tile is not None:
+        entries.update(
+            {
+                322: (4, [chunk_width]),
+                323: (4, [chunk_height]),
+                324: (offset_type, offsets),
+                325: (4, [len(c) for c in chunks]),
+            }
+        )
+    else:
+        entries.update({273: (offset_type, offsets), 278: (4, [chunk_height]), 279: (4, [len(c) for c in chunks])})
+
+    data = b"".join(chunks)
+    value_size, count_format = (8, "Q") if bigtiff else (4, "H")
+    ifd_offset = header_size + len(data)
+    extra_offset = ifd_offset + struct.calcsize(count_format) + len(entries) * (4 + 2 * value_size) + value_size
+    ifd, extra = struct.pack(byteorder + count_format, len(entries)), b""
+    for tag, (field_type, values) in sorted(entries.items()):
+        values = struct.pack(byteorder + {3: "H", 4: "I", 16: "Q"}[field_type] * len(values), *values)
+        ifd += struct.pack(
+            byteorder + "HH" + count_format.replace("H", "I"),
+            tag,
+            field_type,
+            len(values) // 2 if field_type == 3 else len(values) // (4 if field_type == 4 else 8),
+        )
+        if len(values) <= value_size:
+            ifd += values.ljust(value_size, b"\0")
+        else:
+            ifd += struct.pack(byteorder + ("Q" if bigtiff else "I"), extra_offset + len(extra))
+            extra += values
+    ifd += b"\0" * value_size
+    magic = b"II" if byteorder == "<" else b"MM"
+    if bigtiff:
+        header = magic + struct.pack(byteorder + "HHHQ", 43, 8, 0, ifd_offset)
+    else:
+        header = magic + struct.pack(byteorder + "HI", 42, ifd_offset)
+    return torch.frombuffer(bytearray(header + data + ifd + extra), dtype=torch.uint8)
+
+
+def _pil_to_tiff_tensor(pil_img, **kwargs):
+    buffer = io.BytesIO()
+    pil_img.save(buffer, "TIFF", **kwargs)
+    return torch.frombuffer(bytearray(buffer.getvalue()), dtype=torch.uint8)
+
+
+@pytest.mark.parametrize("mode", ("L", "RGB", "RGBA", "I;16", "F"))
+@pytest.mark.parametrize("compression", ("raw", "packbits", "tiff_lzw", "tiff_adobe_deflate"))
+def test_decode_tiff_against_pil(mode, compression):
+    rng = np.random.default_rng(0)
+    # Half noise, half gradient, to exercise both short and long LZW strings
+    noise = rng.integers(0, 256, (40, 50, 4), dtype=np.uint8)
+    noise[20:] = np.arange(50, dtype=np.uint8)[None, :, None]
+    if mode == "I;16":
+        pil_img = Image.fromarray(noise[..., 0].astype(np.uint16) * 257).convert("I;16")
+    elif mode == "F":
+        pil_img = Image.fromarray(noise[..., 0].astype(np.float32) / 7)
+    else:
+        pil_img = Image.fromarray(noise[..., : len(mode)].squeeze(-1) if mode == "L" else noise[..., : len(mode)])
+    data = _pil_to_tiff_tensor(pil_img, compression=compression)
+
+    output = decode_tiff(data)
+    expected = np.array(Image.open(io.BytesIO(data.numpy().tobytes())))
+    expected = torch.from_numpy(expected.astype(np.int32) if mode == "I;16" else expected)
+    expected = expected.permute(2, 0, 1) if expected.ndim == 3 else expected[None]
+    assert output.dtype == {"I;16": torch.uint16, "F": torch.float32}.get(mode, torch.uint8)
+    assert_equal(output.to(expected.dtype), expected)
+    assert_equal(decode_image(data), output)
+
+
+@pytest.mark.parametrize("dtype", (np.uint8, np.uint16, np.int16, np.float32, np.float64))
+@pytest.mark.parametrize("num_channels", (1, 5))
+@pytest.mark.parametrize("layout", ("strips", "tiles", "planar_tiles", "planar_strips"))
+@pytest.mark.parametrize("byteorder", ("<", ">"))
+@pytest.mark.parametrize("bigtiff", (False, True))
+@pytest.mark.parametrize("compression, predictor", ((1, 1), (8, 1), (8, 2)))
+def test_decode_tiff_layouts(dtype, num_channels, layout, byteorder, bigtiff, compression, predictor):
+    rng = np.random.default_rng(0)
+    img = (rng.random((num_channels, 45, 70)) * 1000).astype(dtype)
+    if predictor == 2 and np.dtype(dtype).kind == "f":
+        predictor = 3
+    data = _write_tiff(
+        img,
+        tile=(16, 32) if "tiles" in layout else None,
+        rows_per_strip=7,
+        planar=layout.startswith("planar"),
+        byteorder=byteorder,
+        bigtiff=bigtiff,
+        compression=compression,
+        predictor=predictor,
+    )
+    output = decode_tiff(data)
+    assert output.dtype == torch.from_numpy(img).dtype
+    assert_equal(output, torch.from_numpy(img))
+
+
+@pytest.mark.parametrize("planar", (False, True))
+@pytest.mark.parametrize("region", ([0, 0, 64, 96], [10, 20, 30, 40], [63, 95, 1, 1], [16, 32, 16, 32]))
+def test_decode_tiff_region(planar, region):
+    img = np.random.default_rng(0).integers(0, 2**16, (3, 64, 96), dtype=np.uint16)
+    data = _write_tiff(img, tile=(16, 32), planar=planar, compression=8)
+    top, left, height, width = region
+    output = decode_tiff(data, region=region)
+    assert_equal(
+        output, torch.from_numpy(img[:, top : top + height, left : left + width].astype(np.int32)).to(output.dtype)
+    )
+
+
+def test_decode_tiff_region_only_reads_needed_tiles():
+    img = np.random.default_rng(0).integers(0, 256, (1, 64, 64), dtype=np.uint8)
+    # Corrupt the offset of the last (bottom right) tile so that decoding it
+    # fails: regions which don't intersect it must still be decodable.
+    data = _write_tiff(img, tile=(32, 32), compression=1, byteorder=">")
+    ifd_offset = int.from_bytes(data[4:8].numpy().tobytes(), "big")
+    assert decode_tiff(data).shape == (1, 64, 64)
+
+    tile_offsets = data[ifd_offset + 2 : ifd_offset + 2 + 12 * 20].view(-1, 12)
+    (tile_offsets_entry,) = [e for e in tile_offsets if int.from_bytes(e[:2].numpy().tobytes(), "big") == 324]
+    pointer = int.from_bytes(tile_offsets_entry[8:12].numpy().tobytes(), "big")
+    data[pointer + 12 : pointer + 16] = torch.tensor([255, 255, 255, 255], dtype=torch.uint8)
+    with pytest.raises(RuntimeError, match="strip or tile out of bounds"):
+        decode_tiff(data)
+    assert_equal(decode_tiff(data, region=[0, 0, 32, 64]), torch.from_numpy(img[:, :32]))
+
+
+@pytest.mark.parametrize("num_channels", (1, 2, 3, 4))
+@pytest.mark.parametrize("dtype", (np.uint8, np.uint16))
+@pytest.mark.parametrize(
+    "mode", (ImageReadMode.GRAY, ImageReadMode.GRAY_ALPHA, ImageReadMode.RGB, ImageReadMode.RGB_ALPHA)
+)
+def test_decode_tiff_modes(num_channels, dtype, mode):
+    img = torch.from_numpy(np.random.default_rng(0).integers(0, 200, (num_channels, 10, 12)).astype(dtype))
+    output = decode_tiff(_write_tiff(img.numpy(), photometric=2 if num_channels >= 3 else 1), mode=mode)
+
+    max_value = 255 if dtype == np.uint8 else 65535
+    color, alpha = (img[:-1], img[-1:]) if num_channels in (2, 4) else (img, torch.full_like(img[:1], max_value))
+    if mode in (ImageReadMode.RGB, ImageReadMode.RGB_ALPHA):
+        color = color.expand(3, -1, -1)
+    elif color.shape[0] == 3:
+        color = F.rgb_to_grayscale(color.to(torch.float64)).round().to(img.dtype)
+    expected = torch.cat([color, alpha]) if mode in (ImageReadMode.GRAY_ALPHA, ImageReadMode.RGB_ALPHA) else color
+    assert_equal(output, expected)
+
+
+def test_decode_tiff_palette_and_white_is_zero():
+    pil_img = Image.fromarray(np.arange(120, dtype=np.uint8).reshape(10, 12)).convert("P", palette=Image.ADAPTIVE)
+    output = decode_tiff(_pil_to_tiff_tensor(pil_img))
+    assert_equal(output, torch.from_numpy(np.array(pil_img.convert("RGB"))).permute(2, 0, 1))
+
+    img = np.arange(120, dtype=np.uint8).reshape(1, 10, 12)
+    assert_equal(decode_tiff(_write_tiff(img, photometric=0)), torch.from_numpy(255 - img))
+
+
+@pytest.mark.parametrize("byteorder", ("<", ">"))
+@pytest.mark.parametrize("bigtiff", (False, True))
+@pytest.mark.parametrize("num_channels", (1, 3, 5))
+def test_read_image_info_tiff(byteorder, bigtiff, num_channels):
+    img = np.zeros((num_channels, 10, 12), dtype=np.uint16)
+    data = _write_tiff(img, tile=(16, 16), byteorder=byteorder, bigtiff=bigtiff)
+    info = read_image_info(data)
+    assert info == (10, 12, num_channels, "tiff", 1)
+    out = torch.empty((info.num_channels, info.height, info.width), dtype=torch.uint16)
+    assert decode_image(data, out=out) is out
+
+    pil_img = Image.fromarray(np.arange(120, dtype=np.uint8).reshape(10, 12)).convert("P", palette=Image.ADAPTIVE)
+    assert read_image_info(_pil_to_tiff_tensor(pil_img)) == (10, 12, 3, "tiff", 1)
+
+
+def test_decode_tiff_errors():
+    with pytest.raises(RuntimeError, match="Content is not a TIFF image"):
+        decode_tiff(read_file(next(get_images(IMAGE_ROOT, ".jpg"))))
+    img = np.zeros((1, 10, 12), dtype=np.uint8)
+    with pytest.raises(RuntimeError, match="Unsupported TIFF compression 7"):
+        decode_tiff(_write_tiff(img, compression=7))
+    with pytest.raises(RuntimeError, match="Unsupported TIFF predictor 3"):
+        decode_tiff(_write_tiff(img, predictor=3))
+    with pytest.raises(RuntimeError, match="is out of the bounds of the image"):
+        decode_tiff(_write_tiff(img), region=[5, 5, 10, 10])
+    with pytest.raises(RuntimeError, match="region must be empty or"):
+        decode_tiff(_write_tiff(img), region=[5, 5])
+    with pytest.raises(
+        RuntimeError, match="Only ImageReadMode.UNCHANGED is supported for TIFF images with more than 4"
+    ):
+        decode_tiff(_write_tiff(np.zeros((5, 10, 12), dtype=np.uint8)), mode=ImageReadMode.RGB)
+    with pytest.raises(RuntimeError, match="unexpected end of file"):
+        decode_tiff(_write_tiff(img)[:-30])
+
+
+def _set_bigtiff_tag(data, tag, value):
+    # Overwrites a tag of a little endian BigTIFF file with a single LONG8 value
+    data = bytearray(data.numpy().tobytes())
+    ifd_offset = struct.unpack_from("<Q", data, 8)[0]
+    (num_entries,) = struct.unpack_from("<Q", data, ifd_offset)
+    for i in range(num_entries):
+        entry_offset = ifd_offset + 8 + 20 * i
+        if struct.unpack_from("<H", data, entry_offset)[0] == tag:
+            struct.pack_into("<HQQ", data, entry_offset + 2, 16, 1, value)
+            return torch.frombuffer(data, dtype=torch.uint8)
+    raise KeyError(tag)
+
+
+@pytest.mark.parametrize(
+    "tags",
+    (
+        # Their product overflows when computing the size of the tiles
+        {322: 2**33, 323: 2**31},
+        {322: 2**20, 323: 16},
+        {322: 32, 323: 16},
+        {256: 2**40},
+        {277: 2**20},
+    ),
+)
+def test_decode_tiff_oversized(tags):
+    data = _write_tiff(np.zeros((1, 1, 2), dtype=np.uint8), tile=(16, 16), bigtiff=True)
+    for tag, value in tags.items():
+        data = _set_bigtiff_tag(data, tag, value)
+    with pytest.raises(RuntimeError, match="Invalid TIFF file"):
+        decode_tiff(data)
+
+
 def test_mode_str():
     # Make sure decode_image supports string modes. We just test decode_image,
     # not all of the decoding functions, but they should all support that too.
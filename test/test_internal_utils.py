@@ -1,5 +1,10 @@
+import os
+import warnings
+
+import numpy as np
 import pytest
-from torchvision._utils import sequence_to_str
+from common_utils import assert_equal
+from torchvision._utils import _load_npz_versioned, _save_npz_atomic, sequence_to_str
 
 
 @pytest.mark.parametrize(
@@ -15,3 +20,37 @@ from torchvision._utils import sequence_to_str
 )
 def test_sequence_to_str(seq, separate_last, expected):
     assert sequence_to_str(seq, separate_last=separate_last) == expected
+
+
+def test_save_load_npz(tmpdir):
+    path = os.path.join(tmpdir, "arrays.npz")
+    assert _load_npz_versioned(path, version=1) is None
+    assert _save_npz_atomic(path, 1, dict(values=np.arange(3)))
+    assert os.listdir(tmpdir) == ["arrays.npz"]
+    assert_equal(_load_npz_versioned(path, version=1)["values"], np.arange(3))
+    assert _load_npz_versioned(path, version=2) is None
+
+
+def test_save_npz_failure_warns_once(tmpdir):
+    path = os.path.join(tmpdir, "missing_dir", "arrays.npz")
+    with pytest.warns(UserWarning, match="Failed to save"):
+        assert not _save_npz_atomic(path, 1, dict(values=np.arange(3)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert not _save_npz_atomic(path, 1, dict(values=np.arange(3)))
+    with pytest.raises(OSError):
+        _save_npz_atomic(path, 1, dict(values=np.arange(3)), raise_errors=True)
+
+
+@pytest.mark.parametrize("truncate", (False, True))
+def test_load_npz_corrupted(tmpdir, truncate):
+    path = os.path.join(tmpdir, "arrays.npz")
+    if truncate:
+        assert _save_npz_atomic(path, 1, dict(values=np.arange(1000)))
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+    else:
+        with open(path, "wb") as f:
+            f.write(b"PK\x03\x04garbage")
+    with pytest.warns(UserWarning, match="Failed to load"):
+        assert _load_npz_versioned(path, version=1) is None
@@ -1,7 +1,10 @@
 import contextlib
 import os
+import shutil
 import sys
 import tempfile
+import threading
+import warnings
 
 import pytest
 import torch
@@ -254,6 +257,254 @@ class TestVideo:
             with pytest.raises(AssertionError):
                 assert_equal(video, data)
 
+    @pytest.mark.parametrize("output_format", ("THWC", "TCHW"))
+    def test_get_frames_at_indices(self, output_format):
+        with temp_video(10, 300, 300, 5, lossless=True) as (f_name, data):
+            indices = [7, 2, 2, -1, 0]
+            frames = io.get_frames_at(f_name, indices=indices, output_format=output_format)
+            expected = data[indices]
+            if output_format == "TCHW":
+                expected = expected.permute(0, 3, 1, 2)
+            assert_equal(frames, expected)
+
+    def test_get_frames_at_bframes(self):
+        # do not use lossless encoding, to test the presence of B-frames and of
+        # several keyframes
+        options = {"x264-params": "bframes=16:keyint=10:min-keyint=4"}
+        with temp_video(100, 300, 300, 5, options=options) as (f_name, data):
+            all_frames, _, _ = io.read_video(f_name, pts_unit="sec")
+            indices = [95, 3, 4, 50, 12, 61, 60, 99, 0]
+            frames = io.get_frames_at(f_name, indices=indices)
+            assert_equal(frames, all_frames[indices])
+            assert_equal(frames, data[indices], rtol=0.0, atol=self.TOLERANCE)
+
+    def test_get_frames_at_pts(self):
+        with temp_video(10, 300, 300, 5, lossless=True) as (f_name, data):
+            pts, _ = io.read_video_timestamps(f_name)
+            frames = io.get_frames_at(f_name, pts=[pts[3], pts[5] + 1, pts[0]], pts_unit="pts")
+            assert_equal(frames, data[[3, 5, 0]])
+
+            # The frame displayed at a given time is returned, the frame rate is 5 fps
+            frames = io.get_frames_at(f_name, pts=[0.0, 0.39, 0.4, 1.85, 100.0])
+            assert_equal(frames, data[[0, 1, 2, 9, 9]])
+
+    def test_get_frames_at_errors(self, mocker):
+        with temp_video(10, 300, 300, 5) as (f_name, data):
+            assert io.get_frames_at(f_name, indices=[]).shape == (0, 300, 300, 3)
+            with pytest.raises(ValueError, match="Exactly one of indices and pts"):
+                io.get_frames_at(f_name)
+            with pytest.raises(ValueError, match="Exactly one of indices and pts"):
+                io.get_frames_at(f_name, indices=[0], pts=[0.0])
+            with pytest.raises(IndexError, match="out of range"):
+                io.get_frames_at(f_name, indices=[10])
+            with pytest.raises(ValueError, match="pts_unit should be"):
+                io.get_frames_at(f_name, pts=[0.0], pts_unit="ms")
+
+            # A video without frames
+            mocker.patch("torchvision.io.video._get_frame_pts_and_keyframes", return_value=([], []))
+            with pytest.raises(IndexError, match="out of range for a video of 0 frames"):
+                io.get_frames_at(f_name, pts=[0.0])
+            with pytest.raises(IndexError, match="out of range for a video of 0 frames"):
+                io.get_frames_at(f_name, indices=[0])
+
+    def test_video_index(self, tmpdir, monkeypatch):
+        options = {"x264-params": "bframes=16:keyint=10:min-keyint=4"}
+        with temp_video(40, 100, 120, 5, options=options) as (f_name, _):
+            paths = [os.path.join(tmpdir, f"{i}.mp4") for i in range(3)]
+            for path in paths:
+                shutil.copy(f_name, path)
+
+            assert io.read_video_index(paths[0]) is None
+            expected_pts, expected_fps = io.read_video_timestamps(paths[0])
+            indices = io.build_video_index(paths[:2])
+            assert os.path.exists(os.path.join(tmpdir, ".torchvision_video_index.npz"))
+            for index in indices:
+                assert index.pts.tolist() == expected_pts
+                assert index.fps == expected_fps
+                assert (index.height, index.width) == (100, 120)
+                with av.open(f_name) as container:
+                    keyframes_pts = [p.pts for p in container.demux(video=0) if p.is_keyframe]
+                assert index.keyframes.tolist() == [expected_pts.index(p) for p in keyframes_pts]
+                assert len(index.keyframes) > 1
+
+            index = io.read_video_index(paths[1])
+            assert_equal(index.pts, indices[1].pts)
+            assert index.time_base == indices[1].time_base
+
+            # Only the new and modified videos are indexed
+            indexed = []
+            original_index_video = io._video_index._index_video
+            monkeypatch.setattr(
+                io._video_index, "_index_video", lambda path: indexed.append(path) or original_index_video(path)
+            )
+            with open(paths[0], "ab") as f:
+                f.write(b"\0")
+            assert io.read_video_index(paths[0]) is None
+            io.build_video_index(paths)
+            assert sorted(indexed) == sorted([paths[0], paths[2]])
+            indexed.clear()
+            io.build_video_index(paths)
+            assert indexed == []
+
+            # The index is used instead of reading the video
+            monkeypatch.setattr(io.video, "_decode_video_timestamps", None)
+            monkeypatch.setattr(io.video, "_get_frame_pts_and_keyframes", None)
+            assert io.read_video_timestamps(paths[2]) == (expected_pts, expected_fps)
+            pts, _ = io.read_video_timestamps(paths[2], pts_unit="sec")
+            assert pts == [p * indices[0].time_base for p in expected_pts]
+            all_frames, _, _ = io.read_video(paths[2], pts_unit="sec")
+            assert_equal(io.get_frames_at(paths[2], indices=[31, 2, 17]), all_frames[[31, 2, 17]])
+
+    @pytest.mark.skipif(get_video_backend() != "pyav", reason="only the pyav backend uses the index to seek")
+    def test_video_reader_seek_with_index(self, tmpdir):
+        options = {"x264-params": "bframes=16:keyint=10:min-keyint=4"}
+        with temp_video(40, 100, 120, 5, options=options) as (f_name, _):
+            path = os.path.join(tmpdir, "video.mp4")
+            shutil.copy(f_name, path)
+            io.build_video_index([path])
+            all_frames, _, _ = io.read_video(path, pts_unit="sec", output_format="TCHW")
+
+            reader = io.VideoReader(path)
+            for i in (13, 0, 39, 20):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("error")
+                    frame = next(reader.seek(i / 5))
+                assert frame["pts"] == pytest.approx(i / 5)
+                assert_equal(frame["data"], all_frames[i])
+
+            # Seeking to keyframes only returns the preceding keyframe
+            keyframes = io.read_video_index(path).keyframes.tolist()
+            frame = next(reader.seek(25 / 5, keyframes_only=True))
+            assert frame["pts"] == pytest.approx(max(k for k in keyframes if k <= 25) / 5)
+
+    @pytest.mark.skipif(get_video_backend() != "pyav", reason="prefetch_frames is only supported by pyav")
+    @pytest.mark.parametrize("stream", ("video", "audio"))
+    def test_video_reader_prefetch_frames(self, stream):
+        path = os.path.join(VIDEO_DIR, "R6llTwEh07w.mp4")
+        num_threads = threading.active_count()
+        expected = list(io.VideoReader(path, stream))
+        reader = io.VideoReader(path, stream, prefetch_frames=4)
+        frames = list(reader)
+        assert len(frames) == len(expected)
+        for frame, expected_frame in zip(frames, expected):
+            assert frame["pts"] == expected_frame["pts"]
+            assert_equal(frame["data"], expected_frame["data"])
+        with pytest.raises(StopIteration):
+            next(reader)
+
+        # Seeking restarts the pipeline
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            frame = next(reader.seek(0))
+        assert frame["pts"] == expected[0]["pts"]
+        assert_equal(frame["data"], expected[0]["data"])
+        assert_equal(next(reader)["data"], expected[1]["data"])
+
+        del reader
+        assert threading.active_count() == num_threads
+
+    @pytest.mark.skipif(get_video_backend() != "pyav", reason="only supported by the pyav backend")
+    @pytest.mark.parametrize("prefetch_frames", (0, 4))
+    def test_video_reader_keyframes_only(self, prefetch_frames):
+        options = {"x264-params": "keyint=10:min-keyint=10:scenecut=0"}
+        with temp_video(35, 60, 80, 5, options=options) as (f_name, _):
+            expected, _, _ = io.read_video(f_name, pts_unit="sec", output_format="TCHW")
+            reader = io.VideoReader(f_name, keyframes_only=True, prefetch_frames=prefetch_frames)
+            frames = list(reader)
+            assert [frame["pts"] for frame in frames] == [0.0, 2.0, 4.0, 6.0]
+            for frame, expected_frame in zip(frames, expected[::10]):
+                assert_equal(frame["data"], expected_frame)
+
+    @pytest.mark.skipif(get_video_backend() != "pyav", reason="only supported by the pyav backend")
+    @pytest.mark.parametrize("prefetch_frames", (0, 4))
+    def test_video_reader_motion_vectors(self, prefetch_frames):
+        path = os.path.join(VIDEO_DIR, "R6llTwEh07w.mp4")
+        expected = list(io.VideoReader(path))
+        frames = list(io.VideoReader(path, export_motion_vectors=True, prefetch_frames=prefetch_frames))
+        assert len(frames) == len(expected)
+        for frame, expected_frame in zip(frames, expected):
+            assert_equal(frame["data"], expected_frame["data"])
+            motion_vectors = frame["motion_vectors"]
+            assert motion_vectors.dtype == torch.int32
+            assert motion_vectors.ndim == 2 and motion_vectors.shape[1] == 10
+        # The first frame is an intra frame
+        assert frames[0]["motion_vectors"].shape[0] == 0
+        motion_vectors = torch.cat([frame["motion_vectors"] for frame in frames])
+        assert set(motion_vectors[:, 0].tolist()) <= {-1, 1}
+        assert (motion_vectors[:, 9] > 0).all()
+        # Blocks move, and their (subpixel) motion is the difference between their source and destination
+        assert (motion_vectors[:, 7:9] != 0).any()
+        torch.testing.assert_close(
+            motion_vectors[:, 7:9] / motion_vectors[:, 9:],
+            (motion_vectors[:, 3:5] - motion_vectors[:, 5:7]).float(),
+            rtol=0,
+            atol=1,
+        )
+
+        assert "motion_vectors" not in next(io.VideoReader(path))
+        assert "motion_vectors" not in next(io.VideoReader(path, "audio", export_motion_vectors=True))
+
+    @pytest.mark.parametrize(
+        "size, min_dimension, crop, expected_shape",
+        (
+            ((50, 80), None, None, (50, 80)),
+            (None, 60, None, (60, 80)),
+            (None, 60, [5, 10, 30, 40], (30, 40)),
+            (None, None, [0, 100, 20, 10], (20, 10)),
+        ),
+    )
+    def test_read_video_size_and_crop(self, size, min_dimension, crop, expected_shape):
+        with temp_video(10, 150, 200, 5) as (f_name, data):
+            full_frames, _, _ = io.read_video(f_name, pts_unit="sec")
+            frames, _, _ = io.read_video(
+                f_name, pts_unit="sec", size=size, min_dimension=min_dimension, crop=crop, output_format="TCHW"
+            )
+            assert frames.shape == (10, 3) + expected_shape
+
+            if size is None and min_dimension is None:
+                top, left, height, width = crop
+                assert_equal(frames, full_frames[:, top : top + height, left : left + width].permute(0, 3, 1, 2))
+            else:
+                # The frames are resized by swscale, with area interpolation
+                with av.open(f_name) as container:
+                    frame = next(container.decode(video=0))
+                    height, width = size or (min_dimension, 80)
+                    expected = frame.reformat(width=width, height=height, format="rgb24", interpolation="AREA")
+                    expected = torch.from_numpy(expected.to_ndarray()).permute(2, 0, 1)
+                if crop is not None:
+                    top, left, height, width = crop
+                    expected = expected[:, top : top + height, left : left + width]
+                assert_equal(frames[0], expected)
+
+                resized = torch.nn.functional.interpolate(
+                    full_frames.permute(0, 3, 1, 2).float(), size=size or (min_dimension, 80), mode="area"
+                )
+                if crop is not None:
+                    top, left, height, width = crop
+                    resized = resized[..., top : top + height, left : left + width]
+                assert (frames.float() - resized).abs().mean() < 2
+
+    @pytest.mark.skipif(get_video_backend() != "pyav", reason="size and crop are only supported by pyav")
+    @pytest.mark.parametrize("prefetch_frames", (0, 2))
+    def test_video_reader_size_and_crop(self, prefetch_frames):
+        with temp_video(10, 150, 200, 5) as (f_name, data):
+            expected, _, _ = io.read_video(
+                f_name, pts_unit="sec", min_dimension=60, crop=[5, 10, 30, 40], output_format="TCHW"
+            )
+            reader = io.VideoReader(f_name, min_dimension=60, crop=[5, 10, 30, 40], prefetch_frames=prefetch_frames)
+            assert_equal(torch.stack([frame["data"] for frame in reader]), expected)
+
+    def test_read_video_size_and_crop_errors(self):
+        with temp_video(10, 150, 200, 5) as (f_name, data):
+            with pytest.raises(ValueError, match="size and min_dimension can't be both specified"):
+                io.read_video(f_name, pts_unit="sec", size=(10, 10), min_dimension=10)
+            with pytest.raises(ValueError, match="size should be a pair of positive integers"):
+                io.read_video(f_name, pts_unit="sec", size=(10,))
+            with pytest.raises(ValueError, match="crop should be"):
+                io.read_video(f_name, pts_unit="sec", crop=[0, 0, 10])
+            with pytest.raises(ValueError, match="is out of the bounds of the frames"):
+                io.read_video(f_name, pts_unit="sec", size=(50, 50), crop=[0, 0, 60, 10])
+
     @pytest.mark.skipif(sys.platform == "win32", reason="temporarily disabled on Windows")
     @pytest.mark.parametrize("device", cpu_and_cuda())
     def test_write_video_with_audio(self, device, tmpdir):
@@ -285,6 +536,78 @@ class TestVideo:
         assert pytest.approx(out_audio_stream.frames, rel=0.0, abs=1) == audio_stream.frames
         assert audio_stream.frame_size == out_audio_stream.frame_size
 
+    @pytest.mark.skipif(sys.platform == "win32", reason="temporarily disabled on Windows")
+    def test_video_writer(self, tmpdir):
+        f_name = os.path.join(VIDEO_DIR, "R6llTwEh07w.mp4")
+        video_tensor, audio_tensor, info = io.read_video(f_name, pts_unit="sec")
+
+        out_f_name = os.path.join(tmpdir, "testing.mp4")
+        num_chunks = 7
+        with io.VideoWriter(
+            out_f_name,
+            round(info["video_fps"]),
+            video_codec="libx264rgb",
+            options={"crf": "0"},
+            audio_fps=info["audio_fps"],
+            audio_codec="aac",
+            audio_channels=audio_tensor.shape[0],
+            height=video_tensor.shape[1],
+            width=video_tensor.shape[2],
+            max_queue_size=4,
+        ) as writer:
+            for video_chunk, audio_chunk in zip(video_tensor.chunk(num_chunks), audio_tensor.chunk(num_chunks, dim=1)):
+                writer.write_frames(video_chunk)
+                writer.write_audio(audio_chunk)
+                # The frames are copied, so the chunks can be reused
+                video_chunk.zero_()
+
+        out_video_tensor, out_audio_tensor, out_info = io.read_video(out_f_name, pts_unit="sec")
+        expected_video_tensor, _, _ = io.read_video(f_name, pts_unit="sec")
+        assert info["video_fps"] == out_info["video_fps"]
+        assert_equal(expected_video_tensor, out_video_tensor)
+
+        audio_stream = av.open(f_name).streams.audio[0]
+        out_audio_stream = av.open(out_f_name).streams.audio[0]
+        assert info["audio_fps"] == out_info["audio_fps"]
+        assert pytest.approx(out_audio_stream.frames, rel=0.0, abs=1) == audio_stream.frames
+
+    def test_video_writer_errors(self, tmpdir):
+        out_f_name = os.path.join(tmpdir, "testing.mp4")
+        with pytest.raises(ValueError, match="height and width"):
+            io.VideoWriter(out_f_name, 5, height=10)
+        with pytest.raises(ValueError, match="audio_fps and audio_codec"):
+            io.VideoWriter(out_f_name, 5, audio_codec="aac")
+
+        with io.VideoWriter(out_f_name, 5, audio_fps=16000, audio_codec="aac") as writer:
+            with pytest.raises(RuntimeError, match="must be known before writing audio"):
+                writer.write_audio(torch.zeros(2, 100))
+            writer.write_frames(torch.zeros(2, 20, 30, 3, dtype=torch.uint8))
+            with pytest.raises(ValueError, match="should have the same size"):
+                writer.write_frames(torch.zeros(2, 10, 30, 3, dtype=torch.uint8))
+            with pytest.raises(ValueError, match="shape"):
+                writer.write_frames(torch.zeros(20, 30, 3, dtype=torch.uint8))
+            with pytest.raises(ValueError, match="audio should be"):
+                writer.write_audio(torch.zeros(1, 100))
+        with pytest.raises(RuntimeError, match="closed"):
+            writer.write_frames(torch.zeros(2, 20, 30, 3, dtype=torch.uint8))
+        assert io.read_video(out_f_name, pts_unit="sec")[0].shape == (2, 20, 30, 3)
+
+        # Errors of the encoder are raised by the following calls, here by close()
+        writer = io.VideoWriter(out_f_name, 5)
+        writer.write_frames(torch.zeros(1, 21, 31, 3, dtype=torch.uint8))
+        with pytest.raises(RuntimeError, match="Failed to encode"):
+            writer.close()
+
+    def test_video_writer_garbage_collected(self, tmpdir):
+        out_f_name = os.path.join(tmpdir, "testing.mp4")
+        num_threads = threading.active_count()
+        writer = io.VideoWriter(out_f_name, 5)
+        writer.write_frames(torch.zeros(2, 20, 30, 3, dtype=torch.uint8))
+        # The encoding thread is stopped, and the file finalized, without close()
+        del writer
+        assert threading.active_count() == num_threads
+        assert io.read_video(out_f_name, pts_unit="sec")[0].shape == (2, 20, 30, 3)
+
     # TODO add tests for audio
 
 
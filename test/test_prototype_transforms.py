@@ -7,9 +7,16 @@ import torch
 
 from common_utils import assert_equal, make_bounding_boxes, make_detection_masks, make_image, make_video
 
+from torchvision.io import decode_image, encode_jpeg, encode_png
 from torchvision.prototype import transforms, tv_tensors
 from torchvision.transforms.v2._utils import check_type, is_pure_tensor
-from torchvision.transforms.v2.functional import clamp_bounding_boxes, InterpolationMode, pil_to_tensor, to_pil_image
+from torchvision.transforms.v2.functional import (
+    clamp_bounding_boxes,
+    InterpolationMode,
+    pil_to_tensor,
+    resized_crop,
+    to_pil_image,
+)
 
 from torchvision.tv_tensors import BoundingBoxes, BoundingBoxFormat, Image, Mask, Video
 
@@ -256,6 +263,54 @@ class TestFixedSizeCrop:
         mock.assert_called_once()
 
 
+class TestDecodeRandomResizedCrop:
+    @pytest.mark.parametrize("encode", [encode_jpeg, encode_png])
+    def test__transform(self, encode):
+        image = make_image((64, 80), dtype=torch.uint8)
+        data = encode(image.as_subclass(torch.Tensor))
+        # A large enough output size means that no DCT scaling happens
+        transform = transforms.DecodeRandomResizedCrop(size=(48, 48))
+
+        torch.manual_seed(0)
+        params = transform._get_params([data])
+        assert params["is_jpeg"] == (encode is encode_jpeg)
+
+        output = transform._transform(data, params)
+        expected = resized_crop(
+            decode_image(data),
+            top=params["top"],
+            left=params["left"],
+            height=params["height"],
+            width=params["width"],
+            size=[48, 48],
+            antialias=True,
+        )
+        assert isinstance(output, Image)
+        assert output.shape == (3, 48, 48)
+        # Chroma upsampling can slightly differ on the edges of the crop
+        torch.testing.assert_close(output, expected, rtol=0, atol=2)
+
+    def test_downscaled_decoding(self):
+        data = encode_jpeg(make_image((512, 512), dtype=torch.uint8).as_subclass(torch.Tensor))
+        transform = transforms.DecodeRandomResizedCrop(size=32, scale=(0.9, 1.0), mode="RGB")
+        output = transform(data)
+        assert isinstance(output, Image)
+        assert output.shape == (3, 32, 32)
+
+    def test_passthrough(self):
+        data = encode_jpeg(make_image((32, 32), dtype=torch.uint8).as_subclass(torch.Tensor))
+        label = tv_tensors.Label(torch.tensor(1))
+        output, output_label = transforms.DecodeRandomResizedCrop(size=16)(data, label)
+        assert output.shape == (3, 16, 16)
+        assert output_label is label
+
+    def test_errors(self):
+        data = encode_jpeg(make_image((32, 32), dtype=torch.uint8).as_subclass(torch.Tensor))
+        transform = transforms.DecodeRandomResizedCrop(size=16)
+        with pytest.raises(TypeError, match="only supports encoded images"):
+            transform(data, make_bounding_boxes(canvas_size=(32, 32)))
+
+
 class TestLabelToOneHot:
     def test__transform(self):
         categories = ["apple", "pear", "pineapple"]
@@ -1,5 +1,11 @@
 import enum
-from typing import Sequence, Type, TypeVar
+import os
+import threading
+import warnings
+import zipfile
+from typing import Callable, Dict, IO, Optional, Sequence, Set, Type, TypeVar
+
+import numpy as np
 
 T = TypeVar("T", bound=enum.Enum)
 
@@ -30,3 +36,72 @@ def sequence_to_str(seq: Sequence, separate_last: str = "") -> str:
     tail = f"{'' if separate_last and len(seq) == 2 else ','} {separate_last}'{seq[-1]}'"
 
     return head + tail
+
+
+# Paths already warned about by _warn_once
+_warned_paths: Set[str] = set()
+
+
+def _warn_once(path: str, message: str) -> None:
+    # Cache files of read-only datasets, e.g. shared between users, fail to be
+    # saved every time: only warn the first time.
+    if path not in _warned_paths:
+        _warned_paths.add(path)
+        warnings.warn(message)
+
+
+def _write_atomic(path: str, write: Callable[[IO[bytes]], None]) -> None:
+    """Write a file with ``write``, atomically.
+
+    The file is written to ``<path>.<pid>.<thread id>.tmp`` first, then
+    renamed, so that concurrent readers never see a partially written file,
+    and concurrent writers don't write to the same temporary file. On failure,
+    the temporary file is removed and the ``OSError`` is raised.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _save_npz_atomic(path: str, version: int, arrays: Dict[str, np.ndarray], raise_errors: bool = False) -> bool:
+    """Save arrays to an ``.npz`` file, together with the version of its format.
+
+    The file is written atomically (see :func:`_write_atomic`). Unless
+    ``raise_errors`` is True, failing to save it only warns, once per path, and
+    returns False.
+    """
+    try:
+        _write_atomic(path, lambda f: np.savez(f, version=np.array(version), **arrays))
+    except OSError as e:
+        if raise_errors:
+            raise
+        _warn_once(path, f"Failed to save {path}, it will be computed again next time: {e}")
+        return False
+    return True
+
+
+def _load_npz_versioned(path: str, version: int) -> Optional[Dict[str, np.ndarray]]:
+    """Load the arrays of an ``.npz`` file saved by :func:`_save_npz_atomic`.
+
+    Returns None if the file doesn't exist, or has another version. If it can't
+    be read, a warning is emitted, once per path, and None is returned as well.
+    """
+    try:
+        # The file is opened here, as np.load leaks it when it isn't a valid npz file
+        with open(path, "rb") as fid, np.load(fid, allow_pickle=False) as f:
+            if "version" not in f.files or int(f["version"]) != version:
+                return None
+            return {name: f[name] for name in f.files if name != "version"}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+        _warn_once(path, f"Failed to load {path}, it is ignored: {e}")
+        return None
@@ -1,5 +1,6 @@
 
 #include "common.h"
+#include <ATen/Parallel.h>
 #include <torch/torch.h>
 
 namespace vision {
@@ -20,6 +21,78 @@ void validate_encoded_data(const torch::Tensor& encoded_data) {
       " numels.");
 }
 
+void parallel_for_each_image(
+    int64_t n,
+    int64_t num_threads,
+    const std::function<void(int64_t)>& fn) {
+  TORCH_CHECK(
+      num_threads >= 0,
+      "num_threads must be a non-negative integer, got ",
+      num_threads);
+  if (n == 0) {
+    return;
+  }
+  if (num_threads == 0) {
+    num_threads = at::get_num_threads();
+  }
+  // at::parallel_for never splits the range into chunks smaller than the grain
+  // size, so this caps the number of concurrently running chunks (and hence
+  // threads) to num_threads.
+  int64_t grain_size = (n + num_threads - 1) / num_threads;
+  at::parallel_for(0, n, grain_size, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      fn(i);
+    }
+  });
+}
+
+torch::Tensor get_decoding_buffer(
+    const std::optional<torch::Tensor>& out,
+    int64_t height,
+    int64_t width,
+    int64_t num_channels,
+    torch::ScalarType dtype) {
+  if (out.has_value() && out->device() == torch::kCPU &&
+      out->scalar_type() == dtype &&
+      out->sizes() == torch::IntArrayRef({num_channels, height, width})) {
+    auto out_hwc = out->permute({1, 2, 0});
+    if (out_hwc.is_contiguous()) {
+      return out_hwc;
+    }
+  }
+  return torch::empty({height, width, num_channels}, dtype);
+}
+
+torch::Tensor write_into_out(
+    const torch::Tensor& image,
+    const std::optional<torch::Tensor>& out) {
+  if (!out.has_value()) {
+    return image;
+  }
+  TORCH_CHECK(
+      out->device() == torch::kCPU,
+      "out must be a CPU tensor, got a tensor on ",
+      out->device());
+  TORCH_CHECK(
+      out->scalar_type() == image.scalar_type(),
+      "out must have dtype ",
+      image.scalar_type(),
+      ", got ",
+      out->scalar_type());
+  TORCH_CHECK(
+      out->sizes() == image.sizes(),
+      "out must have shape ",
+      image.sizes(),
+      " to hold the decoded image, got ",
+      out->sizes());
+  bool decoded_in_place =
+      out->data_ptr() == image.data_ptr() && out->strides() == image.strides();
+  if (!decoded_in_place) {
+    out->copy_(image);
+  }
+  return *out;
+}
+
 bool should_this_return_rgb_or_rgba_let_me_know_in_the_comments_down_below_guys_see_you_in_the_next_video(
     ImageReadMode mode,
     bool has_alpha) {
@@ -3,6 +3,9 @@
 #include <stdint.h>
 #include <torch/torch.h>
 
+#include <functional>
+#include <optional>
+
 namespace vision {
 namespace image {
 
@@ -16,6 +19,32 @@ const ImageReadMode IMAGE_READ_MODE_RGB_ALPHA = 4;
 
 void validate_encoded_data(const torch::Tensor& encoded_data);
 
+// Runs fn(i) for every i in [0, n) on the intra-op thread pool, using at most
+// num_threads threads. num_threads == 0 means "use all intra-op threads".
+// If any call throws, the first exception is re-thrown in the calling thread.
+void parallel_for_each_image(
+    int64_t n,
+    int64_t num_threads,
+    const std::function<void(int64_t)>& fn);
+
+// Helpers for decoders supporting an `out` tensor. Decoders write the image
+// in HWC layout into the buffer returned by get_decoding_buffer(): this is out
+// itself when it is a channels-last tensor of the expected shape and dtype, so
+// that the image is decoded in place, and a new tensor otherwise.
+// write_into_out() must then be called on the final CHW image: it copies the
+// image into out if it wasn't decoded in place, and returns the tensor that
+// the decoder should return.
+torch::Tensor get_decoding_buffer(
+    const std::optional<torch::Tensor>& out,
+    int64_t height,
+    int64_t width,
+    int64_t num_channels,
+    torch::ScalarType dtype = torch::kU8);
+
+torch::Tensor write_into_out(
+    const torch::Tensor& image,
+    const std::optional<torch::Tensor>& out);
+
 bool should_this_return_rgb_or_rgba_let_me_know_in_the_comments_down_below_guys_see_you_in_the_next_video(
     ImageReadMode mode,
     bool has_alpha);
@@ -0,0 +1,269 @@
+#include "decode_and_preprocess.h"
+
+#include <ATen/Dispatch.h>
+#include <ATen/Parallel.h>
+
+#include <algorithm>
+#include <cmath>
+
+#include "decode_image.h"
+
+namespace vision {
+namespace image {
+
+namespace {
+
+// Weights of the triangle (bilinear) filter used to resize one axis of the
+// image, computed like torch's antialiased bilinear interpolation with
+// align_corners=False: output pixel i is the weighted sum of the `size[i]`
+// input pixels starting at `start[i]`, with weights
+// weights[i * max_size : i * max_size + size[i]]. Without antialiasing, or
+// when upscaling, the filter support is 1 and this is regular bilinear
+// interpolation.
+struct AxisWeights {
+  std::vector<int64_t> start;
+  std::vector<int64_t> size;
+  int64_t max_size;
+  std::vector<float> weights;
+};
+
+AxisWeights compute_axis_weights(
+    int64_t in_size,
+    int64_t out_size,
+    bool antialias) {
+  const double scale = static_cast<double>(in_size) / out_size;
+  const double support = (antialias && scale > 1.0) ? scale : 1.0;
+
+  AxisWeights w;
+  w.max_size = static_cast<int64_t>(std::ceil(support)) * 2 + 1;
+  w.start.resize(out_size);
+  w.size.resize(out_size);
+  w.weights.assign(out_size * w.max_size, 0.f);
+
+  for (int64_t i = 0; i < out_size; i++) {
+    const double center = scale * (i + 0.5);
+    const int64_t xmin =
+        std::max(static_cast<int64_t>(center - support + 0.5), int64_t(0));
+    const int64_t xmax =
+        std::min(static_cast<int64_t>(center + support + 0.5), in_size);
+    const int64_t xsize = std::min(xmax - xmin, w.max_size);
+    float* weights = w.weights.data() + i * w.max_size;
+
+    double total = 0;
+    for (int64_t j = 0; j < xsize; j++) {
+      const double x = (j + xmin - center + 0.5) / support;
+      const double weight = std::max(0.0, 1.0 - std::abs(x));
+      weights[j] = static_cast<float>(weight);
+      total += weight;
+    }
+    if (total > 0) {
+      for (int64_t j = 0; j < xsize; j++) {
+        weights[j] = static_cast<float>(weights[j] / total);
+      }
+    }
+    w.start[i] = xmin;
+    w.size[i] = xsize;
+  }
+  return w;
+}
+
+// Same logic as torchvision.transforms.functional._compute_resized_output_size
+std::pair<int64_t, int64_t> compute_output_size(
+    int64_t height,
+    int64_t width,
+    const std::vector<int64_t>& size) {
+  if (size.empty()) {
+    return {height, width};
+  }
+  if (size.size() == 2) {
+    return {size[0], size[1]};
+  }
+  const int64_t short_edge = std::min(height, width);
+  const int64_t long_edge = std::max(height, width);
+  const int64_t new_short = size[0];
+  const int64_t new_long = static_cast<int64_t>(
+      static_cast<double>(new_short * long_edge) / short_edge);
+  return width <= height ? std::make_pair(new_long, new_short)
+                         : std::make_pair(new_short, new_long);
+}
+
+// Horizontal pass: resizes a row of the CHW image along the width, into a
+// float row of shape (out_width, num_channels).
+template <typename in_t>
+void resize_row(
+    const in_t* row,
+    int64_t num_channels,
+    int64_t stride_c,
+    int64_t stride_w,
+    const AxisWeights& wx,
+    float* out_row) {
+  const int64_t out_width = static_cast<int64_t>(wx.start.size());
+  for (int64_t x = 0; x < out_width; x++) {
+    const in_t* src = row + wx.start[x] * stride_w;
+    const float* weights = wx.weights.data() + x * wx.max_size;
+    for (int64_t c = 0; c < num_channels; c++) {
+      float acc = 0;
+      for (int64_t k = 0; k < wx.size[x]; k++) {
+        acc += weights[k] * src[k * stride_w + c * stride_c];
+      }
+      out_row[x * num_channels + c] = acc;
+    }
+  }
+}
+
+} // namespace
+
+torch::Tensor decode_and_preprocess(
+    const torch::Tensor& data,
+    const std::vector<int64_t>& size,
+    const std::vector<double>& mean,
+    const std::vector<double>& std,
+    torch::ScalarType dtype,
+    bool antialias,
+    ImageReadMode mode,
+    bool apply_exif_orientation) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_and_preprocess.decode_and_preprocess");
+
+  TORCH_CHECK(
+      size.size() <= 2,
+      "size must be empty or have 1 or 2 elements, got ",
+      size.size());
+  for (auto s : size) {
+    TORCH_CHECK(s > 0, "size must only contain positive values, got ", size);
+  }
+  TORCH_CHECK(
+      at::isFloatingType(dtype),
+      "dtype must be a floating point dtype, got ",
+      dtype);
+
+  auto image = decode_image(data, mode, apply_exif_orientation);
+  TORCH_CHECK(
+      image.dim() == 3,
+      "decode_and_preprocess only supports single-frame images, got a tensor of shape ",
+      image.sizes());
+  TORCH_CHECK(
+      image.scalar_type() == torch::kU8 || image.scalar_type() == at::kUInt16,
+      "Unsupported decoded image dtype ",
+      image.scalar_type());
+
+  const int64_t num_channels = image.size(0);
+  const int64_t height = image.size(1);
+  const int64_t width = image.size(2);
+
+  // The affine transform applied to every value v of channel c, which
+  // combines the conversion to [0, 1] and the normalization:
+  // ((v / max_value) - mean[c]) / std[c]
+  auto get_channel_value = [&](const std::vector<double>& values,
+                               const char* name,
+                               int64_t c,
+                               double default_value) {
+    if (values.empty()) {
+      return default_value;
+    }
+    TORCH_CHECK(
+        values.size() == 1 ||
+            static_cast<int64_t>(values.size()) == num_channels,
+        name,
+        " must have 1 or num_channels=",
+        num_channels,
+        " values, got ",
+        values.size());
+    return values.size() == 1 ? values[0] : values[c];
+  };
+  const double max_value = image.scalar_type() == torch::kU8 ? 255. : 65535.;
+  std::vector<float> scales(num_channels), shifts(num_channels);
+  for (int64_t c = 0; c < num_channels; c++) {
+    const double channel_mean = get_channel_value(mean, "mean", c, 0.);
+    const double channel_std = get_channel_value(std, "std", c, 1.);
+    TORCH_CHECK(
+        channel_std != 0,
+        "std evaluated to zero, leading to division by zero.");
+    scales[c] = static_cast<float>(1. / (max_value * channel_std));
+    shifts[c] = static_cast<float>(-channel_mean / channel_std);
+  }
+
+  const auto out_size = compute_output_size(height, width, size);
+  const int64_t out_height = out_size.first;
+  const int64_t out_width = out_size.second;
+  const auto wx = compute_axis_weights(width, out_width, antialias);
+  const auto wy = compute_axis_weights(height, out_height, antialias);
+
+  const bool is_uint8 = image.scalar_type() == torch::kU8;
+  const void* image_ptr = image.data_ptr();
+  const int64_t stride_c = image.stride(0);
+  const int64_t stride_h = image.stride(1);
+  const int64_t stride_w = image.stride(2);
+  auto resize_input_row = [&](int64_t y, float* out_row) {
+    if (is_uint8) {
+      resize_row(
+          static_cast<const uint8_t*>(image_ptr) + y * stride_h,
+          num_channels,
+          stride_c,
+          stride_w,
+          wx,
+          out_row);
+    } else {
+      resize_row(
+          static_cast<const uint16_t*>(image_ptr) + y * stride_h,
+          num_channels,
+          stride_c,
+          stride_w,
+          wx,
+          out_row);
+    }
+  };
+
+  // Each output row is computed from the input rows it depends on, resized
+  // horizontally, then normalized before being written into the CHW output.
+  // The horizontally resized rows are kept in a ring of wy.max_size rows,
+  // which holds the window of rows of the current output row: as the windows
+  // of consecutive output rows move forward, each input row is only resized
+  // once per chunk of output rows.
+  auto output = torch::empty(
+      {num_channels, out_height, out_width},
+      torch::TensorOptions().dtype(dtype));
+  const int64_t row_size = out_width * num_channels;
+  const int64_t ring_size = wy.max_size;
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::kHalf, at::kBFloat16, dtype, "decode_and_preprocess", [&] {
+        scalar_t* output_ptr = output.data_ptr<scalar_t>();
+        at::parallel_for(0, out_height, 16, [&](int64_t begin, int64_t end) {
+          std::vector<float> ring(ring_size * row_size);
+          std::vector<float> acc(row_size);
+          // The input rows [next_row - ring_size, next_row) are in the ring,
+          // row r being at index r % ring_size
+          int64_t next_row = 0;
+          for (int64_t y = begin; y < end; y++) {
+            const int64_t window_end = wy.start[y] + wy.size[y];
+            for (int64_t r = std::max(next_row, wy.start[y]); r < window_end;
+                 r++) {
+              resize_input_row(r, ring.data() + (r % ring_size) * row_size);
+            }
+            next_row = std::max(next_row, window_end);
+
+            std::fill(acc.begin(), acc.end(), 0.f);
+            const float* weights = wy.weights.data() + y * wy.max_size;
+            for (int64_t k = 0; k < wy.size[y]; k++) {
+              const float* row =
+                  ring.data() + ((wy.start[y] + k) % ring_size) * row_size;
+              const float weight = weights[k];
+              for (int64_t i = 0; i < row_size; i++) {
+                acc[i] += weight * row[i];
+              }
+            }
+            for (int64_t c = 0; c < num_channels; c++) {
+              scalar_t* out_row = output_ptr + (c * out_height + y) * out_width;
+              for (int64_t x = 0; x < out_width; x++) {
+                out_row[x] = static_cast<scalar_t>(
+                    acc[x * num_channels + c] * scales[c] + shifts[c]);
+              }
+            }
+          }
+        });
+      });
+  return output;
+}
+
+} // namespace image
+} // namespace vision
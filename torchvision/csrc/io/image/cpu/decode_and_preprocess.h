@@ -0,0 +1,27 @@
+#pragma once
+
+#include <torch/types.h>
+#include "../common.h"
+
+namespace vision {
+namespace image {
+
+// Decodes an image and resizes it (bilinear, optionally antialiased), converts
+// it to a floating point dtype in [0, 1] and normalizes it with mean and std.
+// The resizing and the normalization are done row by row, without
+// materializing the resized image, but the whole image is decoded first. This
+// is equivalent to decode_image -> resize -> to_dtype(scale=True) -> normalize.
+// size is empty (no resizing), [smaller_edge] or [height, width]. mean and std
+// are empty (no normalization), or hold 1 or num_channels values.
+C10_EXPORT torch::Tensor decode_and_preprocess(
+    const torch::Tensor& data,
+    const std::vector<int64_t>& size,
+    const std::vector<double>& mean,
+    const std::vector<double>& std,
+    torch::ScalarType dtype = torch::kFloat,
+    bool antialias = true,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    bool apply_exif_orientation = false);
+
+} // namespace image
+} // namespace vision
@@ -5,6 +5,7 @@
 #include "decode_heic.h"
 #include "decode_jpeg.h"
 #include "decode_png.h"
+#include "decode_tiff.h"
 #include "decode_webp.h"
 
 namespace vision {
@@ -13,7 +14,9 @@ namespace image {
 torch::Tensor decode_image(
     const torch::Tensor& data,
     ImageReadMode mode,
-    bool apply_exif_orientation) {
+    bool apply_exif_orientation,
+    const std::vector<int64_t>& target_size,
+    const std::optional<torch::Tensor>& out) {
   // Check that tensor is a CPU tensor
   TORCH_CHECK(data.device() == torch::kCPU, "Expected a CPU tensor");
   // Check that the input tensor dtype is uint8
@@ -24,20 +27,32 @@ torch::Tensor decode_image(
       "Expected a non empty 1-dimensional tensor");
 
   auto err_msg =
-      "Unsupported image file. Only jpeg, png and gif are currently supported.";
+      "Unsupported image file. Only jpeg, png, gif, tiff, webp, avif and heic are currently supported.";
 
   auto datap = data.data_ptr<uint8_t>();
 
   const uint8_t jpeg_signature[3] = {255, 216, 255}; // == "\xFF\xD8\xFF"
   TORCH_CHECK(data.numel() >= 3, err_msg);
   if (memcmp(jpeg_signature, datap, 3) == 0) {
-    return decode_jpeg(data, mode, apply_exif_orientation);
+    return decode_jpeg(
+        data, mode, apply_exif_orientation, target_size, /*crop=*/{}, out);
   }
 
   const uint8_t png_signature[4] = {137, 80, 78, 71}; // == "\211PNG"
   TORCH_CHECK(data.numel() >= 4, err_msg);
   if (memcmp(png_signature, datap, 4) == 0) {
-    return decode_png(data, mode, apply_exif_orientation);
+    return decode_png(data, mode, apply_exif_orientation, out);
+  }
+
+  const uint8_t tiff_signature_le[4] = {0x49, 0x49, 0x2A, 0x00}; // == "II*\0"
+  const uint8_t tiff_signature_be[4] = {0x4D, 0x4D, 0x00, 0x2A}; // == "MM\0*"
+  const uint8_t big_tiff_signature_le[4] = {0x49, 0x49, 0x2B, 0x00};
+  const uint8_t big_tiff_signature_be[4] = {0x4D, 0x4D, 0x00, 0x2B};
+  if (memcmp(tiff_signature_le, datap, 4) == 0 ||
+      memcmp(tiff_signature_be, datap, 4) == 0 ||
+      memcmp(big_tiff_signature_le, datap, 4) == 0 ||
+      memcmp(big_tiff_signature_be, datap, 4) == 0) {
+    return write_into_out(decode_tiff(data, mode), out);
   }
 
   const uint8_t gif_signature_1[6] = {
@@ -47,7 +62,7 @@ torch::Tensor decode_image(
   TORCH_CHECK(data.numel() >= 6, err_msg);
   if (memcmp(gif_signature_1, datap, 6) == 0 ||
       memcmp(gif_signature_2, datap, 6) == 0) {
-    return decode_gif(data);
+    return write_into_out(decode_gif(data), out);
   }
 
   // We assume the signature of an avif file is
@@ -59,7 +74,7 @@ torch::Tensor decode_image(
       0x66, 0x74, 0x79, 0x70, 0x61, 0x76, 0x69, 0x66}; // == "ftypavif"
   TORCH_CHECK(data.numel() >= 12, err_msg);
   if ((memcmp(avif_signature, datap + 4, 8) == 0)) {
-    return decode_avif(data, mode);
+    return write_into_out(decode_avif(data, mode), out);
   }
 
   // Similarly for heic we assume the signature is "ftypeheic" but some files
@@ -70,7 +85,7 @@ torch::Tensor decode_image(
       0x66, 0x74, 0x79, 0x70, 0x68, 0x65, 0x69, 0x63}; // == "ftypheic"
   TORCH_CHECK(data.numel() >= 12, err_msg);
   if ((memcmp(heic_signature, datap + 4, 8) == 0)) {
-    return decode_heic(data, mode);
+    return write_into_out(decode_heic(data, mode), out);
   }
 
   const uint8_t webp_signature_begin[4] = {0x52, 0x49, 0x46, 0x46}; // == "RIFF"
@@ -79,7 +94,7 @@ torch::Tensor decode_image(
   TORCH_CHECK(data.numel() >= 15, err_msg);
   if ((memcmp(webp_signature_begin, datap, 4) == 0) &&
       (memcmp(webp_signature_end, datap + 8, 7) == 0)) {
-    return decode_webp(data, mode);
+    return decode_webp(data, mode, out);
   }
 
   TORCH_CHECK(false, err_msg);
@@ -9,7 +9,9 @@ namespace image {
 C10_EXPORT torch::Tensor decode_image(
     const torch::Tensor& data,
     ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
-    bool apply_exif_orientation = false);
+    bool apply_exif_orientation = false,
+    const std::vector<int64_t>& target_size = {},
+    const std::optional<torch::Tensor>& out = std::nullopt);
 
 } // namespace image
 } // namespace vision
@@ -0,0 +1,144 @@
+#include "decode_image_async.h"
+
+#include <c10/core/thread_pool.h>
+
+#include <mutex>
+#include <thread>
+
+#ifdef _WIN32
+#include <process.h>
+#else
+#include <unistd.h>
+#endif
+
+#include "decode_image.h"
+#include "read_write_file.h"
+
+namespace vision {
+namespace image {
+
+namespace {
+
+// Guards the variables below
+std::mutex io_pool_mutex;
+int64_t io_num_threads = 0;
+c10::ThreadPool* io_pool = nullptr;
+// The process which created io_pool
+int64_t io_pool_pid = 0;
+
+int64_t current_pid() {
+#ifdef _WIN32
+  return _getpid();
+#else
+  return getpid();
+#endif
+}
+
+int64_t default_io_num_threads() {
+  // Reading files is mostly waiting on I/O, so use at least a few threads even
+  // on small machines.
+  return std::max<int64_t>(4, std::thread::hardware_concurrency());
+}
+
+// Whether the pool was created by this process. A process forked after the
+// pool was created inherits a pool without threads.
+bool has_io_pool() {
+  return io_pool != nullptr && io_pool_pid == current_pid();
+}
+
+c10::ThreadPool& get_io_pool() {
+  std::lock_guard<std::mutex> lock(io_pool_mutex);
+  if (!has_io_pool()) {
+    int64_t num_threads = io_num_threads;
+    if (num_threads == 0) {
+      num_threads = default_io_num_threads();
+    }
+    // Intentionally leaked, like the pool inherited from the parent process
+    // if this is a forked process: joining the threads while the process
+    // exits may deadlock.
+    io_pool = new c10::ThreadPool(static_cast<int>(num_threads));
+    io_pool_pid = current_pid();
+  }
+  return *io_pool;
+}
+
+c10::intrusive_ptr<c10::ivalue::Future> run_async(
+    std::function<torch::Tensor()> fn) {
+  auto future =
+      c10::make_intrusive<c10::ivalue::Future>(c10::TensorType::get());
+  get_io_pool().run([future, fn = std::move(fn)]() {
+    try {
+      future->markCompleted(fn());
+    } catch (...) {
+      future->setError(std::current_exception());
+    }
+  });
+  return future;
+}
+
+} // namespace
+
+c10::intrusive_ptr<c10::ivalue::Future> decode_image_async(
+    const torch::Tensor& data,
+    ImageReadMode mode,
+    bool apply_exif_orientation) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_image_async.decode_image_async");
+  return run_async([data, mode, apply_exif_orientation]() {
+    return decode_image(data, mode, apply_exif_orientation);
+  });
+}
+
+c10::intrusive_ptr<c10::ivalue::Future> read_image_async(
+    const std::string& filename,
+    ImageReadMode mode,
+    bool apply_exif_orientation) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_image_async.read_image_async");
+  return run_async([filename, mode, apply_exif_orientation]() {
+    return decode_image(read_file(filename), mode, apply_exif_orientation);
+  });
+}
+
+void decode_image_async_boxed(
+    const c10::OperatorHandle& op,
+    torch::jit::Stack* stack) {
+  auto args = torch::jit::last(*stack, 3);
+  auto future =
+      decode_image_async(args[0].toTensor(), args[1].toInt(), args[2].toBool());
+  torch::jit::drop(*stack, 3);
+  torch::jit::push(*stack, std::move(future));
+}
+
+void read_image_async_boxed(
+    const c10::OperatorHandle& op,
+    torch::jit::Stack* stack) {
+  auto args = torch::jit::last(*stack, 3);
+  auto future = read_image_async(
+      args[0].toStringRef(), args[1].toInt(), args[2].toBool());
+  torch::jit::drop(*stack, 3);
+  torch::jit::push(*stack, std::move(future));
+}
+
+void set_io_num_threads(int64_t num_threads) {
+  TORCH_CHECK(
+      num_threads > 0,
+      "num_threads must be a positive integer, got ",
+      num_threads);
+  std::lock_guard<std::mutex> lock(io_pool_mutex);
+  TORCH_CHECK(
+      !has_io_pool(),
+      "The number of I/O threads can't be changed after the first asynchronous operation");
+  io_num_threads = num_threads;
+}
+
+int64_t get_io_num_threads() {
+  std::lock_guard<std::mutex> lock(io_pool_mutex);
+  if (has_io_pool()) {
+    return static_cast<int64_t>(io_pool->size());
+  }
+  return io_num_threads == 0 ? default_io_num_threads() : io_num_threads;
+}
+
+} // namespace image
+} // namespace vision
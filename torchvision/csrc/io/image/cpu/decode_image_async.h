@@ -0,0 +1,41 @@
+#pragma once
+
+#include <ATen/core/ivalue.h>
+#include <ATen/core/stack.h>
+#include <torch/types.h>
+#include "../common.h"
+
+namespace vision {
+namespace image {
+
+// Asynchronous versions of decode_image() and read_file() + decode_image().
+// They return immediately, and the work is done on a dedicated I/O thread
+// pool, separate from the intra-op and inter-op thread pools. The returned
+// future is completed with the decoded image, or with the error raised while
+// reading or decoding it.
+C10_EXPORT c10::intrusive_ptr<c10::ivalue::Future> decode_image_async(
+    const torch::Tensor& data,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    bool apply_exif_orientation = false);
+
+C10_EXPORT c10::intrusive_ptr<c10::ivalue::Future> read_image_async(
+    const std::string& filename,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    bool apply_exif_orientation = false);
+
+// Kernels returning futures can only be registered as boxed kernels, which
+// take their arguments from and push their result onto the stack.
+void decode_image_async_boxed(
+    const c10::OperatorHandle& op,
+    torch::jit::Stack* stack);
+void read_image_async_boxed(
+    const c10::OperatorHandle& op,
+    torch::jit::Stack* stack);
+
+// Number of threads of the I/O thread pool. The pool is created on first use,
+// so this only has an effect if called before any asynchronous operation.
+C10_EXPORT void set_io_num_threads(int64_t num_threads);
+C10_EXPORT int64_t get_io_num_threads();
+
+} // namespace image
+} // namespace vision
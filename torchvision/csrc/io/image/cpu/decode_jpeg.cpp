@@ -10,7 +10,10 @@ namespace image {
 torch::Tensor decode_jpeg(
     const torch::Tensor& data,
     ImageReadMode mode,
-    bool apply_exif_orientation) {
+    bool apply_exif_orientation,
+    const std::vector<int64_t>& target_size,
+    const std::vector<int64_t>& crop,
+    const std::optional<torch::Tensor>& out) {
   TORCH_CHECK(
       false, "decode_jpeg: torchvision not compiled with libjpeg support");
 }
@@ -86,10 +89,9 @@ inline unsigned char clamped_cmyk_rgb_convert(
 }
 
 void convert_line_cmyk_to_rgb(
-    j_decompress_ptr cinfo,
     const unsigned char* cmyk_line,
-    unsigned char* rgb_line) {
-  int width = cinfo->output_width;
+    unsigned char* rgb_line,
+    int width) {
   for (int i = 0; i < width; ++i) {
     int c = cmyk_line[i * 4 + 0];
     int m = cmyk_line[i * 4 + 1];
@@ -109,10 +111,9 @@ inline unsigned char rgb_to_gray(int r, int g, int b) {
 }
 
 void convert_line_cmyk_to_gray(
-    j_decompress_ptr cinfo,
     const unsigned char* cmyk_line,
-    unsigned char* gray_line) {
-  int width = cinfo->output_width;
+    unsigned char* gray_line,
+    int width) {
   for (int i = 0; i < width; ++i) {
     int c = cmyk_line[i * 4 + 0];
     int m = cmyk_line[i * 4 + 1];
@@ -127,16 +128,60 @@ void convert_line_cmyk_to_gray(
   }
 }
 
+unsigned int get_scale_denom(
+    int64_t height,
+    int64_t width,
+    const std::vector<int64_t>& target_size,
+    int exif_orientation) {
+  // Returns the largest DCT scaling denominator (8, 4, 2 or 1) for which an
+  // image of size (height, width) is still at least as large as target_size
+  // once decoded. libjpeg rounds the scaled dimensions up.
+  if (exif_orientation >= IMAGE_ORIENTATION_LT &&
+      exif_orientation <= IMAGE_ORIENTATION_LB) {
+    // target_size refers to the output, which will be transposed
+    std::swap(height, width);
+  }
+
+  for (unsigned int denom = 8; denom > 1; denom /= 2) {
+    int64_t scaled_height = (height + denom - 1) / denom;
+    int64_t scaled_width = (width + denom - 1) / denom;
+    bool large_enough = target_size.size() == 1
+        ? std::min(scaled_height, scaled_width) >= target_size[0]
+        : scaled_height >= target_size[0] && scaled_width >= target_size[1];
+    if (large_enough) {
+      return denom;
+    }
+  }
+  return 1;
+}
+
 } // namespace
 
 torch::Tensor decode_jpeg(
     const torch::Tensor& data,
     ImageReadMode mode,
-    bool apply_exif_orientation) {
+    bool apply_exif_orientation,
+    const std::vector<int64_t>& target_size,
+    const std::vector<int64_t>& crop,
+    const std::optional<torch::Tensor>& out) {
   C10_LOG_API_USAGE_ONCE(
       "torchvision.csrc.io.image.cpu.decode_jpeg.decode_jpeg");
 
   validate_encoded_data(data);
+  TORCH_CHECK(
+      target_size.size() <= 2,
+      "target_size must have at most 2 elements, got ",
+      target_size.size());
+  for (auto size : target_size) {
+    TORCH_CHECK(size > 0, "target_size values must be positive, got ", size);
+  }
+  TORCH_CHECK(
+      crop.empty() || crop.size() == 4,
+      "crop must be empty or have 4 elements (top, left, height, width), got ",
+      crop.size());
+  TORCH_CHECK(
+      crop.empty() || !apply_exif_orientation,
+      "crop is not supported together with apply_exif_orientation=True");
 
   struct jpeg_decompress_struct cinfo;
   struct torch_jpeg_error_mgr jerr;
@@ -203,33 +248,119 @@ torch::Tensor decode_jpeg(
     exif_orientation = fetch_jpeg_exif_orientation(&cinfo);
   }
 
+  int64_t image_height = cinfo.image_height;
+  int64_t image_width = cinfo.image_width;
+  if (!crop.empty()) {
+    bool valid_crop = crop[0] >= 0 && crop[1] >= 0 && crop[2] > 0 &&
+        crop[3] > 0 && crop[0] + crop[2] <= image_height &&
+        crop[1] + crop[3] <= image_width;
+    if (!valid_crop) {
+      jpeg_destroy_decompress(&cinfo);
+      TORCH_CHECK(
+          false,
+          "The crop (top=",
+          crop[0],
+          ", left=",
+          crop[1],
+          ", height=",
+          crop[2],
+          ", width=",
+          crop[3],
+          ") must be within the image of size ",
+          image_height,
+          "x",
+          image_width);
+    }
+  }
+
+  unsigned int scale_denom = 1;
+  if (!target_size.empty()) {
+    // Let the IDCT downscale the image, which is much cheaper than decoding
+    // the whole image and resizing it afterwards.
+    scale_denom = crop.empty()
+        ? get_scale_denom(
+              image_height, image_width, target_size, exif_orientation)
+        : get_scale_denom(crop[2], crop[3], target_size, exif_orientation);
+    cinfo.scale_num = 1;
+    cinfo.scale_denom = scale_denom;
+  }
+
   jpeg_start_decompress(&cinfo);
 
+  int first_row = 0;
   int height = cinfo.output_height;
   int width = cinfo.output_width;
+  // Offset of the first output column within the decoded scanlines, which can
+  // be wider than the output when cropping.
+  int first_column = 0;
+
+  if (!crop.empty()) {
+    // The crop is expressed in the coordinates of the full size image, map it
+    // to the (possibly downscaled) output.
+    first_row = crop[0] / scale_denom;
+    int left = crop[1] / scale_denom;
+    int bottom = std::min<int64_t>(
+        (crop[0] + crop[2] + scale_denom - 1) / scale_denom, height);
+    int right = std::min<int64_t>(
+        (crop[1] + crop[3] + scale_denom - 1) / scale_denom, width);
+    height = bottom - first_row;
+    width = right - left;
+    first_column = left;
+#ifdef LIBJPEG_TURBO_VERSION
+    // Only decode the iMCU columns and rows covered by the crop. libjpeg-turbo
+    // aligns the columns to iMCU boundaries, so the decoded scanlines may
+    // start a bit before the crop and be a bit wider than it.
+    JDIMENSION xoffset = left;
+    JDIMENSION crop_width = width;
+    jpeg_crop_scanline(&cinfo, &xoffset, &crop_width);
+    first_column = left - xoffset;
+    if (first_row > 0) {
+      jpeg_skip_scanlines(&cinfo, first_row);
+    }
+#endif
+  }
 
   int stride = width * channels;
-  auto tensor =
-      torch::empty({int64_t(height), int64_t(width), channels}, torch::kU8);
+  // The image can't be decoded in place if it gets transformed afterwards.
+  bool is_oriented = exif_orientation > IMAGE_ORIENTATION_TL &&
+      exif_orientation <= IMAGE_ORIENTATION_LB;
+  auto tensor = get_decoding_buffer(
+      is_oriented ? std::nullopt : out, height, width, channels);
   auto ptr = tensor.data_ptr<uint8_t>();
-  torch::Tensor cmyk_line_tensor;
-  if (cmyk_to_rgb_or_gray) {
-    cmyk_line_tensor = torch::empty({int64_t(width), 4}, torch::kU8);
+
+  // Scanlines are decoded in a temporary buffer when they need to be converted
+  // from CMYK or when they don't exactly match the output rows.
+  int line_channels = cmyk_to_rgb_or_gray ? 4 : channels;
+  bool use_line_buffer =
+      cmyk_to_rgb_or_gray || int(cinfo.output_width) != width;
+  torch::Tensor line_tensor;
+  if (use_line_buffer || first_row > int(cinfo.output_scanline)) {
+    line_tensor = torch::empty(
+        {int64_t(cinfo.output_width), int64_t(line_channels)}, torch::kU8);
+  }
+
+  while (int(cinfo.output_scanline) < first_row) {
+    // Only reached when libjpeg can't skip scanlines on its own.
+    auto line_ptr = line_tensor.data_ptr<uint8_t>();
+    jpeg_read_scanlines(&cinfo, &line_ptr, 1);
   }
 
-  while (cinfo.output_scanline < cinfo.output_height) {
+  while (int(cinfo.output_scanline) < first_row + height) {
     /* jpeg_read_scanlines expects an array of pointers to scanlines.
      * Here the array is only one element long, but you could ask for
      * more than one scanline at a time if that's more convenient.
      */
-    if (cmyk_to_rgb_or_gray) {
-      auto cmyk_line_ptr = cmyk_line_tensor.data_ptr<uint8_t>();
-      jpeg_read_scanlines(&cinfo, &cmyk_line_ptr, 1);
-
-      if (channels == 3) {
-        convert_line_cmyk_to_rgb(&cinfo, cmyk_line_ptr, ptr);
+    if (use_line_buffer) {
+      auto line_ptr = line_tensor.data_ptr<uint8_t>();
+      jpeg_read_scanlines(&cinfo, &line_ptr, 1);
+      line_ptr += first_column * line_channels;
+
+      if (!cmyk_to_rgb_or_gray) {
+        std::memcpy(ptr, line_ptr, stride);
+      } else if (channels == 3) {
+        convert_line_cmyk_to_rgb(line_ptr, ptr, width);
       } else if (channels == 1) {
-        convert_line_cmyk_to_gray(&cinfo, cmyk_line_ptr, ptr);
+        convert_line_cmyk_to_gray(line_ptr, ptr, width);
       }
     } else {
       jpeg_read_scanlines(&cinfo, &ptr, 1);
@@ -237,17 +368,55 @@ torch::Tensor decode_jpeg(
     ptr += stride;
   }
 
-  jpeg_finish_decompress(&cinfo);
+  if (cinfo.output_scanline < cinfo.output_height) {
+    // The rows below the crop aren't needed.
+    jpeg_abort_decompress(&cinfo);
+  } else {
+    jpeg_finish_decompress(&cinfo);
+  }
   jpeg_destroy_decompress(&cinfo);
   auto output = tensor.permute({2, 0, 1});
 
   if (apply_exif_orientation) {
-    return exif_orientation_transform(output, exif_orientation);
+    output = exif_orientation_transform(output, exif_orientation);
   }
-  return output;
+  return write_into_out(output, out);
 }
 #endif // #if !JPEG_FOUND
 
+std::vector<torch::Tensor> decode_jpegs(
+    const std::vector<torch::Tensor>& encoded_images,
+    ImageReadMode mode,
+    bool apply_exif_orientation,
+    int64_t num_threads,
+    const std::vector<int64_t>& target_size,
+    const std::optional<torch::Tensor>& out) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_jpeg.decode_jpegs");
+
+  int64_t num_images = encoded_images.size();
+  if (out.has_value()) {
+    TORCH_CHECK(
+        out->dim() == 4 && out->size(0) == num_images,
+        "out must be a 4 dimensional tensor of shape (",
+        num_images,
+        ", num_channels, height, width), got ",
+        out->sizes());
+  }
+
+  std::vector<torch::Tensor> decoded_images(num_images);
+  parallel_for_each_image(num_images, num_threads, [&](int64_t i) {
+    decoded_images[i] = decode_jpeg(
+        encoded_images[i],
+        mode,
+        apply_exif_orientation,
+        target_size,
+        /*crop=*/{},
+        out.has_value() ? std::make_optional(out->select(0, i)) : std::nullopt);
+  });
+  return decoded_images;
+}
+
 int64_t _jpeg_version() {
 #if JPEG_FOUND
   return JPEG_LIB_VERSION;
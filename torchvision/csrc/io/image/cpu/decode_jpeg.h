@@ -9,7 +9,18 @@ namespace image {
 C10_EXPORT torch::Tensor decode_jpeg(
     const torch::Tensor& data,
     ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
-    bool apply_exif_orientation = false);
+    bool apply_exif_orientation = false,
+    const std::vector<int64_t>& target_size = {},
+    const std::vector<int64_t>& crop = {},
+    const std::optional<torch::Tensor>& out = std::nullopt);
+
+C10_EXPORT std::vector<torch::Tensor> decode_jpegs(
+    const std::vector<torch::Tensor>& encoded_images,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    bool apply_exif_orientation = false,
+    int64_t num_threads = 0,
+    const std::vector<int64_t>& target_size = {},
+    const std::optional<torch::Tensor>& out = std::nullopt);
 
 C10_EXPORT int64_t _jpeg_version();
 C10_EXPORT bool _is_compiled_against_turbo();
@@ -12,67 +12,106 @@ using namespace exif_private;
 torch::Tensor decode_png(
     const torch::Tensor& data,
     ImageReadMode mode,
-    bool apply_exif_orientation) {
+    bool apply_exif_orientation,
+    const std::optional<torch::Tensor>& out) {
   TORCH_CHECK(
       false, "decode_png: torchvision not compiled with libPNG support");
 }
+
+struct PngBandDecoder::Impl {};
+
+PngBandDecoder::PngBandDecoder(torch::Tensor data, ImageReadMode mode) {
+  TORCH_CHECK(
+      false, "decode_png_bands: torchvision not compiled with libPNG support");
+}
+
+PngBandDecoder::~PngBandDecoder() = default;
+
+std::tuple<int64_t, int64_t, int64_t, int64_t> PngBandDecoder::get_info()
+    const {
+  TORCH_CHECK(false, "torchvision not compiled with libPNG support");
+}
+
+int64_t PngBandDecoder::decode_rows_into(torch::Tensor out) {
+  TORCH_CHECK(false, "torchvision not compiled with libPNG support");
+}
 #else
 
+namespace {
+
 bool is_little_endian() {
   uint32_t x = 1;
   return *(uint8_t*)&x;
 }
 
-torch::Tensor decode_png(
-    const torch::Tensor& data,
-    ImageReadMode mode,
-    bool apply_exif_orientation) {
-  C10_LOG_API_USAGE_ONCE("torchvision.csrc.io.image.cpu.decode_png.decode_png");
+// Owns the libpng read structures, so that they get destroyed when an error is
+// raised.
+struct PngReadStruct {
+  png_structp png_ptr = nullptr;
+  png_infop info_ptr = nullptr;
 
-  validate_encoded_data(data);
-
-  auto png_ptr =
-      png_create_read_struct(PNG_LIBPNG_VER_STRING, nullptr, nullptr, nullptr);
-  TORCH_CHECK(png_ptr, "libpng read structure allocation failed!")
-  auto info_ptr = png_create_info_struct(png_ptr);
-  if (!info_ptr) {
-    png_destroy_read_struct(&png_ptr, nullptr, nullptr);
-    // Seems redundant with the if statement. done here to avoid leaking memory.
-    TORCH_CHECK(info_ptr, "libpng info structure allocation failed!")
+  PngReadStruct() {
+    png_ptr = png_create_read_struct(
+        PNG_LIBPNG_VER_STRING, nullptr, nullptr, nullptr);
+    TORCH_CHECK(png_ptr, "libpng read structure allocation failed!")
+    info_ptr = png_create_info_struct(png_ptr);
+    if (!info_ptr) {
+      png_destroy_read_struct(&png_ptr, nullptr, nullptr);
+      // Seems redundant with the if statement. done here to avoid leaking
+      // memory.
+      TORCH_CHECK(info_ptr, "libpng info structure allocation failed!")
+    }
   }
 
-  auto accessor = data.accessor<unsigned char, 1>();
-  auto datap = accessor.data();
-  auto datap_len = accessor.size(0);
-
-  if (setjmp(png_jmpbuf(png_ptr)) != 0) {
+  ~PngReadStruct() {
     png_destroy_read_struct(&png_ptr, &info_ptr, nullptr);
-    TORCH_CHECK(false, "Internal error.");
   }
+};
+
+struct Reader {
+  png_const_bytep ptr;
+  png_size_t count;
+};
+
+void read_callback(png_structp png_ptr, png_bytep output, png_size_t bytes) {
+  auto reader = static_cast<Reader*>(png_get_io_ptr(png_ptr));
+  TORCH_CHECK(
+      reader->count >= bytes,
+      "Out of bound read in decode_png. Probably, the input image is corrupted");
+  std::copy(reader->ptr, reader->ptr + bytes, output);
+  reader->ptr += bytes;
+  reader->count -= bytes;
+}
+
+struct PngHeader {
+  int64_t height;
+  int64_t width;
+  int64_t channels;
+  bool is_16_bits;
+  int number_of_passes;
+};
+
+// Reads the image header and sets up the libpng transformations needed for
+// the requested mode. The caller must have called setjmp() on the png_ptr
+// jmpbuf.
+PngHeader read_header(
+    png_structp png_ptr,
+    png_infop info_ptr,
+    Reader* reader,
+    const torch::Tensor& data,
+    ImageReadMode mode) {
+  auto datap = data.data_ptr<uint8_t>();
+  auto datap_len = data.numel();
+
   TORCH_CHECK(datap_len >= 8, "Content is too small for png!")
   auto is_png = !png_sig_cmp(datap, 0, 8);
   TORCH_CHECK(is_png, "Content is not png!")
 
-  struct Reader {
-    png_const_bytep ptr;
-    png_size_t count;
-  } reader;
-  reader.ptr = png_const_bytep(datap) + 8;
-  reader.count = datap_len - 8;
-
-  auto read_callback = [](png_structp png_ptr,
-                          png_bytep output,
-                          png_size_t bytes) {
-    auto reader = static_cast<Reader*>(png_get_io_ptr(png_ptr));
-    TORCH_CHECK(
-        reader->count >= bytes,
-        "Out of bound read in decode_png. Probably, the input image is corrupted");
-    std::copy(reader->ptr, reader->ptr + bytes, output);
-    reader->ptr += bytes;
-    reader->count -= bytes;
-  };
+  reader->ptr = png_const_bytep(datap) + 8;
+  reader->count = datap_len - 8;
+
   png_set_sig_bytes(png_ptr, 8);
-  png_set_read_fn(png_ptr, &reader, read_callback);
+  png_set_read_fn(png_ptr, reader, read_callback);
   png_read_info(png_ptr, info_ptr);
 
   png_uint_32 width, height;
@@ -89,18 +128,12 @@ torch::Tensor decode_png(
       nullptr,
       nullptr);
 
-  if (retval != 1) {
-    png_destroy_read_struct(&png_ptr, &info_ptr, nullptr);
-    TORCH_CHECK(retval == 1, "Could read image metadata from content.")
-  }
+  TORCH_CHECK(retval == 1, "Could read image metadata from content.")
 
-  if (bit_depth > 8 && bit_depth != 16) {
-    png_destroy_read_struct(&png_ptr, &info_ptr, nullptr);
-    TORCH_CHECK(
-        false,
-        "bit depth of png image is " + std::to_string(bit_depth) +
-            ". Only <=8 and 16 are supported.")
-  }
+  TORCH_CHECK(
+      bit_depth <= 8 || bit_depth == 16,
+      "bit depth of png image is " + std::to_string(bit_depth) +
+          ". Only <=8 and 16 are supported.")
 
   int channels = png_get_channels(png_ptr, info_ptr);
 
@@ -186,42 +219,172 @@ torch::Tensor decode_png(
         }
         break;
       default:
-        png_destroy_read_struct(&png_ptr, &info_ptr, nullptr);
         TORCH_CHECK(false, "The provided mode is not supported for PNG files");
     }
 
     png_read_update_info(png_ptr, info_ptr);
   }
 
-  auto num_pixels_per_row = width * channels;
   auto is_16_bits = bit_depth == 16;
-  auto tensor = torch::empty(
-      {int64_t(height), int64_t(width), channels},
-      is_16_bits ? at::kUInt16 : torch::kU8);
   if (is_little_endian()) {
     png_set_swap(png_ptr);
   }
-  auto t_ptr = (uint8_t*)tensor.data_ptr();
-  for (int pass = 0; pass < number_of_passes; pass++) {
-    for (png_uint_32 i = 0; i < height; ++i) {
+  return PngHeader{
+      int64_t(height), int64_t(width), channels, is_16_bits, number_of_passes};
+}
+
+// Reads all the rows of the image into out, a contiguous HWC tensor.
+void read_image(
+    png_structp png_ptr,
+    const PngHeader& header,
+    const torch::Tensor& out) {
+  auto row_size = header.width * header.channels * (header.is_16_bits ? 2 : 1);
+  for (int pass = 0; pass < header.number_of_passes; pass++) {
+    auto t_ptr = (uint8_t*)out.data_ptr();
+    for (int64_t i = 0; i < header.height; ++i) {
       png_read_row(png_ptr, t_ptr, nullptr);
-      t_ptr += num_pixels_per_row * (is_16_bits ? 2 : 1);
+      t_ptr += row_size;
     }
-    t_ptr = (uint8_t*)tensor.data_ptr();
   }
+}
 
+} // namespace
+
+torch::Tensor decode_png(
+    const torch::Tensor& data,
+    ImageReadMode mode,
+    bool apply_exif_orientation,
+    const std::optional<torch::Tensor>& out) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.io.image.cpu.decode_png.decode_png");
+
+  validate_encoded_data(data);
+
+  PngReadStruct png;
+  Reader reader;
+  if (setjmp(png_jmpbuf(png.png_ptr)) != 0) {
+    TORCH_CHECK(false, "Internal error.");
+  }
+  auto header = read_header(png.png_ptr, png.info_ptr, &reader, data, mode);
+
+  // The eXIf chunk comes before the image data, so it has already been read.
   int exif_orientation = -1;
   if (apply_exif_orientation) {
-    exif_orientation = fetch_png_exif_orientation(png_ptr, info_ptr);
+    exif_orientation = fetch_png_exif_orientation(png.png_ptr, png.info_ptr);
   }
 
-  png_destroy_read_struct(&png_ptr, &info_ptr, nullptr);
+  // The image can't be decoded in place if it gets transformed afterwards.
+  bool is_oriented = exif_orientation > IMAGE_ORIENTATION_TL &&
+      exif_orientation <= IMAGE_ORIENTATION_LB;
+  auto tensor = get_decoding_buffer(
+      is_oriented ? std::nullopt : out,
+      header.height,
+      header.width,
+      header.channels,
+      header.is_16_bits ? at::kUInt16 : torch::kU8);
+  read_image(png.png_ptr, header, tensor);
 
   auto output = tensor.permute({2, 0, 1});
   if (apply_exif_orientation) {
-    return exif_orientation_transform(output, exif_orientation);
+    output = exif_orientation_transform(output, exif_orientation);
+  }
+  return write_into_out(output, out);
+}
+
+struct PngBandDecoder::Impl {
+  // Keeps the encoded data alive while reading from it.
+  torch::Tensor data;
+  PngReadStruct png;
+  Reader reader;
+  PngHeader header;
+  int64_t next_row = 0;
+  bool failed = false;
+  // Interlaced images can't be decoded row by row, since each row is only
+  // complete after the last pass. They are decoded at once into this tensor,
+  // from which the rows are then copied.
+  torch::Tensor interlaced_image;
+};
+
+PngBandDecoder::PngBandDecoder(torch::Tensor data, ImageReadMode mode)
+    : impl_(std::make_unique<Impl>()) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_png.PngBandDecoder");
+  validate_encoded_data(data);
+  impl_->data = data;
+
+  auto png_ptr = impl_->png.png_ptr;
+  if (setjmp(png_jmpbuf(png_ptr)) != 0) {
+    TORCH_CHECK(false, "Internal error.");
+  }
+  impl_->header =
+      read_header(png_ptr, impl_->png.info_ptr, &impl_->reader, data, mode);
+
+  const auto& header = impl_->header;
+  if (header.number_of_passes > 1) {
+    impl_->interlaced_image = torch::empty(
+        {header.height, header.width, header.channels},
+        header.is_16_bits ? at::kUInt16 : torch::kU8);
+    read_image(png_ptr, header, impl_->interlaced_image);
+  }
+}
+
+PngBandDecoder::~PngBandDecoder() = default;
+
+std::tuple<int64_t, int64_t, int64_t, int64_t> PngBandDecoder::get_info()
+    const {
+  const auto& header = impl_->header;
+  return std::make_tuple(
+      header.height, header.width, header.channels, header.is_16_bits ? 16 : 8);
+}
+
+int64_t PngBandDecoder::decode_rows_into(torch::Tensor out) {
+  const auto& header = impl_->header;
+  TORCH_CHECK(
+      !impl_->failed,
+      "A previous call to the decoder failed, the image can't be decoded further.");
+  TORCH_CHECK(out.device() == torch::kCPU, "Expected a CPU output tensor");
+  TORCH_CHECK(
+      out.dtype() == (header.is_16_bits ? at::kUInt16 : torch::kU8),
+      "Expected a ",
+      header.is_16_bits ? "uint16" : "uint8",
+      " output tensor, got ",
+      out.dtype());
+  TORCH_CHECK(
+      out.dim() == 3 && out.size(1) == header.width &&
+          out.size(2) == header.channels,
+      "Expected an output tensor of shape (num_rows, ",
+      header.width,
+      ", ",
+      header.channels,
+      "), got ",
+      out.sizes());
+  TORCH_CHECK(out.is_contiguous(), "The output tensor must be contiguous");
+
+  auto num_rows = std::min(out.size(0), header.height - impl_->next_row);
+  if (num_rows == 0) {
+    return 0;
+  }
+
+  if (impl_->interlaced_image.defined()) {
+    out.narrow(0, 0, num_rows)
+        .copy_(impl_->interlaced_image.narrow(0, impl_->next_row, num_rows));
+  } else {
+    auto png_ptr = impl_->png.png_ptr;
+    auto row_size =
+        header.width * header.channels * (header.is_16_bits ? 2 : 1);
+    auto t_ptr = (uint8_t*)out.data_ptr();
+    // Any error leaves libpng in an unusable state.
+    impl_->failed = true;
+    if (setjmp(png_jmpbuf(png_ptr)) != 0) {
+      TORCH_CHECK(false, "Internal error.");
+    }
+    for (int64_t i = 0; i < num_rows; ++i) {
+      png_read_row(png_ptr, t_ptr, nullptr);
+      t_ptr += row_size;
+    }
+    impl_->failed = false;
   }
-  return output;
+  impl_->next_row += num_rows;
+  return num_rows;
 }
 #endif
 
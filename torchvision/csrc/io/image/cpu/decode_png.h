@@ -1,5 +1,6 @@
 #pragma once
 
+#include <torch/custom_class.h>
 #include <torch/types.h>
 #include "../common.h"
 
@@ -9,7 +10,31 @@ namespace image {
 C10_EXPORT torch::Tensor decode_png(
     const torch::Tensor& data,
     ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
-    bool apply_exif_orientation = false);
+    bool apply_exif_orientation = false,
+    const std::optional<torch::Tensor>& out = std::nullopt);
+
+// Decodes a PNG image a few rows at a time, so that the whole image never has
+// to be held in memory. Rows are decoded in HWC layout into caller-provided
+// tensors.
+class PngBandDecoder : public torch::CustomClassHolder {
+ public:
+  PngBandDecoder(torch::Tensor data, ImageReadMode mode);
+  ~PngBandDecoder() override;
+
+  // (height, width, num_channels, bit_depth) of the decoded image. bit_depth
+  // is 8 or 16, in which case rows must be decoded into uint16 tensors.
+  std::tuple<int64_t, int64_t, int64_t, int64_t> get_info() const;
+
+  // Decodes the next out.size(0) rows into out, which must be a contiguous
+  // tensor of shape (num_rows, width, num_channels). Returns the number of
+  // rows actually decoded, which is less than num_rows for the last band, and
+  // 0 once all rows have been decoded.
+  int64_t decode_rows_into(torch::Tensor out);
+
+ private:
+  struct Impl;
+  std::unique_ptr<Impl> impl_;
+};
 
 } // namespace image
 } // namespace vision
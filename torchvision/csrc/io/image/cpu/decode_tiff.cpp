@@ -0,0 +1,811 @@
+#include "decode_tiff.h"
+
+#include <ATen/Parallel.h>
+#include <c10/util/safe_numerics.h>
+
+#include <algorithm>
+#include <cstring>
+#include <limits>
+#include <map>
+
+#if ZLIB_FOUND
+#include <zlib.h>
+#endif
+
+namespace vision {
+namespace image {
+
+namespace {
+
+// TIFF tags, see https://www.itu.int/itudoc/itu-t/com16/tiff-fx/docs/tiff6.pdf
+constexpr uint16_t kImageWidth = 256;
+constexpr uint16_t kImageLength = 257;
+constexpr uint16_t kBitsPerSample = 258;
+constexpr uint16_t kCompression = 259;
+constexpr uint16_t kPhotometric = 262;
+constexpr uint16_t kStripOffsets = 273;
+constexpr uint16_t kSamplesPerPixel = 277;
+constexpr uint16_t kRowsPerStrip = 278;
+constexpr uint16_t kStripByteCounts = 279;
+constexpr uint16_t kPlanarConfig = 284;
+constexpr uint16_t kPredictor = 317;
+constexpr uint16_t kColorMap = 320;
+constexpr uint16_t kTileWidth = 322;
+constexpr uint16_t kTileLength = 323;
+constexpr uint16_t kTileOffsets = 324;
+constexpr uint16_t kTileByteCounts = 325;
+constexpr uint16_t kSampleFormat = 339;
+
+constexpr uint64_t kCompressionNone = 1;
+constexpr uint64_t kCompressionLZW = 5;
+constexpr uint64_t kCompressionDeflate = 8;
+constexpr uint64_t kCompressionAdobeDeflate = 32946;
+constexpr uint64_t kCompressionPackBits = 32773;
+
+constexpr uint64_t kPhotometricWhiteIsZero = 0;
+constexpr uint64_t kPhotometricBlackIsZero = 1;
+constexpr uint64_t kPhotometricRGB = 2;
+constexpr uint64_t kPhotometricPalette = 3;
+constexpr uint64_t kPhotometricYCbCr = 6;
+
+// Limits on the sizes read from the file, which are otherwise only limited by
+// the range of their types
+constexpr int64_t kMaxDimension = std::numeric_limits<int32_t>::max();
+constexpr int64_t kMaxBands = std::numeric_limits<uint16_t>::max();
+constexpr int64_t kMaxTileDimension = 1 << 16;
+
+bool is_little_endian() {
+  uint32_t x = 1;
+  return *(uint8_t*)&x;
+}
+
+// Bounds-checked access to the TIFF structures, in the byte order of the
+// file.
+class Reader {
+ public:
+  Reader(const uint8_t* data, size_t size, bool little_endian)
+      : data_(data), size_(size), little_endian_(little_endian) {}
+
+  uint64_t read(uint64_t offset, size_t num_bytes) const {
+    TORCH_CHECK(
+        offset <= size_ && num_bytes <= size_ - offset,
+        "Invalid TIFF file: unexpected end of file");
+    uint64_t value = 0;
+    for (size_t i = 0; i < num_bytes; i++) {
+      uint64_t byte = data_[offset + (little_endian_ ? i : num_bytes - 1 - i)];
+      value |= byte << (8 * i);
+    }
+    return value;
+  }
+
+  const uint8_t* data() const {
+    return data_;
+  }
+  size_t size() const {
+    return size_;
+  }
+  bool little_endian() const {
+    return little_endian_;
+  }
+
+ private:
+  const uint8_t* data_;
+  size_t size_;
+  bool little_endian_;
+};
+
+size_t field_type_size(uint64_t type) {
+  switch (type) {
+    case 1: // BYTE
+    case 2: // ASCII
+    case 6: // SBYTE
+    case 7: // UNDEFINED
+      return 1;
+    case 3: // SHORT
+    case 8: // SSHORT
+      return 2;
+    case 4: // LONG
+    case 9: // SLONG
+    case 11: // FLOAT
+    case 13: // IFD
+      return 4;
+    case 5: // RATIONAL
+    case 10: // SRATIONAL
+    case 12: // DOUBLE
+    case 16: // LONG8
+    case 17: // SLONG8
+    case 18: // IFD8
+      return 8;
+    default:
+      return 0;
+  }
+}
+
+// The entries of an Image File Directory (IFD), i.e. the metadata of an image.
+class Ifd {
+ public:
+  struct Entry {
+    uint64_t type;
+    uint64_t count;
+    // Offset of the values in the file
+    uint64_t offset;
+  };
+
+  explicit Ifd(const Reader& reader) : reader_(reader) {
+    TORCH_CHECK(reader.size() >= 8, "Invalid TIFF file: file is too small");
+    auto magic = reader.read(2, 2);
+    bool big_tiff = magic == 43;
+    TORCH_CHECK(
+        magic == 42 || big_tiff, "Invalid TIFF file: wrong magic number");
+    size_t count_size = big_tiff ? 8 : 2;
+    size_t value_size = big_tiff ? 8 : 4;
+    size_t entry_size = big_tiff ? 20 : 12;
+    if (big_tiff) {
+      TORCH_CHECK(
+          reader.read(4, 2) == 8 && reader.read(6, 2) == 0,
+          "Invalid BigTIFF header");
+    }
+
+    uint64_t ifd_offset = reader.read(big_tiff ? 8 : 4, value_size);
+    uint64_t num_entries = reader.read(ifd_offset, count_size);
+    TORCH_CHECK(
+        num_entries <= reader.size() / entry_size,
+        "Invalid TIFF file: too many IFD entries");
+    for (uint64_t i = 0; i < num_entries; i++) {
+      uint64_t entry_offset = ifd_offset + count_size + i * entry_size;
+      auto tag = static_cast<uint16_t>(reader.read(entry_offset, 2));
+      auto type = reader.read(entry_offset + 2, 2);
+      auto count = reader.read(entry_offset + 4, value_size);
+      auto type_size = field_type_size(type);
+      if (type_size == 0) {
+        continue; // Unknown types must be ignored
+      }
+      TORCH_CHECK(
+          count <= reader.size() / type_size,
+          "Invalid TIFF file: invalid count for tag ",
+          tag);
+      uint64_t value_offset = entry_offset + 4 + value_size;
+      if (count * type_size > value_size) {
+        value_offset = reader.read(value_offset, value_size);
+      }
+      entries_[tag] = {type, count, value_offset};
+    }
+  }
+
+  bool has(uint16_t tag) const {
+    return entries_.count(tag) > 0;
+  }
+
+  std::vector<uint64_t> get_all(uint16_t tag) const {
+    auto it = entries_.find(tag);
+    TORCH_CHECK(it != entries_.end(), "Invalid TIFF file: missing tag ", tag);
+    const auto& entry = it->second;
+    auto type_size = field_type_size(entry.type);
+    std::vector<uint64_t> values(entry.count);
+    for (uint64_t i = 0; i < entry.count; i++) {
+      values[i] = reader_.read(entry.offset + i * type_size, type_size);
+    }
+    return values;
+  }
+
+  uint64_t get(uint16_t tag) const {
+    auto values = get_all(tag);
+    TORCH_CHECK(!values.empty(), "Invalid TIFF file: empty tag ", tag);
+    return values[0];
+  }
+
+  uint64_t get(uint16_t tag, uint64_t default_value) const {
+    return has(tag) ? get(tag) : default_value;
+  }
+
+ private:
+  const Reader& reader_;
+  std::map<uint16_t, Entry> entries_;
+};
+
+torch::ScalarType get_dtype(uint64_t sample_format, uint64_t bits) {
+  switch (sample_format * 100 + bits) {
+    case 108:
+      return torch::kUInt8;
+    case 116:
+      return at::kUInt16;
+    case 132:
+      return at::kUInt32;
+    case 208:
+      return torch::kInt8;
+    case 216:
+      return torch::kInt16;
+    case 232:
+      return torch::kInt32;
+    case 264:
+      return torch::kInt64;
+    case 316:
+      return torch::kFloat16;
+    case 332:
+      return torch::kFloat32;
+    case 364:
+      return torch::kFloat64;
+    default:
+      TORCH_CHECK(
+          false,
+          "Unsupported TIFF sample format ",
+          sample_format,
+          " with ",
+          bits,
+          " bits per sample");
+  }
+}
+
+void decode_packbits(
+    const uint8_t* src,
+    size_t src_size,
+    uint8_t* dst,
+    size_t dst_size) {
+  size_t i = 0, j = 0;
+  while (i < src_size && j < dst_size) {
+    auto n = static_cast<int8_t>(src[i++]);
+    if (n >= 0) {
+      size_t count = std::min<size_t>(
+          {static_cast<size_t>(n) + 1, src_size - i, dst_size - j});
+      std::memcpy(dst + j, src + i, count);
+      i += count;
+      j += count;
+    } else if (n != -128 && i < src_size) {
+      size_t count = std::min<size_t>(1 - n, dst_size - j);
+      std::memset(dst + j, src[i++], count);
+      j += count;
+    }
+  }
+}
+
+void decode_lzw(
+    const uint8_t* src,
+    size_t src_size,
+    uint8_t* dst,
+    size_t dst_size) {
+  constexpr int kClearCode = 256;
+  constexpr int kEndCode = 257;
+  constexpr int kMaxCodes = 4096;
+  TORCH_CHECK(
+      src_size < 2 || !(src[0] == 0 && (src[1] & 1)),
+      "Unsupported TIFF compression: old-style LZW");
+
+  // Each code is a string made of the string of `prefix` followed by
+  // `suffix`.
+  int prefix[kMaxCodes];
+  uint8_t suffix[kMaxCodes];
+  uint8_t first[kMaxCodes];
+  int length[kMaxCodes];
+  for (int i = 0; i < 256; i++) {
+    prefix[i] = -1;
+    suffix[i] = first[i] = static_cast<uint8_t>(i);
+    length[i] = 1;
+  }
+
+  size_t bit_pos = 0;
+  const size_t num_bits = src_size * 8;
+  int code_width = 9;
+  int next_code = 258;
+  int previous = -1;
+  size_t j = 0;
+
+  auto emit = [&](int code) {
+    // Strings are written backwards, from their last byte
+    size_t end = std::min<size_t>(j + length[code], dst_size);
+    for (int c = code, k = length[code] - 1; c >= 0; c = prefix[c], k--) {
+      if (j + k < end) {
+        dst[j + k] = suffix[c];
+      }
+    }
+    j = end;
+  };
+
+  while (j < dst_size && bit_pos + code_width <= num_bits) {
+    int code = 0;
+    for (int b = 0; b < code_width; b++, bit_pos++) {
+      code = (code << 1) | ((src[bit_pos >> 3] >> (7 - (bit_pos & 7))) & 1);
+    }
+    if (code == kEndCode) {
+      break;
+    }
+    if (code == kClearCode) {
+      code_width = 9;
+      next_code = 258;
+      previous = -1;
+      continue;
+    }
+    if (previous == -1) {
+      TORCH_CHECK(code < 256, "Invalid TIFF file: corrupted LZW data");
+      emit(code);
+      previous = code;
+      continue;
+    }
+    TORCH_CHECK(
+        code <= next_code && next_code < kMaxCodes,
+        "Invalid TIFF file: corrupted LZW data");
+    // The new code is the previous string followed by the first byte of the
+    // current one, which is the previous string itself for code == next_code
+    prefix[next_code] = previous;
+    suffix[next_code] = code == next_code ? first[previous] : first[code];
+    first[next_code] = first[previous];
+    length[next_code] = length[previous] + 1;
+    next_code++;
+    emit(code);
+    previous = code;
+    // The code width is increased one code early ("early change")
+    if (next_code + 1 >= (1 << code_width) && code_width < 12) {
+      code_width++;
+    }
+  }
+}
+
+void decode_deflate(
+    const uint8_t* src,
+    size_t src_size,
+    uint8_t* dst,
+    size_t dst_size) {
+#if !ZLIB_FOUND
+  TORCH_CHECK(
+      false,
+      "decode_tiff: torchvision not compiled with zlib support, which is needed for Deflate compressed TIFF images");
+#else
+  z_stream stream = {};
+  TORCH_CHECK(
+      inflateInit(&stream) == Z_OK, "Internal error in decode_tiff (zlib)");
+  stream.next_in = const_cast<uint8_t*>(src);
+  stream.avail_in = static_cast<uInt>(src_size);
+  stream.next_out = dst;
+  stream.avail_out = static_cast<uInt>(dst_size);
+  int ret = inflate(&stream, Z_FINISH);
+  inflateEnd(&stream);
+  TORCH_CHECK(
+      ret == Z_STREAM_END || ret == Z_OK || ret == Z_BUF_ERROR,
+      "Invalid TIFF file: corrupted Deflate data");
+#endif
+}
+
+// Multiplies sizes computed from the file, checking for overflows
+int64_t checked_mul(int64_t a, int64_t b) {
+  int64_t result = 0;
+  TORCH_CHECK(
+      !c10::mul_overflows(a, b, &result),
+      "Invalid TIFF file: image, strip or tile too large");
+  return result;
+}
+
+int64_t round_up(int64_t value, int64_t multiple) {
+  return (value + multiple - 1) / multiple * multiple;
+}
+
+template <typename T>
+void undo_horizontal_differencing(
+    uint8_t* data,
+    int64_t num_rows,
+    int64_t row_size,
+    int64_t num_samples) {
+  for (int64_t y = 0; y < num_rows; y++) {
+    T* row = reinterpret_cast<T*>(data) + y * row_size;
+    for (int64_t i = num_samples; i < row_size; i++) {
+      row[i] = static_cast<T>(row[i] + row[i - num_samples]);
+    }
+  }
+}
+
+// Floating point predictor: the bytes of each row are stored as differences,
+// with all the most significant bytes of the row first, then all the second
+// most significant bytes, etc.
+void undo_floating_point_predictor(
+    uint8_t* data,
+    int64_t num_rows,
+    int64_t row_size,
+    int64_t num_samples,
+    int64_t bytes_per_sample) {
+  const int64_t row_bytes = row_size * bytes_per_sample;
+  std::vector<uint8_t> tmp(row_bytes);
+  for (int64_t y = 0; y < num_rows; y++) {
+    uint8_t* row = data + y * row_bytes;
+    for (int64_t i = num_samples; i < row_bytes; i++) {
+      row[i] = static_cast<uint8_t>(row[i] + row[i - num_samples]);
+    }
+    std::memcpy(tmp.data(), row, row_bytes);
+    for (int64_t i = 0; i < row_size; i++) {
+      for (int64_t b = 0; b < bytes_per_sample; b++) {
+        int64_t byte = is_little_endian() ? bytes_per_sample - b - 1 : b;
+        row[i * bytes_per_sample + b] = tmp[byte * row_size + i];
+      }
+    }
+  }
+}
+
+struct TiffImage {
+  int64_t height;
+  int64_t width;
+  int64_t num_bands;
+  int64_t bytes_per_sample;
+  torch::ScalarType dtype;
+  uint64_t compression;
+  uint64_t photometric;
+  uint64_t predictor;
+  bool planar;
+  bool swap_bytes;
+  // Strips are handled as tiles that are as wide as the image
+  int64_t chunk_height;
+  int64_t chunk_width;
+  int64_t chunks_across;
+  int64_t chunks_down;
+  std::vector<uint64_t> offsets;
+  std::vector<uint64_t> byte_counts;
+};
+
+TiffImage read_tiff_image(const Ifd& ifd, const Reader& reader) {
+  TiffImage img;
+  // Compared as unsigned values, before being converted to int64_t
+  const uint64_t width = ifd.get(kImageWidth);
+  const uint64_t height = ifd.get(kImageLength);
+  const uint64_t num_bands = ifd.get(kSamplesPerPixel, 1);
+  TORCH_CHECK(
+      width > 0 && height > 0 && num_bands > 0,
+      "Invalid TIFF file: empty image");
+  TORCH_CHECK(
+      width <= kMaxDimension && height <= kMaxDimension &&
+          num_bands <= kMaxBands,
+      "Invalid TIFF file: image too large");
+  img.width = static_cast<int64_t>(width);
+  img.height = static_cast<int64_t>(height);
+  img.num_bands = static_cast<int64_t>(num_bands);
+
+  auto bits = ifd.has(kBitsPerSample) ? ifd.get_all(kBitsPerSample)
+                                      : std::vector<uint64_t>{1};
+  auto sample_formats = ifd.has(kSampleFormat) ? ifd.get_all(kSampleFormat)
+                                               : std::vector<uint64_t>{1};
+  for (auto b : bits) {
+    TORCH_CHECK(
+        b == bits[0],
+        "Unsupported TIFF image: all bands must have the same number of bits");
+  }
+  for (auto f : sample_formats) {
+    TORCH_CHECK(
+        f == sample_formats[0],
+        "Unsupported TIFF image: all bands must have the same sample format");
+  }
+  img.dtype = get_dtype(sample_formats[0], bits[0]);
+  img.bytes_per_sample = static_cast<int64_t>(bits[0] / 8);
+
+  img.compression = ifd.get(kCompression, kCompressionNone);
+  img.photometric = ifd.get(kPhotometric, kPhotometricBlackIsZero);
+  img.predictor = ifd.get(kPredictor, 1);
+  img.planar = ifd.get(kPlanarConfig, 1) == 2;
+  img.swap_bytes = img.bytes_per_sample > 1 &&
+      reader.little_endian() != is_little_endian() && img.predictor != 3;
+
+  TORCH_CHECK(
+      img.photometric != kPhotometricYCbCr,
+      "Unsupported TIFF photometric interpretation: YCbCr");
+  TORCH_CHECK(
+      img.predictor == 1 ||
+          (img.predictor == 2 && !at::isFloatingType(img.dtype)) ||
+          (img.predictor == 3 && at::isFloatingType(img.dtype)),
+      "Unsupported TIFF predictor ",
+      img.predictor,
+      " for dtype ",
+      img.dtype);
+
+  if (ifd.has(kTileWidth)) {
+    // Tile sizes are multiples of 16: tiles are at most as large as the
+    // image, rounded up to a multiple of 16.
+    const uint64_t tile_width = ifd.get(kTileWidth);
+    const uint64_t tile_height = ifd.get(kTileLength);
+    TORCH_CHECK(
+        tile_width > 0 && tile_height > 0 &&
+            tile_width <= static_cast<uint64_t>(std::min(
+                              round_up(img.width, 16), kMaxTileDimension)) &&
+            tile_height <= static_cast<uint64_t>(std::min(
+                               round_up(img.height, 16), kMaxTileDimension)),
+        "Invalid TIFF file: invalid tile size (",
+        tile_height,
+        ", ",
+        tile_width,
+        ") for an image of size (",
+        img.height,
+        ", ",
+        img.width,
+        ")");
+    img.chunk_width = static_cast<int64_t>(tile_width);
+    img.chunk_height = static_cast<int64_t>(tile_height);
+    img.offsets = ifd.get_all(kTileOffsets);
+    img.byte_counts = ifd.get_all(kTileByteCounts);
+  } else {
+    const uint64_t rows_per_strip =
+        ifd.get(kRowsPerStrip, std::numeric_limits<uint32_t>::max());
+    TORCH_CHECK(rows_per_strip > 0, "Invalid TIFF file: invalid strip size");
+    img.chunk_width = img.width;
+    img.chunk_height = static_cast<int64_t>(
+        std::min(rows_per_strip, static_cast<uint64_t>(img.height)));
+    img.offsets = ifd.get_all(kStripOffsets);
+    img.byte_counts = ifd.get_all(kStripByteCounts);
+  }
+  img.chunks_across = (img.width + img.chunk_width - 1) / img.chunk_width;
+  img.chunks_down = (img.height + img.chunk_height - 1) / img.chunk_height;
+
+  const int64_t num_chunks = checked_mul(
+      checked_mul(img.chunks_across, img.chunks_down),
+      img.planar ? img.num_bands : 1);
+  // The size of the decoded strips or tiles, checked once for all of them
+  checked_mul(
+      checked_mul(img.chunk_height, img.chunk_width),
+      checked_mul(img.planar ? 1 : img.num_bands, img.bytes_per_sample));
+  TORCH_CHECK(
+      static_cast<int64_t>(img.offsets.size()) >= num_chunks &&
+          static_cast<int64_t>(img.byte_counts.size()) >= num_chunks,
+      "Invalid TIFF file: expected ",
+      num_chunks,
+      " strips or tiles, got ",
+      img.offsets.size());
+  return img;
+}
+
+// Decodes one strip or tile, returning its samples in native byte order.
+std::vector<uint8_t> decode_chunk(
+    const TiffImage& img,
+    const Reader& reader,
+    int64_t index) {
+  const int64_t samples_per_pixel = img.planar ? 1 : img.num_bands;
+  const int64_t row_size = checked_mul(img.chunk_width, samples_per_pixel);
+  std::vector<uint8_t> chunk(
+      checked_mul(
+          checked_mul(img.chunk_height, row_size), img.bytes_per_sample),
+      0);
+
+  uint64_t offset = img.offsets[index];
+  uint64_t size = img.byte_counts[index];
+  TORCH_CHECK(
+      offset <= reader.size() && size <= reader.size() - offset,
+      "Invalid TIFF file: strip or tile out of bounds");
+  const uint8_t* src = reader.data() + offset;
+
+  switch (img.compression) {
+    case kCompressionNone:
+      std::memcpy(chunk.data(), src, std::min<size_t>(size, chunk.size()));
+      break;
+    case kCompressionPackBits:
+      decode_packbits(src, size, chunk.data(), chunk.size());
+      break;
+    case kCompressionLZW:
+      decode_lzw(src, size, chunk.data(), chunk.size());
+      break;
+    case kCompressionDeflate:
+    case kCompressionAdobeDeflate:
+      decode_deflate(src, size, chunk.data(), chunk.size());
+      break;
+    default:
+      TORCH_CHECK(false, "Unsupported TIFF compression ", img.compression);
+  }
+
+  if (img.swap_bytes) {
+    for (size_t i = 0; i < chunk.size(); i += img.bytes_per_sample) {
+      std::reverse(chunk.begin() + i, chunk.begin() + i + img.bytes_per_sample);
+    }
+  }
+  if (img.predictor == 2) {
+    switch (img.bytes_per_sample) {
+      case 1:
+        undo_horizontal_differencing<uint8_t>(
+            chunk.data(), img.chunk_height, row_size, samples_per_pixel);
+        break;
+      case 2:
+        undo_horizontal_differencing<uint16_t>(
+            chunk.data(), img.chunk_height, row_size, samples_per_pixel);
+        break;
+      case 4:
+        undo_horizontal_differencing<uint32_t>(
+            chunk.data(), img.chunk_height, row_size, samples_per_pixel);
+        break;
+      default:
+        undo_horizontal_differencing<uint64_t>(
+            chunk.data(), img.chunk_height, row_size, samples_per_pixel);
+    }
+  } else if (img.predictor == 3) {
+    undo_floating_point_predictor(
+        chunk.data(),
+        img.chunk_height,
+        row_size,
+        samples_per_pixel,
+        img.bytes_per_sample);
+  }
+  if (img.photometric == kPhotometricWhiteIsZero &&
+      img.dtype == torch::kUInt8 && img.num_bands == 1) {
+    for (auto& byte : chunk) {
+      byte = static_cast<uint8_t>(~byte);
+    }
+  }
+  return chunk;
+}
+
+torch::Tensor apply_color_map(
+    const torch::Tensor& image,
+    const Ifd& ifd,
+    const TiffImage& img) {
+  TORCH_CHECK(
+      img.dtype == torch::kUInt8 && img.num_bands == 1,
+      "Unsupported TIFF image: palette images must have a single 8 bits band");
+  auto color_map = ifd.get_all(kColorMap);
+  TORCH_CHECK(
+      color_map.size() == 3 * 256, "Invalid TIFF file: invalid color map");
+  auto lut = torch::empty({256, 3}, torch::kUInt8);
+  auto lut_ptr = lut.data_ptr<uint8_t>();
+  for (int64_t i = 0; i < 256; i++) {
+    for (int64_t c = 0; c < 3; c++) {
+      // Color map values are 16 bits
+      lut_ptr[i * 3 + c] = static_cast<uint8_t>(color_map[c * 256 + i] >> 8);
+    }
+  }
+  return lut.index({image[0].to(torch::kLong)}).permute({2, 0, 1});
+}
+
+torch::Tensor convert_mode(const torch::Tensor& image, ImageReadMode mode) {
+  const int64_t num_channels = image.size(0);
+  const auto dtype = image.scalar_type();
+  TORCH_CHECK(
+      dtype == torch::kUInt8 || dtype == at::kUInt16 ||
+          at::isFloatingType(dtype),
+      "Only ImageReadMode.UNCHANGED is supported for TIFF images of dtype ",
+      dtype);
+  TORCH_CHECK(
+      num_channels <= 4,
+      "Only ImageReadMode.UNCHANGED is supported for TIFF images with more than 4 bands, got ",
+      num_channels,
+      " bands");
+  const bool is_color = num_channels >= 3;
+  const bool has_alpha = num_channels == 2 || num_channels == 4;
+  const bool want_color =
+      mode == IMAGE_READ_MODE_RGB || mode == IMAGE_READ_MODE_RGB_ALPHA;
+  const bool want_alpha =
+      mode == IMAGE_READ_MODE_GRAY_ALPHA || mode == IMAGE_READ_MODE_RGB_ALPHA;
+
+  auto color = image.narrow(0, 0, is_color ? 3 : 1);
+  if (want_color && !is_color) {
+    color = color.expand({3, -1, -1});
+  } else if (!want_color && is_color) {
+    // Same weights as torchvision.transforms.v2.functional.rgb_to_grayscale
+    auto weights = torch::tensor({0.2989, 0.587, 0.114}).view({3, 1, 1});
+    auto gray = (color.to(torch::kDouble) * weights).sum(0, /*keepdim=*/true);
+    color = (at::isFloatingType(dtype) ? gray : gray.round()).to(dtype);
+  }
+  if (!want_alpha) {
+    return color.contiguous();
+  }
+  auto alpha = has_alpha ? image.narrow(0, num_channels - 1, 1)
+                         : torch::full(
+                               {1, image.size(1), image.size(2)},
+                               at::isFloatingType(dtype)    ? 1.0
+                                   : dtype == torch::kUInt8 ? 255.0
+                                                            : 65535.0,
+                               image.options());
+  return torch::cat({color, alpha});
+}
+
+Reader make_reader(const torch::Tensor& data) {
+  validate_encoded_data(data);
+  const uint8_t* datap = data.data_ptr<uint8_t>();
+  const size_t size = data.numel();
+  TORCH_CHECK(
+      size >= 2 &&
+          ((datap[0] == 'I' && datap[1] == 'I') ||
+           (datap[0] == 'M' && datap[1] == 'M')),
+      "Content is not a TIFF image");
+  return Reader(datap, size, datap[0] == 'I');
+}
+
+} // namespace
+
+std::tuple<int64_t, int64_t, int64_t> read_tiff_info(
+    const torch::Tensor& data) {
+  Reader reader = make_reader(data);
+  Ifd ifd(reader);
+  const TiffImage img = read_tiff_image(ifd, reader);
+  // Palette images are decoded to RGB
+  const int64_t num_channels =
+      img.photometric == kPhotometricPalette ? 3 : img.num_bands;
+  return std::make_tuple(img.height, img.width, num_channels);
+}
+
+torch::Tensor decode_tiff(
+    const torch::Tensor& data,
+    ImageReadMode mode,
+    const std::vector<int64_t>& region) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_tiff.decode_tiff");
+  Reader reader = make_reader(data);
+  Ifd ifd(reader);
+  const TiffImage img = read_tiff_image(ifd, reader);
+
+  TORCH_CHECK(
+      region.empty() || region.size() == 4,
+      "region must be empty or [top, left, height, width], got ",
+      region);
+  const int64_t top = region.empty() ? 0 : region[0];
+  const int64_t left = region.empty() ? 0 : region[1];
+  const int64_t height = region.empty() ? img.height : region[2];
+  const int64_t width = region.empty() ? img.width : region[3];
+  TORCH_CHECK(
+      top >= 0 && left >= 0 && height > 0 && width > 0 &&
+          top + height <= img.height && left + width <= img.width,
+      "region ",
+      region,
+      " is out of the bounds of the image of size (",
+      img.height,
+      ", ",
+      img.width,
+      ")");
+
+  // Contiguous images are decoded into a (H, W, C) buffer, planar ones into a
+  // (C, H, W) buffer.
+  auto buffer = img.planar
+      ? torch::empty({img.num_bands, height, width}, img.dtype)
+      : torch::empty({height, width, img.num_bands}, img.dtype);
+  auto buffer_ptr = static_cast<uint8_t*>(buffer.data_ptr());
+  const int64_t pixel_bytes =
+      (img.planar ? 1 : img.num_bands) * img.bytes_per_sample;
+
+  // Only the strips or tiles intersecting the region are decoded
+  const int64_t first_y = top / img.chunk_height;
+  const int64_t last_y = (top + height - 1) / img.chunk_height;
+  const int64_t first_x = left / img.chunk_width;
+  const int64_t last_x = (left + width - 1) / img.chunk_width;
+  const int64_t num_planes = img.planar ? img.num_bands : 1;
+  std::vector<std::tuple<int64_t, int64_t, int64_t>> chunks;
+  for (int64_t plane = 0; plane < num_planes; plane++) {
+    for (int64_t cy = first_y; cy <= last_y; cy++) {
+      for (int64_t cx = first_x; cx <= last_x; cx++) {
+        chunks.emplace_back(plane, cy, cx);
+      }
+    }
+  }
+
+  at::parallel_for(0, chunks.size(), 1, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      auto [plane, cy, cx] = chunks[i];
+      int64_t index = (plane * img.chunks_down + cy) * img.chunks_across + cx;
+      auto chunk = decode_chunk(img, reader, index);
+      TORCH_CHECK(
+          static_cast<int64_t>(chunk.size()) ==
+              img.chunk_height * img.chunk_width * pixel_bytes,
+          "Internal error in decode_tiff: unexpected strip or tile size");
+
+      const int64_t chunk_top = cy * img.chunk_height;
+      const int64_t chunk_left = cx * img.chunk_width;
+      const int64_t y0 = std::max(chunk_top, top);
+      const int64_t y1 = std::min(chunk_top + img.chunk_height, top + height);
+      const int64_t x0 = std::max(chunk_left, left);
+      const int64_t x1 = std::min(chunk_left + img.chunk_width, left + width);
+      uint8_t* plane_ptr = buffer_ptr + plane * height * width * pixel_bytes;
+      for (int64_t y = y0; y < y1; y++) {
+        const uint8_t* src = chunk.data() +
+            ((y - chunk_top) * img.chunk_width + (x0 - chunk_left)) *
+                pixel_bytes;
+        uint8_t* dst =
+            plane_ptr + ((y - top) * width + (x0 - left)) * pixel_bytes;
+        std::memcpy(dst, src, (x1 - x0) * pixel_bytes);
+      }
+    }
+  });
+
+  auto image = img.planar ? buffer : buffer.permute({2, 0, 1});
+  if (img.photometric == kPhotometricPalette) {
+    image = apply_color_map(image, ifd, img);
+  }
+  if (mode != IMAGE_READ_MODE_UNCHANGED) {
+    TORCH_CHECK(
+        img.photometric == kPhotometricWhiteIsZero ||
+            img.photometric == kPhotometricBlackIsZero ||
+            img.photometric == kPhotometricRGB ||
+            img.photometric == kPhotometricPalette,
+        "Only ImageReadMode.UNCHANGED is supported for TIFF images with photometric interpretation ",
+        img.photometric);
+    image = convert_mode(image, mode);
+  }
+  return image;
+}
+
+} // namespace image
+} // namespace vision
@@ -0,0 +1,30 @@
+#pragma once
+
+#include <torch/types.h>
+
+#include <tuple>
+
+#include "../common.h"
+
+namespace vision {
+namespace image {
+
+// Decodes the first image of a TIFF or BigTIFF file into a (C, H, W) tensor.
+// Images can have any number of bands (samples per pixel), of any integer or
+// floating point type, stored in strips or tiles, contiguously or in separate
+// planes, and compressed with PackBits, LZW or (if torchvision is built with
+// zlib) Deflate.
+// region is either empty, or [top, left, height, width]: only the strips or
+// tiles intersecting this region are then read and decoded.
+C10_EXPORT torch::Tensor decode_tiff(
+    const torch::Tensor& data,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    const std::vector<int64_t>& region = {});
+
+// Returns the (height, width, num_channels) of the image decode_tiff returns
+// with IMAGE_READ_MODE_UNCHANGED, only parsing the headers of the file.
+C10_EXPORT std::tuple<int64_t, int64_t, int64_t> read_tiff_info(
+    const torch::Tensor& data);
+
+} // namespace image
+} // namespace vision
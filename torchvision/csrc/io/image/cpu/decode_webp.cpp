@@ -11,7 +11,8 @@ namespace image {
 #if !WEBP_FOUND
 torch::Tensor decode_webp(
     const torch::Tensor& encoded_data,
-    ImageReadMode mode) {
+    ImageReadMode mode,
+    const std::optional<torch::Tensor>& out) {
   TORCH_CHECK(
       false, "decode_webp: torchvision not compiled with libwebp support");
 }
@@ -19,7 +20,8 @@ torch::Tensor decode_webp(
 
 torch::Tensor decode_webp(
     const torch::Tensor& encoded_data,
-    ImageReadMode mode) {
+    ImageReadMode mode,
+    const std::optional<torch::Tensor>& out) {
   validate_encoded_data(encoded_data);
 
   auto encoded_data_p = encoded_data.data_ptr<uint8_t>();
@@ -36,20 +38,23 @@ torch::Tensor decode_webp(
       should_this_return_rgb_or_rgba_let_me_know_in_the_comments_down_below_guys_see_you_in_the_next_video(
           mode, features.has_alpha);
 
-  auto decoding_func = return_rgb ? WebPDecodeRGB : WebPDecodeRGBA;
+  auto decoding_func = return_rgb ? WebPDecodeRGBInto : WebPDecodeRGBAInto;
   auto num_channels = return_rgb ? 3 : 4;
-
-  int width = 0;
-  int height = 0;
-
-  auto decoded_data =
-      decoding_func(encoded_data_p, encoded_data_size, &width, &height);
+  int64_t height = features.height;
+  int64_t width = features.width;
+
+  // Decoding into our own buffer rather than letting libwebp allocate one
+  // allows decoding in place into out.
+  auto tensor = get_decoding_buffer(out, height, width, num_channels);
+  auto decoded_data = decoding_func(
+      encoded_data_p,
+      encoded_data_size,
+      tensor.data_ptr<uint8_t>(),
+      tensor.numel(),
+      width * num_channels);
   TORCH_CHECK(decoded_data != nullptr, "WebPDecodeRGB[A] failed.");
 
-  auto out = torch::from_blob(
-      decoded_data, {height, width, num_channels}, torch::kUInt8);
-
-  return out.permute({2, 0, 1});
+  return write_into_out(tensor.permute({2, 0, 1}), out);
 }
 #endif // WEBP_FOUND
 
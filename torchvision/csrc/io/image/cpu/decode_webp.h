@@ -8,7 +8,8 @@ namespace image {
 
 C10_EXPORT torch::Tensor decode_webp(
     const torch::Tensor& encoded_data,
-    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED);
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    const std::optional<torch::Tensor>& out = std::nullopt);
 
 } // namespace image
 } // namespace vision
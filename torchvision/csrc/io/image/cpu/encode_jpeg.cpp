@@ -1,6 +1,8 @@
 #include "encode_jpeg.h"
 
+#include "../common.h"
 #include "common_jpeg.h"
+#include "read_write_file.h"
 
 namespace vision {
 namespace image {
@@ -109,5 +111,44 @@ torch::Tensor encode_jpeg(const torch::Tensor& data, int64_t quality) {
 }
 #endif
 
+std::vector<torch::Tensor> encode_jpegs(
+    const std::vector<torch::Tensor>& images,
+    int64_t quality,
+    int64_t num_threads) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.encode_jpeg.encode_jpegs");
+
+  std::vector<torch::Tensor> encoded_images(images.size());
+  parallel_for_each_image(images.size(), num_threads, [&](int64_t i) {
+    encoded_images[i] = encode_jpeg(images[i], quality);
+  });
+  return encoded_images;
+}
+
+void write_jpegs(
+    const std::vector<torch::Tensor>& images,
+    const std::vector<std::string>& filenames,
+    int64_t quality,
+    int64_t num_threads) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.encode_jpeg.write_jpegs");
+  TORCH_CHECK(
+      images.size() == filenames.size(),
+      "Expected as many filenames as images, got ",
+      filenames.size(),
+      " filenames and ",
+      images.size(),
+      " images");
+  // Checked before writing any file. This is a ValueError in Python.
+  TORCH_CHECK_VALUE(
+      quality >= 1 && quality <= 100,
+      "Image quality should be a positive number between 1 and 100");
+
+  parallel_for_each_image(images.size(), num_threads, [&](int64_t i) {
+    auto encoded_image = encode_jpeg(images[i], quality);
+    write_file(filenames[i], encoded_image);
+  });
+}
+
 } // namespace image
 } // namespace vision
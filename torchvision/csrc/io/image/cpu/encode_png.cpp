@@ -1,6 +1,8 @@
-#include "encode_jpeg.h"
+#include "encode_png.h"
 
+#include "../common.h"
 #include "common_png.h"
+#include "read_write_file.h"
 
 namespace vision {
 namespace image {
@@ -176,5 +178,39 @@ torch::Tensor encode_png(const torch::Tensor& data, int64_t compression_level) {
 
 #endif
 
+std::vector<torch::Tensor> encode_pngs(
+    const std::vector<torch::Tensor>& images,
+    int64_t compression_level,
+    int64_t num_threads) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.encode_png.encode_pngs");
+
+  std::vector<torch::Tensor> encoded_images(images.size());
+  parallel_for_each_image(images.size(), num_threads, [&](int64_t i) {
+    encoded_images[i] = encode_png(images[i], compression_level);
+  });
+  return encoded_images;
+}
+
+void write_pngs(
+    const std::vector<torch::Tensor>& images,
+    const std::vector<std::string>& filenames,
+    int64_t compression_level,
+    int64_t num_threads) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.io.image.cpu.encode_png.write_pngs");
+  TORCH_CHECK(
+      images.size() == filenames.size(),
+      "Expected as many filenames as images, got ",
+      filenames.size(),
+      " filenames and ",
+      images.size(),
+      " images");
+
+  parallel_for_each_image(images.size(), num_threads, [&](int64_t i) {
+    auto encoded_image = encode_png(images[i], compression_level);
+    write_file(filenames[i], encoded_image);
+  });
+}
+
 } // namespace image
 } // namespace vision
@@ -9,5 +9,18 @@ C10_EXPORT torch::Tensor encode_png(
     const torch::Tensor& data,
     int64_t compression_level);
 
+C10_EXPORT std::vector<torch::Tensor> encode_pngs(
+    const std::vector<torch::Tensor>& images,
+    int64_t compression_level,
+    int64_t num_threads = 0);
+
+// Encodes images[i] and writes it to filenames[i]. Each image is written as
+// soon as it is encoded, so that encoding and writing overlap across threads.
+C10_EXPORT void write_pngs(
+    const std::vector<torch::Tensor>& images,
+    const std::vector<std::string>& filenames,
+    int64_t compression_level,
+    int64_t num_threads = 0);
+
 } // namespace image
 } // namespace vision
@@ -0,0 +1,498 @@
+#include "read_image_info.h"
+
+#include <cstring>
+
+#include "../common.h"
+#include "decode_tiff.h"
+#include "exif.h"
+
+namespace vision {
+namespace image {
+
+namespace {
+
+// All the parsers below only look at the bytes of the container / bitstream
+// headers: no pixel data is ever touched, and none of the decoding libraries
+// are needed. This makes read_image_info() available (and cheap) regardless of
+// which image libraries torchvision was compiled against.
+
+constexpr auto unsupported_format_msg =
+    "Unsupported image file. Only jpeg, png, gif, webp, avif, heic and tiff are currently supported.";
+
+inline uint32_t read_be16(const uint8_t* p) {
+  return (uint32_t(p[0]) << 8) | uint32_t(p[1]);
+}
+
+inline uint32_t read_be24(const uint8_t* p) {
+  return (uint32_t(p[0]) << 16) | (uint32_t(p[1]) << 8) | uint32_t(p[2]);
+}
+
+inline uint32_t read_be32(const uint8_t* p) {
+  return (uint32_t(p[0]) << 24) | (uint32_t(p[1]) << 16) |
+      (uint32_t(p[2]) << 8) | uint32_t(p[3]);
+}
+
+inline uint64_t read_be64(const uint8_t* p) {
+  return (uint64_t(read_be32(p)) << 32) | uint64_t(read_be32(p + 4));
+}
+
+inline uint32_t read_le16(const uint8_t* p) {
+  return uint32_t(p[0]) | (uint32_t(p[1]) << 8);
+}
+
+inline uint32_t read_le24(const uint8_t* p) {
+  return uint32_t(p[0]) | (uint32_t(p[1]) << 8) | (uint32_t(p[2]) << 16);
+}
+
+inline uint32_t read_le32(const uint8_t* p) {
+  return read_le24(p) | (uint32_t(p[3]) << 24);
+}
+
+inline int64_t sanitize_exif_orientation(int orientation) {
+  // Missing or invalid orientation tags are treated as "no transformation",
+  // which is what the decoders do when apply_exif_orientation=True.
+  return (orientation >= 1 && orientation <= 8) ? orientation : 1;
+}
+
+ImageInfo jpeg_info(uint8_t* data, int64_t size) {
+  int64_t exif_orientation = 1;
+  bool found_exif = false;
+  int64_t pos = 2; // skip SOI
+  while (true) {
+    TORCH_CHECK(
+        pos < size && data[pos] == 0xFF,
+        "Invalid or truncated JPEG header: no SOF marker found");
+    // Markers may be preceded by any number of 0xFF fill bytes.
+    while (pos < size && data[pos] == 0xFF) {
+      pos++;
+    }
+    TORCH_CHECK(pos < size, "Invalid or truncated JPEG header");
+    auto marker = data[pos++];
+    if (marker == 0x01 || (marker >= 0xD0 && marker <= 0xD7)) {
+      // Standalone markers, without a length field.
+      continue;
+    }
+    TORCH_CHECK(
+        marker != 0xD9 && marker != 0xDA,
+        "Invalid JPEG header: no SOF marker found before the image data");
+    TORCH_CHECK(pos + 2 <= size, "Invalid or truncated JPEG header");
+    // The length field counts itself, but not the marker.
+    int64_t length = read_be16(data + pos);
+    TORCH_CHECK(
+        length >= 2 && pos + length <= size,
+        "Invalid or truncated JPEG header");
+    auto payload = data + pos + 2;
+    auto payload_size = length - 2;
+
+    // SOF0 to SOF15, except DHT (0xC4), JPG (0xC8) and DAC (0xCC).
+    bool is_sof = marker >= 0xC0 && marker <= 0xCF && marker != 0xC4 &&
+        marker != 0xC8 && marker != 0xCC;
+    if (is_sof) {
+      TORCH_CHECK(payload_size >= 6, "Invalid JPEG SOF marker");
+      int64_t height = read_be16(payload + 1);
+      int64_t width = read_be16(payload + 3);
+      int64_t num_channels = payload[5];
+      return ImageInfo(height, width, num_channels, "jpeg", exif_orientation);
+    }
+
+    constexpr size_t exif_header_size = 6; // "Exif\0\0"
+    if (marker == exif_private::APP1 && !found_exif &&
+        payload_size > (int64_t)exif_header_size &&
+        memcmp(payload, "Exif\0\0", exif_header_size) == 0) {
+      found_exif = true;
+      exif_orientation =
+          sanitize_exif_orientation(exif_private::fetch_exif_orientation(
+              payload + exif_header_size, payload_size - exif_header_size));
+    }
+    pos += length;
+  }
+}
+
+ImageInfo png_info(uint8_t* data, int64_t size) {
+  // 8 bytes signature, then the IHDR chunk: 4 bytes length, 4 bytes type and
+  // 13 bytes of data.
+  TORCH_CHECK(
+      size >= 29 && memcmp(data + 12, "IHDR", 4) == 0,
+      "Invalid or truncated PNG header");
+  int64_t width = read_be32(data + 16);
+  int64_t height = read_be32(data + 20);
+  auto color_type = data[25];
+
+  // This is the number of channels decode_png() returns with
+  // ImageReadMode.UNCHANGED, which is why palette images have one channel.
+  int64_t num_channels = 0;
+  switch (color_type) {
+    case 0: // gray
+    case 3: // palette
+      num_channels = 1;
+      break;
+    case 2: // RGB
+      num_channels = 3;
+      break;
+    case 4: // gray + alpha
+      num_channels = 2;
+      break;
+    case 6: // RGB + alpha
+      num_channels = 4;
+      break;
+    default:
+      TORCH_CHECK(false, "Invalid PNG color type ", int(color_type));
+  }
+
+  // The eXIf chunk, if any, comes before the image data. We only walk the
+  // chunk headers to find it.
+  int64_t exif_orientation = 1;
+  int64_t pos = 8;
+  while (pos + 8 <= size) {
+    int64_t length = read_be32(data + pos);
+    auto type = data + pos + 4;
+    if (memcmp(type, "IDAT", 4) == 0 || memcmp(type, "IEND", 4) == 0) {
+      break;
+    }
+    if (memcmp(type, "eXIf", 4) == 0 && pos + 8 + length <= size) {
+      exif_orientation = sanitize_exif_orientation(
+          exif_private::fetch_exif_orientation(data + pos + 8, length));
+      break;
+    }
+    pos += 12 + length; // length + type + data + crc
+  }
+  return ImageInfo(height, width, num_channels, "png", exif_orientation);
+}
+
+ImageInfo gif_info(uint8_t* data, int64_t size) {
+  TORCH_CHECK(size >= 13, "Invalid or truncated GIF header");
+  int64_t width = read_le16(data + 6);
+  int64_t height = read_le16(data + 8);
+
+  // decode_gif() returns images whose size is the max of the logical screen
+  // size and of the first frame's size, so we also look for the first image
+  // descriptor.
+  int64_t pos = 13;
+  auto packed_fields = data[10];
+  if (packed_fields & 0x80) {
+    pos += 3 * (1 << ((packed_fields & 0x07) + 1)); // global color table
+  }
+  while (pos < size) {
+    if (data[pos] == 0x2C) { // image descriptor
+      if (pos + 9 <= size) {
+        width = std::max(width, int64_t(read_le16(data + pos + 5)));
+        height = std::max(height, int64_t(read_le16(data + pos + 7)));
+      }
+      break;
+    } else if (data[pos] == 0x21) { // extension: label + data sub-blocks
+      pos += 2;
+      while (pos < size && data[pos] != 0) {
+        pos += data[pos] + 1;
+      }
+      pos++;
+    } else {
+      break;
+    }
+  }
+  return ImageInfo(height, width, 3, "gif", 1);
+}
+
+ImageInfo webp_info(uint8_t* data, int64_t size) {
+  // "RIFF", file size, "WEBP", then the first chunk header at offset 12.
+  auto chunk_type = data + 12;
+  int64_t height = 0;
+  int64_t width = 0;
+  bool has_alpha = false;
+  if (memcmp(chunk_type, "VP8 ", 4) == 0) {
+    // Lossy bitstream: 3 bytes frame tag, 3 bytes start code, then the
+    // dimensions on 14 bits each.
+    TORCH_CHECK(
+        size >= 30 && data[23] == 0x9D && data[24] == 0x01 && data[25] == 0x2A,
+        "Invalid or truncated WEBP header");
+    width = read_le16(data + 26) & 0x3FFF;
+    height = read_le16(data + 28) & 0x3FFF;
+  } else if (memcmp(chunk_type, "VP8L", 4) == 0) {
+    // Lossless bitstream: 1 byte signature, then width - 1 and height - 1 on
+    // 14 bits each, followed by the alpha_is_used bit.
+    TORCH_CHECK(
+        size >= 25 && data[20] == 0x2F, "Invalid or truncated WEBP header");
+    auto bits = read_le32(data + 21);
+    width = (bits & 0x3FFF) + 1;
+    height = ((bits >> 14) & 0x3FFF) + 1;
+    has_alpha = (bits >> 28) & 1;
+  } else if (memcmp(chunk_type, "VP8X", 4) == 0) {
+    // Extended format: 1 byte of flags, 3 reserved bytes, then the canvas
+    // width - 1 and height - 1 on 24 bits each.
+    TORCH_CHECK(size >= 30, "Invalid or truncated WEBP header");
+    has_alpha = data[20] & 0x10;
+    width = read_le24(data + 24) + 1;
+    height = read_le24(data + 27) + 1;
+  } else {
+    TORCH_CHECK(false, "Invalid WEBP header");
+  }
+  return ImageInfo(height, width, has_alpha ? 4 : 3, "webp", 1);
+}
+
+// Calls fn(type, payload_begin, payload_end) on each ISOBMFF box within
+// [begin, end), stopping early if fn returns false.
+template <typename Fn>
+void for_each_box(uint8_t* begin, uint8_t* end, Fn fn) {
+  auto pos = begin;
+  while (end - pos >= 8) {
+    uint64_t box_size = read_be32(pos);
+    auto type = pos + 4;
+    auto payload = pos + 8;
+    if (box_size == 1) {
+      if (end - pos < 16) {
+        return;
+      }
+      box_size = read_be64(pos + 8);
+      payload = pos + 16;
+    } else if (box_size == 0) {
+      box_size = end - pos;
+    }
+    if (box_size < uint64_t(payload - pos) || box_size > uint64_t(end - pos)) {
+      return;
+    }
+    if (!fn(type, payload, pos + box_size)) {
+      return;
+    }
+    pos += box_size;
+  }
+}
+
+bool is_alpha_aux_type(uint8_t* begin, uint8_t* end) {
+  // auxC is a full box: 1 byte version, 3 bytes flags, then a null-terminated
+  // URN.
+  if (end - begin < 4) {
+    return false;
+  }
+  std::string aux_type(
+      reinterpret_cast<char*>(begin + 4),
+      strnlen(reinterpret_cast<char*>(begin + 4), end - begin - 4));
+  return aux_type == "urn:mpeg:mpegB:cicp:systems:auxiliary:alpha" ||
+      aux_type == "urn:mpeg:hevc:2015:auxid:1";
+}
+
+ImageInfo heif_info(uint8_t* data, int64_t size, const std::string& format) {
+  // AVIF and HEIC are both HEIF files. The image size lives in the 'ispe'
+  // property of the primary item, which is found through
+  // meta -> pitm (primary item id) and meta -> iprp -> {ipco, ipma}.
+  auto end = data + size;
+  uint8_t* meta_begin = nullptr;
+  uint8_t* meta_end = nullptr;
+  for_each_box(data, end, [&](uint8_t* type, uint8_t* begin, uint8_t* end) {
+    if (memcmp(type, "meta", 4) == 0) {
+      meta_begin = begin + 4; // meta is a full box
+      meta_end = end;
+      return false;
+    }
+    return true;
+  });
+  TORCH_CHECK(
+      meta_begin != nullptr && meta_begin <= meta_end,
+      "Invalid or truncated ",
+      format,
+      " header: no meta box found");
+
+  int64_t primary_item_id = -1;
+  std::vector<std::pair<uint8_t*, uint8_t*>> properties; // 1-indexed in ipma
+  std::vector<std::string> property_types;
+  std::vector<int64_t> primary_properties;
+
+  for_each_box(
+      meta_begin, meta_end, [&](uint8_t* type, uint8_t* begin, uint8_t* end) {
+        if (memcmp(type, "pitm", 4) == 0 && end - begin >= 6) {
+          primary_item_id =
+              begin[0] == 0 ? read_be16(begin + 4) : read_be32(begin + 4);
+        } else if (memcmp(type, "iprp", 4) == 0) {
+          for_each_box(
+              begin, end, [&](uint8_t* type, uint8_t* begin, uint8_t* end) {
+                if (memcmp(type, "ipco", 4) == 0) {
+                  for_each_box(
+                      begin,
+                      end,
+                      [&](uint8_t* type, uint8_t* begin, uint8_t* end) {
+                        properties.emplace_back(begin, end);
+                        property_types.emplace_back(
+                            reinterpret_cast<char*>(type), 4);
+                        return true;
+                      });
+                } else if (memcmp(type, "ipma", 4) == 0 && end - begin >= 8) {
+                  auto version = begin[0];
+                  auto large_indices = read_be24(begin + 1) & 1;
+                  int64_t entry_count = read_be32(begin + 4);
+                  auto pos = begin + 8;
+                  for (int64_t i = 0; i < entry_count; i++) {
+                    int64_t id_size = version < 1 ? 2 : 4;
+                    if (end - pos < id_size + 1) {
+                      break;
+                    }
+                    int64_t item_id =
+                        version < 1 ? read_be16(pos) : read_be32(pos);
+                    pos += id_size;
+                    int64_t association_count = *pos++;
+                    int64_t index_size = large_indices ? 2 : 1;
+                    if (end - pos < association_count * index_size) {
+                      break;
+                    }
+                    for (int64_t j = 0; j < association_count; j++) {
+                      auto index = large_indices ? (read_be16(pos) & 0x7FFF)
+                                                 : (pos[0] & 0x7F);
+                      if (item_id == primary_item_id) {
+                        primary_properties.push_back(index);
+                      }
+                      pos += index_size;
+                    }
+                  }
+                }
+                return true;
+              });
+        }
+        return true;
+      });
+
+  int64_t height = 0;
+  int64_t width = 0;
+  int64_t rotation = 0;
+  bool has_alpha = false;
+  for (size_t i = 0; i < properties.size(); i++) {
+    if (property_types[i] == "auxC" &&
+        is_alpha_aux_type(properties[i].first, properties[i].second)) {
+      has_alpha = true;
+    }
+  }
+  for (auto index : primary_properties) {
+    if (index < 1 || index > (int64_t)properties.size()) {
+      continue;
+    }
+    auto begin = properties[index - 1].first;
+    auto end = properties[index - 1].second;
+    const auto& type = property_types[index - 1];
+    if (type == "ispe" && end - begin >= 12) {
+      // Full box: 1 byte version, 3 bytes flags, then width and height.
+      width = read_be32(begin + 4);
+      height = read_be32(begin + 8);
+    } else if (type == "irot" && end - begin >= 1) {
+      rotation = begin[0] & 0x03; // in units of 90 degrees anti-clockwise
+    }
+  }
+  if (width == 0 || height == 0) {
+    // No primary item or no association: fall back to the largest ispe, which
+    // is the full image rather than a tile or a thumbnail.
+    for (size_t i = 0; i < properties.size(); i++) {
+      auto begin = properties[i].first;
+      auto end = properties[i].second;
+      if (property_types[i] == "ispe" && end - begin >= 12) {
+        int64_t w = read_be32(begin + 4);
+        int64_t h = read_be32(begin + 8);
+        if (w * h > width * height) {
+          width = w;
+          height = h;
+        }
+      }
+    }
+  }
+  TORCH_CHECK(
+      width > 0 && height > 0,
+      "Invalid or truncated ",
+      format,
+      " header: could not find the image size");
+
+  // libheif applies the irot transformation when decoding, libavif doesn't.
+  if (format == "heic" && rotation % 2 == 1) {
+    std::swap(height, width);
+  }
+  return ImageInfo(height, width, has_alpha ? 4 : 3, format, 1);
+}
+
+std::string heif_format(uint8_t* data, int64_t size) {
+  // Returns "avif", "heic", or "" based on the brands of the ftyp box.
+  int64_t ftyp_size = read_be32(data);
+  if (memcmp(data + 4, "ftyp", 4) != 0 || ftyp_size < 16 || ftyp_size > size) {
+    return "";
+  }
+  bool is_heic = false;
+  // Major brand, then minor version, then the list of compatible brands.
+  for (int64_t pos = 8; pos + 4 <= ftyp_size; pos += 4) {
+    if (pos == 12) {
+      continue;
+    }
+    auto brand = data + pos;
+    if (memcmp(brand, "avif", 4) == 0 || memcmp(brand, "avis", 4) == 0) {
+      return "avif";
+    }
+    for (auto heic_brand : {"heic", "heix", "heim", "heis", "hevc", "hevx"}) {
+      is_heic |= memcmp(brand, heic_brand, 4) == 0;
+    }
+  }
+  return is_heic ? "heic" : "";
+}
+
+} // namespace
+
+ImageInfo read_image_info(const torch::Tensor& data) {
+  TORCH_CHECK(data.device() == torch::kCPU, "Expected a CPU tensor");
+  validate_encoded_data(data);
+
+  auto datap = data.data_ptr<uint8_t>();
+  auto size = data.numel();
+
+  const uint8_t jpeg_signature[3] = {255, 216, 255}; // == "\xFF\xD8\xFF"
+  if (size >= 3 && memcmp(jpeg_signature, datap, 3) == 0) {
+    return jpeg_info(datap, size);
+  }
+
+  const uint8_t png_signature[4] = {137, 80, 78, 71}; // == "\211PNG"
+  if (size >= 4 && memcmp(png_signature, datap, 4) == 0) {
+    return png_info(datap, size);
+  }
+
+  if (size >= 6 &&
+      (memcmp("GIF89a", datap, 6) == 0 || memcmp("GIF87a", datap, 6) == 0)) {
+    return gif_info(datap, size);
+  }
+
+  if (size >= 16 && memcmp("RIFF", datap, 4) == 0 &&
+      memcmp("WEBPVP8", datap + 8, 7) == 0) {
+    return webp_info(datap, size);
+  }
+
+  // "II" or "MM" byte order, then 42 (TIFF) or 43 (BigTIFF)
+  if (size >= 4 &&
+      ((memcmp("II", datap, 2) == 0 &&
+        (read_le16(datap + 2) == 42 || read_le16(datap + 2) == 43)) ||
+       (memcmp("MM", datap, 2) == 0 &&
+        (read_be16(datap + 2) == 42 || read_be16(datap + 2) == 43)))) {
+    auto [height, width, num_channels] = read_tiff_info(data);
+    return ImageInfo(height, width, num_channels, "tiff", 1);
+  }
+
+  if (size >= 16) {
+    auto format = heif_format(datap, size);
+    if (!format.empty()) {
+      return heif_info(datap, size, format);
+    }
+  }
+
+  TORCH_CHECK(false, unsupported_format_msg);
+}
+
+ImageInfos read_image_infos(
+    const std::vector<torch::Tensor>& encoded_images,
+    int64_t num_threads) {
+  std::vector<ImageInfo> infos(encoded_images.size());
+  // Headers are tiny, but the input tensors are typically memory-mapped files
+  // (see read_file()) and touching them can block on I/O, hence the threads.
+  parallel_for_each_image(encoded_images.size(), num_threads, [&](int64_t i) {
+    infos[i] = read_image_info(encoded_images[i]);
+  });
+
+  ImageInfos out;
+  for (auto& info : infos) {
+    std::get<0>(out).push_back(std::get<0>(info));
+    std::get<1>(out).push_back(std::get<1>(info));
+    std::get<2>(out).push_back(std::get<2>(info));
+    std::get<3>(out).push_back(std::move(std::get<3>(info)));
+    std::get<4>(out).push_back(std::get<4>(info));
+  }
+  return out;
+}
+
+} // namespace image
+} // namespace vision
@@ -0,0 +1,30 @@
+#pragma once
+
+#include <torch/types.h>
+
+#include <string>
+#include <tuple>
+
+namespace vision {
+namespace image {
+
+// (height, width, num_channels, format, exif_orientation)
+using ImageInfo = std::tuple<int64_t, int64_t, int64_t, std::string, int64_t>;
+
+C10_EXPORT ImageInfo read_image_info(const torch::Tensor& data);
+
+// The batched version returns one list per field, because lists of tuples
+// can't be returned from custom ops.
+using ImageInfos = std::tuple<
+    std::vector<int64_t>,
+    std::vector<int64_t>,
+    std::vector<int64_t>,
+    std::vector<std::string>,
+    std::vector<int64_t>>;
+
+C10_EXPORT ImageInfos read_image_infos(
+    const std::vector<torch::Tensor>& encoded_images,
+    int64_t num_threads = 0);
+
+} // namespace image
+} // namespace vision
@@ -32,7 +32,11 @@ std::wstring utf8_decode(const std::string& str) {
 } // namespace
 #endif
 
-torch::Tensor read_file(const std::string& filename) {
+torch::Tensor read_file(
+    const std::string& filename,
+    int64_t offset,
+    int64_t length,
+    bool mmap) {
   C10_LOG_API_USAGE_ONCE(
       "torchvision.csrc.io.image.cpu.read_write_file.read_file");
 #ifdef _WIN32
@@ -53,6 +57,24 @@ torch::Tensor read_file(const std::string& filename) {
   int64_t size = stat_buf.st_size;
 
   TORCH_CHECK(size > 0, "Expected a non empty file");
+  TORCH_CHECK(
+      offset >= 0 && offset < size,
+      "offset must be in [0, ",
+      size,
+      "), got ",
+      offset);
+  if (length < 0) {
+    length = size - offset;
+  }
+  TORCH_CHECK(
+      length > 0 && offset + length <= size,
+      "Cannot read ",
+      length,
+      " bytes at offset ",
+      offset,
+      " from a file of ",
+      size,
+      " bytes");
 
 #ifdef _WIN32
   // TODO: Once torch::from_file handles UTF-8 paths correctly, we should move
@@ -64,14 +86,44 @@ torch::Tensor read_file(const std::string& filename) {
 
   TORCH_CHECK(infile != nullptr, "Error opening input file");
 
-  auto data = torch::empty({size}, torch::kU8);
+  auto data = torch::empty({length}, torch::kU8);
   auto dataBytes = data.data_ptr<uint8_t>();
 
-  fread(dataBytes, sizeof(uint8_t), size, infile);
+  _fseeki64(infile, offset, SEEK_SET);
+  fread(dataBytes, sizeof(uint8_t), length, infile);
   fclose(infile);
 #else
-  auto data =
-      torch::from_file(filename, /*shared=*/false, /*size=*/size, torch::kU8);
+  torch::Tensor data;
+  if (mmap) {
+    // The file is privately mapped up to the last requested byte, and we
+    // return a view on the requested bytes: only the pages that are actually
+    // accessed are read, and nothing is copied.
+    data = torch::from_file(
+               filename,
+               /*shared=*/false,
+               /*size=*/offset + length,
+               torch::kU8)
+               .narrow(0, offset, length);
+  } else {
+    FILE* infile = fopen(filename.c_str(), "rb");
+    TORCH_CHECK(
+        infile != nullptr,
+        "[Errno ",
+        errno,
+        "] ",
+        strerror(errno),
+        ": '",
+        filename,
+        "'");
+
+    data = torch::empty({length}, torch::kU8);
+    auto dataBytes = data.data_ptr<uint8_t>();
+
+    bool success = fseeko(infile, offset, SEEK_SET) == 0 &&
+        fread(dataBytes, sizeof(uint8_t), length, infile) == size_t(length);
+    fclose(infile);
+    TORCH_CHECK(success, "Error reading input file: '", filename, "'");
+  }
 #endif
 
   return data;
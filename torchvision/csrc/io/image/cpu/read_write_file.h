@@ -5,7 +5,11 @@
 namespace vision {
 namespace image {
 
-C10_EXPORT torch::Tensor read_file(const std::string& filename);
+C10_EXPORT torch::Tensor read_file(
+    const std::string& filename,
+    int64_t offset = 0,
+    int64_t length = -1,
+    bool mmap = true);
 
 C10_EXPORT void write_file(const std::string& filename, torch::Tensor& data);
 
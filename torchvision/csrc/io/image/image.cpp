@@ -16,26 +16,62 @@ namespace image {
 static auto registry =
     torch::RegisterOperators()
         .op("image::decode_gif", &decode_gif)
-        .op("image::decode_png(Tensor data, int mode, bool apply_exif_orientation=False) -> Tensor",
+        .op("image::decode_png(Tensor data, int mode, bool apply_exif_orientation=False, Tensor? out=None) -> Tensor",
             &decode_png)
+        .op("image::decode_tiff(Tensor data, int mode, int[] region=[]) -> Tensor",
+            &decode_tiff)
         .op("image::encode_png", &encode_png)
-        .op("image::decode_jpeg(Tensor data, int mode, bool apply_exif_orientation=False) -> Tensor",
+        .op("image::encode_pngs(Tensor[] images, int compression_level, int num_threads=0) -> Tensor[]",
+            &encode_pngs)
+        .op("image::write_pngs(Tensor[] images, str[] filenames, int compression_level, int num_threads=0) -> ()",
+            &write_pngs)
+        .op("image::decode_jpeg(Tensor data, int mode, bool apply_exif_orientation=False, int[] target_size=[], int[] crop=[], Tensor? out=None) -> Tensor",
             &decode_jpeg)
-        .op("image::decode_webp(Tensor encoded_data, int mode) -> Tensor",
+        .op("image::decode_jpegs(Tensor[] encoded_images, int mode, bool apply_exif_orientation=False, int num_threads=0, int[] target_size=[], Tensor? out=None) -> Tensor[]",
+            &decode_jpegs)
+        .op("image::decode_webp(Tensor encoded_data, int mode, Tensor? out=None) -> Tensor",
             &decode_webp)
         .op("image::decode_heic(Tensor encoded_data, int mode) -> Tensor",
             &decode_heic)
         .op("image::decode_avif(Tensor encoded_data, int mode) -> Tensor",
             &decode_avif)
         .op("image::encode_jpeg", &encode_jpeg)
-        .op("image::read_file", &read_file)
+        .op("image::encode_jpegs(Tensor[] images, int quality, int num_threads=0) -> Tensor[]",
+            &encode_jpegs)
+        .op("image::write_jpegs(Tensor[] images, str[] filenames, int quality, int num_threads=0) -> ()",
+            &write_jpegs)
+        .op("image::read_file(str filename, int offset=0, int length=-1, bool mmap=True) -> Tensor",
+            &read_file)
         .op("image::write_file", &write_file)
-        .op("image::decode_image(Tensor data, int mode, bool apply_exif_orientation=False) -> Tensor",
+        .op("image::read_image_info(Tensor data) -> (int, int, int, str, int)",
+            &read_image_info)
+        .op("image::read_image_infos(Tensor[] encoded_images, int num_threads=0) -> (int[], int[], int[], str[], int[])",
+            &read_image_infos)
+        .op("image::decode_image(Tensor data, int mode, bool apply_exif_orientation=False, int[] target_size=[], Tensor? out=None) -> Tensor",
             &decode_image)
+        .op(torch::RegisterOperators::options()
+                .schema(
+                    "image::decode_image_async(Tensor data, int mode, bool apply_exif_orientation=False) -> Future(Tensor)")
+                .catchAllKernel<&decode_image_async_boxed>())
+        .op(torch::RegisterOperators::options()
+                .schema(
+                    "image::read_image_async(str filename, int mode, bool apply_exif_orientation=False) -> Future(Tensor)")
+                .catchAllKernel<&read_image_async_boxed>())
+        .op("image::set_io_num_threads(int num_threads) -> ()",
+            &set_io_num_threads)
+        .op("image::get_io_num_threads() -> int", &get_io_num_threads)
+        .op("image::decode_and_preprocess(Tensor data, int[] size, float[] mean, float[] std, ScalarType dtype, bool antialias=True, int mode=0, bool apply_exif_orientation=False) -> Tensor",
+            &decode_and_preprocess)
         .op("image::decode_jpegs_cuda", &decode_jpegs_cuda)
         .op("image::encode_jpegs_cuda", &encode_jpegs_cuda)
         .op("image::_jpeg_version", &_jpeg_version)
         .op("image::_is_compiled_against_turbo", &_is_compiled_against_turbo);
 
+static auto registerPngBandDecoder =
+    torch::class_<PngBandDecoder>("image", "PngBandDecoder")
+        .def(torch::init<torch::Tensor, int64_t>())
+        .def("get_info", &PngBandDecoder::get_info)
+        .def("decode_rows_into", &PngBandDecoder::decode_rows_into);
+
 } // namespace image
 } // namespace vision
@@ -1,13 +1,17 @@
 #pragma once
 
+#include "cpu/decode_and_preprocess.h"
 #include "cpu/decode_avif.h"
 #include "cpu/decode_gif.h"
 #include "cpu/decode_heic.h"
 #include "cpu/decode_image.h"
+#include "cpu/decode_image_async.h"
 #include "cpu/decode_jpeg.h"
 #include "cpu/decode_png.h"
+#include "cpu/decode_tiff.h"
 #include "cpu/decode_webp.h"
 #include "cpu/encode_jpeg.h"
 #include "cpu/encode_png.h"
+#include "cpu/read_image_info.h"
 #include "cpu/read_write_file.h"
 #include "cuda/encode_decode_jpegs_cuda.h"
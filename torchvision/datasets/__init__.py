@@ -1,4 +1,6 @@
+from ._image_cache import DecodedImageCache
 from ._optical_flow import FlyingChairs, FlyingThings3D, HD1K, KittiFlow, Sintel
+from ._sharded import ShardedImageDataset, ShardShuffledImageDataset, write_image_shards
 from ._stereo_matching import (
     CarlaStereo,
     CREStereo,
@@ -62,6 +64,10 @@ __all__ = (
     "LSUNClass",
     "ImageFolder",
     "DatasetFolder",
+    "DecodedImageCache",
+    "ShardedImageDataset",
+    "ShardShuffledImageDataset",
+    "write_image_shards",
     "FakeData",
     "CocoCaptions",
     "CocoDetection",
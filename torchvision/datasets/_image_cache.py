@@ -0,0 +1,276 @@
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import time
+import warnings
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple, Union
+
+import torch
+
+from .._utils import _write_atomic
+
+from ..io.image import decode_image, ImageReadMode
+
+# Each cache entry is a file made of this header, followed by the shape of the
+# image (one int64 per dimension) and by its raw data.
+_HEADER = struct.Struct("<8sqq")  # magic, dtype index, number of dimensions
+_MAGIC = b"TVIMGC01"
+_DTYPES = (torch.uint8, torch.uint16, torch.float32)
+_MAX_NDIM = 8
+# Temporary files older than this were left by crashed processes, and are removed
+_STALE_TMP_NS = 60 * 1_000_000_000
+
+
+def _remove_cache_dir(cache_dir: str, owner_pid: int) -> None:
+    # Forked DataLoader workers inherit the finalizer: only the process which
+    # created the directory may remove it.
+    if os.getpid() == owner_pid:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+class DecodedImageCache:
+    """A least-recently-used cache of decoded images, shared between processes.
+
+    This is a loader, i.e. a callable taking the path of an image and returning
+    it as a tensor, which can be passed as the ``loader`` of
+    :class:`~torchvision.datasets.ImageFolder`,
+    :class:`~torchvision.datasets.DatasetFolder` and other datasets. The first
+    time an image is loaded, it is decoded (and optionally downscaled) and
+    stored in the cache, so that the following epochs skip decoding entirely.
+
+    The cache entries are files in ``cache_dir``, which is in shared memory
+    (``/dev/shm``) by default. The cache can thus be shared by all the
+    DataLoader worker processes, including across epochs where workers are
+    re-created. Entries are keyed by the path of the image, its modification
+    time and size, and the ``size`` and ``mode`` of the cache, so modified
+    images are decoded again. When the cache grows over ``max_bytes``, the
+    least recently used entries are evicted.
+
+    .. note::
+        The images are returned as uint8 tensors (see
+        :func:`~torchvision.io.decode_image`), not PIL images, so the
+        transforms of the dataset must support tensors, e.g.
+        :mod:`torchvision.transforms.v2`.
+
+    Example:
+
+    .. code::
+
+        cache = DecodedImageCache(max_bytes=20 * 2**30, size=256)
+        dataset = ImageFolder(root, loader=cache, transform=v2.Compose([v2.RandomResizedCrop(224), ...]))
+
+    Args:
+        max_bytes (int): The maximum total size of the cache entries, in bytes.
+            This limit is approximate: eviction is done in batches, by each
+            process independently, so the cache may transiently grow over it,
+            by up to ``max_bytes / 20`` per process using the cache (e.g. per
+            DataLoader worker). If writing an entry fails, e.g. because the
+            shared memory is full, the image is returned without being cached.
+        size (int, optional): If set, images whose smaller edge is larger
+            than ``size`` are downscaled (with antialiasing) so that their
+            smaller edge is ``size`` before being cached. This reduces the
+            memory used by the cache, e.g. when the images are only used after
+            a ``Resize(size)`` or a ``RandomResizedCrop`` to a smaller size.
+            Default: None (images are cached at full resolution).
+        mode (str or ImageReadMode): The mode to decode the images with. See
+            :func:`~torchvision.io.decode_image`. Default: "RGB".
+        loader (callable, optional): A function loading an image as a tensor
+            given its path, used instead of :func:`~torchvision.io.decode_image`
+            when set. ``size`` and ``mode`` are then ignored, except as part of
+            the cache keys. The images which aren't uint8, uint16 or float32
+            tensors are returned without being cached.
+        cache_dir (str or ``pathlib.Path``, optional): The directory holding the
+            cache entries. It must be accessible by all the processes sharing
+            the cache. When not set, a temporary directory is created in shared
+            memory if available, and removed when the cache is garbage
+            collected in the process that created it. When set, the directory
+            is kept, so the cache can be reused by later runs.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        size: Optional[int] = None,
+        mode: Union[str, ImageReadMode] = ImageReadMode.RGB,
+        loader: Optional[Callable[[str], torch.Tensor]] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}")
+        if size is not None and size <= 0:
+            raise ValueError(f"size must be a positive integer, got {size}")
+        if isinstance(mode, str):
+            mode = ImageReadMode[mode.upper()]
+
+        self.max_bytes = max_bytes
+        self.size = size
+        self.mode = mode
+        self.loader = loader
+        self._warned_uncacheable = False
+
+        if cache_dir is None:
+            shm_dir = "/dev/shm"
+            self.cache_dir = tempfile.mkdtemp(
+                prefix="torchvision_image_cache_", dir=shm_dir if os.path.isdir(shm_dir) else None
+            )
+            self._finalizer: Optional[weakref.finalize] = weakref.finalize(
+                self, _remove_cache_dir, self.cache_dir, os.getpid()
+            )
+        else:
+            self.cache_dir = os.fspath(cache_dir)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._finalizer = None
+
+        # Scanning the cache directory to evict entries is done every time this
+        # many bytes have been added by this process.
+        self._eviction_interval = max(max_bytes // 20, 1)
+        self._bytes_since_eviction = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # The copies sent to DataLoader workers don't own the cache directory
+        state["_finalizer"] = None
+        state["_bytes_since_eviction"] = 0
+        return state
+
+    def __call__(self, path: Union[str, Path]) -> torch.Tensor:
+        path = os.fspath(path)
+        entry = os.path.join(self.cache_dir, self._get_key(path))
+        image = self._read_entry(entry)
+        if image is None:
+            image = self._load(path)
+            self._write_entry(entry, image)
+        return image
+
+    def clear(self) -> None:
+        """Remove all the entries of the cache."""
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def _get_key(self, path: str) -> str:
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0{self.size}\0{self.mode.name}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _load(self, path: str) -> torch.Tensor:
+        if self.loader is not None:
+            return self.loader(path)
+        if self.size is None:
+            return decode_image(path, mode=self.mode)
+
+        # JPEGs are downscaled during decoding, which is much faster
+        image = decode_image(path, mode=self.mode, target_size=[self.size])
+        if min(image.shape[-2:]) > self.size:
+            from ..transforms.v2.functional import resize
+
+            image = resize(image, [self.size], antialias=True)
+        return image
+
+    def _read_entry(self, entry: str) -> Optional[torch.Tensor]:
+        try:
+            with open(entry, "rb") as f:
+                magic, dtype_index, ndim = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or not 0 <= dtype_index < len(_DTYPES) or not 0 <= ndim <= _MAX_NDIM:
+                    raise ValueError("Malformed header")
+                shape: Tuple[int, ...] = struct.unpack(f"<{ndim}q", f.read(8 * ndim))
+                if any(s < 0 for s in shape):
+                    raise ValueError("Malformed header")
+                dtype = _DTYPES[dtype_index]
+                data = bytearray(torch.Size(shape).numel() * dtype.itemsize)
+                if f.readinto(data) != len(data):
+                    raise ValueError("Truncated entry")
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, ValueError, OverflowError, MemoryError):
+            # A corrupted entry is a cache miss: remove it, so it is written again
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return torch.frombuffer(data, dtype=dtype).view(shape)
+
+    def _write_entry(self, entry: str, image: torch.Tensor) -> None:
+        if not isinstance(image, torch.Tensor) or image.dtype not in _DTYPES:
+            # The image is just not cached
+            if not self._warned_uncacheable:
+                self._warned_uncacheable = True
+                warnings.warn(
+                    f"Only tensors of dtype {', '.join(map(str, _DTYPES))} can be cached, "
+                    f"got {image.dtype if isinstance(image, torch.Tensor) else type(image)}: they are not cached"
+                )
+            return
+        data = image.contiguous().flatten().view(torch.uint8).numpy()
+        if data.nbytes > self.max_bytes:
+            return
+
+        def write(f: IO[bytes]) -> None:
+            f.write(_HEADER.pack(_MAGIC, _DTYPES.index(image.dtype), image.ndim))
+            f.write(struct.pack(f"<{image.ndim}q", *image.shape))
+            f.write(data.tobytes())
+
+        try:
+            _write_atomic(entry, write)
+        except OSError:
+            # E.g. the shared memory is full: the image is just not cached.
+            # Evict entries, so that there is room for the next ones.
+            self._evict()
+            return
+
+        self._bytes_since_eviction += data.nbytes
+        if self._bytes_since_eviction >= self._eviction_interval:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Processes evict entries independently of each other, without any
+        # locking: concurrently removing the same entries is harmless.
+        self._bytes_since_eviction = 0
+        entries: List[Tuple[int, int, str]] = []
+        total_bytes = 0
+        now = time.time_ns()
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                if e.name.endswith(".tmp"):
+                    # Temporary files are renamed right after being written:
+                    # old ones were left by processes which crashed.
+                    if now - st.st_mtime_ns > _STALE_TMP_NS:
+                        try:
+                            os.remove(e.path)
+                        except FileNotFoundError:
+                            pass
+                    else:
+                        total_bytes += st.st_size
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, e.path))
+                total_bytes += st.st_size
+        if total_bytes <= self.max_bytes:
+            return
+
+        # Evict a bit more than needed, so that this isn't done on every insertion
+        target_bytes = self.max_bytes - self._eviction_interval
+        for _, entry_bytes, path in sorted(entries):
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= entry_bytes
@@ -0,0 +1,321 @@
+import math
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+import torch.utils.data
+from PIL import Image
+
+from .._utils import _load_npz_versioned, _save_npz_atomic
+
+from ..io.image import decode_image, encode_png, ImageReadMode, read_file
+from ..utils import _log_api_usage_once
+from .vision import VisionDataset
+
+INDEX_FILENAME = "index.npz"
+_INDEX_VERSION = 1
+# Number of samples read concurrently while writing shards
+_READ_CHUNK_SIZE = 256
+
+
+def _shard_filename(shard_idx: int) -> str:
+    return f"shard-{shard_idx:05d}.bin"
+
+
+def _read_sample_file(sample: Tuple[str, Any]) -> Tuple[bytes, int]:
+    path, target = sample
+    with open(path, "rb") as f:
+        return f.read(), int(target)
+
+
+def _encode_sample(sample: Tuple[Any, Any]) -> Tuple[bytes, int]:
+    image, target = sample
+    if isinstance(image, Image.Image):
+        from ..transforms.functional import pil_to_tensor
+
+        image = pil_to_tensor(image)
+    if not isinstance(image, torch.Tensor) or image.dtype != torch.uint8:
+        raise TypeError(
+            f"The images of the dataset should be PIL images or uint8 tensors to be encoded, got {type(image)}"
+        )
+    return encode_png(image).numpy().tobytes(), int(target)
+
+
+def write_image_shards(
+    dataset: VisionDataset,
+    root: Union[str, Path],
+    shard_size: int = 2**30,
+    shuffle: bool = True,
+    seed: int = 0,
+    num_threads: int = 16,
+) -> None:
+    """Packs the images of a dataset into a few large shard files, which can be
+    read by :class:`~torchvision.datasets.ShardedImageDataset`.
+
+    Reading many small files is slow on network file systems. Shards hold the
+    encoded images, stored back to back, and are read with a few large
+    sequential reads, or memory-mapped.
+
+    The images of datasets with a ``samples`` attribute holding (path, class
+    index) tuples, like :class:`~torchvision.datasets.DatasetFolder` and
+    :class:`~torchvision.datasets.ImageFolder`, are copied as-is, without being
+    decoded. The images of other datasets are read with ``dataset[idx]``, which
+    must return a PIL image or a uint8 tensor and an integer target, and are
+    encoded as PNG.
+
+    ``root`` then holds the ``shard-*.bin`` files, and an ``index.npz`` file
+    with the location of each image in the shards, its target, and the
+    ``classes`` of the dataset if it has this attribute. The index is written
+    last, once all the shards are complete.
+
+    Args:
+        dataset (VisionDataset): the dataset to pack.
+        root (str or ``pathlib.Path``): the directory where the shards are written.
+        shard_size (int): shards are closed once they hold at least this many
+            bytes. Default: 1 GiB.
+        shuffle (bool): If True (default), the images are written in a random
+            order, so that each shard holds images of all the classes. This
+            matters when the shards are read sequentially, see
+            :meth:`ShardedImageDataset.shard_shuffled`.
+        seed (int): the seed of the random order of the images. Default: 0.
+        num_threads (int): the number of threads reading the images of the
+            ``samples`` concurrently. Default: 16.
+    """
+    _log_api_usage_once(write_image_shards)
+    if shard_size <= 0:
+        raise ValueError(f"shard_size should be a positive integer, got {shard_size}")
+    root = os.fspath(root)
+    os.makedirs(root, exist_ok=True)
+
+    samples = getattr(dataset, "samples", None)
+    num_samples = len(samples) if samples is not None else len(dataset)  # type: ignore[arg-type]
+    order = list(range(num_samples))
+    if shuffle:
+        random.Random(seed).shuffle(order)
+
+    shards = np.zeros(num_samples, dtype=np.int32)
+    offsets = np.zeros(num_samples, dtype=np.int64)
+    lengths = np.zeros(num_samples, dtype=np.int64)
+    targets = np.zeros(num_samples, dtype=np.int64)
+    shard_idx, shard_offset = 0, 0
+    shard_file = open(os.path.join(root, _shard_filename(shard_idx)), "wb")
+    try:
+        with ThreadPoolExecutor(num_threads) as executor:
+            for start in range(0, num_samples, _READ_CHUNK_SIZE):
+                chunk = order[start : start + _READ_CHUNK_SIZE]
+                if samples is not None:
+                    records = executor.map(_read_sample_file, [samples[idx] for idx in chunk])
+                else:
+                    records = map(_encode_sample, (dataset[idx] for idx in chunk))
+                for i, (data, target) in enumerate(records, start):
+                    if shard_offset >= shard_size:
+                        shard_file.close()
+                        shard_idx, shard_offset = shard_idx + 1, 0
+                        shard_file = open(os.path.join(root, _shard_filename(shard_idx)), "wb")
+                    shard_file.write(data)
+                    shards[i], offsets[i], lengths[i], targets[i] = shard_idx, shard_offset, len(data), target
+                    shard_offset += len(data)
+    finally:
+        shard_file.close()
+
+    classes = getattr(dataset, "classes", None)
+    arrays = {
+        "num_shards": np.array(shard_idx + 1),
+        "shards": shards,
+        "offsets": offsets,
+        "lengths": lengths,
+        "targets": targets,
+    }
+    if classes is not None:
+        arrays["classes"] = np.array(classes, dtype=str)
+    _save_npz_atomic(os.path.join(root, INDEX_FILENAME), _INDEX_VERSION, arrays, raise_errors=True)
+
+
+class ShardedImageDataset(VisionDataset):
+    """Images packed into shard files by :func:`~torchvision.datasets.write_image_shards`.
+
+    This is a map-style dataset: ``dataset[idx]`` memory-maps the part of the
+    shard holding the image with :func:`~torchvision.io.read_file`, and decodes
+    it with :func:`~torchvision.io.decode_image`. :meth:`shard_shuffled`
+    returns an iterable version of the dataset, which reads the shards
+    sequentially, for file systems where random reads are slow.
+
+    .. note::
+        The images are returned as tensors (see :func:`~torchvision.io.decode_image`),
+        not PIL images, so the transforms must support tensors, e.g.
+        :mod:`torchvision.transforms.v2`.
+
+    Args:
+        root (str or ``pathlib.Path``): the directory holding the shards.
+        transform (callable, optional): A function/transform that takes in an
+            image and returns a transformed version.
+        target_transform (callable, optional): A function/transform that takes
+            in the target and transforms it.
+        mode (str or ImageReadMode): The mode to decode the images with. See
+            :func:`~torchvision.io.decode_image`. Default: "RGB".
+        decoder (callable, optional): A function decoding an image given its
+            encoded bytes, as a uint8 tensor, used instead of
+            :func:`~torchvision.io.decode_image` when set. ``mode`` is then ignored.
+
+     Attributes:
+        classes (list): List of the class names, if the packed dataset had a
+            ``classes`` attribute, else None.
+        targets (numpy.ndarray): The target of each image.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        mode: Union[str, ImageReadMode] = ImageReadMode.RGB,
+        decoder: Optional[Callable[[torch.Tensor], Any]] = None,
+    ) -> None:
+        super().__init__(root, transform=transform, target_transform=target_transform)
+        if isinstance(mode, str):
+            mode = ImageReadMode[mode.upper()]
+        self.mode = mode
+        self.decoder = decoder
+
+        index_path = os.path.join(self.root, INDEX_FILENAME)
+        if not os.path.isfile(index_path):
+            raise FileNotFoundError(f"{index_path} not found. The shards can be written with write_image_shards().")
+        index = _load_npz_versioned(index_path, _INDEX_VERSION)
+        if index is None:
+            raise RuntimeError(f"The index {index_path} is corrupted, or was written by an unsupported version")
+        num_shards = int(index["num_shards"])
+        self._shards = index["shards"]
+        self._offsets = index["offsets"]
+        self._lengths = index["lengths"]
+        self.targets = index["targets"]
+        self.classes: Optional[List[str]] = index["classes"].tolist() if "classes" in index else None
+        self._shard_paths = [os.path.join(self.root, _shard_filename(i)) for i in range(num_shards)]
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def _load(self, data: torch.Tensor, target: int) -> Tuple[Any, Any]:
+        image = self.decoder(data) if self.decoder is not None else decode_image(data, mode=self.mode)
+        if self.transform is not None:
+            image = self.transform(image)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+        return image, target
+
+    def __getitem__(self, index: int) -> Tuple[Any, Any]:
+        """
+        Args:
+            index (int): Index
+
+        Returns:
+            tuple: (image, target) where target is the class index of the image.
+        """
+        data = read_file(self._shard_paths[self._shards[index]], int(self._offsets[index]), int(self._lengths[index]))
+        return self._load(data, int(self.targets[index]))
+
+    def shard_shuffled(
+        self, seed: int = 0, buffer_size: int = 1024, read_size: int = 64 * 2**20
+    ) -> "ShardShuffledImageDataset":
+        """Returns an iterable version of the dataset, which reads the shards
+        sequentially.
+
+        The shards are visited in a random order, and read in blocks of about
+        ``read_size`` bytes, with a single read each. The next block is read
+        in the background while the images of the current one are decoded.
+        The images are shuffled within a buffer of ``buffer_size`` images. When
+        iterated in the workers of a :class:`~torch.utils.data.DataLoader`, the
+        shards are split between the workers.
+
+        Args:
+            seed (int): the seed of the random order of the shards and images.
+                Call :meth:`ShardShuffledImageDataset.set_epoch` at the beginning
+                of each epoch to get a different order at each epoch. Default: 0.
+            buffer_size (int): the number of images shuffled together. 1 keeps
+                the order of the images within each shard. Default: 1024.
+            read_size (int): the approximate number of bytes read at once.
+                Default: 64 MiB.
+
+        Returns:
+            ShardShuffledImageDataset: the iterable dataset.
+        """
+        return ShardShuffledImageDataset(self, seed=seed, buffer_size=buffer_size, read_size=read_size)
+
+
+class ShardShuffledImageDataset(torch.utils.data.IterableDataset):
+    """Iterable version of a :class:`ShardedImageDataset`, returned by
+    :meth:`ShardedImageDataset.shard_shuffled`."""
+
+    def __init__(self, dataset: ShardedImageDataset, seed: int, buffer_size: int, read_size: int) -> None:
+        if buffer_size < 1:
+            raise ValueError(f"buffer_size should be a positive integer, got {buffer_size}")
+        self.dataset = dataset
+        self.seed = seed
+        self.buffer_size = buffer_size
+        self.read_size = read_size
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch, which changes the random order of the shards and images."""
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def _get_blocks(self, shard_indices: List[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        # Splits the shards into blocks of consecutive images, of about read_size
+        # bytes. The images are indexed in the order they were written, so the
+        # images of a shard are contiguous and sorted by offset.
+        dataset = self.dataset
+        shard_starts = np.searchsorted(dataset._shards, np.arange(len(dataset._shard_paths) + 1))
+        for shard_idx in shard_indices:
+            images = np.arange(shard_starts[shard_idx], shard_starts[shard_idx + 1])
+            if len(images) == 0:
+                continue
+            ends = dataset._offsets[images] + dataset._lengths[images]
+            num_blocks = max(math.ceil(int(ends[-1] - dataset._offsets[images[0]]) / self.read_size), 1)
+            boundaries = np.searchsorted(ends, dataset._offsets[images[0]] + np.arange(1, num_blocks) * self.read_size)
+            for block in np.split(images, boundaries):
+                if len(block) > 0:
+                    yield shard_idx, block
+
+    def _read_block(self, shard_idx: int, block: np.ndarray) -> Tuple[torch.Tensor, int]:
+        dataset = self.dataset
+        start = int(dataset._offsets[block[0]])
+        end = int(dataset._offsets[block[-1]] + dataset._lengths[block[-1]])
+        return read_file(dataset._shard_paths[shard_idx], start, end - start, mmap=False), start
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        dataset = self.dataset
+        rng = random.Random(self.seed + self.epoch)
+        shard_indices = list(range(len(dataset._shard_paths)))
+        rng.shuffle(shard_indices)
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is not None:
+            shard_indices = shard_indices[worker_info.id :: worker_info.num_workers]
+            rng = random.Random(self.seed + self.epoch + worker_info.id)
+
+        buffer: List[Tuple[torch.Tensor, int]] = []
+        blocks = self._get_blocks(shard_indices)
+        with ThreadPoolExecutor(1) as executor:
+            # Read the next block in the background while this one is decoded
+            next_block = next(blocks, None)
+            future = executor.submit(self._read_block, *next_block) if next_block is not None else None
+            while future is not None:
+                _, block = next_block  # type: ignore[misc]
+                data, start = future.result()
+                next_block = next(blocks, None)
+                future = executor.submit(self._read_block, *next_block) if next_block is not None else None
+                for idx in block:
+                    offset = int(dataset._offsets[idx]) - start
+                    buffer.append((data[offset : offset + int(dataset._lengths[idx])], int(dataset.targets[idx])))
+                    if len(buffer) >= self.buffer_size:
+                        i = rng.randrange(len(buffer))
+                        buffer[i], buffer[-1] = buffer[-1], buffer[i]
+                        yield dataset._load(*buffer.pop())
+            rng.shuffle(buffer)
+            for sample in buffer:
+                yield dataset._load(*sample)
@@ -1,4 +1,3 @@
-import csv
 import os
 from collections import namedtuple
 from pathlib import Path
@@ -7,7 +6,7 @@ from typing import Any, Callable, List, Optional, Tuple, Union
 import PIL
 import torch
 
-from .utils import check_integrity, download_file_from_google_drive, extract_archive, verify_str_arg
+from .utils import _load_int_table, check_integrity, download_file_from_google_drive, extract_archive, verify_str_arg
 from .vision import VisionDataset
 
 CSV = namedtuple("CSV", ["header", "index", "data"])
@@ -119,20 +118,8 @@ class CelebA(VisionDataset):
         filename: str,
         header: Optional[int] = None,
     ) -> CSV:
-        with open(os.path.join(self.root, self.base_folder, filename)) as csv_file:
-            data = list(csv.reader(csv_file, delimiter=" ", skipinitialspace=True))
-
-        if header is not None:
-            headers = data[header]
-            data = data[header + 1 :]
-        else:
-            headers = []
-
-        indices = [row[0] for row in data]
-        data = [row[1:] for row in data]
-        data_int = [list(map(int, i)) for i in data]
-
-        return CSV(headers, indices, torch.tensor(data_int))
+        headers, indices, data = _load_int_table(os.path.join(self.root, self.base_folder, filename), header=header)
+        return CSV(headers, indices, data)
 
     def _check_integrity(self) -> bool:
         for (_, md5, filename) in self.file_list:
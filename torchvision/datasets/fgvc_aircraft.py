@@ -6,7 +6,7 @@ from typing import Any, Callable, Optional, Tuple, Union
 
 import PIL.Image
 
-from .utils import download_and_extract_archive, verify_str_arg
+from .utils import _read_rows, download_and_extract_archive, verify_str_arg
 from .vision import VisionDataset
 
 
@@ -82,11 +82,9 @@ class FGVCAircraft(VisionDataset):
         self._image_files = []
         self._labels = []
 
-        with open(labels_file, "r") as f:
-            for line in f:
-                image_name, label_name = line.strip().split(" ", 1)
-                self._image_files.append(os.path.join(image_data_folder, f"{image_name}.jpg"))
-                self._labels.append(self.class_to_idx[label_name])
+        for image_name, label_name in _read_rows(labels_file, delimiter=" ", max_split=1):
+            self._image_files.append(os.path.join(image_data_folder, f"{image_name}.jpg"))
+            self._labels.append(self.class_to_idx[label_name])
 
     def __len__(self) -> int:
         return len(self._image_files)
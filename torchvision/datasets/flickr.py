@@ -7,6 +7,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from PIL import Image
 
+from .utils import _read_rows
 from .vision import VisionDataset
 
 
@@ -133,10 +134,8 @@ class Flickr30k(VisionDataset):
 
         # Read annotations and store in a dict
         self.annotations = defaultdict(list)
-        with open(self.ann_file) as fh:
-            for line in fh:
-                img_id, caption = line.strip().split("\t")
-                self.annotations[img_id[:-2]].append(caption)
+        for img_id, caption in _read_rows(self.ann_file, delimiter="\t"):
+            self.annotations[img_id[:-2]].append(caption)
 
         self.ids = list(sorted(self.annotations.keys()))
 
@@ -1,10 +1,16 @@
+import hashlib
 import os
 import os.path
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, cast, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 from PIL import Image
 
+from .._utils import _load_npz_versioned, _save_npz_atomic
 from .vision import VisionDataset
 
 
@@ -46,17 +52,144 @@ def find_classes(directory: Union[str, Path]) -> Tuple[List[str], Dict[str, int]
     return classes, class_to_idx
 
 
+# A directory listing: the modification time of the directory, and the sorted
+# names of its (valid) files and of its subdirectories
+_Listing = Tuple[int, List[str], List[str]]
+
+_MANIFEST_VERSION = 1
+# Directories modified less than this many nanoseconds before being listed may
+# be modified again without their (coarse) modification time changing
+_RACY_INTERVAL_NS = 1_000_000_000
+
+
+def _list_directory(path: str, extensions: Optional[Union[str, Tuple[str, ...]]]) -> _Listing:
+    # The modification time is read first, so that changes made while listing
+    # the directory are detected next time
+    mtime_ns = os.stat(path).st_mtime_ns
+    if mtime_ns > time.time_ns() - _RACY_INTERVAL_NS:
+        # Never matches, so that the directory is listed again next time
+        mtime_ns = -1
+    files, subdirs = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                # Follows symlinks, like os.walk(followlinks=True)
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                subdirs.append(entry.name)
+            elif extensions is None or has_file_allowed_extension(entry.name, extensions):
+                files.append(entry.name)
+    return mtime_ns, sorted(files), sorted(subdirs)
+
+
+def _walk_class_directory(
+    directory: str,
+    target_class: str,
+    extensions: Optional[Union[str, Tuple[str, ...]]],
+    manifest: Dict[str, _Listing],
+) -> Dict[str, _Listing]:
+    # Lists the class directory and its subdirectories, by path relative to
+    # directory. The listings of the manifest are reused for the directories
+    # which weren't modified since: adding, removing or renaming an entry of a
+    # directory changes its modification time.
+    listings = {}
+    stack = [target_class]
+    while stack:
+        rel_path = stack.pop()
+        path = os.path.join(directory, rel_path)
+        listing = manifest.get(rel_path)
+        try:
+            if listing is None or os.stat(path).st_mtime_ns != listing[0]:
+                listing = _list_directory(path, extensions)
+        except OSError:
+            # Like os.walk, directories which can't be listed are skipped
+            continue
+        listings[rel_path] = listing
+        stack.extend(os.path.join(rel_path, subdir) for subdir in listing[2])
+    return listings
+
+
+def _top_directory(rel_path: str) -> str:
+    return rel_path.split(os.sep, 1)[0]
+
+
+def _get_manifest_path(manifest_dir: Union[str, Path], directory: str, extensions: Union[str, Tuple[str, ...]]) -> str:
+    key = "\0".join([os.path.abspath(directory)] + ([extensions] if isinstance(extensions, str) else list(extensions)))
+    return os.path.join(os.fspath(manifest_dir), f"folder_manifest_{hashlib.sha1(key.encode()).hexdigest()}.npz")
+
+
+def _join_names(names: List[str]) -> np.ndarray:
+    # Names are stored as a single buffer of null-separated UTF-8 strings, much
+    # smaller and faster to load than an array of strings.
+    return np.frombuffer("\0".join(names).encode("utf-8", "surrogateescape"), dtype=np.uint8)
+
+
+def _split_names(buffer: np.ndarray, count: int) -> List[str]:
+    return buffer.tobytes().decode("utf-8", "surrogateescape").split("\0") if count else []
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, _Listing]:
+    stored = _load_npz_versioned(manifest_path, _MANIFEST_VERSION)
+    if stored is None:
+        return {}
+    mtimes, num_files, num_subdirs = stored["mtimes"], stored["num_files"], stored["num_subdirs"]
+    dirs = _split_names(stored["dirs"], len(mtimes))
+    files = _split_names(stored["files"], int(num_files.sum()))
+    subdirs = _split_names(stored["subdirs"], int(num_subdirs.sum()))
+
+    manifest = {}
+    files_offsets = np.concatenate([[0], np.cumsum(num_files)]).tolist()
+    subdirs_offsets = np.concatenate([[0], np.cumsum(num_subdirs)]).tolist()
+    for i, (rel_path, mtime_ns) in enumerate(zip(dirs, mtimes.tolist())):
+        manifest[rel_path] = (
+            mtime_ns,
+            files[files_offsets[i] : files_offsets[i + 1]],
+            subdirs[subdirs_offsets[i] : subdirs_offsets[i + 1]],
+        )
+    return manifest
+
+
+def _save_manifest(manifest_path: str, manifest: Dict[str, _Listing]) -> None:
+    dirs = sorted(manifest)
+    listings = [manifest[rel_path] for rel_path in dirs]
+    arrays = {
+        "dirs": _join_names(dirs),
+        "mtimes": np.array([mtime_ns for mtime_ns, _, _ in listings], dtype=np.int64),
+        "num_files": np.array([len(files) for _, files, _ in listings], dtype=np.int64),
+        "files": _join_names([name for _, files, _ in listings for name in files]),
+        "num_subdirs": np.array([len(subdirs) for _, _, subdirs in listings], dtype=np.int64),
+        "subdirs": _join_names([name for _, _, subdirs in listings for name in subdirs]),
+    }
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    except OSError:
+        # Saving the manifest then fails, and warns
+        pass
+    _save_npz_atomic(manifest_path, _MANIFEST_VERSION, arrays)
+
+
 def make_dataset(
     directory: Union[str, Path],
     class_to_idx: Optional[Dict[str, int]] = None,
     extensions: Optional[Union[str, Tuple[str, ...]]] = None,
     is_valid_file: Optional[Callable[[str], bool]] = None,
     allow_empty: bool = False,
+    num_workers: Optional[int] = None,
+    manifest_dir: Optional[Union[str, Path]] = None,
 ) -> List[Tuple[str, int]]:
     """Generates a list of samples of a form (path_to_sample, class).
 
     See :class:`DatasetFolder` for details.
 
+    The class directories are listed concurrently by ``num_workers`` threads
+    (by default, as many as :class:`~concurrent.futures.ThreadPoolExecutor`
+    uses), which is much faster on network file systems. If ``manifest_dir``
+    is set, the listings of the directories are also stored in a manifest in
+    this directory, keyed by ``directory`` and ``extensions``. Next time, only
+    the directories modified since are listed again.
+
     Note: The class_to_idx parameter is here optional and will use the logic of the ``find_classes`` function
     by default.
     """
@@ -72,29 +205,51 @@ def make_dataset(
     if both_none or both_something:
         raise ValueError("Both extensions and is_valid_file cannot be None or not None at the same time")
 
-    if extensions is not None:
-
-        def is_valid_file(x: str) -> bool:
-            return has_file_allowed_extension(x, extensions)  # type: ignore[arg-type]
-
-    is_valid_file = cast(Callable[[str], bool], is_valid_file)
+    manifest: Dict[str, _Listing] = {}
+    manifest_path = None
+    if manifest_dir is not None:
+        if extensions is None:
+            raise ValueError("A manifest can only be used with extensions, not with is_valid_file")
+        manifest_path = _get_manifest_path(manifest_dir, directory, extensions)
+        manifest = _load_manifest(manifest_path)
+
+    # The files are filtered by extension while listing the directories, and
+    # by is_valid_file in this thread, in the order of the samples.
+    target_classes = sorted(class_to_idx.keys())
+    with ThreadPoolExecutor(num_workers) as executor:
+        class_listings = list(
+            executor.map(
+                lambda target_class: _walk_class_directory(directory, target_class, extensions, manifest),
+                target_classes,
+            )
+        )
 
     instances = []
     available_classes = set()
-    for target_class in sorted(class_to_idx.keys()):
+    for target_class, listings in zip(target_classes, class_listings):
         class_index = class_to_idx[target_class]
-        target_dir = os.path.join(directory, target_class)
-        if not os.path.isdir(target_dir):
-            continue
-        for root, _, fnames in sorted(os.walk(target_dir, followlinks=True)):
-            for fname in sorted(fnames):
-                path = os.path.join(root, fname)
-                if is_valid_file(path):
-                    item = path, class_index
-                    instances.append(item)
-
-                    if target_class not in available_classes:
-                        available_classes.add(target_class)
+        num_instances = len(instances)
+        # Same order as sorted(os.walk(target_dir)): by directory, then by file name
+        for rel_path in sorted(listings):
+            prefix = os.path.join(directory, rel_path, "")
+            fnames = listings[rel_path][1]
+            if is_valid_file is None:
+                instances.extend((prefix + fname, class_index) for fname in fnames)
+            else:
+                instances.extend((prefix + fname, class_index) for fname in fnames if is_valid_file(prefix + fname))
+        if len(instances) > num_instances:
+            available_classes.add(target_class)
+
+    if manifest_path is not None:
+        updated_manifest = {
+            rel_path: listing for rel_path, listing in manifest.items() if _top_directory(rel_path) not in class_to_idx
+        }
+        for listings in class_listings:
+            updated_manifest.update(listings)
+        if updated_manifest.keys() != manifest.keys() or any(
+            listing is not manifest[rel_path] for rel_path, listing in updated_manifest.items()
+        ):
+            _save_manifest(manifest_path, updated_manifest)
 
     empty_classes = set(class_to_idx.keys()) - available_classes
     if empty_classes and not allow_empty:
@@ -106,6 +261,43 @@ def make_dataset(
     return instances
 
 
+class _CompactSamples(Sequence):
+    """Sequence of (path, class_index) samples, stored in a few numpy arrays
+    instead of millions of Python objects: the paths are concatenated in a
+    single buffer of bytes, indexed by an array of offsets.
+
+    Reading a sample doesn't write to the memory of the other samples, unlike
+    reading a list of tuples, which updates their reference counts. The memory
+    of the samples is thus shared by the DataLoader workers forked from the
+    process, instead of being progressively copied into each of them.
+    """
+
+    def __init__(self, samples: List[Tuple[str, int]]) -> None:
+        encoded_paths = [os.fsencode(path) for path, _ in samples]
+        self._paths = np.frombuffer(b"".join(encoded_paths), dtype=np.uint8)
+        self._offsets = np.zeros(len(samples) + 1, dtype=np.int64)
+        np.cumsum([len(path) for path in encoded_paths], out=self._offsets[1:])
+        targets = np.array([target for _, target in samples], dtype=np.int64)
+        for dtype in (np.int16, np.int32):
+            if len(targets) == 0 or (targets.min() >= np.iinfo(dtype).min and targets.max() <= np.iinfo(dtype).max):
+                targets = targets.astype(dtype)
+                break
+        self.targets = targets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Sample index {index} is out of range for {len(self)} samples")
+        path = os.fsdecode(self._paths[self._offsets[index] : self._offsets[index + 1]].tobytes())
+        return path, int(self.targets[index])
+
+
 class DatasetFolder(VisionDataset):
     """A generic data loader.
 
@@ -127,6 +319,16 @@ class DatasetFolder(VisionDataset):
             both extensions and is_valid_file should not be passed.
         allow_empty(bool, optional): If True, empty folders are considered to be valid classes.
             An error is raised on empty folders if False (default).
+        manifest_dir (str or ``pathlib.Path``, optional): If set, the listings of the
+            directories of the dataset are stored in a manifest in this directory,
+            so that the following instantiations of the dataset, e.g. in other jobs
+            or DDP ranks, only list the directories modified since. Only supported
+            together with ``extensions``, and when :meth:`make_dataset` isn't overridden.
+        compact_samples (bool, optional): If True, ``samples`` is a read-only sequence
+            storing the paths in a single buffer, and ``targets`` a numpy array. This uses
+            much less memory than lists for large datasets and, unlike lists, it isn't
+            progressively copied into each DataLoader worker as the samples are read.
+            Default: False.
 
      Attributes:
         classes (list): List of the class names sorted alphabetically.
@@ -144,24 +346,42 @@ class DatasetFolder(VisionDataset):
         target_transform: Optional[Callable] = None,
         is_valid_file: Optional[Callable[[str], bool]] = None,
         allow_empty: bool = False,
+        manifest_dir: Optional[Union[str, Path]] = None,
+        compact_samples: bool = False,
     ) -> None:
         super().__init__(root, transform=transform, target_transform=target_transform)
         classes, class_to_idx = self.find_classes(self.root)
-        samples = self.make_dataset(
-            self.root,
-            class_to_idx=class_to_idx,
-            extensions=extensions,
-            is_valid_file=is_valid_file,
-            allow_empty=allow_empty,
-        )
+        if manifest_dir is None:
+            samples = self.make_dataset(
+                self.root,
+                class_to_idx=class_to_idx,
+                extensions=extensions,
+                is_valid_file=is_valid_file,
+                allow_empty=allow_empty,
+            )
+        else:
+            if type(self).make_dataset is not DatasetFolder.make_dataset:
+                raise ValueError("manifest_dir can't be used when make_dataset is overridden")
+            samples = make_dataset(
+                self.root,
+                class_to_idx,
+                extensions=extensions,
+                is_valid_file=is_valid_file,
+                allow_empty=allow_empty,
+                manifest_dir=manifest_dir,
+            )
 
         self.loader = loader
         self.extensions = extensions
 
         self.classes = classes
         self.class_to_idx = class_to_idx
-        self.samples = samples
-        self.targets = [s[1] for s in samples]
+        if compact_samples:
+            self.samples: Sequence[Tuple[str, int]] = _CompactSamples(samples)
+            self.targets: Sequence[int] = self.samples.targets
+        else:
+            self.samples = samples
+            self.targets = [s[1] for s in samples]
 
     @staticmethod
     def make_dataset(
@@ -309,6 +529,12 @@ class ImageFolder(DatasetFolder):
             and check if the file is a valid file (used to check of corrupt files)
         allow_empty(bool, optional): If True, empty folders are considered to be valid classes.
             An error is raised on empty folders if False (default).
+        manifest_dir (str or ``pathlib.Path``, optional): If set, the listings of the
+            directories of the dataset are stored in a manifest in this directory,
+            to speed up the following instantiations. See :class:`DatasetFolder`.
+        compact_samples (bool, optional): If True, ``samples`` and ``targets`` are stored
+            compactly, in a way that isn't copied into the DataLoader workers.
+            See :class:`DatasetFolder`.
 
      Attributes:
         classes (list): List of the class names sorted alphabetically.
@@ -324,6 +550,8 @@ class ImageFolder(DatasetFolder):
         loader: Callable[[str], Any] = default_loader,
         is_valid_file: Optional[Callable[[str], bool]] = None,
         allow_empty: bool = False,
+        manifest_dir: Optional[Union[str, Path]] = None,
+        compact_samples: bool = False,
     ):
         super().__init__(
             root,
@@ -333,5 +561,7 @@ class ImageFolder(DatasetFolder):
             target_transform=target_transform,
             is_valid_file=is_valid_file,
             allow_empty=allow_empty,
+            manifest_dir=manifest_dir,
+            compact_samples=compact_samples,
         )
         self.imgs = self.samples
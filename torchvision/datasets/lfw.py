@@ -4,7 +4,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from PIL import Image
 
-from .utils import check_integrity, download_and_extract_archive, download_url, verify_str_arg
+from .utils import _read_rows, check_integrity, download_and_extract_archive, download_url, verify_str_arg
 from .vision import VisionDataset
 
 
@@ -127,26 +127,23 @@ class LFWPeople(_LFW):
 
     def _get_people(self) -> Tuple[List[str], List[int]]:
         data, targets = [], []
-        with open(os.path.join(self.root, self.labels_file)) as f:
-            lines = f.readlines()
-            n_folds, s = (int(lines[0]), 1) if self.split == "10fold" else (1, 0)
-
-            for fold in range(n_folds):
-                n_lines = int(lines[s])
-                people = [line.strip().split("\t") for line in lines[s + 1 : s + n_lines + 1]]
-                s += n_lines + 1
-                for i, (identity, num_imgs) in enumerate(people):
-                    for num in range(1, int(num_imgs) + 1):
-                        img = self._get_path(identity, num)
-                        data.append(img)
-                        targets.append(self.class_to_idx[identity])
+        rows = _read_rows(os.path.join(self.root, self.labels_file), delimiter="\t")
+        n_folds, s = (int(rows[0][0]), 1) if self.split == "10fold" else (1, 0)
+
+        for fold in range(n_folds):
+            n_lines = int(rows[s][0])
+            people = rows[s + 1 : s + n_lines + 1]
+            s += n_lines + 1
+            for i, (identity, num_imgs) in enumerate(people):
+                for num in range(1, int(num_imgs) + 1):
+                    img = self._get_path(identity, num)
+                    data.append(img)
+                    targets.append(self.class_to_idx[identity])
 
         return data, targets
 
     def _get_classes(self) -> Dict[str, int]:
-        with open(os.path.join(self.root, self.names)) as f:
-            lines = f.readlines()
-            names = [line.strip().split()[0] for line in lines]
+        names = [row[0] for row in _read_rows(os.path.join(self.root, self.names))]
         class_to_idx = {name: i for i, name in enumerate(names)}
         return class_to_idx
 
@@ -208,29 +205,27 @@ class LFWPairs(_LFW):
 
     def _get_pairs(self, images_dir: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]], List[int]]:
         pair_names, data, targets = [], [], []
-        with open(os.path.join(self.root, self.labels_file)) as f:
-            lines = f.readlines()
-            if self.split == "10fold":
-                n_folds, n_pairs = lines[0].split("\t")
-                n_folds, n_pairs = int(n_folds), int(n_pairs)
-            else:
-                n_folds, n_pairs = 1, int(lines[0])
-            s = 1
-
-            for fold in range(n_folds):
-                matched_pairs = [line.strip().split("\t") for line in lines[s : s + n_pairs]]
-                unmatched_pairs = [line.strip().split("\t") for line in lines[s + n_pairs : s + (2 * n_pairs)]]
-                s += 2 * n_pairs
-                for pair in matched_pairs:
-                    img1, img2, same = self._get_path(pair[0], pair[1]), self._get_path(pair[0], pair[2]), 1
-                    pair_names.append((pair[0], pair[0]))
-                    data.append((img1, img2))
-                    targets.append(same)
-                for pair in unmatched_pairs:
-                    img1, img2, same = self._get_path(pair[0], pair[1]), self._get_path(pair[2], pair[3]), 0
-                    pair_names.append((pair[0], pair[2]))
-                    data.append((img1, img2))
-                    targets.append(same)
+        rows = _read_rows(os.path.join(self.root, self.labels_file), delimiter="\t")
+        if self.split == "10fold":
+            n_folds, n_pairs = int(rows[0][0]), int(rows[0][1])
+        else:
+            n_folds, n_pairs = 1, int(rows[0][0])
+        s = 1
+
+        for fold in range(n_folds):
+            matched_pairs = rows[s : s + n_pairs]
+            unmatched_pairs = rows[s + n_pairs : s + (2 * n_pairs)]
+            s += 2 * n_pairs
+            for pair in matched_pairs:
+                img1, img2, same = self._get_path(pair[0], pair[1]), self._get_path(pair[0], pair[2]), 1
+                pair_names.append((pair[0], pair[0]))
+                data.append((img1, img2))
+                targets.append(same)
+            for pair in unmatched_pairs:
+                img1, img2, same = self._get_path(pair[0], pair[1]), self._get_path(pair[2], pair[3]), 0
+                pair_names.append((pair[0], pair[2]))
+                data.append((img1, img2))
+                targets.append(same)
 
         return pair_names, data, targets
 
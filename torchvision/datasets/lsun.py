@@ -1,46 +1,149 @@
 import io
 import os.path
-import pickle
-import string
+import warnings
 from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, Callable, cast, List, Optional, Tuple, Union
+from typing import Any, Callable, cast, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+import torch
 from PIL import Image
 
+from .._utils import _load_npz_versioned, _save_npz_atomic
+
+from ..io.image import decode_image
 from .utils import iterable_to_str, verify_str_arg
 from .vision import VisionDataset
 
+# Name of the file storing the keys of a database, in the directory of the database
+KEYS_FILENAME = ".torchvision_lsun_keys.npz"
+_KEYS_VERSION = 1
+
+# LMDB environments opened by this process, by database directory. An
+# environment can only be opened once per process, and can't be used across
+# fork(): all the datasets reading a database share its environment, and each
+# process opens its own.
+_environments: Dict[str, Any] = {}
+_environments_pid = os.getpid()
+
+
+def _get_environment(root: str) -> Any:
+    global _environments_pid
+    if _environments_pid != os.getpid():
+        # Close the environments inherited from the parent process, so that
+        # they can be opened again
+        for env in _environments.values():
+            env.close()
+        _environments.clear()
+        _environments_pid = os.getpid()
+    root = os.path.abspath(root)
+    env = _environments.get(root)
+    if env is None:
+        import lmdb
+
+        env = lmdb.open(root, readonly=True, lock=False, readahead=False, meminit=False)
+        _environments[root] = env
+    return env
+
+
+def _pil_loader(data: torch.Tensor) -> Image.Image:
+    return Image.open(io.BytesIO(data.numpy())).convert("RGB")
+
+
+# Loaders which don't keep a reference to the encoded image, and can thus read
+# it straight from the memory of the database
+_ZERO_COPY_LOADERS = (_pil_loader, decode_image)
+
+
+def _get_database_stat(root: str) -> Tuple[int, int]:
+    st = os.stat(os.path.join(root, "data.mdb"))
+    return st.st_mtime_ns, st.st_size
+
 
 class LSUNClass(VisionDataset):
+    """The images of a single LSUN LMDB database. See :class:`LSUN`.
+
+    The keys of the database are listed once, and stored next to the database,
+    in a ``.torchvision_lsun_keys.npz`` file, which is used as long as the
+    database doesn't change. The database is opened separately by each process
+    using the dataset, e.g. each DataLoader worker.
+
+    Args:
+        root (str or ``pathlib.Path``): Directory of the database.
+        transform (callable, optional): A function/transform that takes in an image
+            and returns a transformed version. E.g, ``transforms.RandomCrop``
+        target_transform (callable, optional): A function/transform that takes in the
+            target and transforms it.
+        loader (callable, optional): A function loading an image from its encoded
+            bytes, given as a uint8 tensor. By default, images are decoded as RGB
+            PIL images. :func:`~torchvision.io.decode_image` decodes them to tensors,
+            straight from the memory of the database, without copying them.
+            Other loaders are given a copy of the bytes, which they may keep.
+    """
+
     def __init__(
-        self, root: str, transform: Optional[Callable] = None, target_transform: Optional[Callable] = None
+        self,
+        root: str,
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        loader: Callable[[torch.Tensor], Any] = _pil_loader,
     ) -> None:
-        import lmdb
-
         super().__init__(root, transform=transform, target_transform=target_transform)
+        self.loader = loader
+        self._keys, self._key_offsets = self._load_keys()
+        self._keys_list: Optional[List[bytes]] = None
+        self.length = len(self._key_offsets) - 1
+
+    @property
+    def env(self) -> Any:
+        return _get_environment(self.root)
 
-        self.env = lmdb.open(root, max_readers=1, readonly=True, lock=False, readahead=False, meminit=False)
+    def _load_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The keys are stored as a single buffer of bytes, indexed by an array of offsets
         with self.env.begin(write=False) as txn:
-            self.length = txn.stat()["entries"]
-        cache_file = "_cache_" + "".join(c for c in root if c in string.ascii_letters)
-        if os.path.isfile(cache_file):
-            self.keys = pickle.load(open(cache_file, "rb"))
-        else:
-            with self.env.begin(write=False) as txn:
-                self.keys = [key for key in txn.cursor().iternext(keys=True, values=False)]
-            pickle.dump(self.keys, open(cache_file, "wb"))
+            num_entries = txn.stat()["entries"]
+        stat = np.array(_get_database_stat(self.root), dtype=np.int64)
+        keys_path = os.path.join(self.root, KEYS_FILENAME)
+        stored = _load_npz_versioned(keys_path, _KEYS_VERSION)
+        if stored is not None and np.array_equal(stored["stat"], stat) and len(stored["offsets"]) == num_entries + 1:
+            return stored["keys"], stored["offsets"]
 
-    def __getitem__(self, index: int) -> Tuple[Any, Any]:
-        img, target = None, None
-        env = self.env
-        with env.begin(write=False) as txn:
-            imgbuf = txn.get(self.keys[index])
+        with self.env.begin(write=False) as txn:
+            keys = list(txn.cursor().iternext(keys=True, values=False))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(key) for key in keys], out=offsets[1:])
+        key_buffer = np.frombuffer(b"".join(keys), dtype=np.uint8)
+        _save_npz_atomic(keys_path, _KEYS_VERSION, dict(stat=stat, keys=key_buffer, offsets=offsets))
+        return key_buffer, offsets
+
+    @property
+    def keys(self) -> List[bytes]:
+        if self._keys_list is None:
+            self._keys_list = [self._get_key(index) for index in range(self.length)]
+        return self._keys_list
+
+    def _get_key(self, index: int) -> bytes:
+        return self._keys[self._key_offsets[index] : self._key_offsets[index + 1]].tobytes()
 
-        buf = io.BytesIO()
-        buf.write(imgbuf)
-        buf.seek(0)
-        img = Image.open(buf).convert("RGB")
+    def __getitem__(self, index: int) -> Tuple[Any, Any]:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"Index {index} is out of range for {self.length} images")
+
+        target = None
+        # With buffers=True, the value is a view on the memory-mapped database,
+        # which is only valid until the end of the transaction.
+        with self.env.begin(write=False, buffers=True) as txn:
+            imgbuf = txn.get(self._get_key(index))
+            with warnings.catch_warnings():
+                # The buffer is read-only, but the loaders don't modify it
+                warnings.filterwarnings("ignore", message="The given buffer is not writable")
+                data = torch.frombuffer(imgbuf, dtype=torch.uint8)
+            if self.loader not in _ZERO_COPY_LOADERS:
+                # Other loaders may keep the tensor: give them their own copy
+                data = data.clone()
+            img = self.loader(data)
 
         if self.transform is not None:
             img = self.transform(img)
@@ -68,6 +171,11 @@ class LSUN(VisionDataset):
             and returns a transformed version. E.g, ``transforms.RandomCrop``
         target_transform (callable, optional): A function/transform that takes in the
             target and transforms it.
+        loader (callable, optional): A function loading an image from its encoded
+            bytes, given as a uint8 tensor. By default, images are decoded as RGB
+            PIL images. :func:`~torchvision.io.decode_image` decodes them to tensors,
+            straight from the memory of the database, without copying them.
+            Other loaders are given a copy of the bytes, which they may keep.
     """
 
     def __init__(
@@ -76,6 +184,7 @@ class LSUN(VisionDataset):
         classes: Union[str, List[str]] = "train",
         transform: Optional[Callable] = None,
         target_transform: Optional[Callable] = None,
+        loader: Callable[[torch.Tensor], Any] = _pil_loader,
     ) -> None:
         super().__init__(root, transform=transform, target_transform=target_transform)
         self.classes = self._verify_classes(classes)
@@ -83,7 +192,7 @@ class LSUN(VisionDataset):
         # for each class, create an LSUNClassDataset
         self.dbs = []
         for c in self.classes:
-            self.dbs.append(LSUNClass(root=os.path.join(root, f"{c}_lmdb"), transform=transform))
+            self.dbs.append(LSUNClass(root=os.path.join(root, f"{c}_lmdb"), transform=transform, loader=loader))
 
         self.indices = []
         count = 0
@@ -123,8 +123,7 @@ class UniformClipSampler(Sampler):
         idxs = []
         s = 0
         # select num_clips_per_video for each video, uniformly spaced
-        for c in self.video_clips.clips:
-            length = len(c)
+        for length in self.video_clips.num_clips_per_video().tolist():
             if length == 0:
                 # corner case where video decoding fails
                 continue
@@ -135,7 +134,7 @@ class UniformClipSampler(Sampler):
         return iter(cast(List[int], torch.cat(idxs).tolist()))
 
     def __len__(self) -> int:
-        return sum(self.num_clips_per_video for c in self.video_clips.clips if len(c) > 0)
+        return self.num_clips_per_video * int((self.video_clips.num_clips_per_video() > 0).sum())
 
 
 class RandomClipSampler(Sampler):
@@ -157,8 +156,7 @@ class RandomClipSampler(Sampler):
         idxs = []
         s = 0
         # select at most max_clips_per_video for each video, randomly
-        for c in self.video_clips.clips:
-            length = len(c)
+        for length in self.video_clips.num_clips_per_video().tolist():
             size = min(length, self.max_clips_per_video)
             sampled = torch.randperm(length)[:size] + s
             s += length
@@ -169,4 +167,4 @@ class RandomClipSampler(Sampler):
         return iter(idxs_[perm].tolist())
 
     def __len__(self) -> int:
-        return sum(min(len(c), self.max_clips_per_video) for c in self.video_clips.clips)
+        return int(self.video_clips.num_clips_per_video().clamp(max=self.max_clips_per_video).sum())
@@ -20,6 +20,7 @@ import torch
 from torch.utils.model_zoo import tqdm
 
 from .._internally_replaced_utils import _download_file_from_remote_location, _is_remote_location_available
+from .._utils import _load_npz_versioned, _save_npz_atomic
 
 USER_AGENT = "pytorch/vision"
 
@@ -465,6 +466,78 @@ def _read_pfm(file_name: Union[str, pathlib.Path], slice_channels: int = 2) -> n
     return data.astype(np.float32)
 
 
+def _read_rows(
+    file_name: Union[str, pathlib.Path], skip_rows: int = 0, delimiter: Optional[str] = None, max_split: int = -1
+) -> List[List[str]]:
+    """Read a text file holding one record per line, and split its lines into fields.
+
+    The file is read at once. Blank lines are ignored, and the fields are split
+    from the stripped lines, by whitespace if ``delimiter`` is None.
+    """
+    with open(file_name) as f:
+        lines = f.read().splitlines()[skip_rows:]
+    return [line.strip().split(delimiter, max_split) for line in lines if line and not line.isspace()]
+
+
+def _parse_int_rows(lines: List[str], usecols: Optional[Iterable[int]] = None) -> np.ndarray:
+    """Parse lines of whitespace-separated integers at once, into a 2D int64 array."""
+    if not lines:
+        return np.zeros((0, 0), dtype=np.int64)
+    return np.loadtxt(lines, dtype=np.int64, usecols=usecols, ndmin=2)
+
+
+# Version of the files caching the tables loaded by _load_int_table
+_INT_TABLE_VERSION = 1
+
+
+def _load_int_table(
+    file_name: Union[str, pathlib.Path], header: Optional[int] = None
+) -> Tuple[List[str], List[str], torch.Tensor]:
+    """Load a whitespace-separated text table, whose first column holds names
+    (e.g. of images) and whose other columns hold integers.
+
+    The integers are parsed at once by numpy, and the table is cached in a
+    binary ``.<file name>.torchvision_cache.npz`` file next to the text file,
+    which is used as long as the text file doesn't change.
+
+    Args:
+        file_name (str): Path to the file.
+        header (int, optional): Index of the line holding the names of the
+            columns. The table starts on the next line. If None, the table has
+            no header, and starts on the first line.
+
+    Returns:
+        (List[str], List[str], Tensor[N, C]): the names of the columns, the
+        first column, and the other columns as an int64 tensor.
+    """
+    file_name = os.fspath(file_name)
+    directory, name = os.path.split(file_name)
+    cache_path = os.path.join(directory, f".{name}.torchvision_cache.npz")
+    st = os.stat(file_name)
+    key = np.array([st.st_mtime_ns, st.st_size, -1 if header is None else header], dtype=np.int64)
+    cached = _load_npz_versioned(cache_path, _INT_TABLE_VERSION)
+    if cached is not None and np.array_equal(cached.get("key"), key):
+        return cached["columns"].tolist(), cached["names"].tolist(), torch.from_numpy(cached["values"])
+
+    with open(file_name) as f:
+        lines = f.read().splitlines()
+    if header is not None:
+        columns = lines[header].split()
+        lines = lines[header + 1 :]
+    else:
+        columns = []
+    lines = [line for line in lines if line and not line.isspace()]
+    names = [line.split(None, 1)[0] for line in lines]
+    values = _parse_int_rows(lines, usecols=range(1, len(lines[0].split())) if lines else None)
+
+    _save_npz_atomic(
+        cache_path,
+        _INT_TABLE_VERSION,
+        dict(key=key, columns=np.array(columns, dtype=str), names=np.array(names, dtype=str), values=values),
+    )
+    return columns, names, torch.from_numpy(values)
+
+
 def _flip_byte_order(t: torch.Tensor) -> torch.Tensor:
     return (
         t.contiguous().view(torch.uint8).view(*t.shape, t.element_size()).flip(-1).view(*t.shape[:-1], -1).view(t.dtype)
@@ -1,11 +1,27 @@
-import bisect
 import math
+import os
 import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
 from fractions import Fraction
-from typing import Any, Callable, cast, Dict, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, cast, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import numpy as np
 import torch
-from torchvision.io import _probe_video_from_file, _read_video_from_file, read_video, read_video_timestamps
+from torchvision.io import (
+    _probe_video_from_file,
+    _read_video_from_file,
+    build_video_index,
+    read_video,
+    read_video_timestamps,
+)
+from torchvision.io.video import (
+    _check_av_available,
+    _check_frame_size_options,
+    _get_frame_output_size,
+    _video_frame_to_ndarray,
+    av,
+)
 
 from .utils import tqdm
 
@@ -80,7 +96,10 @@ class VideoClips:
 
     Creating this instance the first time is time-consuming, as it needs to
     decode all the videos in `video_paths`. It is recommended that you
-    cache the results after instantiation of the class.
+    cache the results after instantiation of the class, or that you use
+    `use_video_index=True`, so that the timestamps of the videos are stored in
+    a persistent index next to the videos (see
+    :func:`~torchvision.io.build_video_index`) and only computed once.
 
     Recreating the clips for different clip lengths is fast, and can be done
     with the `compute_clips` method.
@@ -95,6 +114,11 @@ class VideoClips:
         num_workers (int): how many subprocesses to use for data loading.
             0 means that the data will be loaded in the main process. (default: 0)
         output_format (str): The format of the output video tensors. Can be either "THWC" (default) or "TCHW".
+        use_video_index (bool): if True, the timestamps of the videos are read
+            from their index, which is built (or updated, for the videos added
+            or modified since it was built) and saved if needed. See
+            :func:`~torchvision.io.build_video_index`. Otherwise, the existing
+            indices are still used, but missing ones aren't built. (default: False)
     """
 
     def __init__(
@@ -112,6 +136,7 @@ class VideoClips:
         _audio_samples: int = 0,
         _audio_channels: int = 0,
         output_format: str = "THWC",
+        use_video_index: bool = False,
     ) -> None:
 
         self.video_paths = video_paths
@@ -129,14 +154,17 @@ class VideoClips:
             raise ValueError(f"output_format should be either 'THWC' or 'TCHW', got {output_format}.")
 
         if _precomputed_metadata is None:
-            self._compute_frame_pts()
+            if use_video_index:
+                self._read_frame_pts_from_index()
+            else:
+                self._compute_frame_pts()
         else:
             self._init_from_metadata(_precomputed_metadata)
         self.compute_clips(clip_length_in_frames, frames_between_clips, frame_rate)
 
     def _compute_frame_pts(self) -> None:
-        self.video_pts = []  # len = num_videos. Each entry is a tensor of shape (num_frames_in_video,)
-        self.video_fps: List[float] = []  # len = num_videos
+        video_pts = []  # len = num_videos. Each entry is a tensor of shape (num_frames_in_video,)
+        video_fps: List[Optional[float]] = []  # len = num_videos
 
         # strategy: use a DataLoader to parallelize read_video_timestamps
         # so need to create a dummy dataset first
@@ -157,15 +185,45 @@ class VideoClips:
                 # torch.as_tensor will use torch.float as default dtype. This
                 # happens when decoding fails and no pts is returned in the list.
                 batch_pts = [torch.as_tensor(pts, dtype=torch.long) for pts in batch_pts]
-                self.video_pts.extend(batch_pts)
-                self.video_fps.extend(batch_fps)
+                video_pts.extend(batch_pts)
+                video_fps.extend(batch_fps)
+        self._set_frame_pts(video_pts, video_fps)
+
+    def _read_frame_pts_from_index(self) -> None:
+        indices = build_video_index(self.video_paths, num_workers=self.num_workers)
+        self._set_frame_pts([index.pts for index in indices], [index.fps for index in indices])
+
+    def _set_frame_pts(self, video_pts: Sequence[torch.Tensor], video_fps: Sequence[Optional[float]]) -> None:
+        # The pts of all the videos are stored in a single flat tensor, the pts
+        # of video i being _video_pts[_video_pts_offsets[i] : _video_pts_offsets[i + 1]].
+        # Unlike lists of small tensors, this doesn't use memory per video, and
+        # isn't copied in DataLoader workers by reference count updates.
+        sizes = torch.tensor([len(pts) for pts in video_pts], dtype=torch.int64)
+        self._video_pts_offsets = torch.cat([torch.zeros(1, dtype=torch.int64), sizes.cumsum(0)])
+        self._video_pts = torch.cat(
+            [torch.zeros(0, dtype=torch.int64)] + [torch.as_tensor(pts, dtype=torch.int64) for pts in video_pts]
+        )
+        # NaN stands for videos without fps
+        self._video_fps = torch.tensor([math.nan if fps is None else fps for fps in video_fps], dtype=torch.float64)
+        self._video_pts_list: Optional[List[torch.Tensor]] = None
 
     def _init_from_metadata(self, metadata: Dict[str, Any]) -> None:
         self.video_paths = metadata["video_paths"]
         assert len(self.video_paths) == len(metadata["video_pts"])
-        self.video_pts = metadata["video_pts"]
         assert len(self.video_paths) == len(metadata["video_fps"])
-        self.video_fps = metadata["video_fps"]
+        self._set_frame_pts(metadata["video_pts"], metadata["video_fps"])
+
+    @property
+    def video_pts(self) -> List[torch.Tensor]:
+        """The pts of the frames of each video, as views of a single flat tensor."""
+        if self._video_pts_list is None:
+            self._video_pts_list = list(torch.split(self._video_pts, torch.diff(self._video_pts_offsets).tolist()))
+        return self._video_pts_list
+
+    @property
+    def video_fps(self) -> List[Optional[float]]:
+        """The frame rate of each video, or None for videos without video stream."""
+        return [None if math.isnan(fps) else fps for fps in self._video_fps.tolist()]
 
     @property
     def metadata(self) -> Dict[str, Any]:
@@ -178,8 +236,10 @@ class VideoClips:
 
     def subset(self, indices: List[int]) -> "VideoClips":
         video_paths = [self.video_paths[i] for i in indices]
-        video_pts = [self.video_pts[i] for i in indices]
-        video_fps = [self.video_fps[i] for i in indices]
+        all_video_pts = self.video_pts
+        video_pts = [all_video_pts[i] for i in indices]
+        all_video_fps = self.video_fps
+        video_fps = [all_video_fps[i] for i in indices]
         metadata = {
             "video_paths": video_paths,
             "video_pts": video_pts,
@@ -201,6 +261,18 @@ class VideoClips:
             output_format=self.output_format,
         )
 
+    def share_memory_(self) -> "VideoClips":
+        """Moves the metadata of the clips to shared memory, so that it isn't
+        copied when the instance is sent to processes which are not forked,
+        e.g. DataLoader workers using the "spawn" start method.
+        """
+        self._video_pts.share_memory_()
+        self._video_pts_offsets.share_memory_()
+        self._video_fps.share_memory_()
+        self._resampling_steps.share_memory_()
+        self.cumulative_sizes.share_memory_()
+        return self
+
     @staticmethod
     def compute_clips_for_video(
         video_pts: torch.Tensor, num_frames: int, step: int, fps: Optional[float], frame_rate: Optional[float] = None
@@ -241,14 +313,79 @@ class VideoClips:
         self.num_frames = num_frames
         self.step = step
         self.frame_rate = frame_rate
-        self.clips = []
-        self.resampling_idxs = []
-        for video_pts, fps in zip(self.video_pts, self.video_fps):
-            clips, idxs = self.compute_clips_for_video(video_pts, num_frames, step, fps, frame_rate)
-            self.clips.append(clips)
-            self.resampling_idxs.append(idxs)
-        clip_lengths = torch.as_tensor([len(v) for v in self.clips])
-        self.cumulative_sizes = clip_lengths.cumsum(0).tolist()
+
+        # The clips aren't stored: only their number per video is computed
+        # here, and their pts are computed on the fly by get_clip. This gives
+        # the same clips as compute_clips_for_video, in a vectorized way.
+        video_lengths = torch.diff(self._video_pts_offsets)
+        fps = torch.nan_to_num(self._video_fps, nan=1.0)
+        # The step, in frames of the original video, between two frames of the
+        # resampled video, for each video. Same logic as compute_clips_for_video.
+        resampling_steps = torch.ones_like(fps) if frame_rate is None else fps / frame_rate
+        # With an integer step s, the resampled video is video_pts[::s].
+        # Otherwise it has floor(len(video_pts) * frame_rate / fps) frames.
+        is_integer_step = resampling_steps == resampling_steps.round()
+        integer_steps = resampling_steps.round().clamp(min=1).to(torch.int64)
+        # In float64, like compute_clips_for_video which computes with Python floats
+        total_frames = video_lengths.to(torch.float64) * (fps if frame_rate is None else frame_rate) / fps
+        num_resampled_frames = torch.where(
+            is_integer_step,
+            torch.div(video_lengths + integer_steps - 1, integer_steps, rounding_mode="floor"),
+            total_frames.floor().to(torch.int64),
+        )
+        clips_per_video = (torch.div(num_resampled_frames - num_frames, step, rounding_mode="floor") + 1).clamp(min=0)
+        if (clips_per_video == 0).any():
+            warnings.warn(
+                "There aren't enough frames in the current video to get a clip for the given clip length and "
+                "frames between clips. The video (and potentially others) will be skipped."
+            )
+        self.cumulative_sizes = clips_per_video.cumsum(0)
+        self._resampling_steps = resampling_steps
+        self._clips_lists: Optional[Tuple[List[torch.Tensor], List[Union[List[slice], torch.Tensor]]]] = None
+
+    def _get_clips_lists(self) -> Tuple[List[torch.Tensor], List[Union[List[slice], torch.Tensor]]]:
+        if self._clips_lists is None:
+            clips, resampling_idxs = [], []
+            for video_idx in range(self.num_videos()):
+                video_clips, video_idxs = self._get_clips_for_video(video_idx)
+                clips.append(video_clips)
+                resampling_idxs.append(video_idxs)
+            self._clips_lists = clips, resampling_idxs
+        return self._clips_lists
+
+    @property
+    def clips(self) -> List[torch.Tensor]:
+        """The pts of the frames of each clip, for each video. They are
+        computed on first access: prefer :meth:`get_clip` or :meth:`num_clips_per_video`."""
+        return self._get_clips_lists()[0]
+
+    @property
+    def resampling_idxs(self) -> List[Union[List[slice], torch.Tensor]]:
+        """The indices of the frames of each clip in the original video, for
+        each video. They are computed on first access."""
+        return self._get_clips_lists()[1]
+
+    def _get_clips_for_video(self, video_idx: int) -> Tuple[torch.Tensor, Union[List[slice], torch.Tensor]]:
+        start, end = self._video_pts_offsets[video_idx : video_idx + 2].tolist()
+        fps = self._video_fps[video_idx].item()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return self.compute_clips_for_video(
+                self._video_pts[start:end],
+                self.num_frames,
+                self.step,
+                None if math.isnan(fps) else fps,
+                self.frame_rate,
+            )
+
+    def _get_clip_frame_idxs(self, video_idx: int, clip_idx: int) -> torch.Tensor:
+        # The indices in the original video of the frames of a clip
+        resampled_idxs = torch.arange(clip_idx * self.step, clip_idx * self.step + self.num_frames)
+        resampling_step = self._resampling_steps[video_idx].item()
+        if resampling_step.is_integer():
+            return resampled_idxs * int(resampling_step)
+        # Computed in float32 like _resample_video_idx, to get exactly the same frames
+        return (resampled_idxs.to(torch.float32) * resampling_step).floor().to(torch.int64)
 
     def __len__(self) -> int:
         return self.num_clips()
@@ -260,18 +397,24 @@ class VideoClips:
         """
         Number of subclips that are available in the video list.
         """
-        return self.cumulative_sizes[-1]
+        return int(self.cumulative_sizes[-1]) if len(self.cumulative_sizes) > 0 else 0
+
+    def num_clips_per_video(self) -> torch.Tensor:
+        """
+        Number of subclips that are available in each video, as an int64 tensor.
+        """
+        return torch.diff(self.cumulative_sizes, prepend=torch.zeros(1, dtype=torch.int64))
 
     def get_clip_location(self, idx: int) -> Tuple[int, int]:
         """
         Converts a flattened representation of the indices into a video_idx, clip_idx
         representation.
         """
-        video_idx = bisect.bisect_right(self.cumulative_sizes, idx)
+        video_idx = int(torch.searchsorted(self.cumulative_sizes, idx, right=True))
         if video_idx == 0:
             clip_idx = idx
         else:
-            clip_idx = idx - self.cumulative_sizes[video_idx - 1]
+            clip_idx = idx - int(self.cumulative_sizes[video_idx - 1])
         return video_idx, clip_idx
 
     @staticmethod
@@ -303,7 +446,8 @@ class VideoClips:
             raise IndexError(f"Index {idx} out of range ({self.num_clips()} number of clips)")
         video_idx, clip_idx = self.get_clip_location(idx)
         video_path = self.video_paths[video_idx]
-        clip_pts = self.clips[video_idx][clip_idx]
+        frame_idxs = self._get_clip_frame_idxs(video_idx, clip_idx)
+        clip_pts = self._video_pts[self._video_pts_offsets[video_idx] + frame_idxs]
 
         from torchvision import get_video_backend
 
@@ -311,12 +455,8 @@ class VideoClips:
 
         if backend == "pyav":
             # check for invalid options
-            if self._video_width != 0:
-                raise ValueError("pyav backend doesn't support _video_width != 0")
-            if self._video_height != 0:
-                raise ValueError("pyav backend doesn't support _video_height != 0")
-            if self._video_min_dimension != 0:
-                raise ValueError("pyav backend doesn't support _video_min_dimension != 0")
+            if (self._video_width == 0) != (self._video_height == 0):
+                raise ValueError("pyav backend doesn't support only one of _video_width and _video_height != 0")
             if self._video_max_dimension != 0:
                 raise ValueError("pyav backend doesn't support _video_max_dimension != 0")
             if self._audio_samples != 0:
@@ -325,7 +465,15 @@ class VideoClips:
         if backend == "pyav":
             start_pts = clip_pts[0].item()
             end_pts = clip_pts[-1].item()
-            video, audio, info = read_video(video_path, start_pts, end_pts)
+            video, audio, info = read_video(
+                video_path,
+                start_pts,
+                end_pts,
+                size=(self._video_height, self._video_width) if self._video_width != 0 else None,
+                min_dimension=self._video_min_dimension
+                if self._video_width == 0 and self._video_min_dimension
+                else None,
+            )
         else:
             _info = _probe_video_from_file(video_path)
             video_fps = _info.video_fps
@@ -361,10 +509,7 @@ class VideoClips:
                 info["audio_fps"] = audio_fps
 
         if self.frame_rate is not None:
-            resampling_idx = self.resampling_idxs[video_idx][clip_idx]
-            if isinstance(resampling_idx, torch.Tensor):
-                resampling_idx = resampling_idx - resampling_idx[0]
-            video = video[resampling_idx]
+            video = video[frame_idxs - frame_idxs[0]]
             info["video_fps"] = self.frame_rate
         assert len(video) == self.num_frames, f"{video.shape} x {self.num_frames}"
 
@@ -375,45 +520,239 @@ class VideoClips:
         return video, audio, info, video_idx
 
     def __getstate__(self) -> Dict[str, Any]:
-        video_pts_sizes = [len(v) for v in self.video_pts]
-        # To be back-compatible, we convert data to dtype torch.long as needed
-        # because for empty list, in legacy implementation, torch.as_tensor will
-        # use torch.float as default dtype. This happens when decoding fails and
-        # no pts is returned in the list.
-        video_pts = [x.to(torch.int64) for x in self.video_pts]
-        # video_pts can be an empty list if no frames have been decoded
-        if video_pts:
-            video_pts = torch.cat(video_pts)  # type: ignore[assignment]
-            # avoid bug in https://github.com/pytorch/pytorch/issues/32351
-            # TODO: Revert it once the bug is fixed.
-            video_pts = video_pts.numpy()  # type: ignore[attr-defined]
-
         # make a copy of the fields of self
         d = self.__dict__.copy()
-        d["video_pts_sizes"] = video_pts_sizes
-        d["video_pts"] = video_pts
-        # delete the following attributes to reduce the size of dictionary. They
-        # will be re-computed in "__setstate__()"
-        del d["clips"]
-        del d["resampling_idxs"]
-        del d["cumulative_sizes"]
+        # cumulative_sizes and the cached lists are re-computed in "__setstate__()"
+        for name in ("cumulative_sizes", "_resampling_steps", "_clips_lists", "_video_pts_list"):
+            del d[name]
 
         # for backwards-compatibility
-        d["_version"] = 2
+        d["_version"] = 3
         return d
 
     def __setstate__(self, d: Dict[str, Any]) -> None:
         # for backwards-compatibility
-        if "_version" not in d:
-            self.__dict__ = d
-            return
+        version = d.get("_version", 1)
+        if version < 3:
+            if version == 1:
+                video_pts = d.pop("video_pts")
+            else:
+                video_pts = torch.as_tensor(d.pop("video_pts"), dtype=torch.int64)
+                video_pts = torch.split(video_pts, d.pop("video_pts_sizes"), dim=0)
+            video_fps = d.pop("video_fps")
+            for name in ("clips", "resampling_idxs", "cumulative_sizes"):
+                d.pop(name, None)
+            d["_version"] = 3
 
-        video_pts = torch.as_tensor(d["video_pts"], dtype=torch.int64)
-        video_pts = torch.split(video_pts, d["video_pts_sizes"], dim=0)
-        # don't need this info anymore
-        del d["video_pts_sizes"]
-
-        d["video_pts"] = video_pts
         self.__dict__ = d
-        # recompute attributes "clips", "resampling_idxs" and other derivative ones
+        if version < 3:
+            self._set_frame_pts(video_pts, video_fps)
+        else:
+            self._video_pts_list = None
+        # recompute attributes "cumulative_sizes"
         self.compute_clips(self.num_frames, self.step, self.frame_rate)
+
+
+def _decode_clip_into(
+    path: str,
+    clip_pts: List[int],
+    out: np.ndarray,
+    size: Optional[Tuple[int, int]],
+    min_dimension: Optional[int],
+    crop: Optional[List[int]],
+) -> None:
+    # Decodes the frames of a clip, given their pts, into out of shape (T, H, W, C)
+    slots: Dict[int, List[int]] = {}
+    for i, pts in enumerate(clip_pts):
+        # A frame is used several times when the video is upsampled
+        slots.setdefault(pts, []).append(i)
+    remaining = set(slots)
+    end_pts = max(slots)
+
+    with av.open(path, metadata_errors="ignore") as container:
+        stream = container.streams.video[0]
+        # The parallelism comes from decoding several clips at once
+        stream.codec_context.thread_count = 1
+        # Some files don't seek to the right location: decode from the start if needed
+        for seek_pts in (min(slots), 0):
+            container.seek(seek_pts, backward=True, any_frame=False, stream=stream)
+            for frame in container.decode(stream):
+                if frame.pts is None:
+                    continue
+                if frame.pts in remaining:
+                    array = _video_frame_to_ndarray(frame, size, min_dimension, crop)
+                    if array.shape != out.shape[1:]:
+                        raise ValueError(
+                            f"The frames of {path} have size {array.shape[:2]}, which is not the size "
+                            f"{out.shape[1:3]} of the other clips. Pass size or crop to get clips of the same size."
+                        )
+                    for i in slots[frame.pts]:
+                        out[i] = array
+                    remaining.discard(frame.pts)
+                if not remaining or frame.pts >= end_pts:
+                    break
+            if not remaining:
+                return
+    raise RuntimeError(f"Failed to decode the frames at pts {sorted(remaining)} of {path}")
+
+
+class ClipBatchReader:
+    """
+    Decodes batches of clips of a :class:`VideoClips` concurrently, into a
+    single tensor.
+
+    The clips are decoded by a pool of threads in the calling process: PyAV
+    releases the GIL while demuxing, decoding and converting frames, so the
+    clips are decoded in parallel, and a single process can produce large
+    batches of clips, e.g. to feed a GPU. This relies on PyAV, whichever
+    video backend is selected, and only the video frames are decoded.
+
+    All the clips of a batch must have frames of the same size: pass ``size``,
+    or ``crop``, when the videos have different sizes.
+
+    The threads are stopped by :meth:`close`, when the reader is used as a
+    context manager, or when it is garbage collected.
+
+    Example:
+
+    .. code::
+
+        with ClipBatchReader(video_clips, size=(128, 171)) as reader:
+            for batch_idxs in sampler:
+                batch = reader.read([video_clips.get_clip_location(idx) for idx in batch_idxs])
+
+    Args:
+        video_clips (VideoClips): the clips to read from. The frames of each
+            clip are the ones returned by :meth:`VideoClips.get_clip`, including
+            when the clips are resampled to a ``frame_rate``.
+        num_threads (int, optional): the number of decoding threads. Default:
+            the number of CPUs.
+        size (tuple of int, optional): if specified, the frames are resized to
+            this ``(height, width)`` while they are decoded. See
+            :func:`~torchvision.io.read_video`.
+        min_dimension (int, optional): if specified, the frames are resized so
+            that their smaller edge is ``min_dimension``.
+        crop (list of int, optional): if specified, only the ``[top, left,
+            height, width]`` region of the (resized) frames is returned.
+    """
+
+    def __init__(
+        self,
+        video_clips: VideoClips,
+        num_threads: Optional[int] = None,
+        size: Optional[Tuple[int, int]] = None,
+        min_dimension: Optional[int] = None,
+        crop: Optional[List[int]] = None,
+    ) -> None:
+        _check_av_available()
+        _check_frame_size_options(size, min_dimension, crop)
+        self.video_clips = video_clips
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.size = size
+        self.min_dimension = min_dimension
+        self.crop = crop
+        self._executor = ThreadPoolExecutor(self.num_threads, thread_name_prefix="ClipBatchReader")
+        # The threads of the executor don't reference the reader
+        self._executor_finalizer = weakref.finalize(self, self._executor.shutdown)
+
+    def close(self) -> None:
+        """
+        Stops the decoding threads.
+        """
+        self._executor_finalizer()
+
+    def __enter__(self) -> "ClipBatchReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _get_frame_size(self, video_idx: int) -> Tuple[int, int]:
+        if self.crop is not None:
+            return self.crop[2], self.crop[3]
+        if self.size is not None:
+            return self.size[0], self.size[1]
+        with av.open(self.video_clips.video_paths[video_idx], metadata_errors="ignore") as container:
+            codec_context = container.streams.video[0].codec_context
+            return _get_frame_output_size(codec_context.height, codec_context.width, None, self.min_dimension)
+
+    def _get_batch_frame_size(self, video_idxs: List[int]) -> Tuple[int, int]:
+        if not video_idxs:
+            return 0, 0
+        if self.crop is not None or self.size is not None:
+            return self._get_frame_size(video_idxs[0])
+        sizes = {video_idx: self._get_frame_size(video_idx) for video_idx in sorted(set(video_idxs))}
+        if len(set(sizes.values())) > 1:
+            paths_and_sizes = ", ".join(f"{self.video_clips.video_paths[i]}: {size}" for i, size in sizes.items())
+            raise ValueError(
+                f"The frames of the videos of the batch have different sizes ({paths_and_sizes}). "
+                "Pass size or crop to get clips of the same size, e.g. size=(128, 171)."
+            )
+        return sizes[video_idxs[0]]
+
+    def read(self, clip_locations: List[Tuple[int, int]], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Decodes a batch of clips.
+
+        Args:
+            clip_locations (List[Tuple[int, int]]): the ``(video_idx, clip_idx)``
+                of the clips, as returned by :meth:`VideoClips.get_clip_location`.
+            out (Tensor, optional): a tensor to decode the clips into, e.g. the
+                tensor returned by a previous call, to reuse its memory. It must
+                have the shape and layout of the returned tensor.
+
+        Returns:
+            Tensor[B, T, H, W, C] or Tensor[B, T, C, H, W] (depending on the
+            ``output_format`` of the ``VideoClips``): the clips, as a uint8
+            tensor. With the "TCHW" format, this is a view of a contiguous
+            (B, T, H, W, C) tensor.
+        """
+        if not self._executor_finalizer.alive:
+            raise RuntimeError("The ClipBatchReader is closed")
+        video_clips = self.video_clips
+        num_clips_per_video = video_clips.num_clips_per_video()
+        for video_idx, clip_idx in clip_locations:
+            if not (0 <= video_idx < video_clips.num_videos() and 0 <= clip_idx < num_clips_per_video[video_idx]):
+                raise IndexError(f"There is no clip {clip_idx} in video {video_idx}")
+
+        height, width = self._get_batch_frame_size([video_idx for video_idx, _ in clip_locations])
+        shape = (len(clip_locations), video_clips.num_frames, height, width, 3)
+        channels_first = video_clips.output_format == "TCHW"
+        if out is None:
+            buffer = torch.empty(shape, dtype=torch.uint8)
+        else:
+            # [B,T,C,H,W] --> [B,T,H,W,C]
+            buffer = out.permute(0, 1, 3, 4, 2) if channels_first else out
+            if buffer.shape != shape or buffer.dtype != torch.uint8 or not buffer.is_contiguous():
+                expected_shape = (shape[0], shape[1], 3, height, width) if channels_first else shape
+                raise ValueError(
+                    f"out should be a uint8 tensor of shape {expected_shape}, which is a contiguous tensor of shape "
+                    f"{shape} if permuted to THWC, got a {out.dtype} tensor of shape {tuple(out.shape)}"
+                )
+
+        buffer_np = buffer.numpy()
+        futures = []
+        for i, (video_idx, clip_idx) in enumerate(clip_locations):
+            frame_idxs = video_clips._get_clip_frame_idxs(video_idx, clip_idx)
+            clip_pts = video_clips._video_pts[video_clips._video_pts_offsets[video_idx] + frame_idxs].tolist()
+            futures.append(
+                self._executor.submit(
+                    _decode_clip_into,
+                    video_clips.video_paths[video_idx],
+                    clip_pts,
+                    buffer_np[i],
+                    self.size,
+                    self.min_dimension,
+                    self.crop,
+                )
+            )
+        # Wait for all the clips, so that none is still being written into the
+        # output when an error is raised
+        wait(futures)
+        for future in futures:
+            future.result()
+
+        if channels_first:
+            # [B,T,H,W,C] --> [B,T,C,H,W]
+            return buffer.permute(0, 1, 4, 2, 3)
+        return buffer
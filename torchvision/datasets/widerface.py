@@ -7,7 +7,13 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import torch
 from PIL import Image
 
-from .utils import download_and_extract_archive, download_file_from_google_drive, extract_archive, verify_str_arg
+from .utils import (
+    _parse_int_rows,
+    download_and_extract_archive,
+    download_file_from_google_drive,
+    extract_archive,
+    verify_str_arg,
+)
 from .vision import VisionDataset
 
 
@@ -115,48 +121,42 @@ class WIDERFace(VisionDataset):
         filepath = os.path.join(self.root, "wider_face_split", filename)
 
         with open(filepath) as f:
-            lines = f.readlines()
-            file_name_line, num_boxes_line, box_annotation_line = True, False, False
-            num_boxes, box_counter = 0, 0
-            labels = []
-            for line in lines:
-                line = line.rstrip()
-                if file_name_line:
-                    img_path = os.path.join(self.root, "WIDER_" + self.split, "images", line)
-                    img_path = abspath(expanduser(img_path))
-                    file_name_line = False
-                    num_boxes_line = True
-                elif num_boxes_line:
-                    num_boxes = int(line)
-                    num_boxes_line = False
-                    box_annotation_line = True
-                elif box_annotation_line:
-                    box_counter += 1
-                    line_split = line.split(" ")
-                    line_values = [int(x) for x in line_split]
-                    labels.append(line_values)
-                    if box_counter >= num_boxes:
-                        box_annotation_line = False
-                        file_name_line = True
-                        labels_tensor = torch.tensor(labels)
-                        self.img_info.append(
-                            {
-                                "img_path": img_path,
-                                "annotations": {
-                                    "bbox": labels_tensor[:, 0:4].clone(),  # x, y, width, height
-                                    "blur": labels_tensor[:, 4].clone(),
-                                    "expression": labels_tensor[:, 5].clone(),
-                                    "illumination": labels_tensor[:, 6].clone(),
-                                    "occlusion": labels_tensor[:, 7].clone(),
-                                    "pose": labels_tensor[:, 8].clone(),
-                                    "invalid": labels_tensor[:, 9].clone(),
-                                },
-                            }
-                        )
-                        box_counter = 0
-                        labels.clear()
-                else:
-                    raise RuntimeError(f"Error parsing annotation file {filepath}")
+            lines = f.read().splitlines()
+
+        # Each image is described by its path, its number of boxes, and a line
+        # per box (a single line of zeros if it has no box). The lines of all
+        # the boxes are parsed at once.
+        img_paths, num_boxes, box_lines = [], [], []
+        i = 0
+        try:
+            while i < len(lines):
+                img_path = os.path.join(self.root, "WIDER_" + self.split, "images", lines[i].rstrip())
+                img_paths.append(abspath(expanduser(img_path)))
+                n = max(int(lines[i + 1]), 1)
+                num_boxes.append(n)
+                box_lines.extend(lines[i + 2 : i + 2 + n])
+                i += 2 + n
+            if len(box_lines) != sum(num_boxes):
+                raise ValueError("Missing box annotations")
+            boxes = torch.from_numpy(_parse_int_rows(box_lines))
+        except (IndexError, ValueError) as e:
+            raise RuntimeError(f"Error parsing annotation file {filepath}") from e
+
+        for img_path, labels_tensor in zip(img_paths, boxes.split(num_boxes)):
+            self.img_info.append(
+                {
+                    "img_path": img_path,
+                    "annotations": {
+                        "bbox": labels_tensor[:, 0:4].clone(),  # x, y, width, height
+                        "blur": labels_tensor[:, 4].clone(),
+                        "expression": labels_tensor[:, 5].clone(),
+                        "illumination": labels_tensor[:, 6].clone(),
+                        "occlusion": labels_tensor[:, 7].clone(),
+                        "pose": labels_tensor[:, 8].clone(),
+                        "invalid": labels_tensor[:, 9].clone(),
+                    },
+                }
+            )
 
     def parse_test_annotations_file(self) -> None:
         filepath = os.path.join(self.root, "wider_face_split", "wider_face_test_filelist.txt")
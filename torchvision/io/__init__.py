@@ -9,6 +9,7 @@ try:
 except ModuleNotFoundError:
     _HAS_GPU_VIDEO_DECODER = False
 
+from ._video_index import build_video_index, read_video_index, VideoIndexEntry
 from ._video_opt import (
     _HAS_CPU_VIDEO_DECODER,
     _HAS_VIDEO_OPT,
@@ -22,28 +23,42 @@ from ._video_opt import (
     VideoMetaData,
 )
 from .image import (
+    decode_and_preprocess,
     decode_gif,
     decode_image,
+    decode_image_async,
     decode_jpeg,
     decode_png,
+    decode_png_bands,
+    decode_tiff,
     decode_webp,
     encode_jpeg,
     encode_png,
+    get_io_num_threads,
+    ImageInfo,
     ImageReadMode,
     read_file,
     read_image,
+    read_image_async,
+    read_image_info,
+    set_io_num_threads,
     write_file,
     write_jpeg,
     write_png,
 )
-from .video import read_video, read_video_timestamps, write_video
+from .video import get_frames_at, read_video, read_video_timestamps, write_video
 from .video_reader import VideoReader
+from .video_writer import VideoWriter
 
 
 __all__ = [
     "write_video",
     "read_video",
     "read_video_timestamps",
+    "get_frames_at",
+    "build_video_index",
+    "read_video_index",
+    "VideoIndexEntry",
     "_read_video_from_file",
     "_read_video_timestamps_from_file",
     "_probe_video_from_file",
@@ -58,21 +73,31 @@ __all__ = [
     "VideoMetaData",
     "Timebase",
     "ImageReadMode",
+    "ImageInfo",
     "decode_image",
+    "decode_and_preprocess",
+    "decode_image_async",
+    "read_image_async",
+    "set_io_num_threads",
+    "get_io_num_threads",
     "decode_jpeg",
     "decode_png",
+    "decode_png_bands",
     "decode_heic",
+    "decode_tiff",
     "decode_webp",
     "decode_gif",
     "encode_jpeg",
     "encode_png",
     "read_file",
     "read_image",
+    "read_image_info",
     "write_file",
     "write_jpeg",
     "write_png",
     "Video",
     "VideoReader",
+    "VideoWriter",
 ]
 
 from .._internally_replaced_utils import IN_FBCODE
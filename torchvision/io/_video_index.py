@@ -0,0 +1,315 @@
+import os
+import threading
+import time
+import warnings
+from fractions import Fraction
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from .._utils import _load_npz_versioned, _save_npz_atomic
+from ..utils import _log_api_usage_once
+
+# Name of the index file stored in each directory of videos
+INDEX_FILENAME = ".torchvision_video_index.npz"
+_INDEX_VERSION = 1
+# While building an index, it is saved at this interval, in seconds, so that
+# an interrupted build can be resumed.
+_SAVE_INTERVAL = 60.0
+
+
+class VideoIndexEntry(NamedTuple):
+    """Index of a video, as returned by :func:`~torchvision.io.read_video_index`
+    and :func:`~torchvision.io.build_video_index`.
+
+    - pts: the presentation timestamps of the frames of the first video stream,
+      sorted, as an int64 tensor. They are the timestamps returned by
+      :func:`~torchvision.io.read_video_timestamps` with ``pts_unit="pts"``.
+    - keyframes: the indices in ``pts`` of the keyframes, as an int64 tensor.
+    - time_base: the time base of the video stream, i.e. the duration of one
+      unit of ``pts`` in seconds.
+    - fps: the average frame rate of the video stream, or None if the file has
+      no video stream.
+    - height, width: the size of the frames.
+    """
+
+    pts: torch.Tensor
+    keyframes: torch.Tensor
+    time_base: Fraction
+    fps: Optional[float]
+    height: int
+    width: int
+
+
+# (mtime_ns, size) of the file when it was indexed, and its index
+_Entry = Tuple[int, int, VideoIndexEntry]
+
+
+class _DirectoryIndex:
+    """
+    The indices of the videos of a directory. The indices loaded from the
+    index file are kept as the flat arrays of the file, and only sliced when
+    a video is looked up.
+    """
+
+    def __init__(self, arrays: Optional[Dict[str, np.ndarray]] = None) -> None:
+        self._arrays = arrays
+        self._rows: Dict[str, int] = {} if arrays is None else {n: i for i, n in enumerate(arrays["names"].tolist())}
+        # Entries added or updated since the index file was loaded
+        self._updates: Dict[str, _Entry] = {}
+
+    def copy(self) -> "_DirectoryIndex":
+        index = _DirectoryIndex()
+        index._arrays, index._rows, index._updates = self._arrays, self._rows, dict(self._updates)
+        return index
+
+    def names(self) -> List[str]:
+        return sorted(set(self._rows) | set(self._updates))
+
+    def get(self, name: str) -> Optional[_Entry]:
+        entry = self._updates.get(name)
+        if entry is not None:
+            return entry
+        i = self._rows.get(name)
+        if i is None or self._arrays is None:
+            return None
+        a = self._arrays
+        pts_offsets, keyframes_offsets = a["pts_offsets"], a["keyframes_offsets"]
+        return (
+            int(a["stats"][i, 0]),
+            int(a["stats"][i, 1]),
+            VideoIndexEntry(
+                pts=torch.from_numpy(a["pts"][pts_offsets[i] : pts_offsets[i + 1]]),
+                keyframes=torch.from_numpy(a["keyframes"][keyframes_offsets[i] : keyframes_offsets[i + 1]]),
+                time_base=Fraction(int(a["time_bases"][i, 0]), int(a["time_bases"][i, 1])),
+                fps=None if np.isnan(a["fps"][i]) else float(a["fps"][i]),
+                height=int(a["sizes"][i, 0]),
+                width=int(a["sizes"][i, 1]),
+            ),
+        )
+
+    def __setitem__(self, name: str, entry: _Entry) -> None:
+        self._updates[name] = entry
+
+    def save(self, index_path: str) -> None:
+        names = self.names()
+        values: List[_Entry] = []
+        for name in names:
+            value = self.get(name)
+            assert value is not None
+            values.append(value)
+        indices = [entry for _, _, entry in values]
+        arrays = {
+            "names": np.array(names, dtype=str),
+            "stats": np.array([[mtime_ns, size] for mtime_ns, size, _ in values], dtype=np.int64).reshape(-1, 2),
+            "pts": np.concatenate([np.zeros(0, dtype=np.int64)] + [e.pts.numpy() for e in indices]),
+            "pts_offsets": np.cumsum([0] + [len(e.pts) for e in indices], dtype=np.int64),
+            "keyframes": np.concatenate([np.zeros(0, dtype=np.int64)] + [e.keyframes.numpy() for e in indices]),
+            "keyframes_offsets": np.cumsum([0] + [len(e.keyframes) for e in indices], dtype=np.int64),
+            "time_bases": np.array(
+                [[e.time_base.numerator, e.time_base.denominator] for e in indices], dtype=np.int64
+            ).reshape(-1, 2),
+            "fps": np.array([np.nan if e.fps is None else e.fps for e in indices], dtype=np.float64),
+            "sizes": np.array([[e.height, e.width] for e in indices], dtype=np.int64).reshape(-1, 2),
+        }
+        _save_npz_atomic(index_path, _INDEX_VERSION, arrays)
+
+
+# Indices already loaded by this process: directory -> (mtime_ns of the index file, index)
+_loaded_indices: Dict[str, Tuple[int, _DirectoryIndex]] = {}
+_loaded_indices_lock = threading.Lock()
+
+
+def _get_directory_index(directory: str) -> _DirectoryIndex:
+    index_path = os.path.join(directory, INDEX_FILENAME)
+    try:
+        mtime_ns = os.stat(index_path).st_mtime_ns
+    except FileNotFoundError:
+        return _DirectoryIndex()
+    with _loaded_indices_lock:
+        loaded = _loaded_indices.get(directory)
+    if loaded is not None and loaded[0] == mtime_ns:
+        return loaded[1]
+    index = _DirectoryIndex(_load_npz_versioned(index_path, _INDEX_VERSION))
+    with _loaded_indices_lock:
+        _loaded_indices[directory] = (mtime_ns, index)
+    return index
+
+
+def _lookup(index: _DirectoryIndex, path: str) -> Optional[VideoIndexEntry]:
+    value = index.get(os.path.basename(path))
+    if value is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    mtime_ns, size, entry = value
+    # The video changed since it was indexed
+    if (mtime_ns, size) != (st.st_mtime_ns, st.st_size):
+        return None
+    return entry
+
+
+def read_video_index(filename: str) -> Optional[VideoIndexEntry]:
+    """
+    Returns the index of a video, as stored by
+    :func:`~torchvision.io.build_video_index`.
+
+    The index of the videos of a directory is stored in a
+    ``.torchvision_video_index.npz`` file in that directory. It is loaded once
+    per process and reloaded when it changes. The index of a video is only
+    valid if the modification time and size of the video didn't change since
+    it was indexed.
+
+    Args:
+        filename (str): path to the video file.
+
+    Returns:
+        (VideoIndexEntry, optional): the index of the video, or None if the
+        video isn't indexed or changed since it was indexed.
+    """
+    if not isinstance(filename, (str, os.PathLike)):
+        return None
+    filename = os.path.abspath(filename)
+    return _lookup(_get_directory_index(os.path.dirname(filename)), filename)
+
+
+def _index_video(filename: str) -> VideoIndexEntry:
+    from .video import _can_read_timestamps_from_packets, _check_av_available, av
+
+    _check_av_available()
+    frames: List[Tuple[int, bool]] = []
+    time_base, fps, height, width = Fraction(1, 1), None, 0, 0
+    try:
+        with av.open(filename, metadata_errors="ignore") as container:
+            if container.streams.video:
+                stream = container.streams.video[0]
+                time_base = stream.time_base
+                fps = float(stream.average_rate) if stream.average_rate is not None else None
+                height, width = stream.codec_context.height, stream.codec_context.width
+                # Same logic as read_video_timestamps, so that the pts match
+                try:
+                    if _can_read_timestamps_from_packets(container):
+                        frames = [(p.pts, p.is_keyframe) for p in container.demux(stream) if p.pts is not None]
+                    else:
+                        frames = [(f.pts, f.key_frame) for f in container.decode(stream) if f.pts is not None]
+                except av.AVError:
+                    warnings.warn(f"Failed decoding frames for file {filename}")
+    except av.AVError as e:
+        warnings.warn(f"Failed to open container for {filename}; Caught error: {e}", RuntimeWarning)
+
+    frames.sort()
+    return VideoIndexEntry(
+        pts=torch.tensor([pts for pts, _ in frames], dtype=torch.int64),
+        keyframes=torch.tensor([i for i, (_, is_keyframe) in enumerate(frames) if is_keyframe], dtype=torch.int64),
+        time_base=time_base,
+        fps=fps,
+        height=height,
+        width=width,
+    )
+
+
+class _IndexVideosDataset:
+    """
+    Dataset used to parallelize the indexing of videos in
+    build_video_index. Defined at top level, so it can be pickled when forking.
+    """
+
+    def __init__(self, video_paths: List[str]) -> None:
+        self.video_paths = video_paths
+
+    def __len__(self) -> int:
+        return len(self.video_paths)
+
+    def __getitem__(self, idx: int) -> Tuple[int, int, VideoIndexEntry]:
+        path = self.video_paths[idx]
+        # Stat the file before indexing it, so that a video modified while it
+        # is being indexed is indexed again next time.
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size, _index_video(path)
+
+
+def _collate_fn(x):
+    return x
+
+
+def build_video_index(video_paths: Sequence[str], num_workers: int = 0) -> List[VideoIndexEntry]:
+    """
+    Builds or updates the indices of videos, and returns them.
+
+    The index of a video holds the presentation timestamps of its frames, the
+    positions of its keyframes, its time base, frame rate and frame size (see
+    :class:`~torchvision.io.VideoIndexEntry`). Indices are stored in a
+    ``.torchvision_video_index.npz`` file in the directory of each video, so
+    that they are only computed once: only the videos which are not indexed
+    yet, or which changed since they were indexed, are indexed. The index
+    files are saved periodically while indexing, so an interrupted build can
+    be resumed. If a directory is not writable, the indices of its videos are
+    still computed and returned, but not saved.
+
+    Once built, the indices are used by :func:`~torchvision.io.read_video_timestamps`
+    and :func:`~torchvision.io.get_frames_at` (which then don't need to
+    demux or decode the whole video), by the pyav backend of
+    :class:`~torchvision.io.VideoReader` (to seek accurately), and by
+    :class:`~torchvision.datasets.video_utils.VideoClips`.
+
+    Indexing relies on PyAV, whichever video backend is selected.
+
+    Args:
+        video_paths (List[str]): paths to the video files.
+        num_workers (int): how many subprocesses to use to index the videos.
+            0 means that they are indexed in the main process. (default: 0)
+
+    Returns:
+        (List[VideoIndexEntry]): the indices of the videos.
+    """
+    _log_api_usage_once(build_video_index)
+    abs_paths = [os.path.abspath(p) for p in video_paths]
+
+    directory_indices: Dict[str, _DirectoryIndex] = {}
+    results: List[Optional[VideoIndexEntry]] = []
+    to_index = []
+    for i, path in enumerate(abs_paths):
+        directory = os.path.dirname(path)
+        if directory not in directory_indices:
+            # Copy, as the loaded indices are shared
+            directory_indices[directory] = _get_directory_index(directory).copy()
+        entry = _lookup(directory_indices[directory], path)
+        results.append(entry)
+        if entry is None:
+            to_index.append(i)
+
+    if to_index:
+        import torch.utils.data
+        from torch.utils.model_zoo import tqdm
+
+        dl: torch.utils.data.DataLoader = torch.utils.data.DataLoader(
+            _IndexVideosDataset([abs_paths[i] for i in to_index]),  # type: ignore[arg-type]
+            batch_size=16,
+            num_workers=num_workers,
+            collate_fn=_collate_fn,
+        )
+        dirty_directories = set()
+        last_save = time.monotonic()
+        it = iter(to_index)
+        with tqdm(total=len(to_index)) as pbar:
+            for batch in dl:
+                pbar.update(len(batch))
+                for mtime_ns, size, entry in batch:
+                    i = next(it)
+                    directory = os.path.dirname(abs_paths[i])
+                    directory_indices[directory][os.path.basename(abs_paths[i])] = (mtime_ns, size, entry)
+                    dirty_directories.add(directory)
+                    results[i] = entry
+                # Saving rewrites the whole index files: only do it periodically
+                if time.monotonic() - last_save >= _SAVE_INTERVAL:
+                    for directory in dirty_directories:
+                        directory_indices[directory].save(os.path.join(directory, INDEX_FILENAME))
+                    dirty_directories.clear()
+                    last_save = time.monotonic()
+        for directory in dirty_directories:
+            directory_indices[directory].save(os.path.join(directory, INDEX_FILENAME))
+
+    return results  # type: ignore[return-value]
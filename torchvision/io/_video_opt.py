@@ -436,6 +436,9 @@ def _read_video(
     start_pts: Union[float, Fraction] = 0,
     end_pts: Optional[Union[float, Fraction]] = None,
     pts_unit: str = "pts",
+    video_width: int = 0,
+    video_height: int = 0,
+    video_min_dimension: int = 0,
 ) -> Tuple[torch.Tensor, torch.Tensor, Dict[str, float]]:
     if end_pts is None:
         end_pts = float("inf")
@@ -477,6 +480,9 @@ def _read_video(
     vframes, aframes, info = _read_video_from_file(
         filename,
         read_video_stream=True,
+        video_width=video_width,
+        video_height=video_height,
+        video_min_dimension=video_min_dimension,
         video_pts_range=video_pts_range,
         video_timebase=video_timebase,
         read_audio_stream=True,
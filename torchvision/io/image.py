@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List, Union
+from typing import Iterator, List, NamedTuple, Optional, Union
 from warnings import warn
 
 import torch
@@ -49,19 +49,53 @@ class ImageReadMode(Enum):
     RGBA = RGB_ALPHA  # Alias for convenience
 
 
-def read_file(path: str) -> torch.Tensor:
+def _target_size_to_list(target_size: Optional[List[int]]) -> List[int]:
+    if target_size is None:
+        return []
+    if len(target_size) not in (1, 2):
+        raise ValueError(f"target_size must be a list of 1 or 2 integers, got {target_size}")
+    return target_size
+
+
+def _crop_to_list(crop: Optional[List[int]]) -> List[int]:
+    if crop is None:
+        return []
+    return crop
+
+
+def _filenames_to_list(filename: Union[str, List[str]], num_images: int) -> List[str]:
+    if not isinstance(filename, list) or len(filename) != num_images:
+        raise ValueError(f"filename must be a list of {num_images} paths when input is a list of {num_images} tensors")
+    return [str(f) for f in filename]
+
+
+def read_file(path: str, offset: int = 0, length: Optional[int] = None, mmap: bool = True) -> torch.Tensor:
     """
     Return the bytes contents of a file as a uint8 1D Tensor.
 
+    ``offset`` and ``length`` allow to read a single record out of a larger file,
+    e.g. an image stored in a shard file holding many images. The returned
+    tensor can be passed as-is to the decoding functions.
+
     Args:
         path (str or ``pathlib.Path``): the path to the file to be read
+        offset (int): position of the first byte to read. Default: 0.
+        length (int, optional): number of bytes to read. Default: None, which
+            reads until the end of the file.
+        mmap (bool): If True (default), the file is memory-mapped and the
+            returned tensor is a view on the requested bytes: nothing is copied
+            and only the accessed pages are read from disk. The mapping is
+            private, so modifying the tensor doesn't modify the file. If False,
+            the requested bytes are read into a newly allocated tensor, which
+            doesn't keep the file mapped. Memory mapping isn't supported on
+            Windows, where this parameter is ignored.
 
     Returns:
         data (Tensor)
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(read_file)
-    data = torch.ops.image.read_file(str(path))
+    data = torch.ops.image.read_file(str(path), offset, -1 if length is None else length, mmap)
     return data
 
 
@@ -82,6 +116,7 @@ def decode_png(
     input: torch.Tensor,
     mode: ImageReadMode = ImageReadMode.UNCHANGED,
     apply_exif_orientation: bool = False,
+    out: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """
     Decodes a PNG image into a 3 dimensional RGB or grayscale Tensor.
@@ -102,54 +137,187 @@ def decode_png(
             for available modes.
         apply_exif_orientation (bool): apply EXIF orientation transformation to the output tensor.
             Default: False.
+        out (Tensor[image_channels, image_height, image_width], optional): A
+            preallocated CPU tensor to decode the image into, e.g. a reusable
+            (and possibly pinned) buffer. See :func:`~torchvision.io.decode_image`.
+            Default: None.
 
     Returns:
-        output (Tensor[image_channels, image_height, image_width])
+        output (Tensor[image_channels, image_height, image_width]): the decoded
+        image, which is ``out`` if it was passed.
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(decode_png)
     if isinstance(mode, str):
         mode = ImageReadMode[mode.upper()]
-    output = torch.ops.image.decode_png(input, mode.value, apply_exif_orientation)
+    output = torch.ops.image.decode_png(input, mode.value, apply_exif_orientation, out)
     return output
 
 
-def encode_png(input: torch.Tensor, compression_level: int = 6) -> torch.Tensor:
+def decode_png_bands(
+    input: Union[torch.Tensor, str],
+    band_height: int = 256,
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    out: Optional[torch.Tensor] = None,
+) -> Iterator[torch.Tensor]:
+    """
+    Decodes a PNG image band by band, from top to bottom.
+
+    This returns an iterator over horizontal bands of the image, which are
+    decoded lazily: only one band is decoded at a time, so the whole image is
+    never held in memory. This is useful for very large images, e.g. to tile
+    them or to reduce them on the fly. The bands are the same as the
+    corresponding rows of :func:`~torchvision.io.decode_png`, in uint8 or in
+    uint16 for 16-bit images.
+
+    .. note::
+        Interlaced PNG images can't be decoded row by row: they are fully
+        decoded when the iterator is created, and the bands are then copied
+        from the decoded image.
+
+    .. note::
+        The EXIF orientation is not applied to the bands. This function
+        doesn't support torchscript.
+
+    Args:
+        input (Tensor[1] or str or ``pathlib.Path``): a one dimensional uint8
+            tensor containing the raw bytes of the PNG image, or a path to the
+            PNG file. Paths are memory-mapped (see
+            :func:`~torchvision.io.read_file`), so the encoded file isn't loaded
+            in memory either.
+        band_height (int): The number of rows of each band. The last band may
+            have fewer rows. Default: 256.
+        mode (str or ImageReadMode): The mode to convert the image to, e.g. "RGB".
+            Default is "UNCHANGED".  See :class:`~torchvision.io.ImageReadMode`
+            for available modes.
+        out (Tensor[image_channels, band_height, image_width], optional): A
+            tensor to decode the bands into, which avoids allocating a new
+            tensor for each band. The yielded bands are then views of ``out``
+            which are overwritten by the next band, so they must be consumed
+            (or copied) before moving to the next one. Decoding is fastest when
+            ``out`` is channels-last, i.e. when ``out.permute(1, 2, 0)`` is
+            contiguous. Default: None.
+
+    Returns:
+        bands (Iterator[Tensor[image_channels, rows, image_width]]): the bands of the image.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(decode_png_bands)
+    if not isinstance(input, torch.Tensor):
+        input = read_file(str(input))
+    if isinstance(mode, str):
+        mode = ImageReadMode[mode.upper()]
+    if band_height < 1:
+        raise ValueError(f"band_height must be a positive integer, got {band_height}")
+
+    # The decoder is created here rather than in the generator, so that errors
+    # are raised when calling this function.
+    decoder = torch.classes.image.PngBandDecoder(input, mode.value)
+    height, width, num_channels, bit_depth = decoder.get_info()
+    dtype = torch.uint16 if bit_depth == 16 else torch.uint8
+    if out is not None:
+        if out.shape != (num_channels, band_height, width) or out.dtype != dtype:
+            raise ValueError(
+                f"out must be a {dtype} tensor of shape {(num_channels, band_height, width)}, "
+                f"got a {out.dtype} tensor of shape {tuple(out.shape)}"
+            )
+    return _iter_png_bands(decoder, height, width, num_channels, dtype, band_height, out)
+
+
+def _iter_png_bands(
+    decoder,
+    height: int,
+    width: int,
+    num_channels: int,
+    dtype: torch.dtype,
+    band_height: int,
+    out: Optional[torch.Tensor],
+) -> Iterator[torch.Tensor]:
+    # The decoder writes rows in HWC layout. If out isn't channels-last, we
+    # decode into a single band buffer and copy from there.
+    band_buffer = None
+    if out is not None:
+        out_hwc = out.permute(1, 2, 0)
+        band_buffer = (
+            out_hwc if out_hwc.is_contiguous() else torch.empty_like(out_hwc, memory_format=torch.contiguous_format)
+        )
+
+    for top in range(0, height, band_height):
+        num_rows = min(band_height, height - top)
+        if out is None:
+            band = torch.empty((num_rows, width, num_channels), dtype=dtype)
+            decoder.decode_rows_into(band)
+            yield band.permute(2, 0, 1)
+        else:
+            decoder.decode_rows_into(band_buffer[:num_rows])
+            if band_buffer.data_ptr() != out.data_ptr():
+                out[:, :num_rows].copy_(band_buffer[:num_rows].permute(2, 0, 1))
+            yield out[:, :num_rows]
+
+
+def encode_png(
+    input: Union[torch.Tensor, List[torch.Tensor]], compression_level: int = 6, num_threads: int = 0
+) -> Union[torch.Tensor, List[torch.Tensor]]:
     """
-    Takes an input tensor in CHW layout and returns a buffer with the contents
-    of its corresponding PNG file.
+    Takes (a list of) input tensor(s) in CHW layout and returns (a list of)
+    buffer(s) with the contents of the corresponding PNG file(s).
 
     Args:
-        input (Tensor[channels, image_height, image_width]): int8 image tensor of
-            ``c`` channels, where ``c`` must 3 or 1.
+        input (Tensor[channels, image_height, image_width] or List[Tensor[channels, image_height, image_width]]):
+            (list of) int8 image tensor(s) of ``c`` channels, where ``c`` must 3 or 1.
         compression_level (int): Compression factor for the resulting file, it must be a number
             between 0 and 9. Default: 6
+        num_threads (int): The number of threads used to encode a list of
+            images in parallel. Default: 0, which uses all the intra-op
+            threads (see :func:`torch.get_num_threads`). Ignored when a
+            single tensor is passed.
 
     Returns:
-        Tensor[1]: A one dimensional int8 tensor that contains the raw bytes of the
-            PNG file.
+        Tensor[1] or list[Tensor[1]]: A (list of) one dimensional int8 tensor(s) that contain the raw bytes of the
+            PNG file(s).
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(encode_png)
+    if isinstance(input, list):
+        return torch.ops.image.encode_pngs(input, compression_level, num_threads)
     output = torch.ops.image.encode_png(input, compression_level)
     return output
 
 
-def write_png(input: torch.Tensor, filename: str, compression_level: int = 6):
+def write_png(
+    input: Union[torch.Tensor, List[torch.Tensor]],
+    filename: Union[str, List[str]],
+    compression_level: int = 6,
+    num_threads: int = 0,
+):
     """
-    Takes an input tensor in CHW layout (or HW in the case of grayscale images)
-    and saves it in a PNG file.
+    Takes (a list of) input tensor(s) in CHW layout (or HW in the case of
+    grayscale images) and saves them in PNG file(s).
+
+    When a list of images is passed, the images are encoded and written in
+    parallel, each image being written as soon as it is encoded.
 
     Args:
-        input (Tensor[channels, image_height, image_width]): int8 image tensor of
-            ``c`` channels, where ``c`` must be 1 or 3.
-        filename (str or ``pathlib.Path``): Path to save the image.
+        input (Tensor[channels, image_height, image_width] or List[Tensor[channels, image_height, image_width]]):
+            (list of) int8 image tensor(s) of ``c`` channels, where ``c`` must be 1 or 3.
+        filename (str or ``pathlib.Path`` or list of these): Path(s) to save
+            the image(s). Must be a list of the same length as ``input`` if
+            ``input`` is a list.
         compression_level (int): Compression factor for the resulting file, it must be a number
             between 0 and 9. Default: 6
+        num_threads (int): The number of threads used for a list of images.
+            Default: 0, which uses all the intra-op threads (see
+            :func:`torch.get_num_threads`).
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(write_png)
+    if isinstance(input, list):
+        torch.ops.image.write_pngs(input, _filenames_to_list(filename, len(input)), compression_level, num_threads)
+        return
+    if isinstance(filename, list):
+        raise ValueError("filename must be a single path when input is a single tensor")
     output = encode_png(input, compression_level)
+    assert isinstance(output, torch.Tensor)  # Needed for torchscript
     write_file(filename, output)
 
 
@@ -158,14 +326,19 @@ def decode_jpeg(
     mode: ImageReadMode = ImageReadMode.UNCHANGED,
     device: Union[str, torch.device] = "cpu",
     apply_exif_orientation: bool = False,
+    num_threads: int = 0,
+    target_size: Optional[List[int]] = None,
+    crop: Optional[List[int]] = None,
+    out: Optional[torch.Tensor] = None,
 ) -> Union[torch.Tensor, List[torch.Tensor]]:
     """Decode JPEG image(s) into 3D RGB or grayscale Tensor(s), on CPU or CUDA.
 
     The values of the output tensor are uint8 between 0 and 255.
 
     .. note::
-        When using a CUDA device, passing a list of tensors is more efficient than repeated individual calls to ``decode_jpeg``.
-        When using CPU the performance is equivalent.
+        Passing a list of tensors is more efficient than repeated individual calls to ``decode_jpeg``.
+        On CUDA the images are decoded as a batch. On CPU they are decoded in parallel
+        on PyTorch's intra-op thread pool (see ``num_threads``), without holding the GIL.
         The CUDA version of this function has explicitly been designed with thread-safety in mind.
         This function does not return partial results in case of an error.
 
@@ -188,11 +361,56 @@ def decode_jpeg(
                 Make sure to rely on CUDA 11.6 or above before using ``device="cuda"``.
         apply_exif_orientation (bool): apply EXIF orientation transformation to the output tensor.
             Default: False. Only implemented for JPEG format on CPU.
+        num_threads (int): Maximum number of threads used to decode a list of
+            images on CPU. Default: 0, which means all the threads of PyTorch's
+            intra-op thread pool (see :func:`torch.get_num_threads`). The
+            intra-op thread pool bounds the number of threads that can
+            actually be used, so within ``DataLoader`` workers (where it is set
+            to 1 by default) you may want to call :func:`torch.set_num_threads`
+            in the ``worker_init_fn``. Ignored for CUDA and single-tensor inputs.
+        target_size (list of int, optional): Minimum size of the decoded image(s),
+            following the semantics of the ``size`` parameter of
+            :class:`~torchvision.transforms.v2.Resize`: ``[h, w]`` or ``[size]``
+            for the smaller edge. When set, the image is downscaled by the
+            largest factor among 1/2, 1/4 and 1/8 for which it is still at least
+            as large as ``target_size``, directly in the inverse DCT. This is
+            much faster than decoding the full image and resizing it
+            afterwards, but the output size isn't exactly ``target_size``: you
+            still need to resize it. Default: None (no downscaling). Only
+            implemented on CPU.
+
+            .. note::
+                A typical use is to pass the ``size`` of the
+                :class:`~torchvision.transforms.v2.Resize` transform that
+                follows the decoding step, e.g. ``decode_jpeg(data,
+                target_size=resize.size)``.
+        crop (list of int, optional): Region of the image to decode, as
+            ``[top, left, height, width]`` in the coordinates of the full size
+            image. Only the parts of the JPEG bitstream covering this region
+            are decoded, which is much faster than decoding the whole image and
+            cropping it afterwards, e.g. for
+            :class:`~torchvision.transforms.v2.RandomResizedCrop`. When
+            ``target_size`` is also passed, it applies to the cropped region
+            and the crop boundaries are rounded outwards to the downscaled
+            pixel grid. Default: None (decode the whole image). Only supported
+            for single images on CPU, and not together with
+            ``apply_exif_orientation=True``.
+        out (Tensor, optional): A preallocated CPU tensor to decode the
+            image(s) into, e.g. a reusable (and possibly pinned) buffer. For a
+            single image, see :func:`~torchvision.io.decode_image`. For a list
+            of images, ``out`` must be a batch tensor of shape
+            ``(len(input), image_channels, image_height, image_width)``, into
+            which all the images are decoded: the images must all have the same
+            decoded size. Use the ``torch.channels_last`` memory format (NHWC)
+            to decode the images in place. Default: None. Only supported on
+            CPU.
 
     Returns:
         output (Tensor[image_channels, image_height, image_width] or list[Tensor[image_channels, image_height, image_width]]):
             The values of the output tensor(s) are uint8 between 0 and 255.
-            ``output.device`` will be set to the specified ``device``
+            ``output.device`` will be set to the specified ``device``. If
+            ``out`` was passed, the output is ``out`` (or, for a list of
+            images, the list of ``out[i]``).
 
 
     """
@@ -206,38 +424,60 @@ def decode_jpeg(
     if isinstance(input, list):
         if len(input) == 0:
             raise ValueError("Input list must contain at least one element")
+        if crop is not None:
+            raise ValueError("crop is only supported when decoding a single image")
         if not all(isinstance(t, torch.Tensor) for t in input):
             raise ValueError("All elements of the input list must be tensors.")
         if not all(t.device.type == "cpu" for t in input):
             raise ValueError("Input list must contain tensors on CPU.")
         if device.type == "cuda":
+            if out is not None:
+                raise ValueError("out is not supported on CUDA")
             return torch.ops.image.decode_jpegs_cuda(input, mode.value, device)
         else:
-            return [torch.ops.image.decode_jpeg(img, mode.value, apply_exif_orientation) for img in input]
+            return torch.ops.image.decode_jpegs(
+                input, mode.value, apply_exif_orientation, num_threads, _target_size_to_list(target_size), out
+            )
 
     else:  # input is tensor
         if input.device.type != "cpu":
             raise ValueError("Input tensor must be a CPU tensor")
         if device.type == "cuda":
+            if crop is not None:
+                raise ValueError("crop is not supported on CUDA")
+            if out is not None:
+                raise ValueError("out is not supported on CUDA")
             return torch.ops.image.decode_jpegs_cuda([input], mode.value, device)[0]
         else:
-            return torch.ops.image.decode_jpeg(input, mode.value, apply_exif_orientation)
+            return torch.ops.image.decode_jpeg(
+                input,
+                mode.value,
+                apply_exif_orientation,
+                _target_size_to_list(target_size),
+                _crop_to_list(crop),
+                out,
+            )
 
 
 def encode_jpeg(
-    input: Union[torch.Tensor, List[torch.Tensor]], quality: int = 75
+    input: Union[torch.Tensor, List[torch.Tensor]], quality: int = 75, num_threads: int = 0
 ) -> Union[torch.Tensor, List[torch.Tensor]]:
     """Encode RGB tensor(s) into raw encoded jpeg bytes, on CPU or CUDA.
 
     .. note::
-        Passing a list of CUDA tensors is more efficient than repeated individual calls to ``encode_jpeg``.
-        For CPU tensors the performance is equivalent.
+        Passing a list of tensors is more efficient than repeated individual
+        calls to ``encode_jpeg``: CUDA tensors are encoded in a single batch,
+        and CPU tensors are encoded in parallel over ``num_threads`` threads.
 
     Args:
         input (Tensor[channels, image_height, image_width] or List[Tensor[channels, image_height, image_width]]):
             (list of) uint8 image tensor(s) of ``c`` channels, where ``c`` must be 1 or 3
         quality (int): Quality of the resulting JPEG file(s). Must be a number between
             1 and 100. Default: 75
+        num_threads (int): The number of threads used to encode a list of CPU
+            tensors in parallel. Default: 0, which uses all the intra-op
+            threads (see :func:`torch.get_num_threads`). Ignored for CUDA
+            tensors or when a single tensor is passed.
 
     Returns:
         output (Tensor[1] or list[Tensor[1]]): A (list of) one dimensional uint8 tensor(s) that contain the raw bytes of the JPEG file.
@@ -252,7 +492,7 @@ def encode_jpeg(
         if input[0].device.type == "cuda":
             return torch.ops.image.encode_jpegs_cuda(input, quality)
         else:
-            return [torch.ops.image.encode_jpeg(image, quality) for image in input]
+            return torch.ops.image.encode_jpegs(input, quality, num_threads)
     else:  # single input tensor
         if input.device.type == "cuda":
             return torch.ops.image.encode_jpegs_cuda([input], quality)[0]
@@ -260,19 +500,44 @@ def encode_jpeg(
             return torch.ops.image.encode_jpeg(input, quality)
 
 
-def write_jpeg(input: torch.Tensor, filename: str, quality: int = 75):
+def write_jpeg(
+    input: Union[torch.Tensor, List[torch.Tensor]],
+    filename: Union[str, List[str]],
+    quality: int = 75,
+    num_threads: int = 0,
+):
     """
-    Takes an input tensor in CHW layout and saves it in a JPEG file.
+    Takes (a list of) input tensor(s) in CHW layout and saves them in JPEG file(s).
+
+    When a list of CPU images is passed, the images are encoded and written in
+    parallel, each image being written as soon as it is encoded.
 
     Args:
-        input (Tensor[channels, image_height, image_width]): int8 image tensor of ``c``
-            channels, where ``c`` must be 1 or 3.
-        filename (str or ``pathlib.Path``): Path to save the image.
+        input (Tensor[channels, image_height, image_width] or List[Tensor[channels, image_height, image_width]]):
+            (list of) int8 image tensor(s) of ``c`` channels, where ``c`` must be 1 or 3.
+        filename (str or ``pathlib.Path`` or list of these): Path(s) to save
+            the image(s). Must be a list of the same length as ``input`` if
+            ``input`` is a list.
         quality (int): Quality of the resulting JPEG file, it must be a number
             between 1 and 100. Default: 75
+        num_threads (int): The number of threads used for a list of CPU
+            images. Default: 0, which uses all the intra-op threads (see
+            :func:`torch.get_num_threads`).
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(write_jpeg)
+    if isinstance(input, list):
+        filenames = _filenames_to_list(filename, len(input))
+        if input and input[0].device.type == "cuda":
+            outputs = encode_jpeg(input, quality)
+            assert isinstance(outputs, list)  # Needed for torchscript
+            for output, path in zip(outputs, filenames):
+                write_file(path, output)
+        else:
+            torch.ops.image.write_jpegs(input, filenames, quality, num_threads)
+        return
+    if isinstance(filename, list):
+        raise ValueError("filename must be a single path when input is a single tensor")
     output = encode_jpeg(input, quality)
     assert isinstance(output, torch.Tensor)  # Needed for torchscript
     write_file(filename, output)
@@ -282,12 +547,16 @@ def decode_image(
     input: Union[torch.Tensor, str],
     mode: ImageReadMode = ImageReadMode.UNCHANGED,
     apply_exif_orientation: bool = False,
+    target_size: Optional[List[int]] = None,
+    out: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """Decode an image into a uint8 tensor, from a path or from raw encoded bytes.
 
-    Currently supported image formats are jpeg, png, gif and webp.
+    Currently supported image formats are jpeg, png, gif, tiff and webp.
 
     The values of the output tensor are in uint8 in [0, 255] for most cases.
+    TIFF images are decoded with the dtype of their samples, see
+    :func:`~torchvision.io.decode_tiff`.
 
     If the image is a 16-bit png, then the output tensor is uint16 in [0, 65535]
     (supported from torchvision ``0.21``). Since uint16 support is limited in
@@ -305,9 +574,24 @@ def decode_image(
             for available modes.
         apply_exif_orientation (bool): apply EXIF orientation transformation to the output tensor.
            Only applies to JPEG and PNG images. Default: False.
+        target_size (list of int, optional): Minimum size of the decoded image,
+            allowing JPEG images to be downscaled during decoding. See
+            :func:`~torchvision.io.decode_jpeg` for details. Ignored for other
+            formats. Default: None.
+        out (Tensor[image_channels, image_height, image_width], optional): A
+            preallocated CPU tensor to decode the image into, e.g. a reusable
+            (and possibly pinned) buffer, or a slice of a batch tensor. Its
+            shape and dtype must be those of the decoded image, which can be
+            found with :func:`~torchvision.io.read_image_info`. JPEG, PNG and
+            WEBP images are decoded directly into ``out`` when it is
+            channels-last, i.e. when ``out.permute(1, 2, 0)`` is contiguous,
+            unless the EXIF orientation has to be applied. Otherwise the image
+            is decoded into a temporary tensor and then copied into ``out``.
+            Default: None.
 
     Returns:
-        output (Tensor[image_channels, image_height, image_width])
+        output (Tensor[image_channels, image_height, image_width]): the decoded
+        image, which is ``out`` if it was passed.
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(decode_image)
@@ -315,7 +599,9 @@ def decode_image(
         input = read_file(str(input))
     if isinstance(mode, str):
         mode = ImageReadMode[mode.upper()]
-    output = torch.ops.image.decode_image(input, mode.value, apply_exif_orientation)
+    output = torch.ops.image.decode_image(
+        input, mode.value, apply_exif_orientation, _target_size_to_list(target_size), out
+    )
     return output
 
 
@@ -331,6 +617,270 @@ def read_image(
     return decode_image(data, mode, apply_exif_orientation=apply_exif_orientation)
 
 
+def _to_python_future(future: torch.Future) -> torch.futures.Future:
+    # Ops return torch._C.Future objects: forward their result to the public
+    # torch.futures.Future class, which isn't a base class of theirs.
+    python_future: torch.futures.Future = torch.futures.Future()
+
+    def callback(fut: torch.Future) -> None:
+        try:
+            python_future.set_result(fut.value())
+        except Exception as e:
+            python_future.set_exception(e)
+
+    future.add_done_callback(callback)
+    return python_future
+
+
+def decode_image_async(
+    input: Union[torch.Tensor, str],
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    apply_exif_orientation: bool = False,
+) -> torch.futures.Future[torch.Tensor]:
+    """Asynchronous version of :func:`~torchvision.io.decode_image`.
+
+    This returns immediately: the image is read (if ``input`` is a path) and
+    decoded on a dedicated pool of native I/O threads, without holding the
+    GIL. This allows the main process, e.g. an inference loop, to prefetch
+    and decode the next images while the model runs, without using
+    DataLoader worker processes.
+
+    .. code::
+
+        futures = [decode_image_async(path, mode="RGB") for path in paths[:prefetch]]
+        for i in range(len(paths)):
+            img = futures[i].wait()
+            if i + prefetch < len(paths):
+                futures.append(decode_image_async(paths[i + prefetch], mode="RGB"))
+            model(img)
+
+    The number of I/O threads can be set with
+    :func:`~torchvision.io.set_io_num_threads`.
+
+    Args:
+        input (Tensor or str or ``pathlib.Path``): The image to decode. If a
+            tensor is passed, it must be one dimensional uint8 tensor containing
+            the raw bytes of the image. Otherwise, this must be a path to the image file.
+        mode (str or ImageReadMode): The mode to convert the image to, e.g. "RGB".
+            Default is "UNCHANGED".  See :class:`~torchvision.io.ImageReadMode`
+            for available modes.
+        apply_exif_orientation (bool): apply EXIF orientation transformation to the output tensor.
+           Only applies to JPEG and PNG images. Default: False.
+
+    Returns:
+        future (torch.futures.Future[Tensor]): a future completed with the
+        decoded image, as returned by :func:`~torchvision.io.decode_image`.
+        If reading or decoding the image fails, ``future.wait()`` raises the
+        corresponding error.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(decode_image_async)
+    if isinstance(mode, str):
+        mode = ImageReadMode[mode.upper()]
+    if isinstance(input, torch.Tensor):
+        future = torch.ops.image.decode_image_async(input, mode.value, apply_exif_orientation)
+    else:
+        future = torch.ops.image.read_image_async(str(input), mode.value, apply_exif_orientation)
+    if torch.jit.is_scripting():
+        return future
+    return _to_python_future(future)
+
+
+def read_image_async(
+    path: str,
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    apply_exif_orientation: bool = False,
+) -> torch.futures.Future[torch.Tensor]:
+    """Read and decode an image file asynchronously.
+
+    Same as :func:`~torchvision.io.decode_image_async` called with a path.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(read_image_async)
+    return decode_image_async(path, mode, apply_exif_orientation=apply_exif_orientation)
+
+
+def set_io_num_threads(num_threads: int) -> None:
+    """Set the number of threads of the I/O thread pool used by
+    :func:`~torchvision.io.decode_image_async` and
+    :func:`~torchvision.io.read_image_async`.
+
+    The pool is created by the first asynchronous call of each process, after
+    which its size can't be changed anymore. By default, it has as many
+    threads as there are CPUs, and at least 4.
+
+    Args:
+        num_threads (int): the number of threads.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(set_io_num_threads)
+    torch.ops.image.set_io_num_threads(num_threads)
+
+
+def get_io_num_threads() -> int:
+    """Return the number of threads of the I/O thread pool. See
+    :func:`~torchvision.io.set_io_num_threads`."""
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(get_io_num_threads)
+    return torch.ops.image.get_io_num_threads()
+
+
+def decode_and_preprocess(
+    input: Union[torch.Tensor, str],
+    size: Optional[List[int]] = None,
+    mean: Optional[List[float]] = None,
+    std: Optional[List[float]] = None,
+    dtype: torch.dtype = torch.float32,
+    antialias: bool = True,
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    apply_exif_orientation: bool = False,
+) -> torch.Tensor:
+    """Decode an image, resize it, convert it to float and normalize it in one go.
+
+    This is equivalent to, but faster than:
+
+    .. code::
+
+        img = decode_image(input, mode=mode, apply_exif_orientation=apply_exif_orientation)
+        img = v2.functional.resize(img, size, antialias=antialias)
+        img = v2.functional.to_dtype(img, dtype, scale=True)
+        img = v2.functional.normalize(img, mean, std)
+
+    The image is decoded first, then the resizing, the conversion to
+    ``dtype`` and the normalization are fused into a single C++ kernel, which
+    processes the image row by row: besides the decoded image and the output,
+    it only keeps the few horizontally resized rows needed by the vertical
+    filter. The resizing is done in float, so the result may differ very
+    slightly from the unfused chain above, which rounds the resized image back
+    to uint8.
+
+    Args:
+        input (Tensor or str or ``pathlib.Path``): The image to decode. See
+            :func:`~torchvision.io.decode_image`.
+        size (int or list of int, optional): The output size, with the same
+            semantics as :class:`~torchvision.transforms.v2.Resize`: either
+            ``[height, width]``, or the size of the smaller edge, the aspect
+            ratio being preserved. The image is resized with bilinear
+            interpolation. Default: None, which doesn't resize the image.
+        mean (list of float, optional): The per-channel means to subtract
+            from the image after converting it to ``[0, 1]``. A single value is
+            used for all channels. Default: None, which is 0.
+        std (list of float, optional): The per-channel standard deviations to
+            divide the image by. A single value is used for all channels.
+            Default: None, which is 1.
+        dtype (torch.dtype): The floating point dtype of the output.
+            Default: ``torch.float32``.
+        antialias (bool): Whether to apply antialiasing when downscaling. See
+            :class:`~torchvision.transforms.v2.Resize`. Default: True.
+        mode (str or ImageReadMode): The mode to convert the image to, e.g.
+            "RGB". Default is "UNCHANGED". See
+            :class:`~torchvision.io.ImageReadMode` for available modes.
+        apply_exif_orientation (bool): apply EXIF orientation transformation
+            to the image. Default: False.
+
+    Returns:
+        output (Tensor[image_channels, height, width]): the preprocessed image,
+        of dtype ``dtype``.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(decode_and_preprocess)
+    if not isinstance(input, torch.Tensor):
+        input = read_file(str(input))
+    if isinstance(mode, str):
+        mode = ImageReadMode[mode.upper()]
+    if not torch.jit.is_scripting() and isinstance(size, int):
+        size = [size]
+    # An empty list means "no resizing" / "no normalization"
+    size_list: List[int] = []
+    mean_list: List[float] = []
+    std_list: List[float] = []
+    if size is not None:
+        size_list = size
+    if mean is not None:
+        mean_list = mean
+    if std is not None:
+        std_list = std
+    return torch.ops.image.decode_and_preprocess(
+        input, size_list, mean_list, std_list, dtype, antialias, mode.value, apply_exif_orientation
+    )
+
+
+class ImageInfo(NamedTuple):
+    """Metadata of an encoded image, as returned by :func:`~torchvision.io.read_image_info`.
+
+    - height, width: the size of the image as stored in the file, i.e. before
+      any EXIF orientation is applied.
+    - num_channels: the number of channels of the tensor that
+      :func:`~torchvision.io.decode_image` returns with ``mode="UNCHANGED"``.
+    - format: one of "jpeg", "png", "gif", "webp", "avif", "heic" or "tiff".
+    - exif_orientation: the EXIF orientation tag, between 1 and 8. 1 means that
+      no transformation is needed, which is also what is reported when the
+      image has no EXIF orientation. For values 5 to 8, height and width are
+      swapped when decoding with ``apply_exif_orientation=True``.
+    """
+
+    height: int
+    width: int
+    num_channels: int
+    format: str
+    exif_orientation: int
+
+
+def read_image_info(
+    input: Union[torch.Tensor, str, List[torch.Tensor], List[str]],
+    num_threads: int = 0,
+) -> Union[ImageInfo, List[ImageInfo]]:
+    """Read the size, number of channels, format and EXIF orientation of an
+    image without decoding it.
+
+    Only the image headers are parsed, which is orders of magnitude faster than
+    decoding the image. When a path is passed, the file is memory-mapped (see
+    :func:`~torchvision.io.read_file`), so usually only its first few kilobytes
+    are actually read from disk.
+
+    Currently supported image formats are jpeg, png, gif, webp, avif, heic and tiff.
+    This doesn't require torchvision to be compiled with support for decoding
+    these formats.
+
+    Args:
+        input (Tensor or str or ``pathlib.Path`` or list of these): The image(s)
+            to read the metadata of. If a tensor is passed, it must be a one
+            dimensional uint8 tensor containing the raw bytes of the image.
+            Otherwise, this must be a path to the image file. A list of images
+            is processed in parallel and returns a list of ``ImageInfo``.
+        num_threads (int): The number of threads to use when a list is passed.
+            Default: 0, which uses all the intra-op threads (see
+            :func:`torch.get_num_threads`).
+
+    Returns:
+        info (ImageInfo or list of ImageInfo): named tuple(s) of
+        ``(height, width, num_channels, format, exif_orientation)``. See
+        :class:`~torchvision.io.ImageInfo`.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(read_image_info)
+    if isinstance(input, list):
+        encoded_images: List[torch.Tensor] = []
+        if torch.jit.isinstance(input, List[torch.Tensor]):
+            encoded_images = input
+        elif torch.jit.isinstance(input, List[str]):
+            encoded_images = [read_file(path) for path in input]
+        elif not torch.jit.is_scripting():
+            # e.g. a list of pathlib.Path
+            encoded_images = [x if isinstance(x, torch.Tensor) else read_file(str(x)) for x in input]
+        heights, widths, num_channels, formats, exif_orientations = torch.ops.image.read_image_infos(
+            encoded_images, num_threads
+        )
+        return [
+            ImageInfo(heights[i], widths[i], num_channels[i], formats[i], exif_orientations[i])
+            for i in range(len(encoded_images))
+        ]
+    if not isinstance(input, torch.Tensor):
+        input = read_file(str(input))
+    info = torch.ops.image.read_image_info(input)
+    return ImageInfo(info[0], info[1], info[2], info[3], info[4])
+
+
 def decode_gif(input: torch.Tensor) -> torch.Tensor:
     """
     Decode a GIF image into a 3 or 4 dimensional RGB Tensor.
@@ -354,6 +904,7 @@ def decode_gif(input: torch.Tensor) -> torch.Tensor:
 def decode_webp(
     input: torch.Tensor,
     mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    out: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """
     Decode a WEBP image into a 3 dimensional RGB[A] Tensor.
@@ -366,15 +917,61 @@ def decode_webp(
         mode (str or ImageReadMode): The mode to convert the image to, e.g. "RGB".
             Default is "UNCHANGED".  See :class:`~torchvision.io.ImageReadMode`
             for available modes.
+        out (Tensor[image_channels, image_height, image_width], optional): A
+            preallocated CPU tensor to decode the image into, e.g. a reusable
+            (and possibly pinned) buffer. See :func:`~torchvision.io.decode_image`.
+            Default: None.
 
     Returns:
-        Decoded image (Tensor[image_channels, image_height, image_width])
+        Decoded image (Tensor[image_channels, image_height, image_width]),
+        which is ``out`` if it was passed.
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(decode_webp)
     if isinstance(mode, str):
         mode = ImageReadMode[mode.upper()]
-    return torch.ops.image.decode_webp(input, mode.value)
+    return torch.ops.image.decode_webp(input, mode.value, out)
+
+
+def decode_tiff(
+    input: torch.Tensor,
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    region: Optional[List[int]] = None,
+) -> torch.Tensor:
+    """
+    Decode a TIFF image into a 3 dimensional Tensor.
+
+    Images can have any number of bands, e.g. multispectral satellite images,
+    and the dtype of the output tensor is the one of the image samples: uint8,
+    uint16, uint32, int8, int16, int32, int64, float16, float32 or float64.
+    Strips and tiles, contiguous and planar images, and BigTIFF files are
+    supported, as well as images compressed with PackBits, LZW or Deflate
+    (if torchvision was built with zlib), with or without predictor. Palette
+    images are decoded as RGB. JPEG-compressed and YCbCr images aren't
+    supported. Only the first image of the file is decoded.
+
+    Args:
+        input (Tensor[1]): a one dimensional contiguous uint8 tensor containing
+            the raw bytes of the TIFF image.
+        mode (str or ImageReadMode): The mode to convert the image to, e.g. "RGB".
+            Default is "UNCHANGED", which returns all the bands of the image.
+            See :class:`~torchvision.io.ImageReadMode` for available modes.
+            Other modes are only supported for uint8, uint16 and floating
+            point images with up to 4 bands.
+        region (list of int, optional): ``[top, left, height, width]`` of the
+            part of the image to decode. Only the strips or tiles intersecting
+            this region are read and decompressed, which makes reading small
+            windows of large (tiled) rasters much faster than decoding the whole
+            image. Default: None, which decodes the whole image.
+
+    Returns:
+        output (Tensor[image_channels, image_height, image_width])
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(decode_tiff)
+    if isinstance(mode, str):
+        mode = ImageReadMode[mode.upper()]
+    return torch.ops.image.decode_tiff(input, mode.value, _crop_to_list(region))
 
 
 def _decode_avif(
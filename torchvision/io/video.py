@@ -1,3 +1,4 @@
+import bisect
 import gc
 import math
 import os
@@ -11,6 +12,7 @@ import torch
 
 from ..utils import _log_api_usage_once
 from . import _video_opt
+from ._video_index import read_video_index
 
 try:
     import av
@@ -45,6 +47,21 @@ def _av_available() -> bool:
     return not isinstance(av, Exception)
 
 
+# numpy dtypes of the audio sample formats of FFmpeg
+_AUDIO_FORMAT_DTYPES = {
+    "dbl": "<f8",
+    "dblp": "<f8",
+    "flt": "<f4",
+    "fltp": "<f4",
+    "s16": "<i2",
+    "s16p": "<i2",
+    "s32": "<i4",
+    "s32p": "<i4",
+    "u8": "u1",
+    "u8p": "u1",
+}
+
+
 # PyAV has some reference cycles
 _CALLED_TIMES = 0
 _GC_COLLECTION_INTERVAL = 10
@@ -121,18 +138,6 @@ def write_video(
         stream.options = options or {}
 
         if audio_array is not None:
-            audio_format_dtypes = {
-                "dbl": "<f8",
-                "dblp": "<f8",
-                "flt": "<f4",
-                "fltp": "<f4",
-                "s16": "<i2",
-                "s16p": "<i2",
-                "s32": "<i4",
-                "s32p": "<i4",
-                "u8": "u1",
-                "u8p": "u1",
-            }
             a_stream = container.add_stream(audio_codec, rate=audio_fps)
             a_stream.options = audio_options or {}
 
@@ -140,7 +145,7 @@ def write_video(
             audio_layout = "stereo" if num_channels > 1 else "mono"
             audio_sample_fmt = container.streams.audio[0].format.name
 
-            format_dtype = np.dtype(audio_format_dtypes[audio_sample_fmt])
+            format_dtype = np.dtype(_AUDIO_FORMAT_DTYPES[audio_sample_fmt])
             audio_array = torch.as_tensor(audio_array).numpy(force=True).astype(format_dtype)
 
             frame = av.AudioFrame.from_ndarray(audio_array, format=audio_sample_fmt, layout=audio_layout)
@@ -244,6 +249,64 @@ def _read_from_stream(
     return result
 
 
+def _check_frame_size_options(
+    size: Optional[Tuple[int, int]], min_dimension: Optional[int], crop: Optional[List[int]]
+) -> None:
+    if size is not None and min_dimension is not None:
+        raise ValueError("size and min_dimension can't be both specified.")
+    if size is not None and (len(size) != 2 or min(size) <= 0):
+        raise ValueError(f"size should be a pair of positive integers (height, width), got {size}.")
+    if min_dimension is not None and min_dimension <= 0:
+        raise ValueError(f"min_dimension should be a positive integer, got {min_dimension}.")
+    if crop is not None and (len(crop) != 4 or min(crop[:2]) < 0 or min(crop[2:]) <= 0):
+        raise ValueError(f"crop should be [top, left, height, width], got {crop}.")
+
+
+def _get_frame_output_size(
+    height: int, width: int, size: Optional[Tuple[int, int]], min_dimension: Optional[int]
+) -> Tuple[int, int]:
+    if size is not None:
+        return size[0], size[1]
+    if min_dimension is not None:
+        # Same rounding as the video_reader backend
+        if width > height:
+            return min_dimension, int(width * min_dimension / height + 0.5)
+        return int(height * min_dimension / width + 0.5), min_dimension
+    return height, width
+
+
+def _crop_frames(frames: torch.Tensor, crop: Optional[List[int]]) -> torch.Tensor:
+    # frames are [..., H, W, C]
+    if crop is None:
+        return frames
+    top, left, height, width = crop
+    if top + height > frames.shape[-3] or left + width > frames.shape[-2]:
+        raise ValueError(
+            f"crop {crop} is out of the bounds of the frames of size {tuple(frames.shape[-3:-1])}, "
+            "after resizing if size or min_dimension is specified."
+        )
+    return frames[..., top : top + height, left : left + width, :]
+
+
+def _video_frame_to_ndarray(
+    frame: "av.video.frame.VideoFrame",
+    size: Optional[Tuple[int, int]] = None,
+    min_dimension: Optional[int] = None,
+    crop: Optional[List[int]] = None,
+) -> np.ndarray:
+    height, width = _get_frame_output_size(frame.height, frame.width, size, min_dimension)
+    if (height, width) != (frame.height, frame.width):
+        # The frame is resized by swscale while it is converted to RGB, like
+        # in the video_reader backend.
+        frame = frame.reformat(width=width, height=height, format="rgb24", interpolation="AREA")
+    else:
+        frame = frame.to_rgb()
+    array = frame.to_ndarray()
+    if crop is not None:
+        array = _crop_frames(torch.from_numpy(array), crop).numpy()
+    return array
+
+
 def _align_audio_frames(
     aframes: torch.Tensor, audio_frames: List["av.frame.Frame"], ref_start: int, ref_end: float
 ) -> torch.Tensor:
@@ -265,6 +328,9 @@ def read_video(
     end_pts: Optional[Union[float, Fraction]] = None,
     pts_unit: str = "pts",
     output_format: str = "THWC",
+    size: Optional[Tuple[int, int]] = None,
+    min_dimension: Optional[int] = None,
+    crop: Optional[List[int]] = None,
 ) -> Tuple[torch.Tensor, torch.Tensor, Dict[str, Any]]:
     """
     Reads a video from a file, returning both the video frames and the audio frames
@@ -286,6 +352,19 @@ def read_video(
         pts_unit (str, optional): unit in which start_pts and end_pts values will be interpreted,
             either 'pts' or 'sec'. Defaults to 'pts'.
         output_format (str, optional): The format of the output video tensors. Can be either "THWC" (default) or "TCHW".
+        size (tuple of int, optional): if specified, the frames are resized to
+            this ``(height, width)``. Resizing is done by FFmpeg (swscale) while
+            converting the decoded frames to RGB, which is much faster than
+            resizing the full resolution RGB frames afterwards.
+        min_dimension (int, optional): if specified, the frames are resized so
+            that their smaller edge is ``min_dimension``, keeping their aspect
+            ratio. Can't be specified together with ``size``.
+        crop (list of int, optional): if specified, only the ``[top, left,
+            height, width]`` region of the frames is returned. The region is in
+            the coordinates of the resized frames if ``size`` or
+            ``min_dimension`` is specified, e.g. ``size=(128, 171)`` and
+            ``crop=[8, 29, 112, 112]`` give the center crop of size 112 of the
+            frames resized to 128x171.
 
     Returns:
         vframes (Tensor[T, H, W, C] or Tensor[T, C, H, W]): the `T` video frames
@@ -298,13 +377,24 @@ def read_video(
     output_format = output_format.upper()
     if output_format not in ("THWC", "TCHW"):
         raise ValueError(f"output_format should be either 'THWC' or 'TCHW', got {output_format}.")
+    _check_frame_size_options(size, min_dimension, crop)
 
     from torchvision import get_video_backend
 
     if get_video_backend() != "pyav":
         if not os.path.exists(filename):
             raise RuntimeError(f"File not found: {filename}")
-        vframes, aframes, info = _video_opt._read_video(filename, start_pts, end_pts, pts_unit)
+        vframes, aframes, info = _video_opt._read_video(
+            filename,
+            start_pts,
+            end_pts,
+            pts_unit,
+            video_width=size[1] if size is not None else 0,
+            video_height=size[0] if size is not None else 0,
+            video_min_dimension=min_dimension or 0,
+        )
+        if vframes.numel() > 0:
+            vframes = _crop_frames(vframes, crop).contiguous()
     else:
         _check_av_available()
 
@@ -326,6 +416,8 @@ def read_video(
                 if container.streams.audio:
                     audio_timebase = container.streams.audio[0].time_base
                 if container.streams.video:
+                    # Let FFmpeg use frame and slice threading
+                    container.streams.video[0].thread_type = "AUTO"
                     video_frames = _read_from_stream(
                         container,
                         start_pts,
@@ -354,7 +446,7 @@ def read_video(
             # TODO raise a warning?
             pass
 
-        vframes_list = [frame.to_rgb().to_ndarray() for frame in video_frames]
+        vframes_list = [_video_frame_to_ndarray(frame, size, min_dimension, crop) for frame in video_frames]
         aframes_list = [frame.to_ndarray() for frame in audio_frames]
 
         if vframes_list:
@@ -409,7 +501,9 @@ def read_video_timestamps(filename: str, pts_unit: str = "pts") -> Tuple[List[in
         try it out and share your feedback, as the torchvision video decoders
         will eventually be deprecated.
 
-    Note that the function decodes the whole video frame-by-frame.
+    Note that the function decodes the whole video frame-by-frame, unless the
+    video was indexed with :func:`~torchvision.io.build_video_index` and the
+    pyav backend is used.
 
     Args:
         filename (str): path to the video file
@@ -431,6 +525,13 @@ def read_video_timestamps(filename: str, pts_unit: str = "pts") -> Tuple[List[in
 
     _check_av_available()
 
+    index = read_video_index(filename)
+    if index is not None:
+        pts = index.pts.tolist()
+        if pts_unit == "sec":
+            pts = [x * index.time_base for x in pts]
+        return pts, index.fps
+
     video_fps = None
     pts = []
 
@@ -454,3 +555,147 @@ def read_video_timestamps(filename: str, pts_unit: str = "pts") -> Tuple[List[in
         pts = [x * video_time_base for x in pts]
 
     return pts, video_fps
+
+
+def _get_frame_pts_and_keyframes(
+    container: "av.container.Container", stream: "av.stream.Stream"
+) -> Tuple[List[int], List[int]]:
+    # Demuxing doesn't decode anything, so this is much cheaper than decoding
+    # the video, and packets hold both the pts and the keyframe flag of frames.
+    pts, keyframes_pts = [], []
+    for packet in container.demux(stream):
+        if packet.pts is None:
+            continue
+        pts.append(packet.pts)
+        if packet.is_keyframe:
+            keyframes_pts.append(packet.pts)
+    pts.sort()
+    keyframes_pts.sort()
+    return pts, keyframes_pts
+
+
+def get_frames_at(
+    filename: str,
+    indices: Optional[List[int]] = None,
+    pts: Optional[List[Union[float, Fraction]]] = None,
+    pts_unit: str = "sec",
+    output_format: str = "THWC",
+) -> torch.Tensor:
+    """
+    Reads the video frames at the given indices or presentation timestamps.
+
+    .. warning::
+
+        In the near future, we intend to centralize PyTorch's video decoding
+        capabilities within the `torchcodec
+        <https://github.com/pytorch/torchcodec>`_ project. We encourage you to
+        try it out and share your feedback, as the torchvision video decoders
+        will eventually be deprecated.
+
+    Unlike :func:`read_video`, which decodes every frame between ``start_pts``
+    and ``end_pts``, this function only decodes the frames needed to get the
+    requested ones, which makes sparse sampling (e.g. a few frames spread over
+    a long video) much faster. The requested frames are sorted, and the
+    decoder only seeks when a keyframe lies between the last decoded frame and
+    the next requested one; otherwise decoding simply goes on from where it
+    is. The frame positions and keyframes are read from the index of the
+    video if it was built with :func:`~torchvision.io.build_video_index`, and
+    are otherwise found by demuxing the video, without decoding it.
+
+    This function relies on PyAV, whichever video backend is selected.
+
+    Args:
+        filename (str): path to the video file. This can be whatever ``av.open`` accepts.
+        indices (List[int], optional): the indices of the frames to read, in
+            presentation order. Negative indices count from the end of the video.
+        pts (List[float or Fraction or int], optional): the presentation
+            timestamps of the frames to read. For each timestamp, the frame
+            displayed at that time is returned, i.e. the last frame whose pts is
+            lower than or equal to it. Exactly one of ``indices`` and ``pts``
+            must be given.
+        pts_unit (str, optional): unit in which the ``pts`` values are
+            interpreted, either 'pts' or 'sec'. Defaults to 'sec'.
+        output_format (str, optional): The format of the output video tensors.
+            Can be either "THWC" (default) or "TCHW".
+
+    Returns:
+        frames (Tensor[N, H, W, C] or Tensor[N, C, H, W]): the requested frames,
+        as a uint8 tensor, in the order in which they were requested.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(get_frames_at)
+    _check_av_available()
+
+    if (indices is None) == (pts is None):
+        raise ValueError("Exactly one of indices and pts must be specified.")
+    if pts_unit not in ("pts", "sec"):
+        raise ValueError(f"pts_unit should be either 'pts' or 'sec', got {pts_unit}.")
+    output_format = output_format.upper()
+    if output_format not in ("THWC", "TCHW"):
+        raise ValueError(f"output_format should be either 'THWC' or 'TCHW', got {output_format}.")
+
+    with av.open(filename, metadata_errors="ignore") as container:
+        if not container.streams.video:
+            raise ValueError(f"No video stream found in {filename}")
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        index = read_video_index(filename)
+        if index is not None:
+            frame_pts = index.pts.tolist()
+            keyframes_pts = index.pts[index.keyframes].tolist()
+        else:
+            frame_pts, keyframes_pts = _get_frame_pts_and_keyframes(container, stream)
+        num_frames = len(frame_pts)
+
+        targets = []
+        if indices is not None:
+            for frame_idx in indices:
+                if not -num_frames <= frame_idx < num_frames:
+                    raise IndexError(f"Frame index {frame_idx} is out of range for a video of {num_frames} frames")
+                targets.append(frame_pts[frame_idx])
+        else:
+            if pts and num_frames == 0:
+                raise IndexError(f"Frame pts {pts[0]} is out of range for a video of 0 frames")
+            for t in pts:
+                if pts_unit == "sec":
+                    t = int(math.floor(Fraction(t) / stream.time_base))
+                # The frame displayed at time t, or the first one if t is before it
+                targets.append(frame_pts[max(bisect.bisect_right(frame_pts, t) - 1, 0)])
+
+        decoded: Dict[int, np.ndarray] = {}
+        frames_iter = None
+        last_frame = None
+        for target in sorted(set(targets)):
+            # The target frame was already decoded when looking for the previous one
+            if last_frame is not None and last_frame.pts == target:
+                decoded[target] = last_frame.to_rgb().to_ndarray()
+                continue
+            # Only seek if the target frame can't be reached by decoding forward
+            # from the last decoded frame without going through a keyframe.
+            keyframe_index = bisect.bisect_right(keyframes_pts, target) - 1
+            keyframe = keyframes_pts[keyframe_index] if keyframe_index >= 0 else frame_pts[0]
+            if frames_iter is None or last_frame is None or not keyframe <= last_frame.pts < target:
+                container.seek(keyframe, any_frame=False, backward=True, stream=stream)
+                frames_iter = container.decode(stream)
+                last_frame = None
+            for frame in frames_iter:
+                if frame.pts is None:
+                    continue
+                last_frame = frame
+                if frame.pts >= target:
+                    # The target pts come from the demuxed packets, so this is an
+                    # exact match unless the pts of packets and frames differ.
+                    decoded[target] = frame.to_rgb().to_ndarray()
+                    break
+            else:
+                raise RuntimeError(f"Failed to decode the frame at pts {target} of {filename}")
+
+        if targets:
+            frames = torch.as_tensor(np.stack([decoded[target] for target in targets]))
+        else:
+            frames = torch.empty((0, stream.codec_context.height, stream.codec_context.width, 3), dtype=torch.uint8)
+
+    if output_format == "TCHW":
+        # [T,H,W,C] --> [T,C,H,W]
+        frames = frames.permute(0, 3, 1, 2)
+    return frames
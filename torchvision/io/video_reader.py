@@ -1,13 +1,21 @@
+import functools
 import io
+import itertools
+import queue
+import threading
 import warnings
+import weakref
 
-from typing import Any, Dict, Iterator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import torch
 
 from ..utils import _log_api_usage_once
 
+from ._video_index import read_video_index
 from ._video_opt import _HAS_CPU_VIDEO_DECODER
+from .video import _check_frame_size_options, _video_frame_to_ndarray
 
 if _HAS_CPU_VIDEO_DECODER:
 
@@ -44,6 +52,195 @@ install PyAV on your system.
     )
 
 
+# Fields of the motion vectors exported by FFmpeg, in the order of the columns
+# of the motion vectors returned by VideoReader
+_MOTION_VECTOR_FIELDS = (
+    "source",
+    "w",
+    "h",
+    "src_x",
+    "src_y",
+    "dst_x",
+    "dst_y",
+    "motion_x",
+    "motion_y",
+    "motion_scale",
+)
+
+
+def _get_motion_vectors(frame: "av.video.frame.VideoFrame") -> torch.Tensor:
+    side_data = frame.side_data.get("MOTION_VECTORS")
+    if side_data is None:
+        # e.g. intra frames
+        return torch.zeros((0, len(_MOTION_VECTOR_FIELDS)), dtype=torch.int32)
+    motion_vectors = side_data.to_ndarray()
+    return torch.from_numpy(np.stack([motion_vectors[name].astype(np.int32) for name in _MOTION_VECTOR_FIELDS], 1))
+
+
+def _convert_pyav_frame(
+    frame: "av.frame.Frame",
+    stream_type: str,
+    size: Optional[Tuple[int, int]] = None,
+    min_dimension: Optional[int] = None,
+    crop: Optional[List[int]] = None,
+    motion_vectors: bool = False,
+) -> Dict[str, Any]:
+    pts = float(frame.pts * frame.time_base)
+    if stream_type == "video":
+        data = torch.as_tensor(_video_frame_to_ndarray(frame, size, min_dimension, crop)).permute(2, 0, 1)
+    elif stream_type == "audio":
+        data = torch.as_tensor(frame.to_ndarray()).permute(1, 0)
+    else:
+        data = None
+    result = {"data": data, "pts": pts}
+    if motion_vectors and stream_type == "video":
+        result["motion_vectors"] = _get_motion_vectors(frame)
+    return result
+
+
+def _demux_keyframes(container: "av.container.Container", stream: "av.stream.Stream") -> Iterator["av.packet.Packet"]:
+    # Non-key packets are dropped before being decoded. The empty packets
+    # demuxed at the end of the file are kept, as they flush the decoder.
+    for packet in container.demux(stream):
+        if packet.is_keyframe or packet.size == 0:
+            yield packet
+
+
+# Markers passed between the stages of _FramePipeline
+_END = object()
+
+
+class _Error:
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+class _FramePipeline:
+    """
+    Iterator over the frames of a stream, which are demuxed, decoded and
+    converted by ``convert`` in three background threads, connected by queues
+    of at most ``max_queue_size`` items. FFmpeg and PyAV release the GIL
+    while demuxing, decoding and converting frames, so the three stages run
+    in parallel with each other, and with the consumer of the frames.
+
+    Frames whose pts is lower than ``min_pts`` are dropped before being
+    converted, until a frame with a greater pts is found. If ``keyframes_only``,
+    only the keyframes are decoded.
+    """
+
+    def __init__(
+        self,
+        container: "av.container.Container",
+        stream: "av.stream.Stream",
+        convert: Callable[["av.frame.Frame"], Dict[str, Any]],
+        max_queue_size: int,
+        min_pts: Optional[int] = None,
+        keyframes_only: bool = False,
+    ) -> None:
+        self._stop = threading.Event()
+        self._done = False
+        self._output: queue.Queue = queue.Queue(max_queue_size)
+        packets: queue.Queue = queue.Queue(max_queue_size)
+        frames: queue.Queue = queue.Queue(max_queue_size)
+        self._threads = [
+            threading.Thread(target=self._demux, args=(container, stream, packets, keyframes_only), daemon=True),
+            threading.Thread(target=self._decode, args=(packets, frames), daemon=True),
+            threading.Thread(target=self._convert, args=(frames, convert, min_pts), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        # Returns False if the pipeline was closed before the item could be queued
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _END
+
+    def _demux(
+        self,
+        container: "av.container.Container",
+        stream: "av.stream.Stream",
+        packets: queue.Queue,
+        keyframes_only: bool,
+    ) -> None:
+        try:
+            for packet in _demux_keyframes(container, stream) if keyframes_only else container.demux(stream):
+                if not self._put(packets, packet):
+                    return
+        except Exception as e:
+            self._put(packets, _Error(e))
+            return
+        self._put(packets, _END)
+
+    def _decode(self, packets: queue.Queue, frames: queue.Queue) -> None:
+        while True:
+            packet = self._get(packets)
+            if packet is _END or isinstance(packet, _Error):
+                self._put(frames, packet)
+                return
+            try:
+                decoded = packet.decode()
+            except Exception as e:
+                self._put(frames, _Error(e))
+                return
+            for frame in decoded:
+                if not self._put(frames, frame):
+                    return
+
+    def _convert(
+        self, frames: queue.Queue, convert: Callable[["av.frame.Frame"], Dict[str, Any]], min_pts: Optional[int]
+    ) -> None:
+        while True:
+            frame = self._get(frames)
+            if frame is _END or isinstance(frame, _Error):
+                self._put(self._output, frame)
+                return
+            if min_pts is not None:
+                if frame.pts is None or frame.pts < min_pts:
+                    continue
+                min_pts = None
+            try:
+                converted = convert(frame)
+            except Exception as e:
+                self._put(self._output, _Error(e))
+                return
+            if not self._put(self._output, converted):
+                return
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._done:
+            raise StopIteration
+        item = self._output.get()
+        if item is _END:
+            self._done = True
+            raise StopIteration
+        if isinstance(item, _Error):
+            self._done = True
+            raise item.exception
+        return item
+
+    def close(self) -> None:
+        # Wait for the threads to stop, as they use the container
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+
 class VideoReader:
     """
     Fine-grained video-reading API.
@@ -117,6 +314,44 @@ class VideoReader:
         num_threads (int, optional): number of threads used by the codec to decode video.
             Default value (0) enables multithreading with codec-dependent heuristic. The performance
             will depend on the version of FFMPEG codecs supported.
+
+        prefetch_frames (int, optional): only supported by the pyav backend. If
+            positive, the packets of the stream are demuxed, decoded and converted
+            to tensors in three background threads, which run ahead of the
+            consumer: up to ``prefetch_frames`` converted frames are buffered, and
+            :mod:`next()` returns them without waiting when they are ready.
+            Default value (0) decodes frames on demand, in the calling thread.
+
+        size (tuple of int, optional): only supported by the pyav backend. If
+            specified, the video frames are resized to this ``(height, width)``
+            by FFmpeg (swscale) while they are converted to RGB, which is much
+            faster than resizing the full resolution RGB frames afterwards.
+
+        min_dimension (int, optional): only supported by the pyav backend. If
+            specified, the video frames are resized so that their smaller edge
+            is ``min_dimension``, keeping their aspect ratio.
+
+        crop (list of int, optional): only supported by the pyav backend. If
+            specified, only the ``[top, left, height, width]`` region of the
+            video frames is returned, in the coordinates of the resized frames
+            if ``size`` or ``min_dimension`` is specified.
+
+        keyframes_only (bool, optional): only supported by the pyav backend. If
+            ``True``, only the keyframes (I-frames) are returned: the other
+            packets are skipped before being decoded, which makes iterating
+            over a video much faster than decoding all its frames, e.g. for
+            shot detection.
+
+        export_motion_vectors (bool, optional): only supported by the pyav
+            backend. If ``True``, the frames of the video streams also have a
+            ``motion_vectors`` field: the motion vectors exported by the codec
+            (e.g. H.264, MPEG-4), as an int32 tensor of shape ``(N, 10)`` whose
+            columns are ``source`` (-1 if the block is predicted from a past
+            frame, 1 if from a future frame), ``w``, ``h`` (the size of the
+            block), ``src_x``, ``src_y``, ``dst_x``, ``dst_y`` (the centers of
+            the source and destination blocks), ``motion_x``, ``motion_y`` and
+            ``motion_scale`` (the motion is ``motion_x / motion_scale``, in
+            pixels). Intra frames have no motion vectors.
     """
 
     def __init__(
@@ -124,11 +359,29 @@ class VideoReader:
         src: str,
         stream: str = "video",
         num_threads: int = 0,
+        prefetch_frames: int = 0,
+        size: Optional[Tuple[int, int]] = None,
+        min_dimension: Optional[int] = None,
+        crop: Optional[List[int]] = None,
+        keyframes_only: bool = False,
+        export_motion_vectors: bool = False,
     ) -> None:
         _log_api_usage_once(self)
         from .. import get_video_backend
 
         self.backend = get_video_backend()
+        if prefetch_frames and self.backend != "pyav":
+            raise ValueError(f"prefetch_frames is only supported by the pyav backend, got backend {self.backend}")
+        if (size is not None or min_dimension is not None or crop is not None) and self.backend != "pyav":
+            raise ValueError(
+                f"size, min_dimension and crop are only supported by the pyav backend, got backend {self.backend}"
+            )
+        if (keyframes_only or export_motion_vectors) and self.backend != "pyav":
+            raise ValueError(
+                "keyframes_only and export_motion_vectors are only supported by the pyav backend, "
+                f"got backend {self.backend}"
+            )
+        _check_frame_size_options(size, min_dimension, crop)
         if isinstance(src, str):
             if not src:
                 raise ValueError("src cannot be empty")
@@ -165,17 +418,60 @@ class VideoReader:
 
         elif self.backend == "pyav":
             self.container = av.open(src, metadata_errors="ignore")
+            for video_stream in self.container.streams.video:
+                # Let FFmpeg use frame and slice threading
+                video_stream.thread_type = "AUTO"
+                video_stream.codec_context.thread_count = num_threads
+                if export_motion_vectors:
+                    video_stream.codec_context.options = {"flags2": "+export_mvs"}
             # TODO: load metadata
             stream_type = stream.split(":")[0]
             stream_id = 0 if len(stream.split(":")) == 1 else int(stream.split(":")[1])
             self.pyav_stream = {stream_type: stream_id}
-            self._c = self.container.decode(**self.pyav_stream)
+            self._prefetch_frames = prefetch_frames
+            self._frame_size_options = {"size": size, "min_dimension": min_dimension, "crop": crop}
+            self._keyframes_only = keyframes_only
+            self._export_motion_vectors = export_motion_vectors
+            self._pipeline: Optional[_FramePipeline] = None
+            self._start_pyav_decoding()
+            # The index of the video, if built with build_video_index, is used to seek accurately
+            self._index = read_video_index(src) if isinstance(src, str) else None
 
             # TODO: add extradata exception
 
         else:
             raise RuntimeError("Unknown video backend: {}".format(self.backend))
 
+    def _start_pyav_decoding(self, min_pts: Optional[int] = None) -> None:
+        # Frames with a pts lower than min_pts, if set, are skipped
+        self._stop_pyav_pipeline()
+        stream = self.container.streams.get(**self.pyav_stream)[0]
+        if self._prefetch_frames > 0:
+            convert = functools.partial(
+                _convert_pyav_frame,
+                stream_type=next(iter(self.pyav_stream)),
+                motion_vectors=self._export_motion_vectors,
+                **self._frame_size_options,
+            )
+            self._pipeline = _FramePipeline(
+                self.container, stream, convert, self._prefetch_frames, min_pts, self._keyframes_only
+            )
+            # The threads only reference the pipeline, which is closed when the reader is destroyed
+            self._pipeline_finalizer = weakref.finalize(self, self._pipeline.close)
+            self._c = self._pipeline
+        else:
+            if self._keyframes_only:
+                self._c = (frame for packet in _demux_keyframes(self.container, stream) for frame in packet.decode())
+            else:
+                self._c = self.container.decode(stream)
+            if min_pts is not None:
+                self._c = itertools.dropwhile(lambda frame: frame.pts is None or frame.pts < min_pts, self._c)
+
+    def _stop_pyav_pipeline(self) -> None:
+        if self._pipeline is not None:
+            self._pipeline_finalizer()
+            self._pipeline = None
+
     def __next__(self) -> Dict[str, Any]:
         """Decodes and returns the next frame of the current stream.
         Frames are encoded as a dict with mandatory
@@ -197,16 +493,21 @@ class VideoReader:
             frame, pts = self._c.next()
         else:
             try:
-                frame = next(self._c)
-                pts = float(frame.pts * frame.time_base)
-                if "video" in self.pyav_stream:
-                    frame = torch.as_tensor(frame.to_rgb().to_ndarray()).permute(2, 0, 1)
-                elif "audio" in self.pyav_stream:
-                    frame = torch.as_tensor(frame.to_ndarray()).permute(1, 0)
+                if self._pipeline is not None:
+                    # The frame was already converted in the background
+                    result = next(self._pipeline)
                 else:
-                    frame = None
+                    result = _convert_pyav_frame(
+                        next(self._c),
+                        next(iter(self.pyav_stream)),
+                        motion_vectors=self._export_motion_vectors,
+                        **self._frame_size_options,
+                    )
             except av.error.EOFError:
                 raise StopIteration
+            if result["data"].numel() == 0:
+                raise StopIteration
+            return result
 
         if frame.numel() == 0:
             raise StopIteration
@@ -228,6 +529,8 @@ class VideoReader:
             means following seek, call to :mod:`next()` will return the
             frame with the exact timestamp if it exists or
             the first frame with timestamp larger than ``time_s``.
+            With the pyav backend, seeking is only precise in the video
+            stream of videos indexed with :func:`~torchvision.io.build_video_index`.
         """
         if self.backend in ["cuda", "video_reader"]:
             self._c.seek(time_s, keyframes_only)
@@ -237,10 +540,21 @@ class VideoReader:
                 time_s = 0
             temp_str = self.container.streams.get(**self.pyav_stream)[0]
             offset = int(round(time_s / temp_str.time_base))
+            if self._index is not None and self.pyav_stream == {"video": 0} and len(self._index.pts) > 0:
+                # Seek to the exact keyframe preceding the requested time, and
+                # skip the frames decoded before this time.
+                keyframes_pts = self._index.pts[self._index.keyframes]
+                keyframe_idx = int(torch.searchsorted(keyframes_pts, offset, right=True)) - 1
+                keyframe = keyframes_pts[keyframe_idx].item() if keyframe_idx >= 0 else self._index.pts[0].item()
+                self._stop_pyav_pipeline()
+                self.container.seek(keyframe, backward=True, any_frame=False, stream=temp_str)
+                self._start_pyav_decoding(min_pts=None if keyframes_only else offset)
+                return self
             if not keyframes_only:
                 warnings.warn("Accurate seek is not implemented for pyav backend")
+            self._stop_pyav_pipeline()
             self.container.seek(offset, backward=True, any_frame=False, stream=temp_str)
-            self._c = self.container.decode(**self.pyav_stream)
+            self._start_pyav_decoding()
         return self
 
     def get_metadata(self) -> Dict[str, Any]:
@@ -289,6 +603,6 @@ class VideoReader:
             stream_type = stream.split(":")[0]
             stream_id = 0 if len(stream.split(":")) == 1 else int(stream.split(":")[1])
             self.pyav_stream = {stream_type: stream_id}
-            self._c = self.container.decode(**self.pyav_stream)
+            self._start_pyav_decoding()
             return True
         return self._c.set_current_stream(stream)
@@ -0,0 +1,281 @@
+import queue
+import threading
+import weakref
+from fractions import Fraction
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+from ..utils import _log_api_usage_once
+from .video import _AUDIO_FORMAT_DTYPES, _check_av_available, av
+
+# Marker telling the encoding thread that there are no more frames
+_END = object()
+
+
+class _Encoder:
+    """
+    Encodes the frames put in ``queue`` into ``container``, in a background
+    thread. The thread doesn't reference the :class:`VideoWriter`, which can
+    thus be garbage collected, and closes the encoder when it is.
+    """
+
+    def __init__(self, container: Any, max_queue_size: int) -> None:
+        self.container = container
+        # The streams to flush at the end
+        self.streams: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.queue: queue.Queue = queue.Queue(max_queue_size)
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+
+    def _encode(self) -> None:
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _END:
+                    break
+                stream, frame = item
+                for packet in stream.encode(frame):
+                    self.container.mux(packet)
+            # Flush the streams
+            for stream in self.streams:
+                for packet in stream.encode():
+                    self.container.mux(packet)
+        except BaseException as e:
+            self.error = e
+            # Unblock the writers waiting for room in the queue
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def close(self) -> None:
+        try:
+            if self.error is None:
+                while self.thread.is_alive():
+                    try:
+                        self.queue.put(_END, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+            self.thread.join()
+        finally:
+            self.container.close()
+
+
+class VideoWriter:
+    """
+    Streaming video-writing API.
+
+    Unlike :func:`~torchvision.io.write_video`, which needs the whole video in
+    memory, ``VideoWriter`` encodes the frames, and optionally the audio, as
+    they are written, chunk by chunk. It can thus write videos of any length
+    in constant memory.
+
+    The frames are encoded by a background thread, which receives them through
+    a queue of at most ``max_queue_size`` frames: :meth:`write_frames` only
+    blocks when the queue is full. FFmpeg and PyAV release the GIL while
+    converting and encoding frames, so encoding runs in parallel with the code
+    producing the frames, and the encoder itself can use several threads.
+
+    ``VideoWriter`` should be used as a context manager, or be closed with
+    :meth:`close`, which flushes the encoders and finalizes the file. A
+    writer which isn't closed is closed when it is garbage collected, but the
+    encoding errors are then lost.
+
+    This relies on PyAV (therefore, ultimately FFmpeg) to encode videos.
+
+    Example:
+
+    .. code:: python
+
+        with VideoWriter("overlay.mp4", fps=30, options={"crf": "17"}) as writer:
+            for frames in loader:
+                writer.write_frames(render(frames))
+
+    Args:
+        filename (str): path where the video will be saved
+        fps (Number): video frames per second
+        video_codec (str): the name of the video codec, i.e. "libx264", "h264", etc.
+        options (Dict): dictionary containing options to be passed into the PyAV video stream.
+            The list of options is codec-dependent and can all
+            be found from `the FFMpeg wiki <http://trac.ffmpeg.org/wiki#Encoding>`_.
+        height (int, optional): height of the frames. By default, the size of the
+            frames is given by the first frames written.
+        width (int, optional): width of the frames.
+        audio_fps (Number, optional): audio sample rate, typically 44100 or 48000.
+            Audio can only be written if it is set, together with ``audio_codec``.
+        audio_codec (str, optional): the name of the audio codec, i.e. "mp3", "aac", etc.
+        audio_options (Dict): dictionary containing options to be passed into the PyAV audio stream.
+        audio_channels (int): number of audio channels. Default: 2
+        num_threads (int): number of threads used by the video encoder. 0 lets
+            FFmpeg choose it, depending on the number of CPUs. Default: 0
+        max_queue_size (int): maximum number of frames waiting to be encoded.
+            Default: 16
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        fps: float,
+        video_codec: str = "libx264",
+        options: Optional[Dict[str, Any]] = None,
+        height: Optional[int] = None,
+        width: Optional[int] = None,
+        audio_fps: Optional[int] = None,
+        audio_codec: Optional[str] = None,
+        audio_options: Optional[Dict[str, Any]] = None,
+        audio_channels: int = 2,
+        num_threads: int = 0,
+        max_queue_size: int = 16,
+    ) -> None:
+        _log_api_usage_once(self)
+        _check_av_available()
+        if (height is None) != (width is None):
+            raise ValueError("height and width should either both be set, or both be None")
+        if (audio_fps is None) != (audio_codec is None):
+            raise ValueError("audio_fps and audio_codec should either both be set, or both be None")
+        if max_queue_size < 1:
+            raise ValueError(f"max_queue_size should be a positive integer, got {max_queue_size}")
+
+        # PyAV does not support floating point numbers with decimal point
+        # and will throw OverflowException in case this is not the case
+        if isinstance(fps, float):
+            fps = np.round(fps)
+        self.fps = fps
+        self.video_codec = video_codec
+        self.options = options
+        self.num_threads = num_threads
+        self._num_frames = 0
+        self._num_samples = 0
+
+        self._container = av.open(filename, mode="w")
+        self._video_stream: Optional["av.video.stream.VideoStream"] = None
+        self._audio_stream: Optional["av.audio.stream.AudioStream"] = None
+        try:
+            if height is not None and width is not None:
+                self._add_video_stream(height, width)
+            if audio_codec is not None:
+                self._audio_stream = self._container.add_stream(audio_codec, rate=audio_fps)
+                self._audio_stream.layout = "stereo" if audio_channels > 1 else "mono"
+                self._audio_stream.options = audio_options or {}
+        except Exception:
+            self._container.close()
+            raise
+        self._audio_channels = audio_channels
+
+        self._closed = False
+        self._encoder = _Encoder(self._container, max_queue_size)
+        self._encoder.streams.extend(s for s in (self._video_stream, self._audio_stream) if s is not None)
+        self._encoder_finalizer = weakref.finalize(self, self._encoder.close)
+
+    def _add_video_stream(self, height: int, width: int) -> None:
+        stream = self._container.add_stream(self.video_codec, rate=self.fps)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p" if self.video_codec != "libx264rgb" else "rgb24"
+        stream.options = self.options or {}
+        stream.thread_type = "AUTO"
+        stream.codec_context.thread_count = self.num_threads
+        self._video_stream = stream
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("The VideoWriter is closed")
+        if self._encoder.error is not None:
+            raise RuntimeError("Failed to encode the video") from self._encoder.error
+
+    def _put(self, item: Any) -> None:
+        while True:
+            self._check_open()
+            try:
+                self._encoder.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def write_frames(self, frames: torch.Tensor) -> None:
+        """
+        Writes frames to the video.
+
+        The frames are copied before this returns, so ``frames`` can be
+        modified or reused afterwards.
+
+        Args:
+            frames (Tensor[T, H, W, C]): the frames, as a uint8 tensor in
+                [T, H, W, C] format, with C = 3 (RGB).
+        """
+        self._check_open()
+        frames = torch.as_tensor(frames, dtype=torch.uint8)
+        if frames.ndim != 4 or frames.shape[-1] != 3:
+            raise ValueError(f"frames should be a tensor of shape [T, H, W, 3], got {tuple(frames.shape)}")
+        if self._video_stream is None:
+            self._add_video_stream(frames.shape[1], frames.shape[2])
+            # Flushed before the audio stream, like the streams added on creation
+            self._encoder.streams.insert(0, self._video_stream)
+        stream = self._video_stream
+        if frames.shape[1:3] != (stream.height, stream.width):
+            raise ValueError(
+                f"All the frames should have the same size {(stream.height, stream.width)}, "
+                f"got frames of size {tuple(frames.shape[1:3])}"
+            )
+
+        for img in frames.numpy(force=True):
+            frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+            frame.pict_type = "NONE"
+            frame.pts = self._num_frames
+            frame.time_base = Fraction(1, 1) / Fraction(self.fps)
+            self._put((stream, frame))
+            self._num_frames += 1
+
+    def write_audio(self, audio: torch.Tensor) -> None:
+        """
+        Writes audio samples to the video.
+
+        Args:
+            audio (Tensor[C, N]): the audio, where C is the number of channels
+                and N is the number of samples.
+        """
+        self._check_open()
+        if self._audio_stream is None:
+            raise RuntimeError("The VideoWriter has no audio stream: set audio_fps and audio_codec to write audio")
+        if self._video_stream is None:
+            raise RuntimeError("The size of the video must be known before writing audio: set height and width")
+        audio = torch.as_tensor(audio)
+        if audio.ndim != 2 or audio.shape[0] != self._audio_channels:
+            raise ValueError(f"audio should be a tensor of shape [{self._audio_channels}, N], got {tuple(audio.shape)}")
+
+        stream = self._audio_stream
+        sample_format = stream.format
+        audio_array = audio.numpy(force=True).astype(np.dtype(_AUDIO_FORMAT_DTYPES[sample_format.name]))
+        if not sample_format.is_planar:
+            # Packed formats interleave the channels
+            audio_array = audio_array.T.reshape(1, -1)
+        frame = av.AudioFrame.from_ndarray(
+            np.ascontiguousarray(audio_array), format=sample_format.name, layout=stream.layout.name
+        )
+        frame.sample_rate = stream.rate
+        frame.pts = self._num_samples
+        frame.time_base = Fraction(1, stream.rate)
+        self._put((stream, frame))
+        self._num_samples += audio.shape[1]
+
+    def close(self) -> None:
+        """
+        Flushes the encoders, and finalizes and closes the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._encoder_finalizer()
+        if self._encoder.error is not None:
+            raise RuntimeError("Failed to encode the video") from self._encoder.error
+
+    def __enter__(self) -> "VideoWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
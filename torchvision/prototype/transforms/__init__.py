@@ -1,6 +1,6 @@
 from ._presets import StereoMatching  # usort: skip
 
 from ._augment import SimpleCopyPaste
-from ._geometry import FixedSizeCrop
+from ._geometry import DecodeRandomResizedCrop, FixedSizeCrop
 from ._misc import PermuteDimensions, TransposeDimensions
 from ._type_conversion import LabelToOneHot
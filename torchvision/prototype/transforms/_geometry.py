@@ -1,11 +1,12 @@
-from typing import Any, Dict, List, Optional, Sequence, Type, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
 
 import PIL.Image
 import torch
 
 from torchvision import tv_tensors
+from torchvision.io import decode_image, decode_jpeg, ImageReadMode, read_image_info
 from torchvision.prototype.tv_tensors import Label, OneHotLabel
-from torchvision.transforms.v2 import functional as F, Transform
+from torchvision.transforms.v2 import functional as F, InterpolationMode, RandomResizedCrop, Transform
 from torchvision.transforms.v2._utils import (
     _FillType,
     _get_fill,
@@ -132,3 +133,84 @@ class FixedSizeCrop(Transform):
             inpt = self._call_kernel(F.pad, inpt, params["padding"], fill=fill, padding_mode=self.padding_mode)
 
         return inpt
+
+
+def _is_encoded_image(inpt: Any) -> bool:
+    return isinstance(inpt, torch.Tensor) and inpt.ndim == 1 and inpt.dtype == torch.uint8
+
+
+class DecodeRandomResizedCrop(RandomResizedCrop):
+    """Decode an image, crop a random portion of it and resize it to a given size.
+
+    This is equivalent to :func:`~torchvision.io.decode_image` followed by
+    :class:`~torchvision.transforms.v2.RandomResizedCrop`, but JPEG images are only
+    decoded over the sampled region, and downscaled during decoding when the crop is
+    much larger than ``size``. The crop is sampled from the image size found in the
+    image header.
+
+    The input must be a one dimensional uint8 tensor containing the raw bytes of the
+    image, e.g. an ``EncodedImage``. The output is a :class:`~torchvision.tv_tensors.Image`.
+    The sample must not contain other spatial inputs, e.g. bounding boxes or masks.
+
+    Args:
+        size, scale, ratio, interpolation, antialias: See
+            :class:`~torchvision.transforms.v2.RandomResizedCrop`.
+        mode (str or ImageReadMode): The mode to convert the image to, e.g. "RGB".
+            Default is "UNCHANGED".
+    """
+
+    # There is no v1 equivalent to this transform
+    _v1_transform_cls = None
+
+    _transformed_types = (_is_encoded_image,)
+
+    def __init__(
+        self,
+        size: Union[int, Sequence[int]],
+        scale: Tuple[float, float] = (0.08, 1.0),
+        ratio: Tuple[float, float] = (3.0 / 4.0, 4.0 / 3.0),
+        interpolation: Union[InterpolationMode, int] = InterpolationMode.BILINEAR,
+        antialias: Optional[bool] = True,
+        mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    ) -> None:
+        super().__init__(size, scale=scale, ratio=ratio, interpolation=interpolation, antialias=antialias)
+        self.mode = ImageReadMode[mode.upper()] if isinstance(mode, str) else mode
+
+    def _check_inputs(self, flat_inputs: List[Any]) -> None:
+        if has_any(
+            flat_inputs,
+            PIL.Image.Image,
+            tv_tensors.Image,
+            tv_tensors.Video,
+            tv_tensors.BoundingBoxes,
+            tv_tensors.Mask,
+        ):
+            raise TypeError(
+                f"{type(self).__name__}() only supports encoded images, "
+                f"and the sample must not contain any decoded image, video, bounding boxes or masks."
+            )
+
+    def _get_params(self, flat_inputs: List[Any]) -> Dict[str, Any]:
+        headers = set()
+        for inpt in flat_inputs:
+            info = read_image_info(inpt.as_subclass(torch.Tensor))
+            headers.add((info.height, info.width, info.format))
+        if not headers:
+            raise TypeError("No encoded image was found in the sample")
+        elif len(headers) > 1:
+            raise ValueError(f"Found multiple encoded images with different headers in the sample: {sorted(headers)}")
+        height, width, format = headers.pop()
+
+        params = self._get_crop_params(height, width)
+        params["is_jpeg"] = format == "jpeg"
+        return params
+
+    def _transform(self, inpt: Any, params: Dict[str, Any]) -> Any:
+        data = inpt.as_subclass(torch.Tensor)
+        crop = [params["top"], params["left"], params["height"], params["width"]]
+        if params["is_jpeg"]:
+            image = decode_jpeg(data, mode=self.mode, target_size=self.size, crop=crop)
+        else:
+            image = F.crop(decode_image(data, mode=self.mode), *crop)
+        image = F.resize(image, self.size, interpolation=self.interpolation, antialias=self.antialias)
+        return tv_tensors.Image(image)
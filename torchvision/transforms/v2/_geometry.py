@@ -74,6 +74,12 @@ class Resize(Transform):
     it can have arbitrary number of leading batch dimensions. For example,
     the image can have ``[..., C, H, W]`` shape. A bounding box can have ``[..., 4]`` shape.
 
+    .. note::
+        If the images are JPEGs decoded right before this transform, passing this
+        transform's ``size`` as the ``target_size`` parameter of
+        :func:`~torchvision.io.decode_jpeg` or :func:`~torchvision.io.decode_image`
+        lets the decoder downscale them at a much lower cost.
+
     Args:
         size (sequence, int, or None): Desired
             output size.
@@ -270,6 +276,9 @@ class RandomResizedCrop(Transform):
 
     def _get_params(self, flat_inputs: List[Any]) -> Dict[str, Any]:
         height, width = query_size(flat_inputs)
+        return self._get_crop_params(height, width)
+
+    def _get_crop_params(self, height: int, width: int) -> Dict[str, Any]:
         area = height * width
 
         log_ratio = self._log_ratio